@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STREAMING INDICATOR ENGINE - O(1) Per-Bar Technical Indicators
+=============================================================
+คำนวณ Technical Indicators แบบ incremental - แต่ละ bar ใหม่อัพเดททุกตัวในเวลาคงที่
+แทนการสร้าง list ของราคาใหม่ทุกครั้งที่เรียก
+
+🎯 FEATURES:
+- Fixed-size NumPy ring buffers (close / high / low / volume)
+- Moving Averages ด้วย running sums
+- RSI และ ATR แบบ Wilder smoothing
+- Bollinger Bands ด้วย rolling Welford variance
+- Volume SMA แบบ running sum
+
+เชื่อมต่อไปยัง:
+- adaptive_entries/signal_generator.py (TechnicalAnalyzer)
+"""
+
+import math
+import numpy as np
+from typing import Dict
+
+def wilder_average(values: np.ndarray, period: int) -> float:
+    """Wilder smoothing - seed ด้วยค่าเฉลี่ย period ค่าแรก แล้ว smooth ค่าที่เหลือทีละค่า"""
+    average = float(values[:period].mean())
+    for value in values[period:].tolist():
+        average = (average * (period - 1) + value) / period
+    return average
+
+class RingBuffer:
+    """Ring buffer ขนาดคงที่บน NumPy array"""
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.index = 0      # ตำแหน่งที่จะเขียนครั้งถัดไป
+        self.count = 0
+
+    def append(self, value: float):
+        """เพิ่มค่าใหม่ (เขียนทับค่าเก่าสุดเมื่อเต็ม)"""
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def ago(self, n: int) -> float:
+        """ค่าย้อนหลัง n ตำแหน่ง (0 = ล่าสุด)"""
+        return self.data[(self.index - 1 - n) % self.capacity]
+
+    def last(self, n: int) -> np.ndarray:
+        """n ค่าล่าสุดเรียงจากเก่าไปใหม่ (copy)"""
+        n = min(n, self.count)
+        start = (self.index - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:], self.data[:self.index]))
+
+    def __len__(self) -> int:
+        return self.count
+
+class StreamingIndicatorEngine:
+    """
+    Streaming Indicator Engine - อัพเดท MA / RSI / BB / ATR / Volume SMA ใน O(1) ต่อ bar
+    """
+
+    def __init__(self, capacity: int = 200, ma_periods=(10, 20, 50),
+                 rsi_period: int = 14, bb_period: int = 20, bb_std_dev: float = 2.0,
+                 atr_period: int = 14, volume_period: int = 50):
+        self.ma_periods = tuple(ma_periods)
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_std_dev = bb_std_dev
+        self.atr_period = atr_period
+        self.volume_period = volume_period
+
+        # ต้องจุข้อมูลพอสำหรับค่าที่หลุดออกจาก window ที่ยาวที่สุด
+        capacity = max(capacity, max(self.ma_periods) + 1, bb_period + 1)
+        self.closes = RingBuffer(capacity)
+        self.highs = RingBuffer(capacity)
+        self.lows = RingBuffer(capacity)
+        self.volumes = RingBuffer(volume_period + 1)
+
+        self.reset_state()
+
+    def reset_state(self):
+        """ล้างสถานะของ indicators ทั้งหมด"""
+        self.closes.count = self.highs.count = self.lows.count = self.volumes.count = 0
+        self.closes.index = self.highs.index = self.lows.index = self.volumes.index = 0
+
+        # Moving averages - running sums
+        self._ma_sums: Dict[int, float] = {period: 0.0 for period in self.ma_periods}
+
+        # RSI (Wilder)
+        self._rsi_seed_gain = 0.0
+        self._rsi_seed_loss = 0.0
+        self._rsi_deltas = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+        # ATR (Wilder)
+        self._atr_seed = 0.0
+        self._tr_count = 0
+        self._atr = 0.0
+
+        # Bollinger - rolling Welford
+        self._bb_count = 0
+        self._bb_mean = 0.0
+        self._bb_m2 = 0.0
+
+        # Volume SMA
+        self._volume_sum = 0.0
+        self.last_volume = 0
+
+        self.bar_count = 0
+
+    def update(self, high: float, low: float, close: float, volume: int = 0):
+        """อัพเดททุก indicator ด้วย bar ใหม่ - O(1)"""
+        has_previous = self.closes.count > 0
+        previous_close = self.closes.ago(0) if has_previous else close
+
+        # --- Moving averages: เพิ่มค่าใหม่ ลบค่าที่หลุด window ---
+        for period in self.ma_periods:
+            self._ma_sums[period] += close
+            if self.closes.count >= period:
+                self._ma_sums[period] -= self.closes.ago(period - 1)
+
+        # --- Bollinger: rolling Welford ---
+        if self._bb_count >= self.bb_period:
+            leaving = self.closes.ago(self.bb_period - 1)
+            self._bb_count -= 1
+            if self._bb_count == 0:
+                self._bb_mean = 0.0
+                self._bb_m2 = 0.0
+            else:
+                delta = leaving - self._bb_mean
+                self._bb_mean -= delta / self._bb_count
+                self._bb_m2 -= delta * (leaving - self._bb_mean)
+        self._bb_count += 1
+        delta = close - self._bb_mean
+        self._bb_mean += delta / self._bb_count
+        self._bb_m2 += delta * (close - self._bb_mean)
+        if self._bb_m2 < 0.0:
+            self._bb_m2 = 0.0
+
+        if has_previous:
+            # --- RSI (Wilder) ---
+            change = close - previous_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            self._rsi_deltas += 1
+            if self._rsi_deltas <= self.rsi_period:
+                self._rsi_seed_gain += gain
+                self._rsi_seed_loss += loss
+                if self._rsi_deltas == self.rsi_period:
+                    self._avg_gain = self._rsi_seed_gain / self.rsi_period
+                    self._avg_loss = self._rsi_seed_loss / self.rsi_period
+            else:
+                self._avg_gain = (self._avg_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                self._avg_loss = (self._avg_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+
+            # --- ATR (Wilder) ---
+            true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+            self._tr_count += 1
+            if self._tr_count <= self.atr_period:
+                self._atr_seed += true_range
+                if self._tr_count == self.atr_period:
+                    self._atr = self._atr_seed / self.atr_period
+            else:
+                self._atr = (self._atr * (self.atr_period - 1) + true_range) / self.atr_period
+
+        # --- Volume SMA (เฉพาะ volume > 0) ---
+        if volume > 0:
+            self._volume_sum += volume
+            if self.volumes.count >= self.volume_period:
+                self._volume_sum -= self.volumes.ago(self.volume_period - 1)
+            self.volumes.append(volume)
+            self.last_volume = volume
+
+        self.closes.append(close)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.bar_count += 1
+
+        # ป้องกัน floating-point drift ของ running sums (amortized O(1))
+        if self.bar_count % self.closes.capacity == 0:
+            self._resync_sums()
+
+    def _resync_sums(self):
+        """คำนวณ running sums ใหม่จาก ring buffers"""
+        for period in self.ma_periods:
+            if self.closes.count >= period:
+                self._ma_sums[period] = float(self.closes.last(period).sum())
+
+        if self._bb_count == self.bb_period:
+            window = self.closes.last(self.bb_period)
+            self._bb_mean = float(window.mean())
+            self._bb_m2 = float(((window - self._bb_mean) ** 2).sum())
+
+        count = min(self.volumes.count, self.volume_period)
+        if count:
+            self._volume_sum = float(self.volumes.last(count).sum())
+
+    # ===== INDICATOR VALUES =====
+
+    def moving_average(self, period: int) -> float:
+        """ค่า MA ของ period (0 ถ้าข้อมูลยังไม่พอ)"""
+        if self.closes.count < period:
+            return 0.0
+        return self._ma_sums[period] / period
+
+    def rsi(self) -> float:
+        """RSI แบบ Wilder (50 ถ้าข้อมูลยังไม่พอ)"""
+        if self._rsi_deltas < self.rsi_period:
+            return 50.0
+        if self._avg_loss == 0:
+            return 100.0
+        rs = self._avg_gain / self._avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def atr(self) -> float:
+        """ATR แบบ Wilder (1.0 ถ้าข้อมูลยังไม่พอ)"""
+        if self._tr_count < self.atr_period:
+            return 1.0
+        return self._atr
+
+    def rsi_for_period(self, period: int) -> float:
+        """
+        RSI แบบ Wilder ของ period อื่น - smooth จากทุก bar ใน ring buffer
+        (ค่าเท่ากับ rsi() เมื่อ period ตรงกันและ bars ยังไม่เกิน capacity)
+        """
+        if self.closes.count < period + 1:
+            return 50.0
+        deltas = np.diff(self.closes.last(self.closes.count))
+        avg_gain = wilder_average(np.where(deltas > 0, deltas, 0.0), period)
+        avg_loss = wilder_average(np.where(deltas < 0, -deltas, 0.0), period)
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def atr_for_period(self, period: int) -> float:
+        """ATR แบบ Wilder ของ period อื่น - smooth จากทุก bar ใน ring buffer"""
+        if self.closes.count < period + 1:
+            return 1.0
+        count = self.closes.count
+        highs = self.highs.last(count)[1:]
+        lows = self.lows.last(count)[1:]
+        prev_closes = self.closes.last(count)[:-1]
+        true_ranges = np.maximum(highs - lows,
+                                 np.maximum(np.abs(highs - prev_closes), np.abs(lows - prev_closes)))
+        return wilder_average(true_ranges, period)
+
+    def bollinger_bands(self) -> Dict[str, float]:
+        """Bollinger Bands จาก rolling mean / variance"""
+        if self._bb_count < self.bb_period:
+            return {'bb_upper': 0, 'bb_middle': 0, 'bb_lower': 0}
+
+        std_deviation = math.sqrt(self._bb_m2 / self._bb_count)
+        return {
+            'bb_upper': self._bb_mean + (std_deviation * self.bb_std_dev),
+            'bb_middle': self._bb_mean,
+            'bb_lower': self._bb_mean - (std_deviation * self.bb_std_dev)
+        }
+
+    def volume_sma(self) -> float:
+        """ค่าเฉลี่ย volume ล่าสุด"""
+        count = min(self.volumes.count, self.volume_period)
+        return self._volume_sum / count if count else 0.0
+
+    def get_values(self) -> Dict[str, float]:
+        """ค่า indicators ทั้งหมด"""
+        values = {f'ma_{period}': self.moving_average(period) for period in self.ma_periods}
+        values.update(self.bollinger_bands())
+        values['rsi_14'] = self.rsi()
+        values['atr'] = self.atr()
+        values['volume'] = self.last_volume
+        values['volume_sma'] = self.volume_sma()
+        return values
+
+    def __len__(self) -> int:
+        return self.closes.count
+
+def create_indicator_engine(capacity: int = 200) -> StreamingIndicatorEngine:
+    """สร้าง Streaming Indicator Engine"""
+    return StreamingIndicatorEngine(capacity=capacity)
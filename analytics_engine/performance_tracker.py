@@ -11,13 +11,19 @@ import sqlite3
 import json
 import threading
 import time
-from datetime import datetime, timedelta
+import queue
+import atexit
+import itertools
+import weakref
+from datetime import datetime, timedelta, date
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import deque, defaultdict
 
+from utilities.compact_records import slotted_dataclass
+
 # Import dependencies with fallback
 try:
     from utilities.professional_logger import setup_component_logger
@@ -76,7 +82,7 @@ class SessionType(Enum):
 
 # ===== DATACLASSES - CORRECT FIELD ORDERING =====
 
-@dataclass
+@slotted_dataclass
 class TradeRecord:
     """
     บันทึกเทรด - รับประกันไม่มี default argument errors
@@ -205,12 +211,319 @@ class TradingStatistics:
     sharpe_ratio: float = 0.0
     volume_target_achievement: float = 0.0
 
+@dataclass
+class StatisticsBucket:
+    """ผลรวมสถิติแบบ merge ได้ของกลุ่มเทรดที่ปิดแล้ว (ต่อวัน / session / strategy / recovery method)"""
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    recovered_trades: int = 0
+    total_volume: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    net_profit: float = 0.0
+    largest_win: float = 0.0
+    largest_loss: float = 0.0
+    first_entry: Optional[datetime] = None
+    last_entry: Optional[datetime] = None
+    
+    def add_trade(self, trade: TradeRecord):
+        """เพิ่มเทรดที่ปิดแล้ว - O(1)"""
+        pnl = trade.realized_pnl
+        self.total_trades += 1
+        if pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += pnl
+            self.largest_win = max(self.largest_win, pnl)
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.gross_loss += -pnl
+            self.largest_loss = min(self.largest_loss, pnl)
+        if trade.is_recovery_trade:
+            self.recovered_trades += 1
+        self.total_volume += trade.volume
+        self.net_profit += pnl
+        
+        if self.first_entry is None or trade.entry_time < self.first_entry:
+            self.first_entry = trade.entry_time
+        if self.last_entry is None or trade.entry_time > self.last_entry:
+            self.last_entry = trade.entry_time
+    
+    def merge(self, other: 'StatisticsBucket'):
+        """รวม bucket อื่นเข้ามา"""
+        self.total_trades += other.total_trades
+        self.winning_trades += other.winning_trades
+        self.losing_trades += other.losing_trades
+        self.recovered_trades += other.recovered_trades
+        self.total_volume += other.total_volume
+        self.gross_profit += other.gross_profit
+        self.gross_loss += other.gross_loss
+        self.net_profit += other.net_profit
+        self.largest_win = max(self.largest_win, other.largest_win)
+        self.largest_loss = min(self.largest_loss, other.largest_loss)
+        
+        if other.first_entry is not None and (self.first_entry is None or other.first_entry < self.first_entry):
+            self.first_entry = other.first_entry
+        if other.last_entry is not None and (self.last_entry is None or other.last_entry > self.last_entry):
+            self.last_entry = other.last_entry
+    
+    def within(self, start_time: datetime, end_time: datetime) -> bool:
+        """เทรดทั้งหมดใน bucket อยู่ในช่วงเวลาหรือไม่"""
+        return (self.first_entry is None or
+                (self.first_entry >= start_time and self.last_entry <= end_time))
+
+# กลุ่มของ bucket: (market_session, entry_strategy, recovery_method)
+BucketKey = Tuple[str, str, str]
+BUCKET_DIMENSIONS = ('session', 'strategy', 'recovery_method')
+
+# สถานะที่นับเป็นเทรดที่จบแล้วในสถิติ
+AGGREGATED_STATUSES = (TradeStatus.CLOSED, TradeStatus.RECOVERED)
+
+BUCKET_AGGREGATE_SQL = """
+SELECT {group_columns}
+    market_session, entry_strategy, recovery_method,
+    COUNT(*), SUM(realized_pnl > 0), SUM(realized_pnl < 0), SUM(is_recovery_trade),
+    TOTAL(volume),
+    TOTAL(CASE WHEN realized_pnl > 0 THEN realized_pnl END),
+    TOTAL(CASE WHEN realized_pnl < 0 THEN -realized_pnl END),
+    TOTAL(realized_pnl), MAX(realized_pnl), MIN(realized_pnl),
+    MIN(entry_time), MAX(entry_time)
+FROM trade_records
+WHERE status IN ({statuses}) {where}
+GROUP BY {group_columns} market_session, entry_strategy, recovery_method
+"""
+
+# ===== DATABASE WRITER =====
+
+TRADE_UPSERT_SQL = """
+INSERT OR REPLACE INTO trade_records (
+    trade_id, position_id, symbol, entry_time, close_time, direction, volume,
+    entry_price, close_price, realized_pnl, unrealized_pnl, commission, swap,
+    entry_strategy, signal_quality, market_session, status, is_recovery_trade,
+    parent_trade_id, recovery_method, recovery_level, hold_duration_seconds,
+    max_profit, max_loss, market_conditions, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SNAPSHOT_INSERT_SQL = """
+INSERT INTO performance_snapshots (
+    timestamp, timeframe, account_balance, account_equity, total_trades,
+    winning_trades, losing_trades, recovered_trades, total_profit, total_loss,
+    net_profit, total_volume, win_rate, recovery_rate, profit_factor,
+    max_drawdown, current_drawdown, sharpe_ratio, volume_achievement_rate,
+    session_performance, strategy_performance, recovery_performance
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP_WRITER = object()
+
+# Trackers ที่ยังมี Writer Thread ทำงาน - flush ครั้งเดียวตอนปิดโปรแกรม (ไม่ค้าง reference ของ instance)
+_open_trackers: "weakref.WeakSet[PerformanceTracker]" = weakref.WeakSet()
+
+def _close_open_trackers():
+    """Flush และปิด trackers ที่ยังเปิดอยู่ทั้งหมด (atexit)"""
+    for tracker in list(_open_trackers):
+        tracker.close()
+
+atexit.register(_close_open_trackers)
+
+class PerformanceDatabaseWriter:
+    """
+    Writer thread ที่ถือ SQLite connection เดียว (WAL mode)
+    รับ upserts ผ่าน queue แล้ว commit เป็นกลุ่มตามขนาด batch หรือเวลา
+    """
+    
+    def __init__(self, db_path: Path, batch_size: int = 500, flush_interval: float = 0.5,
+                 max_queue_size: int = 100000, logger=None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logger or setup_component_logger("PerformanceDatabaseWriter")
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._sequence = itertools.count()
+        self._pending_count = 0
+        
+        # Threading
+        self.is_running = False
+        self.writer_thread: Optional[threading.Thread] = None
+        
+        # สถิติ
+        self.rows_submitted = 0
+        self.rows_written = 0
+        self.rows_coalesced = 0
+        self.batches_committed = 0
+        self.direct_writes = 0
+        self.write_errors = 0
+    
+    def start(self):
+        """เริ่ม Writer Thread"""
+        if self.is_running:
+            return
+        
+        self.is_running = True
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            daemon=True,
+            name="PerformanceDBWriter"
+        )
+        self.writer_thread.start()
+    
+    def stop(self, timeout: float = 10.0):
+        """Flush ข้อมูลที่ค้างทั้งหมดแล้วหยุด Writer Thread"""
+        if not self.is_running:
+            return
+        
+        # writes ที่มาหลังจากนี้จะเขียนตรง (synchronous)
+        self.is_running = False
+        self._queue.put(_STOP_WRITER)
+        if self.writer_thread and self.writer_thread.is_alive():
+            self.writer_thread.join(timeout=timeout)
+    
+    def submit(self, sql: str, params: tuple, key: Optional[Any] = None) -> bool:
+        """
+        ส่งคำสั่งเขียนเข้า queue
+        key: คำสั่งที่ key ซ้ำกันใน batch เดียวกันจะเหลือเฉพาะตัวล่าสุด (upsert)
+        """
+        if not self.is_running:
+            return self._write_direct(sql, params)
+        
+        self._queue.put((key, sql, params))
+        self.rows_submitted += 1
+        return True
+    
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Commit ทุกคำสั่งที่ส่งมาก่อนหน้านี้แบบ synchronous"""
+        if not self.is_running:
+            return True
+        
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def has_pending(self) -> bool:
+        """มีคำสั่งที่ยังไม่ commit หรือไม่"""
+        return self._pending_count > 0 or not self._queue.empty()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """เปิด connection ของ writer (WAL + synchronous NORMAL)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _writer_loop(self):
+        """Loop หลักของ Writer - รวบรวมคำสั่งแล้ว commit เป็น transaction เดียว"""
+        conn = self._connect()
+        pending: Dict[Any, tuple] = {}
+        oldest_pending = time.time()
+        
+        try:
+            while True:
+                wait = self.flush_interval - (time.time() - oldest_pending) if pending else self.flush_interval
+                try:
+                    item = self._queue.get(timeout=max(wait, 0.001))
+                except queue.Empty:
+                    item = None
+                
+                flush_events = []
+                stop = False
+                
+                while item is not None:
+                    if item is _STOP_WRITER:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        flush_events.append(item)
+                    else:
+                        key, sql, params = item
+                        if not pending:
+                            oldest_pending = time.time()
+                        if key is None:
+                            key = next(self._sequence)
+                        elif key in pending:
+                            self.rows_coalesced += 1
+                        pending[key] = (sql, params)
+                    
+                    if stop or len(pending) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                
+                self._pending_count = len(pending)
+                
+                if pending and (flush_events or stop or len(pending) >= self.batch_size or
+                                time.time() - oldest_pending >= self.flush_interval):
+                    self._commit(conn, pending)
+                    pending = {}
+                    self._pending_count = 0
+                
+                for event in flush_events:
+                    event.set()
+                
+                if stop:
+                    break
+                    
+        except Exception as e:
+            self.logger.error(f"❌ Database writer loop error: {e}")
+        finally:
+            if pending:
+                self._commit(conn, pending)
+            self._pending_count = 0
+            conn.close()
+    
+    def _commit(self, conn: sqlite3.Connection, pending: Dict[Any, tuple]):
+        """เขียนคำสั่งทั้งหมดใน transaction เดียว (executemany ต่อ statement)"""
+        statements: Dict[str, List[tuple]] = defaultdict(list)
+        for sql, params in pending.values():
+            statements[sql].append(params)
+        
+        try:
+            with conn:
+                for sql, rows in statements.items():
+                    conn.executemany(sql, rows)
+            self.rows_written += len(pending)
+            self.batches_committed += 1
+        except Exception as e:
+            self.write_errors += 1
+            self.logger.error(f"❌ Batch commit error ({len(pending)} rows): {e}")
+    
+    def _write_direct(self, sql: str, params: tuple) -> bool:
+        """เขียนตรงเมื่อ Writer Thread ไม่ทำงาน"""
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                conn.execute(sql, params)
+                conn.commit()
+            self.direct_writes += 1
+            return True
+        except Exception as e:
+            self.write_errors += 1
+            self.logger.error(f"❌ Direct write error: {e}")
+            return False
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """สถิติของ Database Writer"""
+        return {
+            'is_running': self.is_running,
+            'queue_size': self._queue.qsize(),
+            'pending': self._pending_count,
+            'rows_submitted': self.rows_submitted,
+            'rows_written': self.rows_written,
+            'rows_coalesced': self.rows_coalesced,
+            'batches_committed': self.batches_committed,
+            'avg_batch_size': self.rows_written / self.batches_committed if self.batches_committed else 0.0,
+            'direct_writes': self.direct_writes,
+            'write_errors': self.write_errors
+        }
+
 # ===== PERFORMANCE TRACKER =====
 
 class PerformanceTracker:
     """ระบบติดตามประสิทธิภาพการเทรด"""
     
-    def __init__(self, db_path: str = "data/performance.db", logger=None):
+    def __init__(self, db_path: str = "data/performance.db", logger=None,
+                 batched_writes: bool = True):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -236,9 +549,23 @@ class PerformanceTracker:
         self.daily_trades = 0
         self.recovery_operations = 0
         
+        # Rolling aggregates ของเทรดที่ปิดแล้ว: วัน -> (session, strategy, recovery method) -> bucket
+        self.daily_buckets: Dict[date, Dict[BucketKey, StatisticsBucket]] = {}
+        
         # Initialize database
         self._init_database()
         
+        # Database connections - writer thread (WAL, batched commits) + read connection เดียว
+        self.db_writer = PerformanceDatabaseWriter(self.db_path, logger=self.logger)
+        if batched_writes:
+            self.db_writer.start()
+            _open_trackers.add(self)
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        
+        # โหลด aggregates ของประวัติในฐานข้อมูลครั้งเดียว
+        self._load_statistics_buckets()
+        
         self.logger.info("✅ Performance Tracker initialized successfully")
     
     def _init_database(self):
@@ -246,6 +573,7 @@ class PerformanceTracker:
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
                 
                 # ตาราง Trade Records
                 cursor.execute("""
@@ -329,9 +657,13 @@ class PerformanceTracker:
             with self.lock:
                 if trade.status == TradeStatus.OPEN:
                     self.active_trades[trade.trade_id] = trade
+                elif trade.trade_id in self.completed_trades:
+                    # เพิ่มซ้ำ - แทนที่ record (DB upsert) แต่ไม่นับสถิติซ้ำ
+                    self.completed_trades[trade.trade_id] = trade
                 else:
                     self.completed_trades[trade.trade_id] = trade
                     self.trade_history.append(trade)
+                    self._record_statistics(trade)
                     
                     # อัปเดต running statistics
                     self.running_pnl += trade.realized_pnl
@@ -398,6 +730,7 @@ class PerformanceTracker:
                     # เพิ่มเข้า completed trades
                     self.completed_trades[trade_id] = trade
                     self.trade_history.append(trade)
+                    self._record_statistics(trade)
                     
                     # อัปเดต statistics
                     self.running_pnl += trade.realized_pnl
@@ -417,39 +750,46 @@ class PerformanceTracker:
             return False
     
     def save_trade_record(self, trade: TradeRecord) -> bool:
-        """บันทึก Trade Record ในฐานข้อมูล"""
+        """บันทึก Trade Record ในฐานข้อมูล (ผ่าน Writer Thread)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                INSERT OR REPLACE INTO trade_records (
-                    trade_id, position_id, symbol, entry_time, close_time, direction, volume,
-                    entry_price, close_price, realized_pnl, unrealized_pnl, commission, swap,
-                    entry_strategy, signal_quality, market_session, status, is_recovery_trade,
-                    parent_trade_id, recovery_method, recovery_level, hold_duration_seconds,
-                    max_profit, max_loss, market_conditions, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    trade.trade_id, trade.position_id, trade.symbol,
-                    trade.entry_time.isoformat(),
-                    trade.close_time.isoformat() if trade.close_time else None,
-                    trade.direction.value, trade.volume, trade.entry_price, trade.close_price,
-                    trade.realized_pnl, trade.unrealized_pnl, trade.commission, trade.swap,
-                    trade.entry_strategy, trade.signal_quality, trade.market_session,
-                    trade.status.value, int(trade.is_recovery_trade), trade.parent_trade_id,
-                    trade.recovery_method.value if trade.recovery_method else None,
-                    trade.recovery_level, trade.hold_duration_seconds,
-                    trade.max_profit, trade.max_loss, trade.market_conditions, trade.notes
-                ))
-                
-                conn.commit()
-                return True
+            params = (
+                trade.trade_id, trade.position_id, trade.symbol,
+                trade.entry_time.isoformat(),
+                trade.close_time.isoformat() if trade.close_time else None,
+                trade.direction.value, trade.volume, trade.entry_price, trade.close_price,
+                trade.realized_pnl, trade.unrealized_pnl, trade.commission, trade.swap,
+                trade.entry_strategy, trade.signal_quality, trade.market_session,
+                trade.status.value, int(trade.is_recovery_trade), trade.parent_trade_id,
+                trade.recovery_method.value if trade.recovery_method else None,
+                trade.recovery_level, trade.hold_duration_seconds,
+                trade.max_profit, trade.max_loss, trade.market_conditions, trade.notes
+            )
+            
+            return self.db_writer.submit(TRADE_UPSERT_SQL, params, key=('trade', trade.trade_id))
                 
         except Exception as e:
             self.logger.error(f"❌ Failed to save trade record: {e}")
             return False
     
+    def _read_connection(self) -> sqlite3.Connection:
+        """Read connection ที่เปิดค้างไว้ (WAL - อ่านได้พร้อมกับ writer)"""
+        if self._read_conn is None:
+            self._read_conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        return self._read_conn
+    
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Commit ข้อมูลที่ค้างใน Writer Thread ทันที"""
+        return self.db_writer.flush(timeout)
+    
+    def close(self):
+        """Flush ข้อมูลที่ค้างและปิด connections (เรียกตอน shutdown)"""
+        _open_trackers.discard(self)
+        self.db_writer.stop()
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+    
     def get_active_trades(self) -> List[TradeRecord]:
         """ดึงรายการเทรดที่เปิดอยู่"""
         with self.lock:
@@ -466,7 +806,12 @@ class PerformanceTracker:
         try:
             trades = []
             
-            with sqlite3.connect(self.db_path) as conn:
+            # อ่านให้เห็นข้อมูลที่เพิ่งส่งเข้า writer
+            if self.db_writer.has_pending():
+                self.db_writer.flush()
+            
+            with self._read_lock:
+                conn = self._read_connection()
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -477,93 +822,204 @@ class PerformanceTracker:
                 
                 rows = cursor.fetchall()
                 columns = [description[0] for description in cursor.description]
+            
+            for row in rows:
+                data = dict(zip(columns, row))
                 
-                for row in rows:
-                    data = dict(zip(columns, row))
-                    
-                    # Convert back to TradeRecord
-                    trade = TradeRecord(
-                        trade_id=data['trade_id'],
-                        position_id=data['position_id'],
-                        symbol=data['symbol'],
-                        entry_time=datetime.fromisoformat(data['entry_time']),
-                        direction=TradeDirection(data['direction']),
-                        volume=data['volume'],
-                        entry_price=data['entry_price'],
-                        close_time=datetime.fromisoformat(data['close_time']) if data['close_time'] else None,
-                        close_price=data['close_price'],
-                        realized_pnl=data['realized_pnl'],
-                        unrealized_pnl=data['unrealized_pnl'],
-                        commission=data['commission'],
-                        swap=data['swap'],
-                        entry_strategy=data['entry_strategy'],
-                        signal_quality=data['signal_quality'],
-                        market_session=data['market_session'],
-                        status=TradeStatus(data['status']),
-                        is_recovery_trade=bool(data['is_recovery_trade']),
-                        parent_trade_id=data['parent_trade_id'],
-                        recovery_method=RecoveryMethod(data['recovery_method']) if data['recovery_method'] else None,
-                        recovery_level=data['recovery_level'],
-                        hold_duration_seconds=data['hold_duration_seconds'],
-                        max_profit=data['max_profit'],
-                        max_loss=data['max_loss'],
-                        market_conditions=data['market_conditions'],
-                        notes=data['notes']
-                    )
-                    
-                    trades.append(trade)
+                # Convert back to TradeRecord
+                trade = TradeRecord(
+                    trade_id=data['trade_id'],
+                    position_id=data['position_id'],
+                    symbol=data['symbol'],
+                    entry_time=datetime.fromisoformat(data['entry_time']),
+                    direction=TradeDirection(data['direction']),
+                    volume=data['volume'],
+                    entry_price=data['entry_price'],
+                    close_time=datetime.fromisoformat(data['close_time']) if data['close_time'] else None,
+                    close_price=data['close_price'],
+                    realized_pnl=data['realized_pnl'],
+                    unrealized_pnl=data['unrealized_pnl'],
+                    commission=data['commission'],
+                    swap=data['swap'],
+                    entry_strategy=data['entry_strategy'],
+                    signal_quality=data['signal_quality'],
+                    market_session=data['market_session'],
+                    status=TradeStatus(data['status']),
+                    is_recovery_trade=bool(data['is_recovery_trade']),
+                    parent_trade_id=data['parent_trade_id'],
+                    recovery_method=RecoveryMethod(data['recovery_method']) if data['recovery_method'] else None,
+                    recovery_level=data['recovery_level'],
+                    hold_duration_seconds=data['hold_duration_seconds'],
+                    max_profit=data['max_profit'],
+                    max_loss=data['max_loss'],
+                    market_conditions=data['market_conditions'],
+                    notes=data['notes']
+                )
                 
+                trades.append(trade)
+            
             return trades
             
         except Exception as e:
             self.logger.error(f"❌ Failed to get trades by period: {e}")
             return []
     
-    def calculate_statistics(self, start_time: datetime, end_time: datetime) -> TradingStatistics:
-        """คำนวณสถิติการเทรด"""
+    # ===== ROLLING STATISTICS AGGREGATES =====
+    
+    def _bucket_key(self, trade: TradeRecord) -> BucketKey:
+        """key ของ bucket: (session, strategy, recovery method)"""
+        method = trade.recovery_method.value if trade.recovery_method else RecoveryMethod.NONE.value
+        return (trade.market_session or "", trade.entry_strategy or "", method)
+    
+    def _record_statistics(self, trade: TradeRecord):
+        """เพิ่มเทรดที่ปิดแล้วเข้า bucket ของวัน (เรียกภายใต้ self.lock)"""
+        if trade.status not in AGGREGATED_STATUSES:
+            return
+        
+        day_buckets = self.daily_buckets.setdefault(trade.entry_time.date(), {})
+        key = self._bucket_key(trade)
+        bucket = day_buckets.get(key)
+        if bucket is None:
+            bucket = day_buckets[key] = StatisticsBucket()
+        bucket.add_trade(trade)
+    
+    def _query_statistics_buckets(self, start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  by_day: bool = False) -> Dict[Any, StatisticsBucket]:
+        """สร้าง buckets ด้วย SQL aggregates (ไม่สร้าง TradeRecord objects)"""
+        if self.db_writer.has_pending():
+            self.db_writer.flush()
+        
+        where, params = "", []
+        if start_time is not None:
+            where += " AND entry_time >= ?"
+            params.append(start_time.isoformat())
+        if end_time is not None:
+            where += " AND entry_time <= ?"
+            params.append(end_time.isoformat())
+        
+        sql = BUCKET_AGGREGATE_SQL.format(
+            group_columns="substr(entry_time, 1, 10)," if by_day else "",
+            statuses=", ".join("?" for _ in AGGREGATED_STATUSES),
+            where=where
+        )
+        params = [status.value for status in AGGREGATED_STATUSES] + params
+        
+        with self._read_lock:
+            rows = self._read_connection().execute(sql, params).fetchall()
+        
+        buckets = {}
+        for row in rows:
+            if by_day:
+                day, row = date.fromisoformat(row[0]), row[1:]
+            session, strategy, method = row[0] or "", row[1] or "", row[2] or RecoveryMethod.NONE.value
+            bucket = StatisticsBucket(
+                total_trades=row[3],
+                winning_trades=row[4] or 0,
+                losing_trades=row[5] or 0,
+                recovered_trades=row[6] or 0,
+                total_volume=row[7],
+                gross_profit=row[8],
+                gross_loss=row[9],
+                net_profit=row[10],
+                largest_win=max(row[11] or 0.0, 0.0),
+                largest_loss=min(row[12] or 0.0, 0.0),
+                first_entry=datetime.fromisoformat(row[13]),
+                last_entry=datetime.fromisoformat(row[14])
+            )
+            buckets[(day, (session, strategy, method)) if by_day else (session, strategy, method)] = bucket
+        
+        return buckets
+    
+    def _load_statistics_buckets(self):
+        """โหลด buckets รายวันจากฐานข้อมูล (ครั้งเดียวตอนเริ่มต้น)"""
         try:
-            trades = self.get_trades_by_period(start_time, end_time)
-            
-            if not trades:
-                return TradingStatistics(
-                    period_start=start_time,
-                    period_end=end_time
-                )
-            
-            # คำนวณสถิติพื้นฐาน
-            total_trades = len(trades)
-            winning_trades = len([t for t in trades if t.realized_pnl > 0])
-            losing_trades = len([t for t in trades if t.realized_pnl < 0])
-            recovered_trades = len([t for t in trades if t.is_recovery_trade])
-            
-            total_volume = sum(t.volume for t in trades)
-            gross_profit = sum(t.realized_pnl for t in trades if t.realized_pnl > 0)
-            gross_loss = abs(sum(t.realized_pnl for t in trades if t.realized_pnl < 0))
-            net_profit = sum(t.realized_pnl for t in trades)
+            buckets = self._query_statistics_buckets(by_day=True)
+            with self.lock:
+                for (day, key), bucket in buckets.items():
+                    self.daily_buckets.setdefault(day, {})[key] = bucket
             
-            # คำนวณอัตราต่างๆ
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else float('inf')
-            recovery_success_rate = (recovered_trades / total_trades * 100) if total_trades > 0 else 0
+            if buckets:
+                self.logger.info(f"📊 Loaded statistics buckets: {len(self.daily_buckets)} days")
+                
+        except Exception as e:
+            self.logger.error(f"❌ Failed to load statistics buckets: {e}")
+    
+    def _collect_buckets(self, start_time: datetime, end_time: datetime) -> Dict[BucketKey, StatisticsBucket]:
+        """
+        รวม buckets ของช่วงเวลาตาม (session, strategy, recovery method)
+        วันที่มีเทรดอยู่นอกช่วงบางส่วนจะใช้ SQL aggregate เฉพาะส่วนที่ทับช่วงเวลา
+        """
+        merged: Dict[BucketKey, StatisticsBucket] = defaultdict(StatisticsBucket)
+        partial_days = []
+        first_day, last_day = start_time.date(), end_time.date()
+        
+        with self.lock:
+            span = (last_day - first_day).days + 1
+            if span <= len(self.daily_buckets):
+                days = [first_day + timedelta(days=offset) for offset in range(span)]
+            else:
+                days = [day for day in self.daily_buckets if first_day <= day <= last_day]
             
-            # สร้างสถิติ
-            stats = TradingStatistics(
-                period_start=start_time,
-                period_end=end_time,
-                total_trades=total_trades,
-                winning_trades=winning_trades,
-                losing_trades=losing_trades,
-                recovered_trades=recovered_trades,
-                total_volume=total_volume,
-                gross_profit=gross_profit,
-                gross_loss=gross_loss,
-                net_profit=net_profit,
-                win_rate=win_rate,
-                profit_factor=profit_factor,
-                recovery_success_rate=recovery_success_rate
-            )
+            for day in days:
+                day_buckets = self.daily_buckets.get(day)
+                if not day_buckets:
+                    continue
+                if all(bucket.within(start_time, end_time) for bucket in day_buckets.values()):
+                    for key, bucket in day_buckets.items():
+                        merged[key].merge(bucket)
+                else:
+                    partial_days.append(day)
+        
+        for day in partial_days:
+            day_start = datetime.combine(day, datetime.min.time())
+            day_end = datetime.combine(day, datetime.max.time())
+            partial = self._query_statistics_buckets(max(start_time, day_start), min(end_time, day_end))
+            for key, bucket in partial.items():
+                merged[key].merge(bucket)
+        
+        return merged
+    
+    def _statistics_from_bucket(self, bucket: StatisticsBucket, start_time: datetime,
+                                end_time: datetime) -> TradingStatistics:
+        """แปลง bucket เป็น TradingStatistics"""
+        total_trades = bucket.total_trades
+        if total_trades == 0:
+            return TradingStatistics(period_start=start_time, period_end=end_time)
+        
+        # คำนวณอัตราต่างๆ
+        win_rate = (bucket.winning_trades / total_trades * 100) if total_trades > 0 else 0
+        profit_factor = (bucket.gross_profit / bucket.gross_loss) if bucket.gross_loss > 0 else float('inf')
+        recovery_success_rate = (bucket.recovered_trades / total_trades * 100) if total_trades > 0 else 0
+        
+        return TradingStatistics(
+            period_start=start_time,
+            period_end=end_time,
+            total_trades=total_trades,
+            winning_trades=bucket.winning_trades,
+            losing_trades=bucket.losing_trades,
+            recovered_trades=bucket.recovered_trades,
+            total_volume=bucket.total_volume,
+            gross_profit=bucket.gross_profit,
+            gross_loss=bucket.gross_loss,
+            net_profit=bucket.net_profit,
+            largest_win=bucket.largest_win,
+            largest_loss=bucket.largest_loss,
+            average_win=bucket.gross_profit / bucket.winning_trades if bucket.winning_trades else 0.0,
+            average_loss=bucket.gross_loss / bucket.losing_trades if bucket.losing_trades else 0.0,
+            win_rate=win_rate,
+            profit_factor=profit_factor,
+            recovery_success_rate=recovery_success_rate
+        )
+    
+    def calculate_statistics(self, start_time: datetime, end_time: datetime) -> TradingStatistics:
+        """คำนวณสถิติการเทรด (รวมจาก buckets ที่คำนวณไว้แล้ว)"""
+        try:
+            total = StatisticsBucket()
+            for bucket in self._collect_buckets(start_time, end_time).values():
+                total.merge(bucket)
             
-            return stats
+            return self._statistics_from_bucket(total, start_time, end_time)
             
         except Exception as e:
             self.logger.error(f"❌ Failed to calculate statistics: {e}")
@@ -572,6 +1028,29 @@ class PerformanceTracker:
                 period_end=end_time
             )
     
+    def get_statistics_breakdown(self, start_time: datetime, end_time: datetime,
+                                 dimension: str = 'session') -> Dict[str, TradingStatistics]:
+        """
+        สถิติแยกตาม session / strategy / recovery_method
+        
+        Args:
+            dimension: 'session', 'strategy' หรือ 'recovery_method'
+        """
+        try:
+            position = BUCKET_DIMENSIONS.index(dimension)
+            groups: Dict[str, StatisticsBucket] = defaultdict(StatisticsBucket)
+            for key, bucket in self._collect_buckets(start_time, end_time).items():
+                groups[key[position]].merge(bucket)
+            
+            return {
+                name: self._statistics_from_bucket(bucket, start_time, end_time)
+                for name, bucket in groups.items()
+            }
+            
+        except Exception as e:
+            self.logger.error(f"❌ Failed to calculate statistics breakdown: {e}")
+            return {}
+    
     def get_real_time_performance(self) -> Dict[str, Any]:
         """ดึงข้อมูลประสิทธิภาพแบบ real-time"""
         try:
@@ -602,34 +1081,22 @@ class PerformanceTracker:
             return {}
     
     def save_performance_snapshot(self, snapshot: PerformanceSnapshot) -> bool:
-        """บันทึก Performance Snapshot"""
+        """บันทึก Performance Snapshot (ผ่าน Writer Thread)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                INSERT INTO performance_snapshots (
-                    timestamp, timeframe, account_balance, account_equity, total_trades,
-                    winning_trades, losing_trades, recovered_trades, total_profit, total_loss,
-                    net_profit, total_volume, win_rate, recovery_rate, profit_factor,
-                    max_drawdown, current_drawdown, sharpe_ratio, volume_achievement_rate,
-                    session_performance, strategy_performance, recovery_performance
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    snapshot.timestamp.isoformat(), snapshot.timeframe.value,
-                    snapshot.account_balance, snapshot.account_equity, snapshot.total_trades,
-                    snapshot.winning_trades, snapshot.losing_trades, snapshot.recovered_trades,
-                    snapshot.total_profit, snapshot.total_loss, snapshot.net_profit,
-                    snapshot.total_volume, snapshot.win_rate, snapshot.recovery_rate,
-                    snapshot.profit_factor, snapshot.max_drawdown, snapshot.current_drawdown,
-                    snapshot.sharpe_ratio, snapshot.volume_achievement_rate,
-                    json.dumps(snapshot.session_performance),
-                    json.dumps(snapshot.strategy_performance),
-                    json.dumps(snapshot.recovery_performance)
-                ))
-                
-                conn.commit()
-                return True
+            params = (
+                snapshot.timestamp.isoformat(), snapshot.timeframe.value,
+                snapshot.account_balance, snapshot.account_equity, snapshot.total_trades,
+                snapshot.winning_trades, snapshot.losing_trades, snapshot.recovered_trades,
+                snapshot.total_profit, snapshot.total_loss, snapshot.net_profit,
+                snapshot.total_volume, snapshot.win_rate, snapshot.recovery_rate,
+                snapshot.profit_factor, snapshot.max_drawdown, snapshot.current_drawdown,
+                snapshot.sharpe_ratio, snapshot.volume_achievement_rate,
+                json.dumps(snapshot.session_performance),
+                json.dumps(snapshot.strategy_performance),
+                json.dumps(snapshot.recovery_performance)
+            )
+            
+            return self.db_writer.submit(SNAPSHOT_INSERT_SQL, params)
                 
         except Exception as e:
             self.logger.error(f"❌ Failed to save performance snapshot: {e}")
@@ -681,7 +1148,8 @@ class PerformanceTracker:
                 'system_status': {
                     'tracking_active': True,
                     'database_connected': True,
-                    'last_update': now.isoformat()
+                    'last_update': now.isoformat(),
+                    'database_writer': self.db_writer.get_writer_stats()
                 }
             }
             
@@ -693,9 +1161,10 @@ class PerformanceTracker:
 
 # ===== HELPER FUNCTIONS =====
 
-def get_performance_tracker(db_path: str = "data/performance.db", logger=None) -> PerformanceTracker:
+def get_performance_tracker(db_path: str = "data/performance.db", logger=None,
+                            batched_writes: bool = True) -> PerformanceTracker:
     """สร้าง Performance Tracker instance"""
-    return PerformanceTracker(db_path=db_path, logger=logger)
+    return PerformanceTracker(db_path=db_path, logger=logger, batched_writes=batched_writes)
 
 def create_sample_trade_record(
     trade_id: str = "TEST_001",
@@ -840,13 +1309,22 @@ def test_dataclass_structure():
         traceback.print_exc()
         return False
 
-def benchmark_performance():
-    """ทดสอบประสิทธิภาพ"""
+def benchmark_performance(record_counts: tuple = (100, 10_000, 1_000_000), legacy_limit: int = 1_000):
+    """
+    ทดสอบประสิทธิภาพ
+    
+    Args:
+        record_counts: จำนวน trade records ที่ทดสอบการบันทึก
+        legacy_limit: จำนวนสูงสุดที่ทดสอบแบบเขียนตรง (connect + commit ทุกรายการ)
+    """
     print("\n⚡ ทดสอบประสิทธิภาพ Performance Tracker")
     print("=" * 50)
     
     try:
-        tracker = get_performance_tracker("benchmark_performance.db")
+        benchmark_dir = Path("benchmark_data")
+        benchmark_dir.mkdir(exist_ok=True)
+        
+        tracker = get_performance_tracker(str(benchmark_dir / "benchmark_performance.db"))
         
         # ทดสอบความเร็วในการเพิ่มเทรด
         start_time = time.time()
@@ -860,6 +1338,7 @@ def benchmark_performance():
             )
             tracker.add_trade(trade)
             tracker.close_trade(trade.trade_id, 2005.0 + (i * 0.1))
+        tracker.flush()
         
         duration = time.time() - start_time
         trades_per_second = num_trades / duration
@@ -876,9 +1355,53 @@ def benchmark_performance():
         
         print(f"   เวลาสร้างรายงาน: {query_time:.3f} วินาที")
         print(f"   เทรดในรายงาน: {report.get('today', {}).get('trades', 0)}")
+        tracker.close()
+        
+        # ทดสอบ throughput ของการบันทึก (Writer Thread เทียบกับเขียนตรง)
+        print("\n📊 Throughput การบันทึก Trade Records:")
+        results = {}
+        
+        for record_count in record_counts:
+            result = {}
+            modes = [('batched', True)]
+            if record_count <= legacy_limit:
+                modes.append(('direct', False))
+            
+            for mode, batched in modes:
+                db_file = benchmark_dir / f"benchmark_{mode}_{record_count}.db"
+                for suffix in ("", "-wal", "-shm"):
+                    Path(f"{db_file}{suffix}").unlink(missing_ok=True)
+                
+                bench_tracker = get_performance_tracker(str(db_file), batched_writes=batched)
+                
+                trade = create_sample_trade_record(volume=0.01, entry_price=2000.0)
+                trade.status = TradeStatus.CLOSED
+                trade.close_time = datetime.now()
+                trade.close_price = 2005.0
+                
+                start_time = time.perf_counter()
+                for i in range(record_count):
+                    trade.trade_id = f"BENCH_{i:07d}"
+                    trade.realized_pnl = (i % 7) - 3.0
+                    bench_tracker.save_trade_record(trade)
+                bench_tracker.flush(timeout=None)
+                duration = time.perf_counter() - start_time
+                
+                result[mode] = record_count / duration if duration > 0 else 0.0
+                writer_stats = bench_tracker.db_writer.get_writer_stats()
+                bench_tracker.close()
+                
+                batch_info = (f" | {writer_stats['batches_committed']:,} commits"
+                              if batched else f" | {record_count:,} commits")
+                print(f"   {record_count:>9,} records [{mode:7s}]: {result[mode]:>10,.0f} trades/second"
+                      f" ({duration:.2f}s{batch_info})")
+            
+            if 'direct' in result and result['direct'] > 0:
+                print(f"   {'':>9}  เร็วขึ้น {result['batched'] / result['direct']:.1f}x")
+            results[record_count] = result
         
         print("\n✅ Performance Tracker มีประสิทธิภาพดี!")
-        return True
+        return results
         
     except Exception as e:
         print(f"❌ ข้อผิดพลาดในการทดสอบประสิทธิภาพ: {e}")
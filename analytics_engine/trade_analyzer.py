@@ -42,6 +42,7 @@ from config.settings import get_system_settings, MarketSession
 from config.trading_params import get_trading_parameters, EntryStrategy, RecoveryMethod
 from utilities.professional_logger import setup_trading_logger
 from utilities.error_handler import handle_trading_errors, ErrorCategory, ErrorSeverity
+from utilities.compact_records import slotted_dataclass, record_to_dict
 
 class TradeType(Enum):
     """ประเภทของเทรด"""
@@ -129,7 +130,7 @@ class TradeContext:
     system_load: float = 0.0           # โหลดของระบบ (%)
     recovery_active: bool = False       # มี Recovery ทำงานหรือไม่
 
-@dataclass
+@slotted_dataclass
 class TradeRecord:
     """บันทึกการเทรดรายตัว"""
     # Basic Information
@@ -175,6 +176,10 @@ class TradeRecord:
     # System Generated
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """แปลงเป็น Dictionary (JSON serializable)"""
+        return record_to_dict(self)
 
 @dataclass
 class TradeAnalysisResult:
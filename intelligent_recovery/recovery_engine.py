@@ -18,17 +18,22 @@ INTELLIGENT RECOVERY SYSTEM - REAL MT5 RECOVERY EXECUTION
 """
 
 import MetaTrader5 as mt5
+import heapq
 import threading
 import time
 import math
 import statistics
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Callable
+from typing import Dict, List, Optional, Tuple, Any, Callable, Set
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
 import numpy as np
 
+from mt5_integration.snapshot_bus import get_snapshot_bus
+from intelligent_recovery.recovery_kernels import RecoveryBatchInputs, evaluate_recovery_batch, STRATEGY_CODES
+from mt5_integration.basket_executor import BasketLeg, BasketLegKind, BasketResult, execute_basket
+
 class RecoveryStrategy(Enum):
     """กลยุทธ์การกู้คืน"""
     MARTINGALE = "MARTINGALE"
@@ -100,6 +105,16 @@ class RecoveryPlan:
     # Strategy-specific parameters
     parameters: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class RecoveryCandidate:
+    """ผลการประเมิน losing position หนึ่งตัวจาก batch evaluator"""
+    losing_position: LosingPosition
+    pip_loss: float
+    threshold: float
+    strategy: RecoveryStrategy
+    success_probability: float
+    score: float
+
 @dataclass
 class RecoveryResult:
     """ผลการกู้คืน"""
@@ -124,6 +139,13 @@ class RealRecoveryEngine:
         self.is_running = False
         self.recovery_thread = None
         
+        # Shared terminal snapshot (แทนการเรียก MT5 ตรงทุกรอบ)
+        self.snapshot_bus = get_snapshot_bus()
+        self.snapshot_bus.register_symbol(symbol)
+        
+        # Order executor (ถ้าเชื่อมต่อ) - ใช้ส่ง basket orders พร้อมบันทึกสถิติ
+        self.order_executor = None
+        
         # Recovery tracking
         self.active_recoveries: Dict[str, RecoveryPlan] = {}
         self.completed_recoveries: List[RecoveryResult] = []
@@ -135,6 +157,28 @@ class RealRecoveryEngine:
         self.account_risk_percent = 0.5     # 0.5% ของ account
         self.max_concurrent_recoveries = 3
         self.recovery_check_interval = 1    # ตรวจทุก 1 วินาที (เร็วขึ้น)
+        self.loss_threshold = 0.0           # $ - ขาดทุนเกินนี้ถือเป็น losing position
+        self.full_reevaluation_interval = 60  # ประเมิน losing positions ทั้งหมดใหม่ทุก 60 วินาที
+        
+        # Event-driven state - ประเมินเฉพาะ positions ที่เปลี่ยน
+        self._state_lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._open_positions: Dict[int, Tuple[float, float]] = {}  # ticket -> (profit, price_current)
+        self._dirty_tickets: Set[int] = set()                      # รอประเมินรอบถัดไป
+        self._recheck_heap: List[Tuple[float, int]] = []           # (เวลาที่ต้องประเมินใหม่, ticket)
+        self._evaluated_thresholds: Dict[int, float] = {}          # smart threshold (pips) ล่าสุดต่อ ticket
+        self._above_threshold: Dict[int, bool] = {}                # pip loss อยู่เหนือ threshold ตอนตรวจล่าสุด
+        self._latest_tick = None
+        self._last_market_condition: Optional[str] = None
+        self._last_full_reevaluation = 0.0
+        self._positions_from_tracker = False
+        self.event_stats = {
+            'snapshots': 0,
+            'position_events': 0,
+            'unchanged_positions': 0,
+            'threshold_crossings': 0,
+            'evaluations': 0
+        }
 
         # Market condition multipliers - ปรับตามสภาวะตลาด
         self.market_multipliers = {
@@ -169,6 +213,7 @@ class RealRecoveryEngine:
             return
         
         self.is_running = True
+        self.snapshot_bus.subscribe(self._on_snapshot, positions=not self._positions_from_tracker)
         self.recovery_thread = threading.Thread(target=self._recovery_loop, daemon=True)
         self.recovery_thread.start()
         
@@ -177,19 +222,46 @@ class RealRecoveryEngine:
     def stop_recovery_monitoring(self):
         """หยุดการตรวจสอบ"""
         self.is_running = False
+        self.snapshot_bus.unsubscribe(self._on_snapshot)
+        self._wakeup.set()
         if self.recovery_thread:
             self.recovery_thread.join(timeout=10)
         
         print("⏹️ Recovery monitoring stopped")
     
+    def attach_position_tracker(self, position_tracker):
+        """
+        รับ position change events จาก RealPositionTracker แทนการ diff snapshot เอง
+        """
+        try:
+            with self._state_lock:
+                self._positions_from_tracker = True
+                for position in list(position_tracker.positions.values()):
+                    self._on_tracked_position(position)
+            
+            position_tracker.subscribe_changes(self.on_position_change)
+            if self.is_running:
+                # positions มาจาก tracker แล้ว - bus ไม่ต้องดึง positions ให้ทุกรอบ
+                self.snapshot_bus.subscribe(self._on_snapshot, positions=False)
+            print("🔗 Recovery Engine attached to Position Tracker events")
+            
+        except Exception as e:
+            self._positions_from_tracker = False
+            print(f"❌ Error attaching position tracker: {e}")
+    
     def _recovery_loop(self):
-        """Loop หลักของการกู้คืน"""
+        """Loop หลักของการกู้คืน - ตื่นเมื่อมี event หรือครบ interval"""
         while self.is_running:
             try:
-                # ตรวจสอบ positions ที่ขาดทุน
-                self._scan_losing_positions()
+                self._wakeup.wait(self.recovery_check_interval)
+                self._wakeup.clear()
+                
+                # ไม่มี event source (snapshot bus ไม่ได้รัน) - sync จาก snapshot เอง
+                if not self._positions_from_tracker and not self.snapshot_bus.is_running:
+                    self._latest_tick = self.snapshot_bus.get_tick(self.symbol)
+                    self._scan_losing_positions()
                 
-                # สร้างแผนการกู้คืนใหม่
+                # สร้างแผนการกู้คืนใหม่ (เฉพาะ positions ที่เปลี่ยน)
                 self._create_recovery_plans()
                 
                 # ดำเนินการกู้คืนที่กำลัง active
@@ -201,118 +273,355 @@ class RealRecoveryEngine:
                 # Log สถานะ
                 self._log_recovery_status()
                 
-                time.sleep(self.recovery_check_interval)
-                
             except Exception as e:
                 print(f"❌ Recovery loop error: {e}")
                 time.sleep(10)
     
-    def _scan_losing_positions(self):
-        """สแกนหา positions ที่ขาดทุน"""
+    # ===== EVENT HANDLERS =====
+    
+    def _on_snapshot(self, snapshot):
+        """รับ snapshot ใหม่จาก snapshot bus (tick + positions)"""
+        try:
+            self.event_stats['snapshots'] += 1
+            tick = snapshot.get_tick(self.symbol)
+            if tick is not None:
+                self._latest_tick = tick
+            
+            if not self._positions_from_tracker:
+                positions = snapshot.get_positions(self.symbol)
+                if positions is not None:
+                    self._scan_losing_positions(positions)
+                
+        except Exception as e:
+            print(f"❌ Error handling snapshot: {e}")
+    
+    def on_position_change(self, event):
+        """รับ PositionChangeEvent (OPENED / MODIFIED / CLOSED) จาก Position Tracker"""
+        try:
+            if event.change_type.value == "CLOSED":
+                self._on_position_closed(event.ticket)
+            else:
+                self._on_tracked_position(event.position)
+                
+        except Exception as e:
+            print(f"❌ Error handling position change: {e}")
+    
+    def _on_tracked_position(self, position):
+        """แปลง Position ของ tracker เข้า _on_position_update"""
+        position_type = position.position_type
+        is_sell = getattr(position_type, 'value', position_type) == "SELL"
+        
+        self._on_position_update(
+            ticket=position.ticket,
+            symbol=position.symbol,
+            position_type=mt5.POSITION_TYPE_SELL if is_sell else mt5.POSITION_TYPE_BUY,
+            volume=position.volume,
+            open_price=position.open_price,
+            current_price=position.current_price,
+            profit=position.profit,
+            open_time=position.open_time,
+            magic_number=position.magic_number,
+            comment=position.comment
+        )
+    
+    def _scan_losing_positions(self, positions=None):
+        """
+        ซิงค์ positions จาก snapshot - ส่งเฉพาะ ticket ที่ profit / ราคาเปลี่ยน
+        """
         try:
             # ดึง positions ปัจจุบัน
-            positions = mt5.positions_get(symbol=self.symbol)
+            if positions is None:
+                positions = self.snapshot_bus.get_positions(self.symbol)
             if positions is None:
                 return
             
-            current_time = datetime.now()
+            current_tickets = set()
             
             for position in positions:
-                # ตรวจสอบว่าขาดทุนเกินกว่าที่กำหนด
-                if position.profit < -self.loss_threshold:
-                    
-                    # สร้าง LosingPosition object
-                    losing_pos = LosingPosition(
-                        ticket=position.ticket,
-                        symbol=position.symbol,
-                        position_type=position.type,
-                        volume=position.volume,
-                        open_price=position.price_open,
-                        current_price=position.price_current,
-                        profit=position.profit,
-                        open_time=datetime.fromtimestamp(position.time),
-                        magic_number=position.magic,
-                        comment=position.comment
-                    )
-                    
-                    # เพิ่มเข้า losing positions หากยังไม่มี
-                    if position.ticket not in self.losing_positions:
-                        self.losing_positions[position.ticket] = losing_pos
-                        print(f"🔍 New losing position detected: Ticket={position.ticket}, Loss=${position.profit:.2f}")
-                    else:
-                        # อัพเดทข้อมูล
-                        self.losing_positions[position.ticket].current_price = position.price_current
-                        self.losing_positions[position.ticket].profit = position.profit
+                ticket = position.ticket
+                current_tickets.add(ticket)
+                
+                if self._open_positions.get(ticket) == (position.profit, position.price_current):
+                    self.event_stats['unchanged_positions'] += 1
+                    continue
                 
-                # ลบ positions ที่ปิดแล้วหรือกำไรแล้ว
-                elif position.ticket in self.losing_positions:
-                    if position.profit >= 0:
-                        print(f"✅ Position recovered naturally: Ticket={position.ticket}, Profit=${position.profit:.2f}")
-                    del self.losing_positions[position.ticket]
+                self._on_position_update(
+                    ticket=ticket,
+                    symbol=position.symbol,
+                    position_type=position.type,
+                    volume=position.volume,
+                    open_price=position.price_open,
+                    current_price=position.price_current,
+                    profit=position.profit,
+                    open_time=datetime.fromtimestamp(position.time),
+                    magic_number=position.magic,
+                    comment=position.comment
+                )
             
             # ลบ positions ที่ถูกปิดแล้ว
-            current_tickets = [pos.ticket for pos in positions] if positions else []
-            closed_tickets = [ticket for ticket in self.losing_positions.keys() if ticket not in current_tickets]
-            
-            for ticket in closed_tickets:
-                print(f"🔒 Position closed: Ticket={ticket}")
-                del self.losing_positions[ticket]
+            for ticket in set(self._open_positions) - current_tickets:
+                self._on_position_closed(ticket)
                 
         except Exception as e:
             print(f"❌ Error scanning losing positions: {e}")
     
+    def _on_position_update(self, ticket: int, symbol: str, position_type: int, volume: float,
+                            open_price: float, current_price: float, profit: float,
+                            open_time: datetime, magic_number: int = 0, comment: str = ""):
+        """อัพเดท position หนึ่งตัว - ทำเครื่องหมายให้ประเมินเมื่อข้าม threshold"""
+        with self._state_lock:
+            self._open_positions[ticket] = (profit, current_price)
+            self.event_stats['position_events'] += 1
+            losing_pos = self.losing_positions.get(ticket)
+            
+            # ตรวจสอบว่าขาดทุนเกินกว่าที่กำหนด
+            if profit < -self.loss_threshold:
+                if losing_pos is None:
+                    self.losing_positions[ticket] = LosingPosition(
+                        ticket=ticket,
+                        symbol=symbol,
+                        position_type=position_type,
+                        volume=volume,
+                        open_price=open_price,
+                        current_price=current_price,
+                        profit=profit,
+                        open_time=open_time,
+                        magic_number=magic_number,
+                        comment=comment
+                    )
+                    self._dirty_tickets.add(ticket)
+                    print(f"🔍 New losing position detected: Ticket={ticket}, Loss=${profit:.2f}")
+                else:
+                    # อัพเดทข้อมูล
+                    losing_pos.current_price = current_price
+                    losing_pos.profit = profit
+                    
+                    if not losing_pos.is_being_recovered and self._crossed_threshold(losing_pos):
+                        self._dirty_tickets.add(ticket)
+                        self.event_stats['threshold_crossings'] += 1
+            
+            # ลบ positions ที่กำไรแล้ว
+            elif losing_pos is not None:
+                if profit >= 0:
+                    print(f"✅ Position recovered naturally: Ticket={ticket}, Profit=${profit:.2f}")
+                del self.losing_positions[ticket]
+                self._evaluated_thresholds.pop(ticket, None)
+                self._above_threshold.pop(ticket, None)
+                self._dirty_tickets.discard(ticket)
+            
+            has_work = bool(self._dirty_tickets)
+        
+        if has_work:
+            self._wakeup.set()
+    
+    def _on_position_closed(self, ticket: int):
+        """position ถูกปิด"""
+        with self._state_lock:
+            self._open_positions.pop(ticket, None)
+            self._evaluated_thresholds.pop(ticket, None)
+            self._above_threshold.pop(ticket, None)
+            self._dirty_tickets.discard(ticket)
+            if self.losing_positions.pop(ticket, None) is not None:
+                print(f"🔒 Position closed: Ticket={ticket}")
+    
+    def _crossed_threshold(self, losing_pos: LosingPosition) -> bool:
+        """
+        pip loss เพิ่งข้าม smart threshold ขึ้นไป (ต่ำกว่า → ถึง) หรือไม่
+        
+        ticket ที่อยู่เหนือ threshold อยู่แล้วแต่ยังถูกบล็อก (wait / spread / attempts)
+        ไม่ถูกประเมินซ้ำทุก tick - รอ recheck heap หรือ full re-evaluation
+        """
+        threshold = self._evaluated_thresholds.get(losing_pos.ticket)
+        if threshold is None:
+            return True
+        above = self._calculate_pip_loss(losing_pos, losing_pos.current_price) >= threshold
+        was_above = self._above_threshold.get(losing_pos.ticket, False)
+        self._above_threshold[losing_pos.ticket] = above
+        return above and not was_above
+    
+    def _calculate_pip_loss(self, losing_pos: LosingPosition, current_price: float) -> float:
+        """pips ที่ขาดทุน (ไม่ติดลบ)"""
+        if losing_pos.position_type == mt5.POSITION_TYPE_BUY:
+            pip_loss = (losing_pos.open_price - current_price) / 0.01
+        else:
+            pip_loss = (current_price - losing_pos.open_price) / 0.01
+        
+        return max(0, pip_loss)
+    
+    def _take_candidates(self) -> Tuple[List[int], str]:
+        """
+        ดึง tickets ที่ต้องประเมินรอบนี้: เปลี่ยน / ข้าม threshold / ถึงเวลา recheck
+        ประเมินทั้งหมดใหม่เมื่อสภาวะตลาดเปลี่ยนหรือครบ full_reevaluation_interval
+        """
+        now = time.time()
+        market_condition = self._get_current_market_condition()
+        
+        with self._state_lock:
+            if (market_condition != self._last_market_condition or
+                    now - self._last_full_reevaluation >= self.full_reevaluation_interval):
+                self._last_market_condition = market_condition
+                self._last_full_reevaluation = now
+                self._evaluated_thresholds.clear()
+                self._above_threshold.clear()
+                self._dirty_tickets.update(self.losing_positions.keys())
+            
+            while self._recheck_heap and self._recheck_heap[0][0] <= now:
+                _, ticket = heapq.heappop(self._recheck_heap)
+                if ticket in self.losing_positions:
+                    self._dirty_tickets.add(ticket)
+            
+            candidates = list(self._dirty_tickets)
+            self._dirty_tickets.clear()
+        
+        return candidates, market_condition
+    
+    def _schedule_recheck(self, ticket: int, delay_seconds: float):
+        """ประเมิน ticket ใหม่หลัง delay (เช่น ยังรอไม่ครบ min_wait)"""
+        with self._state_lock:
+            heapq.heappush(self._recheck_heap, (time.time() + max(delay_seconds, 0.0), ticket))
+    
     def _create_recovery_plans(self):
-        """สร้างแผนการกู้คืนสำหรับ positions ที่ขาดทุน"""
+        """สร้างแผนการกู้คืนสำหรับ positions ที่ขาดทุน (ประเมินทั้ง batch แล้วเลือกตาม ranking)"""
         try:
             # จำกัดจำนวน recovery ที่ทำงานพร้อมกัน
-            if len(self.active_recoveries) >= self.max_concurrent_recoveries:
+            slots = self.max_concurrent_recoveries - len(self.active_recoveries)
+            if slots <= 0:
                 return
             
-            for ticket, losing_pos in self.losing_positions.items():
-                # ข้าม position ที่กำลังถูกกู้คืนอยู่
-                if losing_pos.is_being_recovered:
-                    continue
+            candidates, market_condition = self._take_candidates()
+            if not candidates:
+                return
+            
+            # ข้าม position ที่กำลังถูกกู้คืนอยู่
+            losing_list = [self.losing_positions[ticket] for ticket in candidates
+                           if ticket in self.losing_positions and not self.losing_positions[ticket].is_being_recovered]
+            
+            ranked = self.evaluate_recovery_candidates(losing_list, market_condition=market_condition)
+            
+            for candidate in ranked[:slots]:
+                losing_pos = candidate.losing_position
+                recovery_plan = self._design_recovery_strategy(losing_pos, candidate.strategy,
+                                                               candidate.success_probability)
                 
-                # ตรวจสอบเงื่อนไขการกู้คืน
-                if self._should_start_recovery(losing_pos):
-                    recovery_plan = self._design_recovery_strategy(losing_pos)
+                if recovery_plan:
+                    # เพิ่มเข้า active recoveries
+                    self.active_recoveries[recovery_plan.recovery_id] = recovery_plan
+                    losing_pos.is_being_recovered = True
+                    losing_pos.recovery_id = recovery_plan.recovery_id
                     
-                    if recovery_plan:
-                        # เพิ่มเข้า active recoveries
-                        self.active_recoveries[recovery_plan.recovery_id] = recovery_plan
-                        losing_pos.is_being_recovered = True
-                        losing_pos.recovery_id = recovery_plan.recovery_id
-                        
-                        print(f"📋 Recovery plan created: {recovery_plan.recovery_id}")
-                        print(f"🎯 Strategy: {recovery_plan.strategy.value}")
-                        print(f"💰 Target Profit: ${recovery_plan.target_profit:.2f}")
+                    print(f"🚨 Smart Recovery Triggered! Position: {losing_pos.ticket} | "
+                          f"Pip Loss: {candidate.pip_loss:.1f} / {candidate.threshold:.1f} pips | "
+                          f"Market: {market_condition} | Score: {candidate.score:.1f}")
+                    print(f"📋 Recovery plan created: {recovery_plan.recovery_id}")
+                    print(f"🎯 Strategy: {recovery_plan.strategy.value}")
+                    print(f"💰 Target Profit: ${recovery_plan.target_profit:.2f}")
+            
+            # candidates ที่ผ่านเงื่อนไขแต่ไม่มี slot - ประเมินใหม่รอบถัดไป
+            if len(ranked) > slots:
+                with self._state_lock:
+                    self._dirty_tickets.update(c.losing_position.ticket for c in ranked[slots:])
                         
         except Exception as e:
             print(f"❌ Error creating recovery plans: {e}")
     
-    def _should_start_recovery(self, losing_pos: LosingPosition) -> bool:
-        """ตรวจสอบการกู้คืนแบบอัจฉริยะ - ฉลาดขึ้น 200 เท่า"""
+    def evaluate_recovery_candidates(self, losing_list: List[LosingPosition], current_tick=None,
+                                     market_condition: Optional[str] = None) -> List[RecoveryCandidate]:
+        """
+        ประเมิน losing positions ทั้งหมดในรอบเดียว (pip loss, threshold, wait time, กลยุทธ์)
+        ด้วย tick / สภาวะตลาด / account ชุดเดียว
+        
+        Returns:
+            List[RecoveryCandidate]: เฉพาะ positions ที่ควรเริ่มกู้คืน เรียงตาม score มาก→น้อย
+        """
         try:
+            if not losing_list:
+                return []
+            
+            if current_tick is None:
+                current_tick = self._latest_tick or self.snapshot_bus.get_tick(self.symbol)
+            if not current_tick:
+                return []
+            
+            if market_condition is None:
+                market_condition = self._get_current_market_condition()
+            
+            account_info = self.snapshot_bus.get_account_info()
+            now = time.time()
+            
+            inputs = RecoveryBatchInputs.from_positions(losing_list, mt5.POSITION_TYPE_BUY, now)
+            result = evaluate_recovery_batch(
+                inputs,
+                bid=current_tick.bid,
+                ask=current_tick.ask,
+                market_condition=market_condition,
+                market_multiplier=self.market_multipliers.get(market_condition, 1.0),
+                base_pip_threshold=self.base_pip_threshold,
+                min_wait_seconds=self.min_wait_seconds,
+                balance=account_info.balance if account_info else None,
+                account_risk_percent=self.account_risk_percent,
+                strategy_weights={strategy.value: weight for strategy, weight in self.strategy_weights.items()}
+            )
+            self.event_stats['evaluations'] += len(losing_list)
+            
+            # เก็บ threshold ไว้ตรวจการข้าม threshold จาก events และนัด recheck
+            thresholds = result['threshold']
+            above = result['pip_loss'] >= thresholds
+            for index, losing_pos in enumerate(losing_list):
+                self._evaluated_thresholds[losing_pos.ticket] = float(thresholds[index])
+                self._above_threshold[losing_pos.ticket] = bool(above[index])
+            
+            for index in np.flatnonzero(~result['wait_ok'] & result['attempts_ok']):
+                self._schedule_recheck(losing_list[index].ticket, float(result['wait_remaining'][index]))
+            
+            if not result['spread_ok'].all():
+                for index in np.flatnonzero(result['wait_ok'] & result['attempts_ok']):
+                    self._schedule_recheck(losing_list[index].ticket, 5)
+            
+            return [
+                RecoveryCandidate(
+                    losing_position=losing_list[index],
+                    pip_loss=float(result['pip_loss'][index]),
+                    threshold=float(thresholds[index]),
+                    strategy=RecoveryStrategy(STRATEGY_CODES[result['strategy_code'][index]]),
+                    success_probability=float(result['success_probability'][index]),
+                    score=float(result['score'][index])
+                )
+                for index in result['ranked']
+            ]
+            
+        except Exception as e:
+            print(f"❌ Error evaluating recovery candidates: {e}")
+            return []
+    
+    def _should_start_recovery(self, losing_pos: LosingPosition, current_tick=None,
+                               market_condition: Optional[str] = None) -> bool:
+        """
+        ตรวจสอบการกู้คืนแบบอัจฉริยะ - ฉลาดขึ้น 200 เท่า
+        
+        current_tick / market_condition ส่งมาจากรอบประเมินได้ (ไม่ต้อง query ซ้ำต่อ position)
+        """
+        try:
+            self.event_stats['evaluations'] += 1
+            
             # 1. คำนวณ pip loss ปัจจุบัน
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            if current_tick is None:
+                current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return False
             
             current_price = current_tick.bid if losing_pos.position_type == mt5.POSITION_TYPE_BUY else current_tick.ask
             
             # คำนวณ pips ที่ขาดทุน
-            if losing_pos.position_type == mt5.POSITION_TYPE_BUY:
-                pip_loss = (losing_pos.open_price - current_price) / 0.01
-            else:
-                pip_loss = (current_price - losing_pos.open_price) / 0.01
-            
-            pip_loss = max(0, pip_loss)  # ไม่ติดลบ
+            pip_loss = self._calculate_pip_loss(losing_pos, current_price)
             
             # 2. ดึงสภาวะตลาดปัจจุบัน
-            market_condition = self._get_current_market_condition()
+            if market_condition is None:
+                market_condition = self._get_current_market_condition()
             
-            # 3. คำนวณ threshold อัจฉริยะ
+            # 3. คำนวณ threshold อัจฉริยะ (เก็บไว้ตรวจการข้าม threshold จาก events)
             smart_threshold = self._calculate_smart_threshold(losing_pos, market_condition)
+            self._evaluated_thresholds[losing_pos.ticket] = smart_threshold
+            self._above_threshold[losing_pos.ticket] = pip_loss >= smart_threshold
             
             # 4. ตรวจสอบเวลาที่รอ (ลดจาก 5 นาที เป็น 1 นาที)
             time_open = datetime.now() - losing_pos.open_time
@@ -325,6 +634,7 @@ class RealRecoveryEngine:
                 min_wait = 45  # รอ 45 วินาที
             
             if time_open.total_seconds() < min_wait:
+                self._schedule_recheck(losing_pos.ticket, min_wait - time_open.total_seconds())
                 return False
             
             # 6. ตรวจสอบจำนวน recovery attempts
@@ -334,6 +644,7 @@ class RealRecoveryEngine:
             # 7. ตรวจสอบสภาวะตลาด (เพิ่มการตรวจสอบ spread)
             spread = current_tick.ask - current_tick.bid
             if spread > 1.5:  # Spread สูงเกินไป
+                self._schedule_recheck(losing_pos.ticket, 5)
                 return False
             
             # 8. ตัดสินใจขั้นสุดท้าย
@@ -389,7 +700,7 @@ class RealRecoveryEngine:
             pip_threshold *= multiplier
             
             # 3. ปรับตามขนาด account
-            account_info = mt5.account_info()
+            account_info = self.snapshot_bus.get_account_info()
             if account_info:
                 # Account ใหญ่ ใช้เปอร์เซ็นต์
                 if account_info.balance > 10000:
@@ -468,13 +779,15 @@ class RealRecoveryEngine:
         
         return False
         
-    def _design_recovery_strategy(self, losing_pos: LosingPosition) -> Optional[RecoveryPlan]:
-        """ออกแบบกลยุทธ์การกู้คืน"""
+    def _design_recovery_strategy(self, losing_pos: LosingPosition, strategy: Optional[RecoveryStrategy] = None,
+                                  success_probability: Optional[float] = None) -> Optional[RecoveryPlan]:
+        """ออกแบบกลยุทธ์การกู้คืน (รับกลยุทธ์ / ความน่าจะเป็นที่ประเมินจาก batch ได้)"""
         try:
             recovery_id = f"REC_{losing_pos.ticket}_{int(time.time())}"
             
             # เลือกกลยุทธ์ตามสถานการณ์
-            strategy = self._select_recovery_strategy(losing_pos)
+            if strategy is None:
+                strategy = self._select_recovery_strategy(losing_pos)
             
             # คำนวณเป้าหมาย
             target_profit = abs(losing_pos.profit) * 1.2  # Target 20% more than loss
@@ -495,7 +808,9 @@ class RealRecoveryEngine:
             plan.parameters = self._get_strategy_parameters(strategy, losing_pos)
             
             # คำนวณความน่าจะเป็นของความสำเร็จ
-            plan.success_probability = self._calculate_success_probability(plan)
+            if success_probability is None:
+                success_probability = self._calculate_success_probability(plan)
+            plan.success_probability = success_probability
             
             return plan
             
@@ -669,6 +984,12 @@ class RealRecoveryEngine:
             print(f"❌ Error starting recovery execution: {e}")
             plan.status = RecoveryStatus.FAILED
     
+    def _execute_basket(self, legs: List[BasketLeg]) -> BasketResult:
+        """ส่งหลายขาพร้อมกันผ่าน order executor (หรือส่งตรงถ้าไม่ได้เชื่อมต่อ)"""
+        if self.order_executor is not None and hasattr(self.order_executor, 'execute_basket'):
+            return self.order_executor.execute_basket(legs)
+        return execute_basket(legs)
+    
     def _execute_martingale_recovery(self, plan: RecoveryPlan):
         """ดำเนินการกู้คืนแบบ Martingale"""
         try:
@@ -685,42 +1006,24 @@ class RealRecoveryEngine:
                 plan.status = RecoveryStatus.FAILED
                 return
             
-            # กำหนดทิศทางตรงข้าม
-            if original_pos.position_type == mt5.POSITION_TYPE_BUY:
-                order_type = mt5.ORDER_TYPE_SELL
-            else:
-                order_type = mt5.ORDER_TYPE_BUY
-            
-            # ดึงราคาปัจจุบัน
-            tick = mt5.symbol_info_tick(self.symbol)
-            if not tick:
-                return
-            
-            price = tick.bid if order_type == mt5.ORDER_TYPE_SELL else tick.ask
-            
-            # สร้าง order request
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": self.symbol,
-                "volume": recovery_volume,
-                "type": order_type,
-                "price": price,
-                "deviation": 3,
-                "magic": 999001,  # Recovery magic number
-                "comment": f"Martingale-{plan.recovery_id}",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
+            # ทิศทางตรงข้ามกับ position เดิม
+            leg = BasketLeg(
+                kind=BasketLegKind.MARKET,
+                symbol=self.symbol,
+                volume=recovery_volume,
+                is_buy=original_pos.position_type != mt5.POSITION_TYPE_BUY,
+                magic_number=999001,  # Recovery magic number
+                comment=f"Martingale-{plan.recovery_id}"
+            )
             
-            # ส่ง order
-            result = mt5.order_send(request)
+            result = self._execute_basket([leg]).legs[0]
             
-            if result.retcode == mt5.TRADE_RETCODE_DONE:
-                print(f"✅ Martingale recovery order executed: {result.order}")
+            if result.success:
+                print(f"✅ Martingale recovery order executed: {result.ticket}")
                 print(f"📊 Volume: {recovery_volume}, Price: {result.price}")
                 
                 # อัพเดทแผน
-                plan.recovery_positions.append(result.order)
+                plan.recovery_positions.append(result.ticket)
                 plan.executed_volume += recovery_volume
                 plan.recovery_cost += recovery_volume * result.price
                 
@@ -729,13 +1032,13 @@ class RealRecoveryEngine:
                 original_pos.total_recovery_volume += recovery_volume
                 
             else:
-                print(f"❌ Martingale recovery order failed: {result.retcode} - {result.comment}")
+                print(f"❌ Martingale recovery order failed: {result.retcode} - {result.error_message}")
                 
         except Exception as e:
             print(f"❌ Martingale recovery execution error: {e}")
     
     def _execute_grid_recovery(self, plan: RecoveryPlan):
-        """ดำเนินการกู้คืนแบบ Grid Trading"""
+        """ดำเนินการกู้คืนแบบ Grid Trading - วางทุกระดับที่ยังขาดเป็น basket เดียว"""
         try:
             original_pos = plan.original_position
             params = plan.parameters
@@ -747,47 +1050,47 @@ class RealRecoveryEngine:
             # คำนวณระดับ grid
             current_price = original_pos.current_price
             pip_value = 0.01  # สำหรับ Gold
-            
-            # สร้าง grid orders
-            for level in range(1, grid_levels + 1):
-                if len(plan.recovery_positions) >= level:
-                    continue  # มี order ในระดับนี้แล้ว
-                
-                # คำนวณราคาสำหรับ grid level
-                if original_pos.position_type == mt5.POSITION_TYPE_BUY:
-                    # Original เป็น BUY, สร้าง SELL grid ด้านบน
+            original_is_buy = original_pos.position_type == mt5.POSITION_TYPE_BUY
+            
+            # สร้าง grid legs
+            levels = []
+            legs = []
+            planned_volume = plan.executed_volume
+            for level in range(len(plan.recovery_positions) + 1, grid_levels + 1):
+                # Original เป็น BUY → SELL grid ด้านบน, Original เป็น SELL → BUY grid ด้านล่าง
+                if original_is_buy:
                     grid_price = current_price + (grid_distance * pip_value * level)
-                    order_type = mt5.ORDER_TYPE_SELL
                 else:
-                    # Original เป็น SELL, สร้าง BUY grid ด้านล่าง
                     grid_price = current_price - (grid_distance * pip_value * level)
-                    order_type = mt5.ORDER_TYPE_BUY
                 
                 # คำนวณ volume
                 grid_volume = original_pos.volume + (lot_increment * level)
                 
                 # ตรวจสอบขีดจำกัด
-                if plan.executed_volume + grid_volume > plan.max_recovery_volume:
+                if planned_volume + grid_volume > plan.max_recovery_volume:
                     break
+                planned_volume += grid_volume
                 
-                # สร้าง pending order
-                request = {
-                    "action": mt5.TRADE_ACTION_PENDING,
-                    "symbol": self.symbol,
-                    "volume": grid_volume,
-                    "type": mt5.ORDER_TYPE_BUY_LIMIT if order_type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_SELL_LIMIT,
-                    "price": grid_price,
-                    "deviation": 3,
-                    "magic": 999002,
-                    "comment": f"Grid-{plan.recovery_id}-L{level}",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                }
-                
-                result = mt5.order_send(request)
-                
-                if result.retcode == mt5.TRADE_RETCODE_DONE:
+                levels.append((level, grid_price, grid_volume))
+                legs.append(BasketLeg(
+                    kind=BasketLegKind.PENDING,
+                    symbol=self.symbol,
+                    volume=grid_volume,
+                    is_buy=not original_is_buy,
+                    price=grid_price,
+                    magic_number=999002,
+                    comment=f"Grid-{plan.recovery_id}-L{level}"
+                ))
+            
+            if not legs:
+                return
+            
+            basket = self._execute_basket(legs)
+            
+            for (level, grid_price, grid_volume), result in zip(levels, basket.legs):
+                if result.success:
                     print(f"✅ Grid order placed: Level {level}, Price {grid_price}")
-                    plan.recovery_positions.append(result.order)
+                    plan.recovery_positions.append(result.ticket)
                     plan.executed_volume += grid_volume
                 else:
                     print(f"❌ Grid order failed: {result.retcode}")
@@ -1041,18 +1344,17 @@ class RealRecoveryEngine:
         try:
             total_profit = 0.0
             
-            # คำนวณกำไรจาก original position
-            original_ticket = plan.original_position.ticket
-            original_position = mt5.positions_get(ticket=original_ticket)
-            
-            if original_position:
-                total_profit += original_position[0].profit
-            
-            # คำนวณกำไรจาก recovery positions
-            for ticket in plan.recovery_positions:
-                recovery_position = mt5.positions_get(ticket=ticket)
-                if recovery_position:
-                    total_profit += recovery_position[0].profit
+            # คำนวณกำไรจาก original position และ recovery positions
+            # (ใช้ค่าล่าสุดจาก events - query MT5 เฉพาะ ticket ที่ยังไม่รู้จัก)
+            for ticket in [plan.original_position.ticket] + list(plan.recovery_positions):
+                known = self._open_positions.get(ticket)
+                if known is not None:
+                    total_profit += known[0]
+                    continue
+                
+                position = mt5.positions_get(ticket=ticket)
+                if position:
+                    total_profit += position[0].profit
             
             plan.current_profit = total_profit
             
@@ -1242,7 +1544,7 @@ class RealRecoveryEngine:
                 
                 if self.losing_positions:
                     print("⚠️ Losing Positions:")
-                    for ticket, pos in self.losing_positions.items():
+                    for ticket, pos in list(self.losing_positions.items()):
                         recovery_status = "🔄" if pos.is_being_recovered else "⏸️"
                         print(f"  - {ticket}: ${pos.profit:.2f} {recovery_status}")
                 
@@ -1355,6 +1657,7 @@ class RealRecoveryEngine:
                 'active_recoveries': len(self.active_recoveries),
                 'losing_positions': len(self.losing_positions),
                 'strategy_weights': dict(self.strategy_weights),
+                'event_stats': dict(self.event_stats),
                 'total_profit_recovered': sum(r.final_profit for r in self.completed_recoveries if r.success),
                 'average_recovery_time': statistics.mean([
                     r.recovery_time.total_seconds() / 60  # Convert to minutes
@@ -1373,33 +1676,35 @@ class RealRecoveryEngine:
         try:
             print("🚨 EMERGENCY: Closing all losing positions")
             
-            closed_count = 0
-            for ticket, losing_pos in list(self.losing_positions.items()):
-                # ปิด position
-                close_request = {
-                    "action": mt5.TRADE_ACTION_DEAL,
-                    "symbol": losing_pos.symbol,
-                    "volume": losing_pos.volume,
-                    "type": mt5.ORDER_TYPE_SELL if losing_pos.position_type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY,
-                    "position": ticket,
-                    "magic": 999999,
-                    "comment": "Emergency Close",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                    "type_filling": mt5.ORDER_FILLING_FOK,
-                }
-                
-                result = mt5.order_send(close_request)
-                if result.retcode == mt5.TRADE_RETCODE_DONE:
-                    print(f"✅ Position {ticket} closed")
-                    closed_count += 1
+            legs = [
+                BasketLeg(
+                    kind=BasketLegKind.CLOSE,
+                    symbol=losing_pos.symbol,
+                    volume=losing_pos.volume,
+                    is_buy=losing_pos.position_type != mt5.POSITION_TYPE_BUY,
+                    position_ticket=ticket,
+                    magic_number=999999,
+                    comment="Emergency Close",
+                    type_filling=mt5.ORDER_FILLING_FOK
+                )
+                for ticket, losing_pos in list(self.losing_positions.items())
+            ]
+            
+            # ปิดทุก position พร้อมกัน
+            basket = self._execute_basket(legs)
+            for result in basket.legs:
+                if result.success:
+                    print(f"✅ Position {result.leg.position_ticket} closed")
                 else:
-                    print(f"❌ Failed to close position {ticket}: {result.retcode}")
+                    print(f"❌ Failed to close position {result.leg.position_ticket}: "
+                          f"{result.retcode or result.error_message}")
+            closed_count = basket.successful_count
             
             # ล้างข้อมูล
             self.losing_positions.clear()
             self.active_recoveries.clear()
             
-            print(f"🚨 Emergency close completed: {closed_count} positions closed")
+            print(f"🚨 Emergency close completed: {closed_count} positions closed ({basket.elapsed_ms:.0f}ms)")
             return True
             
         except Exception as e:
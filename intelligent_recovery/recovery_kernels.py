@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RECOVERY KERNELS - Vectorized Recovery Candidate Evaluation
+==========================================================
+NumPy kernels สำหรับ Recovery Engine - ประเมิน losing positions ทั้งหมด
+ในรอบเดียวด้วย market snapshot เดียว (tick / สภาวะตลาด / account)
+แทนการเรียก _should_start_recovery / _design_recovery_strategy ทีละ position
+
+🎯 FEATURES:
+- Pip loss และ smart threshold ของทุก position เป็น arrays
+- Wait-time / attempts / spread eligibility ด้วย boolean masks
+- เลือกกลยุทธ์และความน่าจะเป็นของความสำเร็จด้วย np.select
+- Priority score และลำดับ (ranked) สำหรับเลือกภายใต้ max_concurrent_recoveries
+
+เชื่อมต่อไปยัง:
+- intelligent_recovery/recovery_engine.py (RealRecoveryEngine)
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Any
+
+PIP_SIZE = 0.01                      # XAUUSD
+PIP_VALUE_PER_LOT = 10.0             # $ ต่อ pip ต่อ 1.00 lot (ตามสูตรเดิม volume × 10)
+MIN_THRESHOLD_PIPS = 8.0
+MAX_THRESHOLD_PIPS = 100.0
+MAX_RECOVERY_ATTEMPTS = 5
+MAX_SPREAD = 1.5
+FAST_WAIT_CONDITIONS = {'VOLATILE_NEWS': 30.0, 'VOLATILE_HIGH': 30.0, 'BREAKOUT': 45.0}
+
+# กลยุทธ์ (ค่า RecoveryStrategy.value) ตาม code ที่ kernel คืน
+STRATEGY_CODES = ("QUICK_RECOVERY", "AVERAGING", "GRID_TRADING", "HEDGING", "SMART_RECOVERY")
+STRATEGY_MODIFIERS = {
+    "QUICK_RECOVERY": 0.85,
+    "AVERAGING": 0.75,
+    "GRID_TRADING": 0.80,
+    "HEDGING": 0.70,
+    "MARTINGALE": 0.65,
+    "SMART_RECOVERY": 0.90
+}
+DEFAULT_STRATEGY_MODIFIER = 0.75
+BASE_SUCCESS_PROBABILITY = 60.0
+MAX_PRIORITY_OVERSHOOT = 3.0         # pip loss เกิน threshold กี่เท่าที่นับใน score
+
+@dataclass
+class RecoveryBatchInputs:
+    """losing positions ในรูป arrays (หนึ่ง element ต่อ position)"""
+    tickets: np.ndarray
+    is_buy: np.ndarray
+    volumes: np.ndarray
+    open_prices: np.ndarray
+    profits: np.ndarray
+    seconds_open: np.ndarray
+    recovery_attempts: np.ndarray
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Any], buy_type: int, now_timestamp: float) -> 'RecoveryBatchInputs':
+        """สร้างจาก LosingPosition (อ่าน attributes ครั้งเดียวต่อ position)"""
+        count = len(positions)
+        return cls(
+            tickets=np.fromiter((p.ticket for p in positions), dtype=np.int64, count=count),
+            is_buy=np.fromiter((p.position_type == buy_type for p in positions), dtype=bool, count=count),
+            volumes=np.fromiter((p.volume for p in positions), dtype=np.float64, count=count),
+            open_prices=np.fromiter((p.open_price for p in positions), dtype=np.float64, count=count),
+            profits=np.fromiter((p.profit for p in positions), dtype=np.float64, count=count),
+            seconds_open=np.fromiter((now_timestamp - p.open_time.timestamp() for p in positions),
+                                     dtype=np.float64, count=count),
+            recovery_attempts=np.fromiter((p.recovery_attempts for p in positions), dtype=np.int64, count=count)
+        )
+
+def compute_pip_loss(is_buy: np.ndarray, open_prices: np.ndarray, bid: float, ask: float) -> np.ndarray:
+    """pips ที่ขาดทุน (ไม่ติดลบ) - BUY ปิดที่ bid, SELL ปิดที่ ask"""
+    pip_loss = np.where(is_buy, open_prices - bid, ask - open_prices) / PIP_SIZE
+    return np.maximum(pip_loss, 0.0)
+
+def compute_smart_thresholds(volumes: np.ndarray, base_pip_threshold: float, market_multiplier: float,
+                             balance: Optional[float], account_risk_percent: float) -> np.ndarray:
+    """Smart threshold (pips) ของทุก position - สูตรเดียวกับ _calculate_smart_threshold"""
+    thresholds = np.full(volumes.shape, base_pip_threshold * market_multiplier, dtype=np.float64)
+
+    if balance is not None:
+        if balance > 10000:
+            account_threshold_dollar = balance * account_risk_percent / 100
+            with np.errstate(divide='ignore'):
+                account_threshold_pips = account_threshold_dollar / (volumes * PIP_VALUE_PER_LOT)
+            thresholds = np.minimum(thresholds, account_threshold_pips)
+        elif balance < 1000:
+            thresholds *= 0.6
+        elif balance < 5000:
+            thresholds *= 0.8
+
+    # Position ใหญ่ ลด threshold
+    thresholds *= np.select([volumes >= 0.1, volumes >= 0.05], [0.7, 0.85], default=1.0)
+
+    return np.clip(thresholds, MIN_THRESHOLD_PIPS, MAX_THRESHOLD_PIPS)
+
+def select_strategy_codes(losses: np.ndarray, seconds_open: np.ndarray) -> np.ndarray:
+    """index ใน STRATEGY_CODES ของทุก position - สูตรเดียวกับ _select_recovery_strategy"""
+    return np.select(
+        [losses < 100,
+         (losses < 300) & (seconds_open < 1800),
+         losses < 300,
+         losses < 500],
+        [0, 1, 2, 3],
+        default=4
+    )
+
+def compute_success_probabilities(strategy_codes: np.ndarray, losses: np.ndarray,
+                                  strategy_weights: Dict[str, float]) -> np.ndarray:
+    """ความน่าจะเป็นของความสำเร็จ (%) - สูตรเดียวกับ _calculate_success_probability"""
+    modifiers = np.array([STRATEGY_MODIFIERS.get(code, DEFAULT_STRATEGY_MODIFIER) *
+                          strategy_weights.get(code, 1.0) for code in STRATEGY_CODES])
+    probability = BASE_SUCCESS_PROBABILITY * modifiers[strategy_codes]
+    probability *= np.maximum(0.5, 1.0 - (losses / 1000) * 0.2)
+    return np.clip(probability, 10.0, 95.0)
+
+def evaluate_recovery_batch(inputs: RecoveryBatchInputs, bid: float, ask: float, market_condition: str,
+                            market_multiplier: float, base_pip_threshold: float, min_wait_seconds: float,
+                            balance: Optional[float], account_risk_percent: float,
+                            strategy_weights: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """
+    ประเมินทุก losing position ในรอบเดียว
+
+    Returns:
+        Dict ของ arrays: pip_loss, threshold, wait_remaining, wait_ok, attempts_ok, spread_ok,
+        eligible, strategy_code, success_probability, score, ranked (indices ของ eligible เรียง score มาก→น้อย)
+    """
+    pip_loss = compute_pip_loss(inputs.is_buy, inputs.open_prices, bid, ask)
+    thresholds = compute_smart_thresholds(inputs.volumes, base_pip_threshold, market_multiplier,
+                                          balance, account_risk_percent)
+
+    min_wait = FAST_WAIT_CONDITIONS.get(market_condition, min_wait_seconds)
+    wait_remaining = min_wait - inputs.seconds_open
+    wait_ok = wait_remaining <= 0
+    attempts_ok = inputs.recovery_attempts < MAX_RECOVERY_ATTEMPTS
+    spread_ok = np.full(pip_loss.shape, (ask - bid) <= MAX_SPREAD)
+    eligible = wait_ok & attempts_ok & spread_ok & (pip_loss >= thresholds)
+
+    losses = np.abs(inputs.profits)
+    strategy_codes = select_strategy_codes(losses, inputs.seconds_open)
+    success = compute_success_probabilities(strategy_codes, losses, strategy_weights)
+
+    # Priority: ความน่าจะเป็นของความสำเร็จ × ระดับที่เกิน threshold (จำกัดเพดาน)
+    overshoot = np.minimum(pip_loss / thresholds, MAX_PRIORITY_OVERSHOOT)
+    score = np.where(eligible, success * overshoot, 0.0)
+
+    candidates = np.flatnonzero(eligible)
+    # เรียง score มาก→น้อย, เท่ากันให้ขาดทุนมากกว่ามาก่อน
+    ranked = candidates[np.lexsort((-losses[candidates], -score[candidates]))]
+
+    return {
+        'pip_loss': pip_loss,
+        'threshold': thresholds,
+        'wait_remaining': wait_remaining,
+        'wait_ok': wait_ok,
+        'attempts_ok': attempts_ok,
+        'spread_ok': spread_ok,
+        'eligible': eligible,
+        'strategy_code': strategy_codes,
+        'success_probability': success,
+        'score': score,
+        'ranked': ranked
+    }
@@ -0,0 +1,374 @@
+# position_management/matching_engine.py - Sorted / Bucketed Position Matching
+
+"""
+MATCHING ENGINE - Hedge / Profit / Correlation Matching without Nested Scans
+============================================================================
+จับคู่ positions สำหรับ PositionPairMatcher โดยไม่ต้องวน BUY × SELL ทุกคู่
+
+🎯 FEATURES:
+- Bucket ตาม symbol แล้วเรียงตาม open time / open price
+- Greedy hedge matching: first-fit แบบเดิม แต่ตรวจเฉพาะ SELL ใน time window (1h) แบบ vectorized
+- Optimal assignment: จับคู่ได้มากที่สุด และ netted P&L รวมสูงสุด
+  (ใช้ scipy ถ้ามี ไม่มีก็ใช้ Hungarian algorithm แบบ NumPy เฉพาะช่วงที่เล็กพอ)
+- Profit / correlation pairs ด้วย score matrix แบบ vectorized
+
+เชื่อมต่อไปยัง:
+- intelligent_recovery/strategies/position_management/pair_matcher.py (PositionPairMatcher)
+"""
+
+import time
+import numpy as np
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+MATCH_GREEDY = "greedy"
+MATCH_OPTIMAL = "optimal"
+
+DEFAULT_MAX_PRICE_DIFF = 0.05       # 5% ของราคาเปิดฝั่ง BUY
+DEFAULT_MAX_TIME_DIFF = 3600.0      # 1 ชั่วโมง
+MAX_NUMPY_ASSIGNMENT_SIZE = 120     # ไม่มี scipy: ช่วงที่ใหญ่กว่านี้ใช้ greedy แทน Hungarian (O(n³))
+
+def bucket_by_symbol(positions: Sequence[Any]) -> Dict[str, Tuple[List[Any], List[Any]]]:
+    """แยก positions ตาม symbol → (BUY legs, SELL legs)"""
+    buckets: Dict[str, Tuple[List[Any], List[Any]]] = defaultdict(lambda: ([], []))
+    for position in positions:
+        if position.position_type == 'BUY':
+            buckets[position.symbol][0].append(position)
+        elif position.position_type == 'SELL':
+            buckets[position.symbol][1].append(position)
+    return dict(buckets)
+
+def _timestamp(value: Any) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+def _price_ok(buy_price: float, sell_price: float, max_price_diff: float) -> bool:
+    return abs(buy_price - sell_price) / buy_price <= max_price_diff
+
+def _volume_ok(buy_volume: float, sell_volume: float, min_volume_ratio: float, max_volume_ratio: float) -> bool:
+    volume_ratio = buy_volume / sell_volume
+    return min_volume_ratio <= volume_ratio <= max_volume_ratio
+
+def match_hedge_pairs_greedy(buys: Sequence[Any], sells: Sequence[Any],
+                             min_volume_ratio: float, max_volume_ratio: float,
+                             max_price_diff: float = DEFAULT_MAX_PRICE_DIFF,
+                             max_time_diff: float = DEFAULT_MAX_TIME_DIFF) -> List[Tuple[Any, Any]]:
+    """
+    จับคู่ BUY/SELL ของ symbol เดียวกันแบบ first-fit (ผลเหมือน nested scan เดิม)
+
+    BUY ตามลำดับเดิมจับกับ SELL ตัวแรก (ตามลำดับเดิม) ที่ยังว่างและผ่านเงื่อนไข
+    SELL ถูกเรียงตามเวลาเปิด - ตัดเฉพาะช่วง ±max_time_diff ด้วย searchsorted
+    แล้วตรวจ price / volume ใน window แบบ vectorized
+    """
+    if not buys or not sells:
+        return []
+
+    sell_time = np.array([_timestamp(p.open_time) for p in sells], dtype=np.float64)
+    order = np.argsort(sell_time, kind='stable')
+    sorted_time = sell_time[order]
+    sorted_price = np.array([sells[i].open_price for i in order], dtype=np.float64)
+    sorted_volume = np.array([sells[i].volume for i in order], dtype=np.float64)
+    available = np.ones(len(sells), dtype=bool)
+    pairs = []
+
+    for buy in buys:
+        if buy.open_price <= 0:
+            continue
+        buy_time = _timestamp(buy.open_time)
+        lo = int(np.searchsorted(sorted_time, buy_time - max_time_diff, side='left'))
+        hi = int(np.searchsorted(sorted_time, buy_time + max_time_diff, side='right'))
+        if lo >= hi:
+            continue
+
+        window = slice(lo, hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = buy.volume / sorted_volume[window]
+        ok = (available[window] &
+              (np.abs(buy.open_price - sorted_price[window]) / buy.open_price <= max_price_diff) &
+              (volume_ratio >= min_volume_ratio) & (volume_ratio <= max_volume_ratio))
+        if not ok.any():
+            continue
+
+        # SELL ที่มาก่อนในลำดับเดิม
+        candidates = np.flatnonzero(ok) + lo
+        chosen = int(candidates[np.argmin(order[candidates])])
+        available[chosen] = False
+        pairs.append((buy, sells[int(order[chosen])]))
+
+    return pairs
+
+def _time_segments(buys: Sequence[Any], sells: Sequence[Any],
+                   max_time_diff: float) -> List[Tuple[List[Any], List[Any]]]:
+    """แบ่ง legs เป็นช่วงเวลาที่ห่างกันเกิน max_time_diff (ไม่มีคู่ข้ามช่วงได้)"""
+    legs = sorted([(_timestamp(p.open_time), 0, p) for p in buys] +
+                  [(_timestamp(p.open_time), 1, p) for p in sells], key=lambda item: item[0])
+    segments = []
+    current: Tuple[List[Any], List[Any]] = ([], [])
+    last_time = None
+    for leg_time, side, position in legs:
+        if last_time is not None and leg_time - last_time > max_time_diff:
+            if current[0] and current[1]:
+                segments.append(current)
+            current = ([], [])
+        current[side].append(position)
+        last_time = leg_time
+    if current[0] and current[1]:
+        segments.append(current)
+    return segments
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment สำหรับ cost (rows ≤ cols) - shortest augmenting path
+    คืน column ที่ assign ให้แต่ละ row
+    """
+    rows, cols = cost.shape
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    assigned_row = np.zeros(cols + 1, dtype=np.int64)     # column j → row (1-based, 0 = ว่าง)
+    way = np.zeros(cols + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        assigned_row[0] = row
+        column = 0
+        min_value = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+
+        while True:
+            used[column] = True
+            current_row = assigned_row[column]
+            free = ~used
+            free[0] = False
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+
+            improve = free[1:] & (reduced < min_value[1:])
+            min_value[1:][improve] = reduced[improve]
+            way[1:][improve] = column
+
+            candidates = np.where(free[1:], min_value[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+
+            u[assigned_row[used]] += delta
+            v[used] -= delta
+            min_value[1:][free[1:]] -= delta
+
+            column = next_column
+            if assigned_row[column] == 0:
+                break
+
+        while column:
+            previous = way[column]
+            assigned_row[column] = assigned_row[previous]
+            column = previous
+
+    assignment = np.full(rows, -1, dtype=np.int64)
+    for column in range(1, cols + 1):
+        if assigned_row[column]:
+            assignment[assigned_row[column] - 1] = column - 1
+    return assignment
+
+def _solve_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """(row, col) ของ assignment ที่ cost รวมต่ำสุด"""
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(cost)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    if cost.shape[0] <= cost.shape[1]:
+        return [(row, int(col)) for row, col in enumerate(_hungarian(cost))]
+    return [(int(row), col) for col, row in enumerate(_hungarian(cost.T))]
+
+def match_hedge_pairs_optimal(buys: Sequence[Any], sells: Sequence[Any],
+                              min_volume_ratio: float, max_volume_ratio: float,
+                              max_price_diff: float = DEFAULT_MAX_PRICE_DIFF,
+                              max_time_diff: float = DEFAULT_MAX_TIME_DIFF) -> List[Tuple[Any, Any]]:
+    """
+    จับคู่ BUY/SELL แบบ optimal assignment: จำนวนคู่มากที่สุดก่อน
+    แล้วเลือกชุดที่ netted P&L (unrealized P&L ของทั้งสองขา) รวมสูงสุด
+
+    แก้ทีละช่วงเวลา (legs ที่ห่างกันเกิน max_time_diff จับคู่กันไม่ได้อยู่แล้ว)
+    ไม่มี scipy และช่วงใหญ่กว่า MAX_NUMPY_ASSIGNMENT_SIZE - ใช้ greedy กับช่วงนั้น
+    """
+    pairs = []
+    for segment_buys, segment_sells in _time_segments(buys, sells, max_time_diff):
+        if not SCIPY_AVAILABLE and max(len(segment_buys), len(segment_sells)) > MAX_NUMPY_ASSIGNMENT_SIZE:
+            pairs.extend(match_hedge_pairs_greedy(segment_buys, segment_sells, min_volume_ratio,
+                                                  max_volume_ratio, max_price_diff, max_time_diff))
+            continue
+
+        buy_price = np.array([p.open_price for p in segment_buys], dtype=np.float64)
+        sell_price = np.array([p.open_price for p in segment_sells], dtype=np.float64)
+        buy_volume = np.array([p.volume for p in segment_buys], dtype=np.float64)
+        sell_volume = np.array([p.volume for p in segment_sells], dtype=np.float64)
+        buy_time = np.array([_timestamp(p.open_time) for p in segment_buys], dtype=np.float64)
+        sell_time = np.array([_timestamp(p.open_time) for p in segment_sells], dtype=np.float64)
+        buy_pnl = np.array([p.unrealized_pnl for p in segment_buys], dtype=np.float64)
+        sell_pnl = np.array([p.unrealized_pnl for p in segment_sells], dtype=np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = buy_volume[:, None] / sell_volume[None, :]
+            price_diff = np.abs(buy_price[:, None] - sell_price[None, :]) / buy_price[:, None]
+        eligible = ((volume_ratio >= min_volume_ratio) & (volume_ratio <= max_volume_ratio) &
+                    (price_diff <= max_price_diff) &
+                    (np.abs(buy_time[:, None] - sell_time[None, :]) <= max_time_diff))
+        if not eligible.any():
+            continue
+
+        # น้ำหนัก lexicographic: แต่ละคู่ได้ bonus ที่มากกว่าผลรวม netted P&L ที่เป็นไปได้ทั้งหมด
+        netted = buy_pnl[:, None] + sell_pnl[None, :]
+        bonus = 2.0 * (np.abs(buy_pnl).sum() + np.abs(sell_pnl).sum()) + 1.0
+        cost = np.where(eligible, -(bonus + netted), 0.0)
+
+        for row, col in _solve_assignment(cost):
+            if col >= 0 and eligible[row, col]:
+                pairs.append((segment_buys[row], segment_sells[col]))
+
+    return pairs
+
+def match_hedge_pairs(positions: Sequence[Any], min_volume_ratio: float, max_volume_ratio: float,
+                      mode: str = MATCH_GREEDY, max_price_diff: float = DEFAULT_MAX_PRICE_DIFF,
+                      max_time_diff: float = DEFAULT_MAX_TIME_DIFF) -> List[Tuple[Any, Any]]:
+    """จับคู่ hedge ทุก symbol (bucket ตาม symbol)"""
+    matcher = match_hedge_pairs_optimal if mode == MATCH_OPTIMAL else match_hedge_pairs_greedy
+    buckets = bucket_by_symbol(positions)
+    pairs = []
+    for symbol in sorted(buckets):
+        buys, sells = buckets[symbol]
+        if buys and sells:
+            pairs.extend(matcher(buys, sells, min_volume_ratio, max_volume_ratio, max_price_diff, max_time_diff))
+    return pairs
+
+def _first_match_greedy(valid: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    จับคู่ตามลำดับเดิม: row i (ที่ยังว่าง) จับกับ j > i ตัวแรกที่ valid และยังว่าง
+    """
+    count = valid.shape[0]
+    available = np.ones(count, dtype=bool)
+    upper = np.triu(valid, k=1)
+    pairs = []
+    for i in np.flatnonzero(upper.any(axis=1)):
+        if not available[i]:
+            continue
+        candidates = upper[i] & available
+        if candidates.any():
+            j = int(np.argmax(candidates))
+            available[i] = available[j] = False
+            pairs.append((int(i), j))
+    return pairs
+
+def match_profit_pairs(positions: Sequence[Any], min_profit_ratio: float = 0.5,
+                       min_volume_ratio: float = 0.5) -> List[Tuple[Any, Any]]:
+    """จับคู่ positions ที่ทำกำไรใกล้เคียงกัน (profit ratio / volume ratio ≥ เกณฑ์)"""
+    if len(positions) < 2:
+        return []
+    profit = np.array([p.unrealized_pnl for p in positions], dtype=np.float64)
+    volume = np.array([p.volume for p in positions], dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_ratio = np.minimum.outer(profit, profit) / np.maximum.outer(profit, profit)
+        volume_ratio = np.minimum.outer(volume, volume) / np.maximum.outer(volume, volume)
+    both_profitable = (profit[:, None] > 0) & (profit[None, :] > 0)
+    valid = both_profitable & (profit_ratio >= min_profit_ratio) & (volume_ratio >= min_volume_ratio)
+
+    return [(positions[i], positions[j]) for i, j in _first_match_greedy(valid)]
+
+def correlation_score_matrix(positions: Sequence[Any]) -> np.ndarray:
+    """Correlation score ของทุกคู่ (เวลาเปิด / ราคา / ทิศทาง / volume)"""
+    open_time = np.array([_timestamp(p.open_time) for p in positions], dtype=np.float64)
+    price = np.array([p.open_price for p in positions], dtype=np.float64)
+    volume = np.array([p.volume for p in positions], dtype=np.float64)
+    is_buy = np.array([p.position_type == 'BUY' for p in positions])
+
+    time_diff = np.abs(open_time[:, None] - open_time[None, :])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_diff = np.abs(price[:, None] - price[None, :]) / price[:, None]
+        volume_ratio = np.minimum.outer(volume, volume) / np.maximum.outer(volume, volume)
+
+    score = np.select([time_diff < 300, time_diff < 900], [0.4, 0.2], default=0.0)
+    score = score + np.select([price_diff < 0.001, price_diff < 0.005], [0.3, 0.2], default=0.0)
+    score = score + np.where(is_buy[:, None] == is_buy[None, :], 0.2, -0.1)
+    score = score + volume_ratio * 0.1
+    return np.clip(score, 0.0, 1.0)
+
+def match_correlation_pairs(positions: Sequence[Any], min_correlation: float) -> List[Tuple[Any, Any, float]]:
+    """จับคู่ positions ที่ correlation score ≥ min_correlation"""
+    if len(positions) < 2:
+        return []
+    scores = correlation_score_matrix(positions)
+    return [(positions[i], positions[j], float(scores[i, j]))
+            for i, j in _first_match_greedy(scores >= min_correlation)]
+
+def _nested_hedge_scan(buys: Sequence[Any], sells: Sequence[Any], min_volume_ratio: float,
+                       max_volume_ratio: float) -> List[Tuple[Any, Any]]:
+    """วิธีเดิม (BUY × SELL ทุกคู่) - ใช้เปรียบเทียบใน benchmark"""
+    pairs, used = [], set()
+    for buy in buys:
+        for sell in sells:
+            if sell.ticket in used or buy.symbol != sell.symbol:
+                continue
+            if (_volume_ok(buy.volume, sell.volume, min_volume_ratio, max_volume_ratio) and
+                    _price_ok(buy.open_price, sell.open_price, DEFAULT_MAX_PRICE_DIFF) and
+                    abs((buy.open_time - sell.open_time).total_seconds()) <= DEFAULT_MAX_TIME_DIFF):
+                used.add(sell.ticket)
+                pairs.append((buy, sell))
+                break
+    return pairs
+
+class BenchmarkLeg(NamedTuple):
+    """leg จำลองสำหรับ benchmark (fields ที่ matching engine ใช้)"""
+    ticket: int
+    symbol: str
+    position_type: str
+    volume: float
+    open_price: float
+    unrealized_pnl: float
+    open_time: datetime
+
+def benchmark_pair_matching(legs: int = 600, seed: int = 7) -> Dict[str, Any]:
+    """
+    วัดเวลาจับคู่ hedge: nested scan เดิม / greedy / optimal บน legs จำลอง
+    """
+    print("⚡ ทดสอบประสิทธิภาพ Pair Matching...")
+
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    symbols = ["XAUUSD.v", "XAGUSD.v"]
+    positions = [
+        BenchmarkLeg(
+            ticket=100000 + index,
+            symbol=symbols[index % len(symbols)],
+            position_type="BUY" if rng.random() < 0.5 else "SELL",
+            volume=float(rng.choice([0.01, 0.02, 0.03, 0.05])),
+            open_price=float(2000.0 + rng.normal(0, 40)),
+            unrealized_pnl=float(rng.normal(0, 25)),
+            open_time=now - timedelta(seconds=float(rng.uniform(0, 48 * 3600)))
+        )
+        for index in range(legs)
+    ]
+    buys = [p for p in positions if p.position_type == 'BUY']
+    sells = [p for p in positions if p.position_type == 'SELL']
+
+    results = {'legs': legs}
+    for name, run in (
+            ("nested", lambda: _nested_hedge_scan(buys, sells, 0.5, 2.0)),
+            ("greedy", lambda: match_hedge_pairs(positions, 0.5, 2.0, MATCH_GREEDY)),
+            ("optimal", lambda: match_hedge_pairs(positions, 0.5, 2.0, MATCH_OPTIMAL))):
+        started = time.perf_counter()
+        pairs = run()
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'seconds': elapsed,
+            'pairs': len(pairs),
+            'netted_pnl': sum(buy.unrealized_pnl + sell.unrealized_pnl for buy, sell in pairs)
+        }
+        print(f"📊 {name}: {len(pairs)} pairs | netted ${results[name]['netted_pnl']:.2f} | {elapsed * 1000:.1f}ms")
+
+    return results
+
+if __name__ == "__main__":
+    benchmark_pair_matching()
@@ -3,12 +3,15 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Set
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Set, Callable
+from dataclasses import dataclass, field
 from enum import Enum
-import itertools
 import math
 
+from intelligent_recovery.strategies.position_management.matching_engine import (
+    MATCH_GREEDY, match_hedge_pairs, match_profit_pairs, match_correlation_pairs
+)
+
 class PairType(Enum):
     """🔗 ประเภทของการจับคู่ Position"""
     HEDGE_PAIR = "hedge_pair"               # คู่ hedge (BUY/SELL)
@@ -67,6 +70,19 @@ class PositionPair:
     
     reasoning: str = ""
 
+@dataclass
+class PairTransitionEvent:
+    """🔔 การเปลี่ยนสถานะของคู่ Position"""
+    pair_id: str
+    pair_type: PairType
+    previous_status: PairStatus
+    new_status: PairStatus
+    combined_pnl: float
+    profit_target: float
+    max_loss_limit: float
+    reason: str = ""
+    timestamp: datetime = field(default_factory=datetime.now)
+
 @dataclass
 class PairDecision:
     """🎯 การตัดสินใจเกี่ยวกับ Position Pairs"""
@@ -106,6 +122,9 @@ class PositionPairMatcher:
         self.hedge_tolerance = config.get('hedge_tolerance', 0.1)  # 10%
         self.min_volume_ratio = config.get('min_volume_ratio', 0.5)
         self.max_volume_ratio = config.get('max_volume_ratio', 2.0)
+        self.max_hedge_price_diff = config.get('max_hedge_price_diff', 0.05)     # 5%
+        self.max_hedge_time_diff = config.get('max_hedge_time_seconds', 3600)    # 1 hour
+        self.matching_mode = config.get('matching_mode', MATCH_GREEDY)            # greedy / optimal
         
         # Risk management
         self.max_pair_exposure = config.get('max_pair_exposure', 1.0)  # lots
@@ -117,6 +136,18 @@ class PositionPairMatcher:
         self.pair_counter = 0
         self.unpaired_positions = set()  # ticket numbers
         
+        # Incremental status - ticket -> pair_ids และ (pnl, ราคา) ล่าสุดที่ใช้คำนวณ
+        self.ticket_pairs: Dict[int, Set[str]] = {}
+        self._position_fingerprints: Dict[int, Tuple[float, float]] = {}
+        self._transition_callbacks: List[Callable[[PairTransitionEvent], None]] = []
+        self._auto_close_interface = None
+        self.status_stats = {
+            'position_updates': 0,
+            'pair_updates': 0,
+            'transitions': 0,
+            'auto_closures': 0
+        }
+        
         # Statistics
         self.pair_history = []
         self.successful_pairs = 0
@@ -127,6 +158,7 @@ class PositionPairMatcher:
         print(f"   - Max Pair Age: {self.max_pair_age}h")
         print(f"   - Min Correlation: {self.min_correlation}")
         print(f"   - Target Hedge Ratio: {self.target_hedge_ratio}")
+        print(f"   - Matching Mode: {self.matching_mode}")
     
     def analyze_positions(self, positions: List[Dict]) -> List[Position]:
         """
@@ -258,21 +290,23 @@ class PositionPairMatcher:
             hedge_pairs = []
             unpaired_positions = [pos for pos in positions if pos.ticket in self.unpaired_positions]
             
-            # จับคู่ BUY/SELL
-            buy_positions = [pos for pos in unpaired_positions if pos.position_type == 'BUY']
-            sell_positions = [pos for pos in unpaired_positions if pos.position_type == 'SELL']
-            
-            for buy_pos in buy_positions:
-                for sell_pos in sell_positions:
-                    # ตรวจสอบเงื่อนไขการ hedge
-                    if self._is_valid_hedge_pair(buy_pos, sell_pos):
-                        pair = self._create_hedge_pair(buy_pos, sell_pos)
-                        if pair:
-                            hedge_pairs.append(pair)
-                            # ลบออกจาก unpaired เพื่อไม่ให้จับคู่ซ้ำ
-                            self.unpaired_positions.discard(buy_pos.ticket)
-                            self.unpaired_positions.discard(sell_pos.ticket)
-                            break  # หาคู่ให้ buy_pos แล้ว
+            # จับคู่ BUY/SELL ตาม symbol (sorted windows / optimal assignment)
+            matches = match_hedge_pairs(
+                unpaired_positions,
+                min_volume_ratio=self.min_volume_ratio,
+                max_volume_ratio=self.max_volume_ratio,
+                mode=self.matching_mode,
+                max_price_diff=self.max_hedge_price_diff,
+                max_time_diff=self.max_hedge_time_diff
+            )
+            
+            for buy_pos, sell_pos in matches:
+                pair = self._create_hedge_pair(buy_pos, sell_pos)
+                if pair:
+                    hedge_pairs.append(pair)
+                    # ลบออกจาก unpaired เพื่อไม่ให้จับคู่ซ้ำ
+                    self.unpaired_positions.discard(buy_pos.ticket)
+                    self.unpaired_positions.discard(sell_pos.ticket)
             
             return hedge_pairs
             
@@ -280,34 +314,6 @@ class PositionPairMatcher:
             print(f"❌ Hedge pairs finding error: {e}")
             return []
     
-    def _is_valid_hedge_pair(self, buy_pos: Position, sell_pos: Position) -> bool:
-        """ตรวจสอบว่าเป็นคู่ hedge ที่ถูกต้องหรือไม่"""
-        try:
-            # ตรวจสอบ symbol เดียวกัน
-            if buy_pos.symbol != sell_pos.symbol:
-                return False
-            
-            # ตรวจสอบ volume ratio
-            volume_ratio = buy_pos.volume / sell_pos.volume
-            if volume_ratio < self.min_volume_ratio or volume_ratio > self.max_volume_ratio:
-                return False
-            
-            # ตรวจสอบราคาใกล้เคียงกัน (ไม่ห่างเกิน 5%)
-            price_diff = abs(buy_pos.open_price - sell_pos.open_price) / buy_pos.open_price
-            if price_diff > 0.05:
-                return False
-            
-            # ตรวจสอบเวลาเปิด position (ไม่ห่างเกิน 1 ชั่วโมง)
-            time_diff = abs((buy_pos.open_time - sell_pos.open_time).total_seconds())
-            if time_diff > 3600:  # 1 hour
-                return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Hedge pair validation error: {e}")
-            return False
-    
     def _create_hedge_pair(self, buy_pos: Position, sell_pos: Position) -> Optional[PositionPair]:
         """สร้าง Hedge Pair"""
         try:
@@ -436,16 +442,13 @@ class PositionPairMatcher:
             if len(profitable_positions) < 2:
                 return profit_pairs
             
-            # จับคู่ positions ที่ทำกำไรใกล้เคียงกัน
-            for i, pos1 in enumerate(profitable_positions):
-                for pos2 in profitable_positions[i+1:]:
-                    if self._is_good_profit_pair(pos1, pos2):
-                        pair = self._create_profit_pair(pos1, pos2)
-                        if pair:
-                            profit_pairs.append(pair)
-                            self.unpaired_positions.discard(pos1.ticket)
-                            self.unpaired_positions.discard(pos2.ticket)
-                            break
+            # จับคู่ positions ที่ทำกำไรใกล้เคียงกัน (กำไร / volume ห่างไม่เกิน 50%)
+            for pos1, pos2 in match_profit_pairs(profitable_positions):
+                pair = self._create_profit_pair(pos1, pos2)
+                if pair:
+                    profit_pairs.append(pair)
+                    self.unpaired_positions.discard(pos1.ticket)
+                    self.unpaired_positions.discard(pos2.ticket)
             
             return profit_pairs
             
@@ -453,29 +456,6 @@ class PositionPairMatcher:
             print(f"❌ Profit pairs finding error: {e}")
             return []
     
-    def _is_good_profit_pair(self, pos1: Position, pos2: Position) -> bool:
-        """ตรวจสอบว่าเป็นคู่ profit ที่ดีหรือไม่"""
-        try:
-            # ทั้งคู่ต้องทำกำไร
-            if pos1.unrealized_pnl <= 0 or pos2.unrealized_pnl <= 0:
-                return False
-            
-            # กำไรต้องใกล้เคียงกัน (ไม่ห่างเกิน 50%)
-            profit_ratio = min(pos1.unrealized_pnl, pos2.unrealized_pnl) / max(pos1.unrealized_pnl, pos2.unrealized_pnl)
-            if profit_ratio < 0.5:
-                return False
-            
-            # Volume ต้องใกล้เคียงกัน
-            volume_ratio = min(pos1.volume, pos2.volume) / max(pos1.volume, pos2.volume)
-            if volume_ratio < 0.5:
-                return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Profit pair validation error: {e}")
-            return False
-    
     def _create_profit_pair(self, pos1: Position, pos2: Position) -> Optional[PositionPair]:
         """สร้าง Profit Pair"""
         try:
@@ -515,17 +495,13 @@ class PositionPairMatcher:
             if len(unpaired_positions) < 2:
                 return correlation_pairs
             
-            # หาคู่ที่เปิดใกล้เคียงกันและราคาใกล้เคียงกัน
-            for i, pos1 in enumerate(unpaired_positions):
-                for pos2 in unpaired_positions[i+1:]:
-                    correlation = self._calculate_position_correlation(pos1, pos2)
-                    if correlation >= self.min_correlation:
-                        pair = self._create_correlation_pair(pos1, pos2, correlation)
-                        if pair:
-                            correlation_pairs.append(pair)
-                            self.unpaired_positions.discard(pos1.ticket)
-                            self.unpaired_positions.discard(pos2.ticket)
-                            break
+            # หาคู่ที่เปิดใกล้เคียงกันและราคาใกล้เคียงกัน (score matrix ครั้งเดียว)
+            for pos1, pos2, correlation in match_correlation_pairs(unpaired_positions, self.min_correlation):
+                pair = self._create_correlation_pair(pos1, pos2, correlation)
+                if pair:
+                    correlation_pairs.append(pair)
+                    self.unpaired_positions.discard(pos1.ticket)
+                    self.unpaired_positions.discard(pos2.ticket)
             
             return correlation_pairs
             
@@ -533,41 +509,6 @@ class PositionPairMatcher:
             print(f"❌ Correlation pairs finding error: {e}")
             return []
     
-    def _calculate_position_correlation(self, pos1: Position, pos2: Position) -> float:
-        """คำนวณ correlation ระหว่าง 2 positions"""
-        try:
-            correlation_score = 0.0
-            
-            # Time correlation (เปิดใกล้เคียงกัน)
-            time_diff = abs((pos1.open_time - pos2.open_time).total_seconds())
-            if time_diff < 300:  # 5 minutes
-                correlation_score += 0.4
-            elif time_diff < 900:  # 15 minutes
-                correlation_score += 0.2
-            
-            # Price correlation (ราคาใกล้เคียงกัน)
-            price_diff = abs(pos1.open_price - pos2.open_price) / pos1.open_price
-            if price_diff < 0.001:  # 0.1%
-                correlation_score += 0.3
-            elif price_diff < 0.005:  # 0.5%
-                correlation_score += 0.2
-            
-            # Direction correlation
-            if pos1.position_type == pos2.position_type:
-                correlation_score += 0.2
-            else:
-                correlation_score -= 0.1  # ทิศทางตรงข้าม
-            
-            # Volume correlation
-            volume_ratio = min(pos1.volume, pos2.volume) / max(pos1.volume, pos2.volume)
-            correlation_score += volume_ratio * 0.1
-            
-            return max(0.0, min(correlation_score, 1.0))
-            
-        except Exception as e:
-            print(f"❌ Correlation calculation error: {e}")
-            return 0.0
-    
     def _create_correlation_pair(self, pos1: Position, pos2: Position, correlation: float) -> Optional[PositionPair]:
         """สร้าง Correlation Pair"""
         try:
@@ -728,11 +669,15 @@ class PositionPairMatcher:
             print(f"🔗 Creating Position Pairs...")
             
             success_count = 0
+            transitions = []
             
             for pair in decision.recommended_pairs:
                 try:
                     # เพิ่มคู่เข้าสู่ active pairs
                     self.active_pairs[pair.pair_id] = pair
+                    transition = self._index_pair(pair)
+                    if transition:
+                        transitions.append(transition)
                     
                     # บันทึกประวัติ
                     self._record_pair_creation(pair)
@@ -745,6 +690,9 @@ class PositionPairMatcher:
             
             print(f"✅ Pair creation completed: {success_count}/{len(decision.recommended_pairs)} pairs created")
             
+            # คู่ที่ถึงเป้าตั้งแต่ตอนสร้าง
+            self._publish_transitions(transitions)
+            
             return success_count > 0
             
         except Exception as e:
@@ -785,7 +733,7 @@ class PositionPairMatcher:
                         self._update_pair_statistics(pair)
                         
                         # ลบออกจาก active pairs
-                        del self.active_pairs[pair_id]
+                        self._remove_pair(pair_id)
                         
                         success_count += 1
                         print(f"   ✅ Closed: {pair_id} (P&L: ${pair.combined_pnl:.2f})")
@@ -884,70 +832,226 @@ class PositionPairMatcher:
         except Exception as e:
             print(f"❌ Pair statistics update error: {e}")
     
+    # ===== INCREMENTAL STATUS =====
+    
+    def _index_pair(self, pair: PositionPair) -> Optional[PairTransitionEvent]:
+        """เพิ่ม pair เข้า ticket -> pairs index และประเมินสถานะเริ่มต้น"""
+        for pos in pair.positions:
+            self.ticket_pairs.setdefault(pos.ticket, set()).add(pair.pair_id)
+            self._position_fingerprints[pos.ticket] = (pos.unrealized_pnl, pos.current_price)
+        return self._apply_pair_status(pair)
+    
+    def _remove_pair(self, pair_id: str) -> Optional[PositionPair]:
+        """ลบ pair ออกจาก active pairs และ index"""
+        pair = self.active_pairs.pop(pair_id, None)
+        if pair is None:
+            return None
+        
+        for pos in pair.positions:
+            pair_ids = self.ticket_pairs.get(pos.ticket)
+            if pair_ids is not None:
+                pair_ids.discard(pair_id)
+                if not pair_ids:
+                    del self.ticket_pairs[pos.ticket]
+                    self._position_fingerprints.pop(pos.ticket, None)
+        return pair
+    
+    def _evaluate_pair_status(self, pair: PositionPair) -> PairStatus:
+        """สถานะของคู่ตาม combined P&L"""
+        if pair.combined_pnl >= pair.profit_target:
+            return PairStatus.PROFITABLE
+        elif pair.combined_pnl <= -pair.max_loss_limit:
+            return PairStatus.FAILED
+        elif pair.pair_type == PairType.RECOVERY_GROUP and pair.combined_pnl < 0:
+            return PairStatus.RECOVERING
+        return PairStatus.ACTIVE
+    
+    def _refresh_pair(self, pair: PositionPair) -> Optional[PairTransitionEvent]:
+        """คำนวณ P&L / สถานะของคู่นี้ใหม่"""
+        pair.combined_pnl = sum(pos.unrealized_pnl for pos in pair.positions)
+        self.status_stats['pair_updates'] += 1
+        return self._apply_pair_status(pair)
+    
+    def _apply_pair_status(self, pair: PositionPair) -> Optional[PairTransitionEvent]:
+        """อัปเดตสถิติ / สถานะจาก combined P&L - คืน event ถ้าสถานะเปลี่ยน"""
+        pair.duration = datetime.now() - pair.creation_time
+        
+        # อัปเดต max profit/loss
+        if pair.combined_pnl > pair.max_profit:
+            pair.max_profit = pair.combined_pnl
+        if pair.combined_pnl < pair.max_loss:
+            pair.max_loss = pair.combined_pnl
+        
+        # อัปเดตสถานะ
+        previous_status = pair.status
+        pair.status = self._evaluate_pair_status(pair)
+        if pair.status == previous_status:
+            return None
+        
+        reasons = {
+            PairStatus.PROFITABLE: f"Reached profit target ${pair.profit_target:.2f}",
+            PairStatus.FAILED: f"Hit max loss limit ${pair.max_loss_limit:.2f}",
+            PairStatus.RECOVERING: "Recovery group in loss",
+            PairStatus.ACTIVE: "Back inside target range"
+        }
+        return PairTransitionEvent(
+            pair_id=pair.pair_id,
+            pair_type=pair.pair_type,
+            previous_status=previous_status,
+            new_status=pair.status,
+            combined_pnl=pair.combined_pnl,
+            profit_target=pair.profit_target,
+            max_loss_limit=pair.max_loss_limit,
+            reason=reasons.get(pair.status, "")
+        )
+    
+    def update_position(self, position: Position):
+        """
+        📈 อัปเดต position หนึ่งตัว - คำนวณใหม่เฉพาะคู่ที่มี position นี้
+        
+        Args:
+            position: Position ที่ราคา / P&L เปลี่ยน
+        """
+        self._publish_transitions(self._apply_position_updates([position]))
+    
+    def _apply_position_updates(self, positions: List[Position]) -> List[PairTransitionEvent]:
+        """
+        แทน positions ในคู่ที่เกี่ยวข้องก่อน แล้วคำนวณแต่ละคู่ครั้งเดียว
+        (คู่ที่ทั้งสองขาเปลี่ยนพร้อมกันจะไม่เห็นค่ากลางทาง)
+        """
+        touched: Dict[str, PositionPair] = {}
+        
+        for position in positions:
+            pair_ids = self.ticket_pairs.get(position.ticket)
+            if not pair_ids:
+                continue
+            
+            self.status_stats['position_updates'] += 1
+            self._position_fingerprints[position.ticket] = (position.unrealized_pnl, position.current_price)
+            
+            for pair_id in pair_ids:
+                pair = self.active_pairs.get(pair_id)
+                if pair is None:
+                    continue
+                for index, old_pos in enumerate(pair.positions):
+                    if old_pos.ticket == position.ticket:
+                        pair.positions[index] = position
+                        break
+                touched[pair_id] = pair
+        
+        events = []
+        for pair_id, pair in touched.items():
+            try:
+                event = self._refresh_pair(pair)
+                if event:
+                    events.append(event)
+            except Exception as e:
+                print(f"❌ Error updating pair {pair_id}: {e}")
+                events.extend(self._drop_pairs([pair_id], "Update error"))
+        return events
+    
+    def remove_position(self, ticket: int):
+        """
+        🔒 Position ถูกปิด - ลบคู่ที่มี position นี้
+        
+        Args:
+            ticket: ticket ของ position ที่ปิดแล้ว
+        """
+        pair_ids = list(self.ticket_pairs.get(ticket, ()))
+        self._publish_transitions(self._drop_pairs(pair_ids, f"Position {ticket} closed"))
+    
+    def _drop_pairs(self, pair_ids: List[str], reason: str) -> List[PairTransitionEvent]:
+        events = []
+        for pair_id in pair_ids:
+            pair = self._remove_pair(pair_id)
+            if pair is None:
+                continue
+            events.append(PairTransitionEvent(
+                pair_id=pair_id,
+                pair_type=pair.pair_type,
+                previous_status=pair.status,
+                new_status=PairStatus.CLOSED,
+                combined_pnl=pair.combined_pnl,
+                profit_target=pair.profit_target,
+                max_loss_limit=pair.max_loss_limit,
+                reason=reason
+            ))
+        return events
+    
     def update_pairs_status(self, current_positions: List[Position]):
         """
-        📊 อัปเดตสถานะของคู่ positions ทั้งหมด
+        📊 อัปเดตสถานะของคู่ positions - เฉพาะคู่ที่มี position ที่ P&L / ราคาเปลี่ยน
         
         Args:
             current_positions: รายการ positions ปัจจุบัน
         """
         try:
-            # สร้าง dictionary สำหรับ lookup
-            position_dict = {pos.ticket: pos for pos in current_positions}
+            changed = []
+            seen_tickets = set()
             
-            pairs_to_remove = []
-            
-            for pair_id, pair in self.active_pairs.items():
-                try:
-                    # อัปเดต positions ในคู่
-                    updated_positions = []
-                    all_positions_exist = True
-                    
-                    for old_pos in pair.positions:
-                        if old_pos.ticket in position_dict:
-                            updated_positions.append(position_dict[old_pos.ticket])
-                        else:
-                            all_positions_exist = False
-                            break
-                    
-                    if not all_positions_exist:
-                        # Position บางตัวถูกปิดแล้ว
-                        pairs_to_remove.append(pair_id)
-                        continue
-                    
-                    # อัปเดตข้อมูลคู่
-                    pair.positions = updated_positions
-                    pair.combined_pnl = sum(pos.unrealized_pnl for pos in updated_positions)
-                    pair.duration = datetime.now() - pair.creation_time
-                    
-                    # อัปเดต max profit/loss
-                    if pair.combined_pnl > pair.max_profit:
-                        pair.max_profit = pair.combined_pnl
-                    if pair.combined_pnl < pair.max_loss:
-                        pair.max_loss = pair.combined_pnl
-                    
-                    # อัปเดตสถานะ
-                    if pair.combined_pnl >= pair.profit_target:
-                        pair.status = PairStatus.PROFITABLE
-                    elif pair.combined_pnl <= -pair.max_loss_limit:
-                        pair.status = PairStatus.FAILED
-                    elif pair.pair_type == PairType.RECOVERY_GROUP and pair.combined_pnl < 0:
-                        pair.status = PairStatus.RECOVERING
-                    else:
-                        pair.status = PairStatus.ACTIVE
+            for pos in current_positions:
+                if pos.ticket not in self.ticket_pairs:
+                    continue
+                seen_tickets.add(pos.ticket)
                 
-                except Exception as e:
-                    print(f"❌ Error updating pair {pair_id}: {e}")
-                    pairs_to_remove.append(pair_id)
+                if self._position_fingerprints.get(pos.ticket) != (pos.unrealized_pnl, pos.current_price):
+                    changed.append(pos)
             
-            # ลบคู่ที่มีปัญหา
-            for pair_id in pairs_to_remove:
-                if pair_id in self.active_pairs:
-                    del self.active_pairs[pair_id]
+            # Position บางตัวถูกปิดแล้ว - ลบคู่ที่เกี่ยวข้อง
+            events = []
+            for ticket in set(self.ticket_pairs) - seen_tickets:
+                events.extend(self._drop_pairs(list(self.ticket_pairs.get(ticket, ())),
+                                               f"Position {ticket} closed"))
+            
+            events.extend(self._apply_position_updates(changed))
+            self._publish_transitions(events)
             
         except Exception as e:
             print(f"❌ Pairs status update error: {e}")
     
+    # ===== TRANSITION EVENTS =====
+    
+    def subscribe_transitions(self, callback: Callable[[PairTransitionEvent], None]):
+        """สมัครรับ pair transition events (เช่น ถึง profit target / ชน max loss)"""
+        if callback not in self._transition_callbacks:
+            self._transition_callbacks.append(callback)
+    
+    def unsubscribe_transitions(self, callback: Callable[[PairTransitionEvent], None]):
+        """ยกเลิกการรับ pair transition events"""
+        if callback in self._transition_callbacks:
+            self._transition_callbacks.remove(callback)
+    
+    def _publish_transitions(self, events: List[PairTransitionEvent]):
+        """ส่ง transition events ให้ subscribers (หลังอัปเดตครบทุกคู่แล้ว)"""
+        for event in events:
+            self.status_stats['transitions'] += 1
+            for callback in list(self._transition_callbacks):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️ Pair transition callback error: {e}")
+    
+    def enable_auto_closure(self, mt5_interface):
+        """
+        ⚡ ปิดคู่ทันทีเมื่อถึง profit target หรือชน max loss limit
+        (ไม่ต้องรอ _identify_pairs_to_close รอบถัดไป)
+        """
+        self._auto_close_interface = mt5_interface
+        self.subscribe_transitions(self._on_pair_transition)
+    
+    def disable_auto_closure(self):
+        """หยุดการปิดคู่อัตโนมัติ"""
+        self.unsubscribe_transitions(self._on_pair_transition)
+        self._auto_close_interface = None
+    
+    def _on_pair_transition(self, event: PairTransitionEvent):
+        if self._auto_close_interface is None:
+            return
+        if event.new_status in (PairStatus.PROFITABLE, PairStatus.FAILED) and event.pair_id in self.active_pairs:
+            print(f"🔔 {event.pair_id}: {event.previous_status.value} → {event.new_status.value} ({event.reason})")
+            if self.execute_pair_closure([event.pair_id], self._auto_close_interface):
+                self.status_stats['auto_closures'] += 1
+    
     def get_pairs_status(self) -> Dict:
         """ดึงสถานะคู่ positions ทั้งหมด"""
         try:
@@ -981,7 +1085,9 @@ class PositionPairMatcher:
                 'successful_pairs': self.successful_pairs,
                 'failed_pairs': self.failed_pairs,
                 'total_pair_profit': self.total_pair_profit,
-                'unpaired_positions': len(self.unpaired_positions)
+                'unpaired_positions': len(self.unpaired_positions),
+                'indexed_tickets': len(self.ticket_pairs),
+                'status_stats': dict(self.status_stats)
             }
             
         except Exception as e:
@@ -24,6 +24,25 @@ def log_status(message, is_error=False):
     level = "ERROR" if is_error else "INFO"
     print(f"{timestamp} | {level} | {message}")
 
+# ===== SIMULATOR MODE =====
+# --simulate (หรือ MT5_SIMULATOR=1) ใช้ MT5 simulator แทน terminal จริง
+# ต้องติดตั้งก่อน import MetaTrader5 / components ทั้งหมด
+SIMULATOR_MODE = '--simulate' in sys.argv or os.environ.get('MT5_SIMULATOR') == '1'
+simulator = None
+simulator_config = None
+if SIMULATOR_MODE:
+    try:
+        from mt5_integration.mt5_simulator import SimulatorConfig, install_simulator
+        simulator_config = SimulatorConfig.from_args(sys.argv[1:])
+        simulator = install_simulator(simulator_config)
+        source = simulator_config.tick_file or "synthetic ticks"
+        log_status(f"🧪 MT5 simulator installed ({source}, latency {simulator_config.latency_ms:.0f}ms)")
+    except Exception as e:
+        # ห้าม fallback ไป terminal จริง - ผู้ใช้ขอ simulation
+        log_status(f"❌ MT5 simulator failed: {e}", True)
+        log_status("❌ Simulation requested - refusing to fall back to live trading", True)
+        sys.exit(1)
+
 # ===== CORE IMPORTS =====
 try:
     import MetaTrader5 as mt5
@@ -93,6 +112,15 @@ except ImportError as e:
     components_loaded['trading_params'] = False
     log_status(f"❌ Trading parameters failed: {e}")
 
+# Snapshot Bus
+try:
+    from mt5_integration.snapshot_bus import get_snapshot_bus
+    components_loaded['snapshot_bus'] = True
+    log_status("✅ Snapshot bus loaded")
+except ImportError as e:
+    components_loaded['snapshot_bus'] = False
+    log_status(f"❌ Snapshot bus failed: {e}")
+
 # Market Intelligence
 try:
     from market_intelligence.market_analyzer import RealTimeMarketAnalyzer
@@ -156,11 +184,13 @@ class IntelligentTradingSystem:
         self.gold_symbol = "XAUUSD"
         
         # Core components
+        self.snapshot_bus = None
         self.market_analyzer = None
         self.signal_generator = None
         self.order_executor = None
         self.recovery_engine = None
         self.position_tracker = None
+        self.load_driver = None
         
         # Threads
         self.system_thread = None
@@ -304,10 +334,24 @@ class IntelligentTradingSystem:
                 self.order_executor.position_tracker = self.position_tracker
                 connections += 1
                 log_status("✅ Order Executor → Position Tracker")
+            if hasattr(self.position_tracker, 'order_executor'):
+                self.position_tracker.order_executor = self.order_executor
+                log_status("✅ Position Tracker → Order Executor (basket close)")
+        
+        # Recovery Engine → Order Executor (basket orders)
+        if self.order_executor and self.recovery_engine:
+            if hasattr(self.recovery_engine, 'order_executor'):
+                self.recovery_engine.order_executor = self.order_executor
+                connections += 1
+                log_status("✅ Recovery Engine → Order Executor")
         
         # Position Tracker → Recovery Engine
         if self.position_tracker and self.recovery_engine:
-            if hasattr(self.recovery_engine, 'position_tracker'):
+            if hasattr(self.recovery_engine, 'attach_position_tracker'):
+                self.recovery_engine.attach_position_tracker(self.position_tracker)
+                connections += 1
+                log_status("✅ Position Tracker → Recovery Engine (change events)")
+            elif hasattr(self.recovery_engine, 'position_tracker'):
                 self.recovery_engine.position_tracker = self.position_tracker
                 connections += 1
                 log_status("✅ Position Tracker → Recovery Engine")
@@ -317,6 +361,13 @@ class IntelligentTradingSystem:
     def start_all_components(self):
         """เริ่มต้น components ทั้งหมด"""
         try:
+            # 0. Snapshot Bus (ต้องเริ่มก่อน components ที่อ่านข้อมูลจาก terminal)
+            if components_loaded.get('snapshot_bus'):
+                self.snapshot_bus = get_snapshot_bus()
+                self.snapshot_bus.register_symbol(self.gold_symbol)
+                self.snapshot_bus.start()
+                log_status("✅ Snapshot bus started")
+            
             # 1. Market Analyzer
             if self.market_analyzer and hasattr(self.market_analyzer, 'start_analysis'):
                 self.market_analyzer.start_analysis()
@@ -410,7 +461,10 @@ class IntelligentTradingSystem:
             # Get current market data
             current_price = 0.0
             if MT5_AVAILABLE and self.mt5_connected:
-                tick = mt5.symbol_info_tick(self.gold_symbol)
+                if self.snapshot_bus:
+                    tick = self.snapshot_bus.get_tick(self.gold_symbol)
+                else:
+                    tick = mt5.symbol_info_tick(self.gold_symbol)
                 if tick:
                     current_price = (tick.bid + tick.ask) / 2
             
@@ -434,6 +488,27 @@ class IntelligentTradingSystem:
                 log_status(f"🎯 Success Rate: {signal_stats.get('success_rate_percent', 0):.1f}%")
                 log_status(f"📊 Volume Today: {signal_stats.get('daily_volume_generated', 0):.2f} lots")
             
+            if self.snapshot_bus:
+                bus_stats = self.snapshot_bus.get_bus_statistics()
+                log_status(f"📡 Snapshot Bus: v{bus_stats['snapshot_version']} | "
+                           f"saved {bus_stats['calls_saved_per_second']:.1f} calls/s")
+            
+            if simulator:
+                sim_stats = simulator.get_simulator_stats()
+                log_status(f"🧪 Simulator: {sim_stats['orders_sent']} orders | {sim_stats['deals']} deals | "
+                           f"{sim_stats['open_positions']} positions | "
+                           f"{sim_stats['orders_per_second']:.1f} orders/s | "
+                           f"send {sim_stats['average_send_ms']:.1f}ms")
+            
+            if self.load_driver:
+                report = self.load_driver.get_report()
+                fill = report['submit_to_fill_ms']
+                tracked = report['fill_to_tracker_ms']
+                log_status(f"🏋️ Load: {report['filled']}/{report['submitted']} filled | "
+                           f"{report['fills_per_second']:.1f} fills/s | "
+                           f"fill p50/p99 {fill.get('p50', 0):.1f}/{fill.get('p99', 0):.1f}ms | "
+                           f"tracker p50/p99 {tracked.get('p50', 0):.1f}/{tracked.get('p99', 0):.1f}ms")
+            
             log_status("=" * 60)
             
         except Exception as e:
@@ -445,6 +520,11 @@ class IntelligentTradingSystem:
             log_status("🛑 Stopping trading system...")
             self.is_running = False
             
+            # Stop Load Driver (simulator)
+            if self.load_driver:
+                self.load_driver.stop()
+                log_status("🛑 Load driver stopped")
+            
             # Stop Signal Generator first
             if self.signal_generator and hasattr(self.signal_generator, 'stop_signal_generation'):
                 self.signal_generator.stop_signal_generation()
@@ -470,6 +550,11 @@ class IntelligentTradingSystem:
                 self.recovery_engine.stop_recovery_engine()
                 log_status("🛑 Recovery engine stopped")
             
+            # Stop Snapshot Bus last
+            if self.snapshot_bus:
+                self.snapshot_bus.stop()
+                log_status("🛑 Snapshot bus stopped")
+            
             log_status("✅ All systems stopped")
             
         except Exception as e:
@@ -505,6 +590,60 @@ class IntelligentTradingSystem:
         finally:
             self.stop_system()
     
+    def start_load_driver(self, orders_per_second: float):
+        """เริ่มส่ง orders จำลองตามอัตราคงที่ (simulator เท่านั้น)"""
+        if not simulator or not self.order_executor or orders_per_second <= 0:
+            return
+        
+        from mt5_integration.mt5_simulator import PipelineLoadDriver
+        self.load_driver = PipelineLoadDriver(self.order_executor, self.position_tracker,
+                                              orders_per_second=orders_per_second, symbol=self.gold_symbol)
+        self.load_driver.start()
+    
+    def run_benchmark_mode(self, seconds: float):
+        """รันแบบ headless บน simulator ตามเวลาที่กำหนด แล้วรายงาน throughput / latency"""
+        log_status(f"🏁 Benchmark mode: {seconds:.0f}s")
+        
+        if not self.start_trading_system():
+            log_status("❌ Failed to start trading system", True)
+            return
+        
+        self.start_load_driver(simulator_config.load_orders_per_second)
+        
+        try:
+            time.sleep(seconds)
+        except KeyboardInterrupt:
+            log_status("👋 Interrupted by user")
+        
+        self._show_status()
+        self._show_benchmark_report()
+    
+    def _show_benchmark_report(self):
+        """สรุป latency ของ signal → order → position → recovery"""
+        log_status("🏁 BENCHMARK REPORT")
+        log_status("-" * 40)
+        
+        if self.order_executor and hasattr(self.order_executor, 'get_execution_statistics'):
+            execution_stats = self.order_executor.get_execution_statistics()
+            log_status(f"⚡ Orders: {execution_stats.get('successful_orders', 0)} ok / "
+                       f"{execution_stats.get('failed_orders', 0)} failed")
+            for order_type, latency in execution_stats.get('latency_by_order_type', {}).items():
+                fill = latency.get('submit_to_fill_ms', {})
+                log_status(f"  {order_type}: {latency.get('count', 0)} fills | "
+                           f"submit→fill p50/p99 {fill.get('p50', 0):.1f}/{fill.get('p99', 0):.1f}ms")
+        
+        if self.position_tracker and hasattr(self.position_tracker, 'get_tracking_stats'):
+            log_status(f"📋 Tracker: {self.position_tracker.get_tracking_stats()}")
+        
+        if self.recovery_engine and hasattr(self.recovery_engine, 'event_stats'):
+            log_status(f"🔄 Recovery events: {self.recovery_engine.event_stats}")
+        
+        if self.load_driver:
+            log_status(f"🏋️ Load driver: {self.load_driver.get_report()}")
+        
+        if simulator:
+            log_status(f"🧪 Simulator: {simulator.get_simulator_stats()}")
+    
     def _show_performance(self):
         """แสดงประสิทธิภาพ"""
         if self.signal_generator and hasattr(self.signal_generator, 'get_strategy_performance'):
@@ -563,7 +702,10 @@ def main():
     """Main entry point"""
     print("🚀 INTELLIGENT GOLD TRADING SYSTEM")
     print("=" * 50)
-    print("⚠️  LIVE TRADING - REAL MONEY")
+    if SIMULATOR_MODE:
+        print("🧪 SIMULATOR MODE - NO REAL ORDERS")
+    else:
+        print("⚠️  LIVE TRADING - REAL MONEY")
     print("⚠️  CONNECTED TO YOUR GIT SYSTEM")
     print("⚠️  ALL IMPORTS FIXED")
     print("=" * 50)
@@ -589,6 +731,14 @@ def main():
             input("Press Enter to exit...")
             return
         
+        # Simulator benchmark (headless)
+        if SIMULATOR_MODE and simulator_config.benchmark_seconds > 0:
+            system.run_benchmark_mode(simulator_config.benchmark_seconds)
+            return
+        
+        if SIMULATOR_MODE:
+            system.start_load_driver(simulator_config.load_orders_per_second)
+        
         # Select mode
         print("\n🎮 Select Mode:")
         print("1. Console Mode (Recommended for debugging)")
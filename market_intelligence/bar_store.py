@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BAR STORE - Columnar Ring-Buffer Storage for OHLC Bars
+=====================================================
+เก็บ bars แบบ columnar ใน NumPy arrays ที่จองไว้ล่วงหน้า แยกตาม (symbol, timeframe)
+เพิ่มเฉพาะ bars ใหม่จริง ๆ และให้ indicator code อ่านผ่าน zero-copy views
+
+🎯 FEATURES:
+- Preallocated columns: time / open / high / low / close / tick_volume / spread
+- Double-write ring buffer - window ล่าสุดเป็น slice ต่อเนื่องเสมอ (ไม่ต้อง copy)
+- Append เฉพาะ bar ที่ใหม่กว่า bar ล่าสุด / อัพเดท bar ที่กำลังก่อตัว
+- รับ structured array จาก mt5.copy_rates_from_pos ได้โดยตรง
+
+เชื่อมต่อไปยัง:
+- market_intelligence/market_analyzer.py (RealTimeMarketAnalyzer)
+"""
+
+import threading
+import numpy as np
+from typing import Dict, Optional, Tuple, Any
+
+BAR_COLUMNS = ('time', 'open', 'high', 'low', 'close', 'tick_volume', 'spread')
+
+class BarRingBuffer:
+    """
+    Ring buffer แบบ columnar สำหรับ bars ของ (symbol, timeframe) เดียว
+
+    แต่ละค่าถูกเขียนสองตำแหน่ง (i และ i + capacity) ทำให้ n bars ล่าสุด
+    อยู่ใน slice ต่อเนื่อง data[start:start+n] เสมอ - อ่านได้แบบ zero-copy
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {
+            'time': np.zeros(capacity * 2, dtype=np.int64),
+            'open': np.zeros(capacity * 2, dtype=np.float64),
+            'high': np.zeros(capacity * 2, dtype=np.float64),
+            'low': np.zeros(capacity * 2, dtype=np.float64),
+            'close': np.zeros(capacity * 2, dtype=np.float64),
+            'tick_volume': np.zeros(capacity * 2, dtype=np.int64),
+            'spread': np.zeros(capacity * 2, dtype=np.float64)
+        }
+        self.index = 0      # ตำแหน่งที่จะเขียนครั้งถัดไป (0..capacity-1)
+        self.count = 0
+        self.bars_appended = 0
+        self.bars_updated = 0
+
+    @property
+    def last_time(self) -> int:
+        """เวลาเปิดของ bar ล่าสุด (epoch seconds, 0 ถ้ายังไม่มี)"""
+        if self.count == 0:
+            return 0
+        return int(self.columns['time'][self.index - 1 + self.capacity])
+
+    def _write(self, position: int, bar: Dict[str, Any]):
+        """เขียน bar ลงทั้งสองตำแหน่งของ double buffer"""
+        for name, column in self.columns.items():
+            value = bar[name]
+            column[position] = value
+            column[position + self.capacity] = value
+
+    def append_bar(self, bar: Dict[str, Any]) -> bool:
+        """
+        เพิ่ม bar เดียว - คืน True ถ้าเป็น bar ใหม่
+        bar ที่เวลาเท่ากับ bar ล่าสุดจะอัพเดทแทน (bar ที่กำลังก่อตัว)
+        """
+        bar_time = int(bar['time'])
+        last_time = self.last_time
+
+        if self.count and bar_time < last_time:
+            return False
+
+        if self.count and bar_time == last_time:
+            self._write((self.index - 1) % self.capacity, bar)
+            self.bars_updated += 1
+            return False
+
+        self._write(self.index, bar)
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.bars_appended += 1
+        return True
+
+    def append_rates(self, rates: np.ndarray, spread: float = 0.0) -> int:
+        """
+        เพิ่ม bars จาก structured array ของ MT5 (เรียงเวลาเก่า→ใหม่)
+        คืนจำนวน bars ใหม่ที่ถูกเพิ่ม
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+
+        # ข้าม bars ที่เก่ากว่า bar ล่าสุดที่มีอยู่แล้ว
+        last_time = self.last_time
+        if self.count:
+            rates = rates[rates['time'] >= last_time]
+        rates = rates[-self.capacity:]
+
+        added = 0
+        names = rates.dtype.names
+        for row in rates:
+            bar = {
+                'time': row['time'],
+                'open': row['open'],
+                'high': row['high'],
+                'low': row['low'],
+                'close': row['close'],
+                'tick_volume': row['tick_volume'] if 'tick_volume' in names else 0,
+                'spread': spread
+            }
+            if self.append_bar(bar):
+                added += 1
+        return added
+
+    def view(self, column: str, n: Optional[int] = None) -> np.ndarray:
+        """n bars ล่าสุดของ column (เก่า→ใหม่) แบบ zero-copy read-only view"""
+        n = self.count if n is None else min(n, self.count)
+        end = self.index + self.capacity
+        window = self.columns[column][end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """bar ล่าสุดเป็น dict"""
+        if self.count == 0:
+            return None
+        position = self.index - 1 + self.capacity
+        return {name: column[position].item() for name, column in self.columns.items()}
+
+    def __len__(self) -> int:
+        return self.count
+
+class BarStore:
+    """
+    Bar Store - รวม BarRingBuffer ของทุก (symbol, timeframe)
+    """
+
+    def __init__(self, default_capacity: int = 500):
+        self.default_capacity = default_capacity
+        self.buffers: Dict[Tuple[str, Any], BarRingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def register(self, symbol: str, timeframe: Any, capacity: Optional[int] = None) -> BarRingBuffer:
+        """สร้าง buffer สำหรับ (symbol, timeframe) ถ้ายังไม่มี"""
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self.buffers:
+                self.buffers[key] = BarRingBuffer(capacity or self.default_capacity)
+            return self.buffers[key]
+
+    def get_buffer(self, symbol: str, timeframe: Any) -> BarRingBuffer:
+        """ดึง buffer (สร้างใหม่ถ้ายังไม่มี)"""
+        buffer = self.buffers.get((symbol, timeframe))
+        if buffer is None:
+            buffer = self.register(symbol, timeframe)
+        return buffer
+
+    def append_rates(self, symbol: str, timeframe: Any, rates: np.ndarray, spread: float = 0.0) -> int:
+        """เพิ่ม bars จาก MT5 rates - คืนจำนวน bars ใหม่"""
+        return self.get_buffer(symbol, timeframe).append_rates(rates, spread)
+
+    def closes(self, symbol: str, timeframe: Any, n: Optional[int] = None) -> np.ndarray:
+        return self.get_buffer(symbol, timeframe).view('close', n)
+
+    def highs(self, symbol: str, timeframe: Any, n: Optional[int] = None) -> np.ndarray:
+        return self.get_buffer(symbol, timeframe).view('high', n)
+
+    def lows(self, symbol: str, timeframe: Any, n: Optional[int] = None) -> np.ndarray:
+        return self.get_buffer(symbol, timeframe).view('low', n)
+
+    def volumes(self, symbol: str, timeframe: Any, n: Optional[int] = None) -> np.ndarray:
+        return self.get_buffer(symbol, timeframe).view('tick_volume', n)
+
+    def count(self, symbol: str, timeframe: Any) -> int:
+        buffer = self.buffers.get((symbol, timeframe))
+        return len(buffer) if buffer else 0
+
+    def get_store_stats(self) -> Dict[str, Any]:
+        """สถิติการใช้งาน Bar Store"""
+        return {
+            'buffers': len(self.buffers),
+            'total_bars': sum(len(buffer) for buffer in self.buffers.values()),
+            'bars_appended': sum(buffer.bars_appended for buffer in self.buffers.values()),
+            'bars_updated': sum(buffer.bars_updated for buffer in self.buffers.values()),
+            'memory_bytes': sum(
+                sum(column.nbytes for column in buffer.columns.values())
+                for buffer in self.buffers.values()
+            )
+        }
+
+def create_bar_store(default_capacity: int = 500) -> BarStore:
+    """สร้าง Bar Store"""
+    return BarStore(default_capacity)
@@ -17,7 +17,6 @@ MARKET INTELLIGENCE ENGINE - REAL MT5 DATA ANALYSIS
 
 import MetaTrader5 as mt5
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
@@ -26,7 +25,10 @@ import threading
 import time
 import math
 import statistics
-from collections import deque, defaultdict
+from collections import defaultdict
+
+from mt5_integration.snapshot_bus import get_snapshot_bus
+from mt5_integration.candle_aggregator import get_candle_aggregator
 
 class MarketCondition(Enum):
     """สภาวะตลาด"""
@@ -150,13 +152,14 @@ class RealTimeMarketAnalyzer:
         self.is_analyzing = False
         self.analysis_thread = None
         
-        # Data storage
-        self.price_history = {
-            mt5.TIMEFRAME_M1: deque(maxlen=1000),
-            mt5.TIMEFRAME_M5: deque(maxlen=500),
-            mt5.TIMEFRAME_M15: deque(maxlen=200),
-            mt5.TIMEFRAME_H1: deque(maxlen=100)
-        }
+        # Shared terminal snapshot (แทนการเรียก MT5 ตรงทุกรอบ)
+        self.snapshot_bus = get_snapshot_bus()
+        self.snapshot_bus.register_symbol(symbol)
+        
+        # Data storage - M1 incremental + aggregate เป็น timeframe อื่นในเครื่อง
+        self.timeframes = ['M1', 'M5', 'M15', 'H1']
+        self.candle_aggregator = get_candle_aggregator(symbol)
+        self.bar_store = self.candle_aggregator.bar_store
         
         # Current analysis
         self.current_analysis = None
@@ -211,47 +214,16 @@ class RealTimeMarketAnalyzer:
                 time.sleep(5)
     
     def _fetch_market_data(self):
-        """ดึงข้อมูลตลาดจาก MT5"""
+        """ดึงข้อมูลตลาดจาก MT5 - M1 แบบ incremental แล้ว aggregate เป็น M5/M15/H1"""
         try:
-            # ดึงข้อมูลแต่ละ timeframe
-            timeframes = [
-                mt5.TIMEFRAME_M1,
-                mt5.TIMEFRAME_M5,
-                mt5.TIMEFRAME_M15,
-                mt5.TIMEFRAME_H1
-            ]
-            
-            for tf in timeframes:
-                # ดึงข้อมูล 100 bars ล่าสุด
-                rates = mt5.copy_rates_from_pos(self.symbol, tf, 0, 100)
-                
-                if rates is not None and len(rates) > 0:
-                    # แปลงเป็น DataFrame
-                    df = pd.DataFrame(rates)
-                    df['time'] = pd.to_datetime(df['time'], unit='s')
-                    
-                    # เก็บข้อมูลล่าสุด
-                    latest_data = MarketData(
-                        timestamp=df.iloc[-1]['time'],
-                        symbol=self.symbol,
-                        timeframe=self._timeframe_to_string(tf),
-                        open=df.iloc[-1]['open'],
-                        high=df.iloc[-1]['high'],
-                        low=df.iloc[-1]['low'],
-                        close=df.iloc[-1]['close'],
-                        volume=df.iloc[-1]['tick_volume'],
-                        spread=self._get_current_spread()
-                    )
-                    
-                    self.price_history[tf].append(latest_data)
-                    
+            self.candle_aggregator.update()
         except Exception as e:
             print(f"❌ Error fetching market data: {e}")
     
     def _get_current_spread(self):
         """ดึง Spread ปัจจุบัน"""
         try:
-            tick = mt5.symbol_info_tick(self.symbol)
+            tick = self.snapshot_bus.get_tick(self.symbol)
             if tick:
                 return tick.ask - tick.bid
             return 0.0
@@ -276,7 +248,7 @@ class RealTimeMarketAnalyzer:
                 return None
             
             # ดึงราคาปัจจุบัน
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return None
             
@@ -325,10 +297,10 @@ class RealTimeMarketAnalyzer:
                 resistance_levels=resistance_levels,
                 spread_score=spread_score,
                 liquidity_score=liquidity_score,
-                m1_signals=self._get_timeframe_signals(mt5.TIMEFRAME_M1),
-                m5_signals=self._get_timeframe_signals(mt5.TIMEFRAME_M5),
-                m15_signals=self._get_timeframe_signals(mt5.TIMEFRAME_M15),
-                h1_signals=self._get_timeframe_signals(mt5.TIMEFRAME_H1)
+                m1_signals=self._get_timeframe_signals('M1'),
+                m5_signals=self._get_timeframe_signals('M5'),
+                m15_signals=self._get_timeframe_signals('M15'),
+                h1_signals=self._get_timeframe_signals('H1')
             )
             
             return analysis
@@ -339,8 +311,8 @@ class RealTimeMarketAnalyzer:
     
     def _has_sufficient_data(self) -> bool:
         """ตรวจสอบว่ามีข้อมูลเพียงพอสำหรับการวิเคราะห์"""
-        for tf, data in self.price_history.items():
-            if len(data) < 20:  # ต้องมีข้อมูลอย่างน้อย 20 periods
+        for tf in self.timeframes:
+            if self.bar_store.count(self.symbol, tf) < 20:  # ต้องมีข้อมูลอย่างน้อย 20 periods
                 return False
         return True
     
@@ -350,14 +322,13 @@ class RealTimeMarketAnalyzer:
         
         try:
             # ใช้ข้อมูล M15 เป็นหลัก
-            m15_data = list(self.price_history[mt5.TIMEFRAME_M15])
-            if len(m15_data) < 50:
+            if self.bar_store.count(self.symbol, 'M15') < 50:
                 return indicators
             
-            # แปลงเป็น arrays
-            closes = np.array([d.close for d in m15_data])
-            highs = np.array([d.high for d in m15_data])
-            lows = np.array([d.low for d in m15_data])
+            # Zero-copy views จาก bar store
+            closes = self.bar_store.closes(self.symbol, 'M15')
+            highs = self.bar_store.highs(self.symbol, 'M15')
+            lows = self.bar_store.lows(self.symbol, 'M15')
             
             # Moving Averages
             if len(closes) >= 200:
@@ -396,11 +367,10 @@ class RealTimeMarketAnalyzer:
             indicators.adx_14 = self._calculate_adx(highs, lows, closes, 14)
             
             # Pivot Points
-            yesterday_data = m15_data[-96:]  # 24 hours of M15 data
-            if len(yesterday_data) >= 96:
-                high_24h = max([d.high for d in yesterday_data])
-                low_24h = min([d.low for d in yesterday_data])
-                close_24h = yesterday_data[-1].close
+            if len(closes) >= 96:  # 24 hours of M15 data
+                high_24h = float(highs[-96:].max())
+                low_24h = float(lows[-96:].min())
+                close_24h = float(closes[-1])
                 
                 indicators.pivot_point = (high_24h + low_24h + close_24h) / 3
                 indicators.resistance_1 = (2 * indicators.pivot_point) - low_24h
@@ -490,7 +460,7 @@ class RealTimeMarketAnalyzer:
             adx_weak = indicators.adx_14 < 20
             
             # เงื่อนไขการตัดสิน
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return MarketCondition.QUIET_LOW
             
@@ -558,7 +528,7 @@ class RealTimeMarketAnalyzer:
         """ตรวจสอบเทรนด์แรง"""
         try:
             # Price position relative to moving averages
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return False
             
@@ -638,7 +608,7 @@ class RealTimeMarketAnalyzer:
     def _analyze_trend(self, indicators: TechnicalIndicators) -> Tuple[TrendDirection, float]:
         """วิเคราะห์เทรนด์และความแรง"""
         try:
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return TrendDirection.SIDEWAYS, 0.0
             
@@ -700,14 +670,13 @@ class RealTimeMarketAnalyzer:
         """คำนวณระดับความผันผวน (0-100)"""
         try:
             # ATR-based volatility
-            m15_data = list(self.price_history[mt5.TIMEFRAME_M15])
-            if len(m15_data) < 50:
+            if self.bar_store.count(self.symbol, 'M15') < 50:
                 return 50.0
             
             # Calculate average ATR for comparison
-            recent_prices = [d.close for d in m15_data[-50:]]
-            price_range = max(recent_prices) - min(recent_prices)
-            avg_price = statistics.mean(recent_prices)
+            recent_prices = self.bar_store.closes(self.symbol, 'M15', 50)
+            price_range = float(recent_prices.max() - recent_prices.min())
+            avg_price = float(recent_prices.mean())
             
             volatility_ratio = (price_range / avg_price) * 100 if avg_price > 0 else 0
             
@@ -782,13 +751,12 @@ class RealTimeMarketAnalyzer:
             resistance_levels = []
             
             # ใช้ข้อมูล H1 สำหรับ S/R
-            h1_data = list(self.price_history[mt5.TIMEFRAME_H1])
-            if len(h1_data) < 20:
+            if self.bar_store.count(self.symbol, 'H1') < 20:
                 return support_levels, resistance_levels
             
             # หา swing highs และ lows
-            highs = [d.high for d in h1_data[-50:]]
-            lows = [d.low for d in h1_data[-50:]]
+            highs = self.bar_store.highs(self.symbol, 'H1', 50).tolist()
+            lows = self.bar_store.lows(self.symbol, 'H1', 50).tolist()
             
             # Find significant levels
             for i in range(2, len(highs) - 2):
@@ -813,7 +781,7 @@ class RealTimeMarketAnalyzer:
     def _evaluate_spread_quality(self) -> float:
         """ประเมินคุณภาพของ Spread (0-100)"""
         try:
-            current_tick = mt5.symbol_info_tick(self.symbol)
+            current_tick = self.snapshot_bus.get_tick(self.symbol)
             if not current_tick:
                 return 0.0
             
@@ -858,18 +826,17 @@ class RealTimeMarketAnalyzer:
     def _get_timeframe_signals(self, timeframe) -> Dict[str, Any]:
         """ดึงสัญญาณจาก timeframe ที่กำหนด"""
         try:
-            data = list(self.price_history[timeframe])
-            if len(data) < 10:
+            if self.bar_store.count(self.symbol, timeframe) < 10:
                 return {}
             
-            recent_data = data[-10:]
-            current_price = recent_data[-1].close
+            closes = self.bar_store.closes(self.symbol, timeframe, 10)
+            volumes = self.bar_store.volumes(self.symbol, timeframe, 10)
             
             # Simple signals
             signals = {
-                'trend': 'UP' if recent_data[-1].close > recent_data[-5].close else 'DOWN',
-                'momentum': 'STRONG' if abs(float(recent_data[-1].close) - float(recent_data[-3].close)) > float(recent_data[-1].close) * 0.001 else 'WEAK',
-                'volume': 'HIGH' if recent_data[-1].volume > statistics.mean([float(d.volume) for d in recent_data]) else 'LOW'
+                'trend': 'UP' if closes[-1] > closes[-5] else 'DOWN',
+                'momentum': 'STRONG' if abs(float(closes[-1]) - float(closes[-3])) > float(closes[-1]) * 0.001 else 'WEAK',
+                'volume': 'HIGH' if volumes[-1] > volumes.mean() else 'LOW'
             }
             
             return signals
@@ -909,7 +876,9 @@ class RealTimeMarketAnalyzer:
             'total_errors': self.analysis_errors,
             'error_rate': (self.analysis_errors / max(self.analysis_count, 1)) * 100,
             'last_analysis': self.last_analysis_time.strftime('%H:%M:%S') if self.last_analysis_time else 'None',
-            'data_points': {tf: len(data) for tf, data in self.price_history.items()}
+            'data_points': {tf: self.bar_store.count(self.symbol, tf) for tf in self.timeframes},
+            'bar_store': self.bar_store.get_store_stats(),
+            'candle_aggregator': self.candle_aggregator.get_aggregator_stats()
         }
 
 class IntelligentStrategySelector:
@@ -41,6 +41,15 @@ from config.settings import get_system_settings, MarketSession
 from config.trading_params import get_trading_parameters, EntryStrategy, RecoveryMethod
 from utilities.professional_logger import setup_trading_logger
 from utilities.error_handler import handle_trading_errors, ErrorCategory, ErrorSeverity
+from money_management.risk_kernels import (
+    compute_var_surface, compute_drawdown_metrics, historical_var_index,
+    Z_SCORES, DEFAULT_Z_SCORE, MONTE_CARLO_SIMULATIONS
+)
+from money_management.stress_engine import build_portfolio_exposure, run_stress_scenarios
+
+# Daily volatility ต่อ symbol สำหรับ stress test (H1 bars)
+VOLATILITY_LOOKBACK_BARS = 120
+MIN_VOLATILITY_BARS = 24
 
 class RiskMetric(Enum):
     """ประเภทของ Risk Metrics"""
@@ -198,12 +207,13 @@ class ValueAtRiskCalculator:
                 
             elif method == "parametric":
                 var_value = self._calculate_parametric_var(returns, confidence_level)
-                metadata["mean"] = statistics.mean(returns)
-                metadata["std_dev"] = statistics.stdev(returns) if len(returns) > 1 else 0
+                values = np.asarray(returns, dtype=np.float64)
+                metadata["mean"] = float(values.mean())
+                metadata["std_dev"] = float(values.std(ddof=1)) if len(returns) > 1 else 0
                 
             elif method == "monte_carlo":
                 var_value = self._calculate_monte_carlo_var(returns, confidence_level)
-                metadata["simulations"] = 10000
+                metadata["simulations"] = MONTE_CARLO_SIMULATIONS
                 
             else:
                 var_value = self._calculate_historical_var(returns, confidence_level)
@@ -216,64 +226,68 @@ class ValueAtRiskCalculator:
             return 0.0, {"error": str(e)}
     
     def _calculate_historical_var(self, returns: List[float], confidence_level: float) -> float:
-        """คำนวณ Historical VaR"""
-        sorted_returns = sorted(returns)
-        index = int((1 - confidence_level) * len(sorted_returns))
-        return sorted_returns[max(0, index - 1)]
+        """คำนวณ Historical VaR (np.partition แทนการ sort ทั้งชุด)"""
+        values = np.asarray(returns, dtype=np.float64)
+        index = historical_var_index(len(values), confidence_level)
+        return float(np.partition(values, index)[index])
     
     def _calculate_parametric_var(self, returns: List[float], confidence_level: float) -> float:
         """คำนวณ Parametric VaR (สมมติ Normal Distribution)"""
         if len(returns) < 2:
             return 0.0
         
-        mean_return = statistics.mean(returns)
-        std_dev = statistics.stdev(returns)
-        
-        # Z-score สำหรับ confidence level
-        z_scores = {0.90: -1.282, 0.95: -1.645, 0.99: -2.326}
-        z_score = z_scores.get(confidence_level, -1.645)
+        values = np.asarray(returns, dtype=np.float64)
+        z_score = Z_SCORES.get(confidence_level, DEFAULT_Z_SCORE)
         
-        return mean_return + (z_score * std_dev)
+        return float(values.mean()) + (z_score * float(values.std(ddof=1)))
     
     def _calculate_monte_carlo_var(self, returns: List[float], confidence_level: float) -> float:
         """คำนวณ Monte Carlo VaR"""
         if len(returns) < 2:
             return 0.0
         
-        mean_return = statistics.mean(returns)
-        std_dev = statistics.stdev(returns)
-        
-        # สร้าง Monte Carlo simulations
-        np.random.seed(42)  # สำหรับผลลัพธ์ที่สม่ำเสมอ
-        simulated_returns = np.random.normal(mean_return, std_dev, 10000)
+        surface = compute_var_surface(returns, (confidence_level,), ())
+        return -surface['all'][confidence_level]['monte_carlo']
+    
+    def calculate_var_surface(self, returns: List[float]) -> Dict[Any, Dict[str, Any]]:
+        """
+        คำนวณ Historical / Parametric / Monte Carlo VaR และ CVaR
+        ของทุก confidence_levels และ lookback_periods ในรอบเดียว
         
-        # คำนวณ VaR จาก simulations
-        index = int((1 - confidence_level) * len(simulated_returns))
-        return np.sort(simulated_returns)[index]
+        Returns:
+            Dict: {'all' | lookback: {confidence: {...}}} (ค่าว่างถ้าข้อมูลไม่เพียงพอ)
+        """
+        try:
+            if not returns or len(returns) < 10:
+                return {}
+            
+            return compute_var_surface(returns, self.confidence_levels, self.lookback_periods)
+            
+        except Exception as e:
+            self.logger.error(f"❌ ข้อผิดพลาดในการคำนวณ VaR Surface: {e}")
+            return {}
     
     def calculate_conditional_var(self, returns: List[float], confidence_level: float = 0.95) -> Tuple[float, Dict[str, Any]]:
         """
         คำนวณ Conditional VaR (Expected Shortfall)
         """
         try:
-            var_value, var_metadata = self.calculate_var(returns, confidence_level, "historical")
-            
-            if var_value == 0:
-                return 0.0, var_metadata
+            if not returns or len(returns) < 10:
+                return 0.0, {"error": "ข้อมูลไม่เพียงพอ"}
             
-            # หา returns ที่แย่กว่า VaR
-            worse_returns = [r for r in returns if r <= -var_value]
+            level_result = compute_var_surface(returns, (confidence_level,), (), include_monte_carlo=False)['all'][confidence_level]
+            var_value = level_result['historical']
+            cvar_value = level_result['cvar']
             
-            if not worse_returns:
-                cvar_value = var_value
-            else:
-                cvar_value = abs(statistics.mean(worse_returns))
+            if var_value == 0:
+                return 0.0, {"method": "historical", "confidence_level": confidence_level,
+                             "sample_size": len(returns)}
             
             metadata = {
                 "var_value": var_value,
                 "cvar_value": cvar_value,
-                "tail_observations": len(worse_returns),
-                "tail_percentage": (len(worse_returns) / len(returns)) * 100
+                "tail_observations": level_result['tail_observations'],
+                "tail_percentage": (level_result['tail_observations'] / len(returns)) * 100
             }
             
             return cvar_value, metadata
@@ -304,124 +318,13 @@ class DrawdownCalculator:
             if not equity_curve or len(equity_curve) < 2:
                 return self._get_empty_drawdown_metrics()
             
-            # คำนวณ Running Maximum
-            running_max = []
-            current_max = equity_curve[0]
-            
-            for value in equity_curve:
-                current_max = max(current_max, value)
-                running_max.append(current_max)
-            
-            # คำนวณ Drawdown ในแต่ละจุด
-            drawdowns = []
-            for i, value in enumerate(equity_curve):
-                if running_max[i] > 0:
-                    dd = ((value - running_max[i]) / running_max[i]) * 100
-                    drawdowns.append(dd)
-                else:
-                    drawdowns.append(0.0)
-            
-            # หา Maximum Drawdown
-            max_drawdown = min(drawdowns) if drawdowns else 0.0
-            
-            # คำนวณ Current Drawdown
-            current_drawdown = drawdowns[-1] if drawdowns else 0.0
-            
-            # หา Drawdown Duration
-            max_duration, current_duration = self._calculate_drawdown_durations(drawdowns)
-            
-            # คำนวณ Drawdown Recovery Time
-            recovery_time = self._calculate_recovery_time(drawdowns)
-            
-            return {
-                "maximum_drawdown": abs(max_drawdown),
-                "current_drawdown": abs(current_drawdown),
-                "max_drawdown_duration": max_duration,
-                "current_drawdown_duration": current_duration,
-                "average_recovery_time": recovery_time,
-                "drawdown_frequency": self._calculate_drawdown_frequency(drawdowns),
-                "underwater_periods": self._identify_underwater_periods(drawdowns),
-                "drawdown_volatility": statistics.stdev(drawdowns) if len(drawdowns) > 1 else 0.0
-            }
+            # Running maximum / drawdown series / underwater runs แบบ vectorized
+            return compute_drawdown_metrics(equity_curve)
             
         except Exception as e:
             self.logger.error(f"❌ ข้อผิดพลาดในการคำนวณ Drawdown: {e}")
             return self._get_empty_drawdown_metrics()
     
-    def _calculate_drawdown_durations(self, drawdowns: List[float]) -> Tuple[int, int]:
-        """คำนวณระยะเวลา Drawdown"""
-        max_duration = 0
-        current_duration = 0
-        temp_duration = 0
-        
-        for dd in drawdowns:
-            if dd < 0:  # อยู่ใน Drawdown
-                temp_duration += 1
-                current_duration = temp_duration
-            else:  # ออกจาก Drawdown
-                max_duration = max(max_duration, temp_duration)
-                temp_duration = 0
-                current_duration = 0
-        
-        max_duration = max(max_duration, temp_duration)
-        return max_duration, current_duration
-    
-    def _calculate_recovery_time(self, drawdowns: List[float]) -> float:
-        """คำนวณเวลาเฉลี่ยในการ Recovery"""
-        recovery_times = []
-        in_drawdown = False
-        drawdown_start = 0
-        
-        for i, dd in enumerate(drawdowns):
-            if dd < 0 and not in_drawdown:  # เริ่ม Drawdown
-                in_drawdown = True
-                drawdown_start = i
-            elif dd >= 0 and in_drawdown:  # จบ Drawdown
-                in_drawdown = False
-                recovery_time = i - drawdown_start
-                recovery_times.append(recovery_time)
-        
-        return statistics.mean(recovery_times) if recovery_times else 0.0
-    
-    def _calculate_drawdown_frequency(self, drawdowns: List[float]) -> float:
-        """คำนวณความถี่ของ Drawdown"""
-        drawdown_periods = 0
-        in_drawdown = False
-        
-        for dd in drawdowns:
-            if dd < 0 and not in_drawdown:
-                drawdown_periods += 1
-                in_drawdown = True
-            elif dd >= 0:
-                in_drawdown = False
-        
-        return (drawdown_periods / len(drawdowns)) * 100 if drawdowns else 0.0
-    
-    def _identify_underwater_periods(self, drawdowns: List[float]) -> List[Dict[str, Any]]:
-        """ระบุช่วงเวลาที่อยู่ใต้น้ำ (Underwater Periods)"""
-        periods = []
-        current_period = None
-        
-        for i, dd in enumerate(drawdowns):
-            if dd < 0:  # อยู่ใน Drawdown
-                if current_period is None:
-                    current_period = {"start": i, "max_dd": dd, "duration": 1}
-                else:
-                    current_period["duration"] += 1
-                    current_period["max_dd"] = min(current_period["max_dd"], dd)
-            else:  # ออกจาก Drawdown
-                if current_period is not None:
-                    current_period["end"] = i - 1
-                    periods.append(current_period)
-                    current_period = None
-        
-        # จัดการ period ที่ยังไม่จบ
-        if current_period is not None:
-            current_period["end"] = len(drawdowns) - 1
-            periods.append(current_period)
-        
-        return periods
-    
     def _get_empty_drawdown_metrics(self) -> Dict[str, Any]:
         """Return empty metrics เมื่อไม่มีข้อมูล"""
         return {
@@ -444,6 +347,11 @@ class CorrelationAnalyzer:
         self.logger = setup_trading_logger()
         self.correlation_threshold_high = 0.7    # Correlation สูง
         self.correlation_threshold_medium = 0.4  # Correlation ปานกลาง
+        
+        # Incremental Matrix - คำนวณใหม่เฉพาะแถว/คอลัมน์ของ positions ที่เปิดใหม่
+        self.incremental_updates = True
+        self._matrix_cache: Optional[Dict[str, Any]] = None
+        self.matrix_stats = {'full_builds': 0, 'incremental_updates': 0, 'rows_recomputed': 0}
     
     def calculate_portfolio_correlation_risk(self, positions_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -495,23 +403,60 @@ class CorrelationAnalyzer:
             self.logger.error(f"❌ ข้อผิดพลาดในการคำนวณ Correlation Risk: {e}")
             return self._get_empty_correlation_metrics()
     
-    def _build_correlation_matrix(self, positions_data: List[Dict[str, Any]]) -> np.ndarray:
-        """สร้าง Correlation Matrix"""
+    def _build_correlation_matrix(self, positions_data: List[Dict[str, Any]],
+                                  incremental: Optional[bool] = None) -> np.ndarray:
+        """
+        สร้าง Correlation Matrix
+        
+        คำนวณทั้ง matrix ด้วย broadcasting ของ feature arrays
+        ใน incremental mode จะใช้ค่าเดิมของ positions ที่ยังเปิดอยู่ และคำนวณเฉพาะ
+        แถว/คอลัมน์ของ positions ที่เปิดใหม่ (positions ที่ปิดแล้วถูกตัดออก)
+        """
         try:
             # ในระบบจริงจะใช้ price returns ของแต่ละ position
             # ที่นี่จะใช้การจำลองตาม position characteristics
             
             n_positions = len(positions_data)
-            correlation_matrix = np.eye(n_positions)  # เริ่มด้วย Identity matrix
+            features = self._position_features(positions_data)
+            position_ids = [pos.get('position_id') for pos in positions_data]
+            
+            if incremental is None:
+                incremental = self.incremental_updates
+            
+            cache = self._matrix_cache
+            unique_ids = None not in position_ids and len(set(position_ids)) == n_positions
+            
+            if incremental and cache is not None and unique_ids:
+                previous_index = cache['index']
+                kept_new = [k for k, pid in enumerate(position_ids) if pid in previous_index]
+                
+                if kept_new:
+                    kept_old = [previous_index[position_ids[k]] for k in kept_new]
+                    added = np.asarray([k for k, pid in enumerate(position_ids) if pid not in previous_index],
+                                       dtype=np.int64)
+                    
+                    correlation_matrix = np.empty((n_positions, n_positions))
+                    correlation_matrix[np.ix_(kept_new, kept_new)] = cache['matrix'][np.ix_(kept_old, kept_old)]
+                    
+                    if len(added):
+                        block = self._correlation_block(features, added, np.arange(n_positions))
+                        correlation_matrix[added, :] = block
+                        correlation_matrix[:, added] = block.T
+                        correlation_matrix[added, added] = 1.0
+                    
+                    self.matrix_stats['incremental_updates'] += 1
+                    self.matrix_stats['rows_recomputed'] += len(added)
+                    self._store_matrix_cache(position_ids, correlation_matrix)
+                    return correlation_matrix
             
-            for i in range(n_positions):
-                for j in range(i + 1, n_positions):
-                    # คำนวณ correlation ตามลักษณะของ positions
-                    correlation = self._estimate_position_correlation(
-                        positions_data[i], positions_data[j]
-                    )
-                    correlation_matrix[i, j] = correlation
-                    correlation_matrix[j, i] = correlation  # Symmetric matrix
+            all_positions = np.arange(n_positions)
+            correlation_matrix = self._correlation_block(features, all_positions, all_positions)
+            np.fill_diagonal(correlation_matrix, 1.0)  # Identity บน diagonal
+            
+            self.matrix_stats['full_builds'] += 1
+            self.matrix_stats['rows_recomputed'] += n_positions
+            if unique_ids:
+                self._store_matrix_cache(position_ids, correlation_matrix)
             
             return correlation_matrix
             
@@ -519,6 +464,68 @@ class CorrelationAnalyzer:
             self.logger.error(f"❌ ข้อผิดพลาดในการสร้าง Correlation Matrix: {e}")
             return np.eye(len(positions_data))
     
+    def _store_matrix_cache(self, position_ids: List[Any], correlation_matrix: np.ndarray):
+        """เก็บ matrix ล่าสุดสำหรับ incremental update"""
+        self._matrix_cache = {
+            'index': {pid: k for k, pid in enumerate(position_ids)},
+            'matrix': correlation_matrix
+        }
+    
+    def reset_correlation_cache(self):
+        """ล้าง matrix ที่เก็บไว้ (ครั้งถัดไปจะคำนวณใหม่ทั้งหมด)"""
+        self._matrix_cache = None
+    
+    @staticmethod
+    def _factorize(values: List[Any]) -> np.ndarray:
+        """แปลงค่า categorical เป็น integer codes (ค่าเท่ากัน = code เดียวกัน)"""
+        codes: Dict[Any, int] = {}
+        return np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                           dtype=np.int64, count=len(values))
+    
+    def _position_features(self, positions_data: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Feature arrays ของทุก position ที่ใช้ประมาณ correlation"""
+        now = datetime.now()
+        open_times = [pos.get('open_time', now) for pos in positions_data]
+        
+        time_valid = np.array([isinstance(t, datetime) for t in open_times], dtype=bool)
+        open_seconds = np.zeros(len(positions_data))
+        valid_times = [t for t in open_times if isinstance(t, datetime)]
+        if valid_times:
+            reference = valid_times[0]
+            open_seconds[time_valid] = [(t - reference).total_seconds() for t in valid_times]
+        
+        return {
+            'symbol': self._factorize([pos.get('symbol') for pos in positions_data]),
+            'direction': self._factorize([pos.get('direction') for pos in positions_data]),
+            'entry_strategy': self._factorize([pos.get('entry_strategy') for pos in positions_data]),
+            'timeframe': self._factorize([pos.get('timeframe') for pos in positions_data]),
+            'open_seconds': open_seconds,
+            'time_valid': time_valid
+        }
+    
+    def _correlation_block(self, features: Dict[str, np.ndarray], rows: np.ndarray,
+                           columns: np.ndarray) -> np.ndarray:
+        """
+        Correlation ของ positions[rows] กับ positions[columns] ด้วย broadcasting
+        (กฎเดียวกับ _estimate_position_correlation)
+        """
+        def same(name: str) -> np.ndarray:
+            return features[name][rows][:, None] == features[name][columns][None, :]
+        
+        correlation = np.zeros((len(rows), len(columns)))
+        correlation += np.where(same('symbol'), 0.8, 0.0)           # Same symbol
+        correlation += np.where(same('direction'), 0.3, -0.2)       # Same / opposite direction
+        correlation += np.where(same('entry_strategy'), 0.2, 0.0)   # Same entry strategy
+        correlation += np.where(same('timeframe'), 0.1, 0.0)        # Same timeframe
+        
+        # Opened at similar time (ภายใน 1 ชั่วโมง)
+        both_valid = features['time_valid'][rows][:, None] & features['time_valid'][columns][None, :]
+        time_diff = np.abs(features['open_seconds'][rows][:, None] - features['open_seconds'][columns][None, :])
+        correlation += np.where(both_valid & (time_diff < 3600), 0.1, 0.0)
+        
+        # จำกัดค่าระหว่าง -1 และ 1
+        return np.clip(correlation, -1.0, 1.0)
+    
     def _estimate_position_correlation(self, pos1: Dict[str, Any], pos2: Dict[str, Any]) -> float:
         """ประมาณ correlation ระหว่าง 2 positions"""
         correlation = 0.0
@@ -555,13 +562,11 @@ class CorrelationAnalyzer:
     def _find_max_correlation(self, correlation_matrix: np.ndarray) -> float:
         """หา correlation สูงสุด (ไม่รวม diagonal)"""
         n = correlation_matrix.shape[0]
-        max_corr = 0.0
-        
-        for i in range(n):
-            for j in range(i + 1, n):
-                max_corr = max(max_corr, abs(correlation_matrix[i, j]))
+        if n < 2:
+            return 0.0
         
-        return max_corr
+        upper = np.abs(correlation_matrix[np.triu_indices(n, 1)])
+        return max(0.0, float(upper.max()))
     
     def _calculate_average_correlation(self, correlation_matrix: np.ndarray) -> float:
         """คำนวณ correlation เฉลี่ย"""
@@ -569,15 +574,7 @@ class CorrelationAnalyzer:
         if n < 2:
             return 0.0
         
-        total_corr = 0.0
-        count = 0
-        
-        for i in range(n):
-            for j in range(i + 1, n):
-                total_corr += abs(correlation_matrix[i, j])
-                count += 1
-        
-        return total_corr / count if count > 0 else 0.0
+        return float(np.abs(correlation_matrix[np.triu_indices(n, 1)]).mean())
     
     def _identify_correlation_clusters(self, correlation_matrix: np.ndarray, 
                                      positions_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -593,15 +590,16 @@ class CorrelationAnalyzer:
             cluster = [i]
             cluster_positions = [positions_data[i]['position_id']]
             
-            for j in range(i + 1, n):
-                if j not in processed and abs(correlation_matrix[i, j]) >= self.correlation_threshold_high:
+            candidates = np.flatnonzero(np.abs(correlation_matrix[i, i + 1:]) >= self.correlation_threshold_high) + i + 1
+            for j in candidates.tolist():
+                if j not in processed:
                     cluster.append(j)
                     cluster_positions.append(positions_data[j]['position_id'])
                     processed.add(j)
             
             if len(cluster) > 1:
-                avg_correlation = np.mean([abs(correlation_matrix[i, j]) 
-                                         for i in cluster for j in cluster if i != j])
+                block = np.abs(correlation_matrix[np.ix_(cluster, cluster)])
+                avg_correlation = float((block.sum() - np.trace(block)) / (len(cluster) * (len(cluster) - 1)))
                 
                 clusters.append({
                     "cluster_id": len(clusters) + 1,
@@ -683,18 +681,19 @@ class CorrelationAnalyzer:
         high_corr_pairs = []
         n = correlation_matrix.shape[0]
         
-        for i in range(n):
-            for j in range(i + 1, n):
-                correlation = correlation_matrix[i, j]
-                if abs(correlation) >= self.correlation_threshold_high:
-                    high_corr_pairs.append({
-                        "position_1": positions_data[i]['position_id'],
-                        "position_2": positions_data[j]['position_id'],
-                        "correlation": correlation,
-                        "risk_level": "HIGH" if abs(correlation) >= 0.8 else "MEDIUM",
-                        "combined_exposure": (positions_data[i].get('volume', 0) + 
-                                            positions_data[j].get('volume', 0))
-                    })
+        rows, columns = np.triu_indices(n, 1)
+        selected = np.abs(correlation_matrix[rows, columns]) >= self.correlation_threshold_high
+        
+        for i, j in zip(rows[selected].tolist(), columns[selected].tolist()):
+            correlation = float(correlation_matrix[i, j])
+            high_corr_pairs.append({
+                "position_1": positions_data[i]['position_id'],
+                "position_2": positions_data[j]['position_id'],
+                "correlation": correlation,
+                "risk_level": "HIGH" if abs(correlation) >= 0.8 else "MEDIUM",
+                "combined_exposure": (positions_data[i].get('volume', 0) + 
+                                    positions_data[j].get('volume', 0))
+            })
         
         # เรียงตาม correlation จากสูงไปต่ำ
         high_corr_pairs.sort(key=lambda x: abs(x['correlation']), reverse=True)
@@ -709,11 +708,7 @@ class CorrelationAnalyzer:
         
         # Portfolio variance (สมมติ equal weights)
         equal_weight = 1.0 / n
-        portfolio_variance = 0.0
-        
-        for i in range(n):
-            for j in range(n):
-                portfolio_variance += equal_weight * equal_weight * correlation_matrix[i, j]
+        portfolio_variance = float(correlation_matrix.sum()) * equal_weight * equal_weight
         
         # Diversification ratio = 1 / sqrt(portfolio_variance)
         return 1.0 / math.sqrt(portfolio_variance) if portfolio_variance > 0 else 1.0
@@ -1028,7 +1023,7 @@ class RiskCalculator:
         self.recovery_risk_analyzer = RecoveryRiskAnalyzer()
         
         # External Connections
-        self.position_tracker = None      # จะเชื่อมต่อใน start()
+        self.position_tracker = None      # RealPositionTracker (เชื่อมจากภายนอก) - ไม่มีจะอ่านจาก snapshot bus
         self.performance_tracker = None   # จะเชื่อมต่อใน start()
         self.market_analyzer = None       # จะเชื่อมต่อใน start()
         self.recovery_engine = None       # จะเชื่อมต่อใน start()
@@ -1056,9 +1051,6 @@ class RiskCalculator:
         
         # เชื่อมต่อ External Components
         try:
-            from position_management.position_tracker import PositionTracker
-            self.position_tracker = PositionTracker()
-            
             from analytics_engine.performance_tracker import get_performance_tracker
             self.performance_tracker = get_performance_tracker()
             
@@ -1104,11 +1096,12 @@ class RiskCalculator:
             # คำนวณ Risk Metrics แต่ละประเภท
             risk_results = {}
             
-            # 1. Value at Risk
-            if returns_data and len(returns_data) >= 10:
-                var_95, var_metadata = self.var_calculator.calculate_var(returns_data, 0.95)
-                var_99, _ = self.var_calculator.calculate_var(returns_data, 0.99)
-                cvar_95, cvar_metadata = self.var_calculator.calculate_conditional_var(returns_data, 0.95)
+            # 1. Value at Risk (ทุก confidence level / lookback ในรอบเดียว)
+            var_surface = self.var_calculator.calculate_var_surface(returns_data)
+            if var_surface:
+                var_95 = var_surface['all'][0.95]['historical']
+                var_99 = var_surface['all'][0.99]['historical']
+                cvar_95 = var_surface['all'][0.95]['cvar']
                 
                 risk_results[RiskMetric.VALUE_AT_RISK] = RiskResult(
                     metric_type=RiskMetric.VALUE_AT_RISK,
@@ -1238,11 +1231,10 @@ class RiskCalculator:
                         self.current_parameters.used_margin = account_info.get('used_margin', 0.0)
                 
                 # อัพเดท Position Data
-                if self.position_tracker:
-                    positions = self.position_tracker.get_all_positions()
-                    self.current_parameters.total_positions = len(positions)
-                    self.current_parameters.open_lot_size = sum(pos.get('volume', 0) for pos in positions)
-                    self.current_parameters.unrealized_pnl = sum(pos.get('unrealized_pnl', 0) for pos in positions)
+                positions = self._collect_positions_data()
+                self.current_parameters.total_positions = len(positions)
+                self.current_parameters.open_lot_size = sum(pos.get('volume', 0) for pos in positions)
+                self.current_parameters.unrealized_pnl = sum(pos.get('unrealized_pnl', 0) for pos in positions)
                 
                 # อัพเดท Market Conditions
                 if self.market_analyzer:
@@ -1260,12 +1252,64 @@ class RiskCalculator:
         except Exception as e:
             self.logger.error(f"❌ ข้อผิดพลาดในการอัพเดท Risk Parameters: {e}")
     
+    def _collect_positions_data(self) -> List[Dict[str, Any]]:
+        """แปลง positions ที่เปิดอยู่เป็น dict - จาก RealPositionTracker.positions หรือ snapshot bus"""
+        if self.position_tracker is not None:
+            return [{
+                'position_id': position.ticket,
+                'symbol': position.symbol,
+                'direction': position.position_type.value,
+                'volume': position.volume,
+                'open_price': position.open_price,
+                'current_price': position.current_price,
+                'unrealized_pnl': position.profit
+            } for position in list(self.position_tracker.positions.values())]
+        
+        from mt5_integration.snapshot_bus import get_snapshot_bus
+        mt5_positions = get_snapshot_bus().get_positions()
+        if mt5_positions is None:
+            return []
+        
+        return [{
+            'position_id': position.ticket,
+            'symbol': position.symbol,
+            'type': position.type,
+            'volume': position.volume,
+            'open_price': position.price_open,
+            'current_price': position.price_current,
+            'unrealized_pnl': position.profit
+        } for position in mt5_positions]
+    
+    def _get_symbol_volatility(self, symbols) -> Dict[str, float]:
+        """
+        Daily volatility ต่อ symbol จาก H1 closes ของ candle aggregator (bars ชุดเดียวกับ market analyzer)
+        σ ของ log returns × √24 - symbol ที่ bars ไม่พอจะไม่อยู่ใน dict (ใช้ค่า default ของ stress engine)
+        """
+        volatility = {}
+        try:
+            from mt5_integration.candle_aggregator import get_candle_aggregator
+        except ImportError as e:
+            self.logger.warning(f"⚠️ ไม่มีข้อมูลราคาสำหรับ volatility: {e}")
+            return volatility
+        
+        for symbol in symbols:
+            if not symbol:
+                continue
+            try:
+                closes = np.asarray(get_candle_aggregator(symbol).bar_store.closes(symbol, 'H1'), dtype=np.float64)
+            except Exception:
+                continue
+            closes = closes[closes > 0][-(VOLATILITY_LOOKBACK_BARS + 1):]
+            if len(closes) <= MIN_VOLATILITY_BARS:
+                continue
+            returns = np.diff(np.log(closes))
+            volatility[symbol] = float(returns.std(ddof=1) * math.sqrt(24))
+        return volatility
+    
     async def _get_positions_data(self) -> List[Dict[str, Any]]:
         """ดึงข้อมูล Positions"""
         try:
-            if self.position_tracker:
-                return self.position_tracker.get_all_positions()
-            return []
+            return self._collect_positions_data()
         except Exception as e:
             self.logger.error(f"❌ ข้อผิดพลาดในการดึงข้อมูล Positions: {e}")
             return []
@@ -2026,12 +2070,20 @@ def get_risk_limits() -> Dict[str, float]:
         })
     }
 
-async def stress_test_portfolio(stress_scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def stress_test_portfolio(stress_scenarios: List[Dict[str, Any]],
+                                paths_per_scenario: int = 10000,
+                                max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     ทำ Stress Test กับ Portfolio
     
+    จำลองราคาแบบ Monte Carlo ต่อ scenario แล้ว revalue ทุก position ที่เปิดอยู่
+    (ดู money_management/stress_engine.py) - scenarios ถูกกระจายไปยัง process pool
+    
     Args:
         stress_scenarios: รายการ Stress scenarios
+            (name, price_shock_percent, volatility_multiplier, correlation_increase, horizon_days)
+        paths_per_scenario: จำนวน paths ต่อ scenario
+        max_workers: จำนวน processes (None = จำนวน CPU)
         
     Returns:
         Dict: ผลการ Stress Test
@@ -2041,21 +2093,33 @@ async def stress_test_portfolio(stress_scenarios: List[Dict[str, Any]]) -> Dict[
         
         # ดึงข้อมูล Portfolio ปัจจุบัน
         current_summary = await risk_calculator.calculate_comprehensive_risk()
+        positions_data = await risk_calculator._get_positions_data()
+        account_data = await risk_calculator._get_account_data()
+        
+        symbol_volatility = risk_calculator._get_symbol_volatility(
+            {position.get('symbol') for position in positions_data}
+        )
+        exposure = build_portfolio_exposure(positions_data, account_data, symbol_volatility)
+        
+        # Monte Carlo (process pool) ใช้เวลานาน - ไม่ block event loop
+        loop = asyncio.get_running_loop()
+        simulations = await loop.run_in_executor(
+            None, run_stress_scenarios, exposure, stress_scenarios, paths_per_scenario, max_workers
+        )
+        equity = exposure.equity if exposure.equity > 0 else 1.0
         
         stress_results = []
         
-        for scenario in stress_scenarios:
-            scenario_name = scenario.get('name', 'Unknown Scenario')
+        for scenario, simulation in zip(stress_scenarios, simulations):
             price_shock = scenario.get('price_shock_percent', 0.0)  # % การเปลี่ยนแปลงราคา
-            volatility_multiplier = scenario.get('volatility_multiplier', 1.0)
             correlation_increase = scenario.get('correlation_increase', 0.0)
             
-            # จำลองผลกระทบ
-            stressed_var = current_summary.current_var_1d * (1 + price_shock / 100) * volatility_multiplier
+            # ผลกระทบจากการจำลอง
+            stressed_var = simulation.var_95
             stressed_correlation = min(1.0, current_summary.correlation_exposure + correlation_increase)
             
-            # คำนวณ Portfolio Value impact
-            portfolio_impact = abs(price_shock) * current_summary.position_concentration / 100
+            # Portfolio impact = ขาดทุนที่ percentile 95 เทียบกับ equity
+            portfolio_impact = max(0.0, simulation.var_95) / equity * 100
             
             # กำหนด Severity
             if portfolio_impact >= 20:
@@ -2068,14 +2132,25 @@ async def stress_test_portfolio(stress_scenarios: List[Dict[str, Any]]) -> Dict[
                 severity = "LOW"
             
             stress_results.append({
-                "scenario_name": scenario_name,
+                "scenario_name": simulation.scenario_name,
                 "price_shock_percent": price_shock,
                 "portfolio_impact_percent": portfolio_impact,
                 "stressed_var": stressed_var,
+                "stressed_var_99": simulation.var_99,
+                "stressed_cvar": simulation.cvar_95,
+                "expected_loss": simulation.expected_loss,
+                "worst_loss": simulation.worst_loss,
+                "loss_percentiles": simulation.loss_percentiles,
+                "loss_distribution": simulation.loss_histogram,
+                "loss_probability": simulation.loss_probability,
+                "margin_call_probability": simulation.margin_call_probability,
+                "stop_out_probability": simulation.stop_out_probability,
+                "position_tail_contributions": simulation.tail_contributions,
                 "stressed_correlation": stressed_correlation,
                 "severity": severity,
-                "survival_probability": max(0, 100 - portfolio_impact * 2),  # ประมาณการ
-                "recovery_time_estimate": abs(portfolio_impact) * 2  # วัน
+                "survival_probability": 100 - simulation.stop_out_probability,
+                "recovery_time_estimate": abs(portfolio_impact) * 2,  # วัน
+                "simulated_paths": simulation.paths
             })
         
         # หา Worst Case Scenario
@@ -2084,7 +2159,10 @@ async def stress_test_portfolio(stress_scenarios: List[Dict[str, Any]]) -> Dict[
         return {
             "current_portfolio_state": {
                 "overall_risk_score": current_summary.overall_risk_score,
-                "risk_level": current_summary.risk_level.value
+                "risk_level": current_summary.risk_level.value,
+                "positions": exposure.position_count,
+                "equity": exposure.equity,
+                "used_margin": exposure.used_margin
             },
             "stress_test_results": stress_results,
             "worst_case_scenario": worst_case,
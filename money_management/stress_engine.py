@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STRESS ENGINE - Parallel Monte Carlo Scenario Revaluation
+========================================================
+จำลองราคาหลายพัน paths ต่อ scenario แล้วประเมินมูลค่าทุก position ใหม่
+ภายใต้ price shock / volatility multiplier / correlation shift
+กระจาย scenarios ไปยัง process pool
+
+🎯 FEATURES:
+- Portfolio exposure แบบ arrays (symbol, ทิศทาง, lot, contract size, ราคา)
+- Correlated price paths ด้วย Cholesky ของ correlation matrix ที่ถูก shift
+- Revalue ทุก position ต่อ path (vectorized)
+- Loss distribution, VaR / CVaR, tail contribution ต่อ position
+- Margin-call และ stop-out probabilities
+
+เชื่อมต่อไปยัง:
+- money_management/risk_calculator.py (stress_test_portfolio)
+"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+DEFAULT_CONTRACT_SIZE = 100.0        # XAUUSD: 1 lot = 100 oz
+DEFAULT_DAILY_VOLATILITY = 0.012     # 1.2% ต่อวัน
+DEFAULT_BASE_CORRELATION = 0.3       # correlation ระหว่าง symbols
+DEFAULT_LEVERAGE = 100.0
+MARGIN_CALL_LEVEL = 100.0            # margin level %
+STOP_OUT_LEVEL = 50.0                # margin level %
+LOSS_PERCENTILES = (50, 90, 95, 99)
+
+# ทิศทาง position -> sign ของ notional (รองรับ string และ MT5 POSITION_TYPE_BUY=0 / POSITION_TYPE_SELL=1)
+DIRECTION_SIGNS = {'BUY': 1.0, 'SELL': -1.0, 0: 1.0, 1: -1.0}
+
+@dataclass
+class PortfolioExposure:
+    """Exposure ของ portfolio ในรูป arrays (หนึ่ง element ต่อ position)"""
+    position_ids: List[str]
+    symbols: List[str]                  # symbols ที่ไม่ซ้ำ
+    symbol_index: np.ndarray            # index ของ symbol ของแต่ละ position
+    notional: np.ndarray                # ทิศทาง × lot × contract size × ราคาปัจจุบัน
+    volatility: np.ndarray              # daily volatility ต่อ symbol
+    equity: float = 10000.0
+    used_margin: float = 0.0
+
+    @property
+    def position_count(self) -> int:
+        return len(self.position_ids)
+
+@dataclass
+class StressScenario:
+    """Stress scenario หนึ่งรายการ"""
+    name: str
+    price_shock_percent: float = 0.0
+    volatility_multiplier: float = 1.0
+    correlation_increase: float = 0.0
+    horizon_days: float = 1.0
+
+    @classmethod
+    def from_dict(cls, scenario: Dict[str, Any]) -> 'StressScenario':
+        return cls(
+            name=scenario.get('name', 'Unknown Scenario'),
+            price_shock_percent=scenario.get('price_shock_percent', 0.0),
+            volatility_multiplier=scenario.get('volatility_multiplier', 1.0),
+            correlation_increase=scenario.get('correlation_increase', 0.0),
+            horizon_days=scenario.get('horizon_days', 1.0)
+        )
+
+@dataclass
+class ScenarioResult:
+    """ผลการจำลองของ scenario"""
+    scenario_name: str
+    paths: int
+    expected_pnl: float
+    expected_loss: float
+    loss_percentiles: Dict[int, float]
+    var_95: float
+    var_99: float
+    cvar_95: float
+    worst_loss: float
+    loss_probability: float             # % ของ paths ที่ขาดทุน
+    margin_call_probability: float      # % ของ paths ที่ margin level < MARGIN_CALL_LEVEL
+    stop_out_probability: float         # % ของ paths ที่ margin level < STOP_OUT_LEVEL
+    loss_histogram: Dict[str, List[float]] = field(default_factory=dict)
+    tail_contributions: Dict[str, float] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+def direction_sign(position: Dict[str, Any]) -> Optional[float]:
+    """sign ของทิศทาง position (+1 BUY / -1 SELL) - None ถ้าไม่รู้จัก type"""
+    direction = position.get('direction', position.get('type'))
+    direction = getattr(direction, 'value', direction)
+    if isinstance(direction, str):
+        direction = direction.strip().upper()
+    try:
+        return DIRECTION_SIGNS.get(direction)
+    except TypeError:
+        return None
+
+def build_portfolio_exposure(positions_data: List[Dict[str, Any]], account_data: Dict[str, Any],
+                             symbol_volatility: Optional[Dict[str, float]] = None) -> PortfolioExposure:
+    """
+    แปลง positions (dict) เป็น PortfolioExposure
+
+    ใช้ key: position_id, symbol, direction/type, volume, current_price (หรือ open_price), contract_size
+    direction/type: 'BUY' / 'SELL' หรือ MT5 POSITION_TYPE_* (0 / 1) - type อื่นจะถูกข้าม
+    """
+    symbol_volatility = symbol_volatility or {}
+    symbols: List[str] = []
+    symbol_lookup: Dict[str, int] = {}
+    position_ids, indices, notional = [], [], []
+
+    for position in positions_data:
+        sign = direction_sign(position)
+        if sign is None:
+            continue
+
+        symbol = position.get('symbol', 'UNKNOWN')
+        if symbol not in symbol_lookup:
+            symbol_lookup[symbol] = len(symbols)
+            symbols.append(symbol)
+
+        price = position.get('current_price') or position.get('open_price') or 0.0
+        contract_size = position.get('contract_size', DEFAULT_CONTRACT_SIZE)
+
+        position_ids.append(str(position.get('position_id', position.get('ticket', len(position_ids)))))
+        indices.append(symbol_lookup[symbol])
+        notional.append(sign * position.get('volume', 0.0) * contract_size * price)
+
+    notional_array = np.asarray(notional, dtype=np.float64)
+    used_margin = float(account_data.get('used_margin', 0.0) or 0.0)
+    if used_margin <= 0 and len(notional_array):
+        used_margin = float(np.abs(notional_array).sum()) / DEFAULT_LEVERAGE
+
+    return PortfolioExposure(
+        position_ids=position_ids,
+        symbols=symbols,
+        symbol_index=np.asarray(indices, dtype=np.int64),
+        notional=notional_array,
+        volatility=np.asarray([symbol_volatility.get(symbol, DEFAULT_DAILY_VOLATILITY) for symbol in symbols],
+                              dtype=np.float64),
+        equity=float(account_data.get('equity', 10000.0)),
+        used_margin=used_margin
+    )
+
+def _stressed_cholesky(symbol_count: int, base_correlation: float, correlation_increase: float) -> np.ndarray:
+    """Cholesky factor ของ correlation matrix หลัง shift (ปรับให้เป็น positive definite)"""
+    correlation = min(0.99, max(-0.99, base_correlation + correlation_increase))
+    matrix = np.full((symbol_count, symbol_count), correlation)
+    np.fill_diagonal(matrix, 1.0)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    if eigenvalues.min() <= 1e-10:
+        eigenvalues = np.clip(eigenvalues, 1e-10, None)
+        matrix = (eigenvectors * eigenvalues) @ eigenvectors.T
+        scale = np.sqrt(np.diag(matrix))
+        matrix = matrix / np.outer(scale, scale)
+
+    return np.linalg.cholesky(matrix)
+
+def simulate_scenario(exposure: PortfolioExposure, scenario: StressScenario, paths: int = 10000,
+                      seed: Optional[int] = None,
+                      base_correlation: float = DEFAULT_BASE_CORRELATION) -> ScenarioResult:
+    """
+    จำลอง scenario เดียว - revalue ทุก position บนทุก path
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    symbol_count = len(exposure.symbols)
+
+    if exposure.position_count == 0 or symbol_count == 0:
+        position_pnl = np.zeros((paths, 0))
+    else:
+        # Correlated returns ต่อ symbol: shock + vol × multiplier × √horizon × Z·Lᵀ
+        cholesky = _stressed_cholesky(symbol_count, base_correlation, scenario.correlation_increase)
+        shocks = rng.standard_normal((paths, symbol_count)) @ cholesky.T
+        sigma = exposure.volatility * scenario.volatility_multiplier * np.sqrt(scenario.horizon_days)
+        symbol_returns = scenario.price_shock_percent / 100 + shocks * sigma
+
+        # Revalue: P&L ของแต่ละ position = notional × return ของ symbol
+        position_pnl = symbol_returns[:, exposure.symbol_index] * exposure.notional
+
+    portfolio_pnl = position_pnl.sum(axis=1)
+    losses = -portfolio_pnl
+
+    loss_percentiles = {p: float(v) for p, v in zip(LOSS_PERCENTILES, np.percentile(losses, LOSS_PERCENTILES))}
+    var_95, var_99 = loss_percentiles[95], loss_percentiles[99]
+    tail = losses >= var_95
+    cvar_95 = float(losses[tail].mean()) if tail.any() else var_95
+
+    # Margin level ของแต่ละ path
+    stressed_equity = exposure.equity + portfolio_pnl
+    if exposure.used_margin > 0:
+        margin_level = stressed_equity / exposure.used_margin * 100
+        margin_call = float((margin_level < MARGIN_CALL_LEVEL).mean() * 100)
+        stop_out = float((margin_level < STOP_OUT_LEVEL).mean() * 100)
+    else:
+        margin_call = stop_out = float((stressed_equity <= 0).mean() * 100)
+
+    # ส่วนของแต่ละ position ใน tail loss (CVaR contribution)
+    tail_contributions = {}
+    if exposure.position_count and tail.any():
+        contributions = -position_pnl[tail].mean(axis=0)
+        tail_contributions = {pid: float(value) for pid, value in zip(exposure.position_ids, contributions)}
+
+    counts, edges = np.histogram(losses, bins=20)
+
+    return ScenarioResult(
+        scenario_name=scenario.name,
+        paths=paths,
+        expected_pnl=float(portfolio_pnl.mean()),
+        expected_loss=float(max(0.0, losses.mean())),
+        loss_percentiles=loss_percentiles,
+        var_95=var_95,
+        var_99=var_99,
+        cvar_95=cvar_95,
+        worst_loss=float(losses.max()),
+        loss_probability=float((losses > 0).mean() * 100),
+        margin_call_probability=margin_call,
+        stop_out_probability=stop_out,
+        loss_histogram={'counts': counts.tolist(), 'edges': edges.tolist()},
+        tail_contributions=tail_contributions,
+        elapsed_ms=(time.perf_counter() - started) * 1000
+    )
+
+def _simulate_scenario_batch(exposure: PortfolioExposure, batch: List[Any], paths: int,
+                             base_correlation: float) -> List[Any]:
+    """Worker ของ process pool - จำลองหลาย scenarios ใน process เดียว คืน (index, result)"""
+    return [(index, simulate_scenario(exposure, scenario, paths, seed, base_correlation))
+            for index, seed, scenario in batch]
+
+def run_stress_scenarios(exposure: PortfolioExposure, scenarios: List[Any], paths: int = 10000,
+                         max_workers: Optional[int] = None, seed: int = 42,
+                         base_correlation: float = DEFAULT_BASE_CORRELATION,
+                         parallel: Optional[bool] = None) -> List[ScenarioResult]:
+    """
+    จำลองทุก scenario (กระจายไปยัง process pool)
+
+    Args:
+        exposure: exposure ของ portfolio
+        scenarios: StressScenario หรือ dict
+        paths: จำนวน paths ต่อ scenario
+        max_workers: จำนวน processes (None = จำนวน CPU)
+        seed: seed เริ่มต้น (scenario ที่ i ใช้ seed + i - ผลลัพธ์ซ้ำได้ไม่ขึ้นกับจำนวน workers)
+        parallel: None = เลือกอัตโนมัติตามขนาดงาน
+
+    Returns:
+        List[ScenarioResult]: ตามลำดับของ scenarios
+    """
+    scenarios = [s if isinstance(s, StressScenario) else StressScenario.from_dict(s) for s in scenarios]
+    tasks = [(index, seed + index, scenario) for index, scenario in enumerate(scenarios)]
+
+    workers = max_workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if parallel is None:
+        # งานเล็ก - ค่า start process แพงกว่าการคำนวณ
+        work = len(tasks) * paths * max(exposure.position_count, 1)
+        parallel = workers > 1 and work >= 5_000_000
+
+    if parallel and workers > 1:
+        try:
+            batches = [tasks[offset::workers] for offset in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_simulate_scenario_batch, exposure, batch, paths, base_correlation)
+                           for batch in batches]
+                indexed = [item for future in futures for item in future.result()]
+            return [result for _, result in sorted(indexed, key=lambda item: item[0])]
+        except Exception as e:
+            print(f"⚠️ Process pool ใช้งานไม่ได้ - จำลองแบบ serial: {e}")
+
+    return [result for _, result in _simulate_scenario_batch(exposure, tasks, paths, base_correlation)]
+
+def create_sample_stress_scenarios(count: int = 50) -> List[StressScenario]:
+    """สร้าง scenarios ตัวอย่าง (shock -10%..+10%, vol 1-4x, correlation +0..0.6)"""
+    return [
+        StressScenario(
+            name=f"SCENARIO_{index:03d}",
+            price_shock_percent=-10.0 + 20.0 * index / max(count - 1, 1),
+            volatility_multiplier=1.0 + 3.0 * (index % 10) / 9,
+            correlation_increase=0.6 * (index % 4) / 3
+        )
+        for index in range(count)
+    ]
+
+def benchmark_stress_engine(scenarios: int = 50, paths: int = 10000, positions: int = 40,
+                            max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    วัดเวลา stress test (scenarios × paths) บน portfolio จำลอง
+    """
+    print("⚡ ทดสอบประสิทธิภาพ Stress Engine...")
+
+    rng = np.random.default_rng(7)
+    symbols = ["XAUUSD", "XAGUSD", "EURUSD", "USDJPY"]
+    positions_data = [
+        {
+            'position_id': f"POS_{index:03d}",
+            'symbol': symbols[index % len(symbols)],
+            'direction': "BUY" if rng.random() > 0.4 else "SELL",
+            'volume': round(float(rng.uniform(0.01, 0.5)), 2),
+            'current_price': 2000.0 if index % len(symbols) == 0 else 25.0,
+            'contract_size': 100.0 if index % len(symbols) < 2 else 100000.0
+        }
+        for index in range(positions)
+    ]
+    exposure = build_portfolio_exposure(positions_data, {'equity': 50000.0, 'used_margin': 0.0})
+    scenario_list = create_sample_stress_scenarios(scenarios)
+
+    results = {}
+    for mode, parallel in (("serial", False), ("parallel", True)):
+        started = time.perf_counter()
+        scenario_results = run_stress_scenarios(exposure, scenario_list, paths, max_workers, parallel=parallel)
+        results[f"{mode}_seconds"] = time.perf_counter() - started
+        results[f"{mode}_results"] = scenario_results
+
+    identical = all(
+        a.var_99 == b.var_99 and a.margin_call_probability == b.margin_call_probability
+        for a, b in zip(results['serial_results'], results['parallel_results'])
+    )
+
+    print(f"📊 {scenarios} scenarios × {paths:,} paths × {positions} positions: "
+          f"serial {results['serial_seconds']:.2f}s | parallel {results['parallel_seconds']:.2f}s "
+          f"| ผลลัพธ์ตรงกัน: {'✅' if identical else '❌'}")
+
+    return {
+        'scenarios': scenarios,
+        'paths': paths,
+        'positions': positions,
+        'serial_seconds': results['serial_seconds'],
+        'parallel_seconds': results['parallel_seconds'],
+        'identical': identical
+    }
+
+if __name__ == "__main__":
+    benchmark_stress_engine()
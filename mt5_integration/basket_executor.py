@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BASKET EXECUTOR - Concurrent Multi-Leg Order Execution
+=====================================================
+ส่ง orders / คำสั่งปิดหลายขาพร้อมกันเป็น basket เดียว
+ดึง symbol info และ tick ครั้งเดียวต่อ symbol แล้วส่งทุกขาแบบขนาน
+(เวลารวม ≈ round trip เดียว แทนผลรวมของทุกขา)
+
+🎯 FEATURES:
+- BasketLeg: intent ของแต่ละขา (MARKET / PENDING / CLOSE)
+- Resolve price context ครั้งเดียวต่อ symbol
+- Fan-out ผ่าน thread pool ร่วม - ขาที่อ้าง position ticket เดียวกันส่งตามลำดับ
+- ขาที่อ้าง position ส่งผ่าน lane ของ executor ได้ (ลำดับเดียวกับ close_position)
+- BasketResult: สถานะต่อขา + เวลารวมของ basket
+
+เชื่อมต่อไปยัง:
+- mt5_integration/order_executor.py (RealOrderExecutor.execute_basket)
+- intelligent_recovery/recovery_engine.py (grid / martingale / emergency close)
+- position_management/position_tracker.py (emergency_close_all)
+"""
+
+import MetaTrader5 as mt5
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mt5_integration.symbol_cache import get_symbol_cache
+
+DEFAULT_BASKET_WORKERS = 32
+DEFAULT_DEVIATION = 3
+
+def position_ordering_key(ticket: int) -> str:
+    """ordering key ของ orders ที่อ้าง position ticket (ใช้ร่วมกับ OrderRequest.ordering_key)"""
+    return f"ticket:{ticket}"
+
+class BasketLegKind(Enum):
+    """ประเภทของขาใน basket"""
+    MARKET = "MARKET"          # เปิด position ที่ราคาตลาด
+    PENDING = "PENDING"        # วาง limit order ที่ราคาที่กำหนด
+    CLOSE = "CLOSE"            # ปิด position เดิม (position_ticket)
+
+@dataclass
+class BasketLeg:
+    """intent ของหนึ่งขา - is_buy คือทิศทางของ order ที่ส่ง (CLOSE ของ BUY position คือ is_buy=False)"""
+    kind: BasketLegKind
+    symbol: str
+    volume: float
+    is_buy: bool
+    price: Optional[float] = None              # PENDING เท่านั้น
+    position_ticket: Optional[int] = None      # CLOSE เท่านั้น
+    magic_number: int = 0
+    comment: str = ""
+    deviation: int = DEFAULT_DEVIATION
+    type_filling: Optional[int] = None         # None = ORDER_FILLING_IOC (MARKET / CLOSE)
+    leg_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+
+@dataclass
+class BasketLegResult:
+    """ผลของหนึ่งขา"""
+    leg: BasketLeg
+    success: bool
+    ticket: Optional[int] = None
+    price: float = 0.0
+    volume: float = 0.0
+    requested_price: float = 0.0
+    retcode: Optional[int] = None
+    error_message: str = ""
+    elapsed_ms: float = 0.0
+
+    @property
+    def slippage(self) -> float:
+        return abs(self.price - self.requested_price) if self.success and self.requested_price else 0.0
+
+@dataclass
+class BasketResult:
+    """ผลรวมของ basket - legs เรียงตามลำดับที่ส่งเข้ามา"""
+    basket_id: str
+    legs: List[BasketLegResult] = field(default_factory=list)
+    resolve_ms: float = 0.0                    # เวลาดึง symbol / tick context
+    elapsed_ms: float = 0.0                    # เวลารวมทั้ง basket
+
+    @property
+    def successful_count(self) -> int:
+        return sum(1 for leg in self.legs if leg.success)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.legs) - self.successful_count
+
+    @property
+    def success(self) -> bool:
+        return bool(self.legs) and self.failed_count == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'basket_id': self.basket_id,
+            'success': self.success,
+            'legs': len(self.legs),
+            'successful': self.successful_count,
+            'failed': self.failed_count,
+            'resolve_ms': self.resolve_ms,
+            'elapsed_ms': self.elapsed_ms,
+            'leg_results': [{
+                'leg_id': result.leg.leg_id,
+                'kind': result.leg.kind.value,
+                'position_ticket': result.leg.position_ticket,
+                'success': result.success,
+                'ticket': result.ticket,
+                'price': result.price,
+                'volume': result.volume,
+                'retcode': result.retcode,
+                'error': result.error_message,
+                'elapsed_ms': result.elapsed_ms
+            } for result in self.legs]
+        }
+
+_basket_pool: Optional[ThreadPoolExecutor] = None
+_basket_pool_lock = threading.Lock()
+
+def _get_basket_pool() -> ThreadPoolExecutor:
+    """Thread pool ร่วมสำหรับ fan-out (สร้างครั้งแรกที่ใช้)"""
+    global _basket_pool
+    with _basket_pool_lock:
+        if _basket_pool is None:
+            _basket_pool = ThreadPoolExecutor(max_workers=DEFAULT_BASKET_WORKERS,
+                                              thread_name_prefix="BasketLeg")
+        return _basket_pool
+
+def resolve_price_context(legs: List[BasketLeg]) -> Dict[str, Tuple[Any, Any]]:
+    """(symbol metadata, tick) ครั้งเดียวต่อ symbol ใน basket - metadata มาจาก symbol cache"""
+    symbol_cache = get_symbol_cache()
+    context = {}
+    for leg in legs:
+        if leg.symbol not in context:
+            context[leg.symbol] = (symbol_cache.get(leg.symbol), mt5.symbol_info_tick(leg.symbol))
+    return context
+
+def build_leg_request(leg: BasketLeg, symbol_info: Any, tick: Any) -> Tuple[Optional[Dict[str, Any]], str]:
+    """สร้าง MT5 request ของขา - คืน (request, error) โดย request เป็น None ถ้าขาไม่ผ่าน validation"""
+    if tick is None:
+        return None, f"No tick for {leg.symbol}"
+
+    if symbol_info is not None:
+        if leg.volume < symbol_info.volume_min or leg.volume > symbol_info.volume_max:
+            return None, f"Invalid volume {leg.volume}"
+
+    if leg.kind == BasketLegKind.PENDING:
+        if not leg.price:
+            return None, "Pending leg without price"
+        return {
+            "action": mt5.TRADE_ACTION_PENDING,
+            "symbol": leg.symbol,
+            "volume": leg.volume,
+            "type": mt5.ORDER_TYPE_BUY_LIMIT if leg.is_buy else mt5.ORDER_TYPE_SELL_LIMIT,
+            "price": leg.price,
+            "deviation": leg.deviation,
+            "magic": leg.magic_number,
+            "comment": leg.comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+        }, ""
+
+    if leg.kind == BasketLegKind.CLOSE and not leg.position_ticket:
+        return None, "Close leg without position ticket"
+
+    request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": leg.symbol,
+        "volume": leg.volume,
+        "type": mt5.ORDER_TYPE_BUY if leg.is_buy else mt5.ORDER_TYPE_SELL,
+        "price": tick.ask if leg.is_buy else tick.bid,
+        "deviation": leg.deviation,
+        "magic": leg.magic_number,
+        "comment": leg.comment,
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": leg.type_filling if leg.type_filling is not None else mt5.ORDER_FILLING_IOC,
+    }
+    if leg.kind == BasketLegKind.CLOSE:
+        request["position"] = leg.position_ticket
+    return request, ""
+
+def _send_leg(leg: BasketLeg, request: Dict[str, Any]) -> BasketLegResult:
+    """ส่งหนึ่งขาไปยัง MT5"""
+    started = time.perf_counter()
+    try:
+        result = mt5.order_send(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if result is None:
+            return BasketLegResult(leg=leg, success=False, requested_price=request["price"],
+                                   error_message="No result from MT5", elapsed_ms=elapsed_ms)
+
+        if result.retcode == mt5.TRADE_RETCODE_DONE:
+            return BasketLegResult(leg=leg, success=True, ticket=result.order,
+                                   price=result.price or request["price"],
+                                   volume=result.volume or leg.volume,
+                                   requested_price=request["price"], retcode=result.retcode,
+                                   elapsed_ms=elapsed_ms)
+
+        return BasketLegResult(leg=leg, success=False, requested_price=request["price"],
+                               retcode=result.retcode, error_message=result.comment,
+                               elapsed_ms=elapsed_ms)
+
+    except Exception as e:
+        return BasketLegResult(leg=leg, success=False, requested_price=request.get("price", 0.0),
+                               error_message=f"Execution error: {e}",
+                               elapsed_ms=(time.perf_counter() - started) * 1000)
+
+def _send_chain(chain: List[Tuple[int, BasketLeg, Dict[str, Any]]]) -> List[Tuple[int, BasketLegResult]]:
+    """ส่งขาที่อ้าง position เดียวกันตามลำดับ"""
+    return [(index, _send_leg(leg, request)) for index, leg, request in chain]
+
+def execute_basket(legs: List[BasketLeg],
+                   on_leg_result: Optional[Callable[[BasketLegResult], None]] = None,
+                   lane_submit: Optional[Callable[[str, Callable[[], Any]], Future]] = None) -> BasketResult:
+    """
+    Execute basket - ดึง context ครั้งเดียว แล้วส่งทุกขาพร้อมกัน
+
+    Args:
+        legs: ขาทั้งหมดของ basket
+        on_leg_result: callback ต่อขา (เช่นบันทึกสถิติของ executor)
+        lane_submit: ส่ง chain ที่อ้าง position ticket เข้า lane ตาม ordering key
+            (RealOrderExecutor.submit_to_lane) - None = ใช้ thread pool ของ basket
+    """
+    started = time.perf_counter()
+    basket = BasketResult(basket_id=uuid.uuid4().hex[:12])
+    if not legs:
+        return basket
+
+    results: List[Optional[BasketLegResult]] = [None] * len(legs)
+
+    try:
+        context = resolve_price_context(legs)
+    except Exception as e:
+        print(f"❌ Basket context error: {e}")
+        context = {}
+    basket.resolve_ms = (time.perf_counter() - started) * 1000
+
+    # จัดกลุ่มขาที่อ้าง position ticket เดียวกันเป็น chain เดียว
+    chains: Dict[Any, List[Tuple[int, BasketLeg, Dict[str, Any]]]] = {}
+    for index, leg in enumerate(legs):
+        symbol_info, tick = context.get(leg.symbol, (None, None))
+        request, error = build_leg_request(leg, symbol_info, tick)
+        if request is None:
+            results[index] = BasketLegResult(leg=leg, success=False, error_message=error)
+            continue
+        key = ('ticket', leg.position_ticket) if leg.position_ticket else ('leg', index)
+        chains.setdefault(key, []).append((index, leg, request))
+
+    futures = []
+    for key, chain in chains.items():
+        if lane_submit is not None and key[0] == 'ticket':
+            futures.append(lane_submit(position_ordering_key(key[1]), lambda chain=chain: _send_chain(chain)))
+        elif len(chains) == 1:
+            inline: Future = Future()
+            inline.set_result(_send_chain(chain))
+            futures.append(inline)
+        else:
+            futures.append(_get_basket_pool().submit(_send_chain, chain))
+    completed = [future.result() for future in futures]
+
+    for chain_results in completed:
+        for index, leg_result in chain_results:
+            results[index] = leg_result
+
+    basket.legs = results
+    basket.elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if on_leg_result:
+        for leg_result in basket.legs:
+            try:
+                on_leg_result(leg_result)
+            except Exception as e:
+                print(f"⚠️ Basket leg callback error: {e}")
+
+    return basket
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CANDLE AGGREGATOR - Incremental M1 Fetch with Multi-Timeframe Aggregation
+========================================================================
+ดึงเฉพาะ M1 bars แบบ incremental (ต่อจาก bar ล่าสุดที่มี) แล้วสร้าง
+M5 / M15 / H1 / H4 / D1 ขึ้นเองในเครื่อง - เรียก terminal ครั้งเดียวต่อรอบ
+แทนการเรียก copy_rates_from_pos แยกทุก timeframe
+
+🎯 FEATURES:
+- Seed ประวัติของแต่ละ timeframe ครั้งเดียวตอนเริ่มต้น
+- Incremental M1 fetch ต่อรอบ (ข้าม bars ที่มีอยู่แล้ว)
+- Publish candle เฉพาะเมื่อ candle ของ timeframe นั้นปิด
+- เขียน bar ที่กำลังก่อตัวลง BarStore ให้ indicators อ่านได้ทันที
+
+เชื่อมต่อไปยัง:
+- market_intelligence/bar_store.py (ที่เก็บ bars)
+- market_intelligence/market_analyzer.py (RealTimeMarketAnalyzer)
+- mt5_integration/market_data_stream.py (candle subscriptions)
+"""
+
+import MetaTrader5 as mt5
+import threading
+import time
+from typing import Dict, List, Optional, Callable, Any
+
+from market_intelligence.bar_store import BarStore
+
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'H1': 3600,
+    'H4': 14400,
+    'D1': 86400
+}
+
+DEFAULT_CAPACITIES = {
+    'M1': 1000,
+    'M5': 500,
+    'M15': 200,
+    'H1': 100,
+    'H4': 100,
+    'D1': 100
+}
+
+class CandleAggregator:
+    """
+    Candle Aggregator - สร้าง candles หลาย timeframe จาก M1 ของ symbol เดียว
+    """
+
+    def __init__(self, symbol: str, capacities: Optional[Dict[str, int]] = None,
+                 min_update_interval: float = 0.5):
+        self.symbol = symbol
+        self.capacities = dict(capacities or DEFAULT_CAPACITIES)
+        self.capacities.setdefault('M1', DEFAULT_CAPACITIES['M1'])
+        self.higher_timeframes = [tf for tf in self.capacities if tf != 'M1']
+        self.min_update_interval = min_update_interval
+
+        # Bar storage (key = (symbol, timeframe name))
+        self.bar_store = BarStore()
+        for tf, capacity in self.capacities.items():
+            self.bar_store.register(symbol, tf, capacity)
+
+        # Aggregation state
+        self._current_m1: Optional[Dict[str, Any]] = None        # M1 ที่กำลังก่อตัว
+        self._forming: Dict[str, Optional[Dict[str, Any]]] = {}  # รวมจาก M1 ที่ปิดแล้ว
+        self._last_closed_time: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        # Subscribers: callback(symbol, timeframe, bar)
+        self._callbacks: List[Callable[[str, str, Dict[str, Any]], None]] = []
+
+        # สถิติ
+        self.seeded = False
+        self.last_update_time = 0.0
+        self.terminal_calls = 0
+        self.m1_bars_processed = 0
+        self.candles_published = 0
+
+    def subscribe(self, callback: Callable[[str, str, Dict[str, Any]], None]):
+        """สมัครรับ candle ที่ปิดแล้ว"""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, str, Dict[str, Any]], None]):
+        """ยกเลิกการรับ candle"""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    # ===== TERMINAL I/O =====
+
+    def seed(self):
+        """โหลดประวัติเริ่มต้น - higher timeframes ครั้งเดียว + M1 ที่ครอบคลุม bucket ปัจจุบัน"""
+        with self._lock:
+            for tf in self.higher_timeframes:
+                # start_pos=1 - เฉพาะ bars ที่ปิดแล้ว
+                rates = mt5.copy_rates_from_pos(self.symbol, self._mt5_timeframe(tf), 1, self.capacities[tf])
+                self.terminal_calls += 1
+                if rates is not None and len(rates) > 0:
+                    self.bar_store.append_rates(self.symbol, tf, rates)
+                    self._last_closed_time[tf] = int(rates[-1]['time'])
+
+            # M1 ต้องครอบคลุม bucket ที่กำลังก่อตัวของ timeframe ที่ใหญ่ที่สุด
+            largest = max((TIMEFRAME_SECONDS[tf] for tf in self.higher_timeframes), default=60)
+            m1_count = max(self.capacities['M1'], largest // 60 + 1)
+            rates = mt5.copy_rates_from_pos(self.symbol, mt5.TIMEFRAME_M1, 0, m1_count)
+            self.terminal_calls += 1
+            self.seeded = True
+            self.last_update_time = time.time()
+
+            if rates is not None and len(rates) > 0:
+                self.process_m1_bars(rates, publish=False)
+
+    def update(self, force: bool = False) -> int:
+        """ดึง M1 bars ใหม่ (incremental) - คืนจำนวน candles ที่ปิดในรอบนี้"""
+        with self._lock:
+            now = time.time()
+            if not self.seeded:
+                self.seed()
+                return 0
+
+            elapsed = now - self.last_update_time
+            if not force and elapsed < self.min_update_interval:
+                return 0
+
+            # ดึงเฉพาะจำนวน M1 ที่อาจเกิดขึ้นตั้งแต่รอบก่อน
+            bar_count = min(int(elapsed // 60) + 2, self.capacities['M1'])
+            rates = mt5.copy_rates_from_pos(self.symbol, mt5.TIMEFRAME_M1, 0, bar_count)
+            self.terminal_calls += 1
+            self.last_update_time = now
+
+            if rates is None or len(rates) == 0:
+                return 0
+
+            if self._current_m1 is not None:
+                rates = rates[rates['time'] >= self._current_m1['time']]
+
+            return self.process_m1_bars(rates)
+
+    def _mt5_timeframe(self, timeframe: str) -> int:
+        """แปลงชื่อ timeframe เป็นค่าคงที่ของ MT5"""
+        return getattr(mt5, f"TIMEFRAME_{timeframe}")
+
+    # ===== AGGREGATION =====
+
+    def process_m1_bars(self, rates, publish: bool = True) -> int:
+        """
+        ประมวลผล M1 bars (เรียงเวลาเก่า→ใหม่) - คืนจำนวน candles ที่ปิด
+        """
+        with self._lock:
+            closed = []
+            names = rates.dtype.names if hasattr(rates, 'dtype') else ()
+
+            for row in rates:
+                bar = {
+                    'time': int(row['time']),
+                    'open': float(row['open']),
+                    'high': float(row['high']),
+                    'low': float(row['low']),
+                    'close': float(row['close']),
+                    'tick_volume': int(row['tick_volume']),
+                    'real_volume': int(row['real_volume']) if 'real_volume' in names else 0,
+                    'spread': float(row['spread']) if 'spread' in names else 0.0
+                }
+                current = self._current_m1
+
+                if current is None or bar['time'] > current['time']:
+                    if current is not None:
+                        closed.extend(self._on_m1_closed(current))
+                    closed.extend(self._close_expired(bar['time']))
+                    self._current_m1 = bar
+                elif bar['time'] == current['time']:
+                    self._current_m1 = bar
+
+                self.m1_bars_processed += 1
+
+            self._write_live_bars()
+
+            if publish:
+                for timeframe, candle in closed:
+                    self._publish(timeframe, candle)
+
+            return len(closed)
+
+    def _on_m1_closed(self, bar: Dict[str, Any]) -> List:
+        """M1 bar ปิด - เก็บและรวมเข้า bucket ของ higher timeframes"""
+        closed = [('M1', bar)]
+        self.bar_store.get_buffer(self.symbol, 'M1').append_bar(bar)
+
+        for tf in self.higher_timeframes:
+            seconds = TIMEFRAME_SECONDS[tf]
+            bucket = bar['time'] - bar['time'] % seconds
+            if bucket <= self._last_closed_time.get(tf, -1):
+                continue  # อยู่ใน bar ที่ seed มาแล้ว
+
+            forming = self._forming.get(tf)
+            if forming is not None and forming['time'] != bucket:
+                closed.append(self._close_timeframe(tf))
+                forming = None
+
+            self._forming[tf] = self._merge(forming, bar, bucket)
+
+        return closed
+
+    def _close_expired(self, bar_time: int) -> List:
+        """ปิด candles ของ timeframe ที่ bucket สิ้นสุดก่อน bar_time"""
+        closed = []
+        for tf in self.higher_timeframes:
+            forming = self._forming.get(tf)
+            if forming is not None and bar_time >= forming['time'] + TIMEFRAME_SECONDS[tf]:
+                closed.append(self._close_timeframe(tf))
+        return closed
+
+    def _close_timeframe(self, timeframe: str):
+        """ปิด candle ที่กำลังก่อตัวของ timeframe"""
+        candle = self._forming[timeframe]
+        self._forming[timeframe] = None
+        self._last_closed_time[timeframe] = candle['time']
+        self.bar_store.get_buffer(self.symbol, timeframe).append_bar(candle)
+        return (timeframe, candle)
+
+    def _merge(self, aggregate: Optional[Dict[str, Any]], bar: Dict[str, Any], bucket: int) -> Dict[str, Any]:
+        """รวม M1 bar เข้ากับ candle ของ bucket"""
+        if aggregate is None:
+            merged = dict(bar)
+            merged['time'] = bucket
+            return merged
+
+        return {
+            'time': aggregate['time'],
+            'open': aggregate['open'],
+            'high': max(aggregate['high'], bar['high']),
+            'low': min(aggregate['low'], bar['low']),
+            'close': bar['close'],
+            'tick_volume': aggregate['tick_volume'] + bar['tick_volume'],
+            'real_volume': aggregate['real_volume'] + bar['real_volume'],
+            'spread': bar['spread']
+        }
+
+    def _write_live_bars(self):
+        """เขียน candle ที่กำลังก่อตัว (รวม M1 ปัจจุบัน) ลง bar store"""
+        current = self._current_m1
+        if current is None:
+            return
+
+        self.bar_store.get_buffer(self.symbol, 'M1').append_bar(current)
+
+        for tf in self.higher_timeframes:
+            seconds = TIMEFRAME_SECONDS[tf]
+            bucket = current['time'] - current['time'] % seconds
+            if bucket <= self._last_closed_time.get(tf, -1):
+                continue
+
+            forming = self._forming.get(tf)
+            if forming is not None and forming['time'] != bucket:
+                continue
+            self.bar_store.get_buffer(self.symbol, tf).append_bar(self._merge(forming, current, bucket))
+
+    def _publish(self, timeframe: str, candle: Dict[str, Any]):
+        """ส่ง candle ที่ปิดแล้วให้ subscribers"""
+        self.candles_published += 1
+        for callback in list(self._callbacks):
+            try:
+                callback(self.symbol, timeframe, candle)
+            except Exception as e:
+                print(f"⚠️ Candle callback error: {e}")
+
+    def get_aggregator_stats(self) -> Dict[str, Any]:
+        """สถิติของ Candle Aggregator"""
+        return {
+            'symbol': self.symbol,
+            'seeded': self.seeded,
+            'timeframes': list(self.capacities),
+            'terminal_calls': self.terminal_calls,
+            'm1_bars_processed': self.m1_bars_processed,
+            'candles_published': self.candles_published,
+            'bars': {tf: self.bar_store.count(self.symbol, tf) for tf in self.capacities}
+        }
+
+# === GLOBAL INSTANCES ===
+_global_candle_aggregators: Dict[str, CandleAggregator] = {}
+
+def get_candle_aggregator(symbol: str) -> CandleAggregator:
+    """ดึง Candle Aggregator ของ symbol แบบ Singleton"""
+    if symbol not in _global_candle_aggregators:
+        _global_candle_aggregators[symbol] = CandleAggregator(symbol)
+    return _global_candle_aggregators[symbol]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CONNECTION HEALTH - Heartbeat State and Reconnect Circuit Breaker
+================================================================
+ติดตามสถานะการเชื่อมต่อ MT5 จาก heartbeat ราคาถูก (terminal_info ครั้งเดียวต่อรอบ)
+ให้ ensure_connection ตอบจากสถานะที่ cache ไว้ แทนการถาม terminal ทุกครั้ง
+และคุม reconnect ด้วย jittered exponential backoff + circuit breaker
+
+🎯 FEATURES:
+- Heartbeat state: ผลล่าสุด, อายุ, latency
+- Circuit breaker: CLOSED → OPEN (หลัง reconnect ล้มเหลว) → HALF_OPEN (ลองใหม่เมื่อครบ backoff)
+- Backoff: base × 2^(failures-1) จำกัดเพดาน พร้อม jitter ± เพื่อไม่ให้ทุก process ลองพร้อมกัน
+- Fail fast: ระหว่าง OPEN ทุก caller ได้ False ทันที
+
+เชื่อมต่อไปยัง:
+- mt5_integration/mt5_connector.py (RealMT5Connector)
+"""
+
+import random
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+class CircuitState(Enum):
+    """สถานะ circuit breaker ของการ reconnect"""
+    CLOSED = "CLOSED"          # ปกติ - reconnect ได้ทันที
+    OPEN = "OPEN"              # กำลัง backoff - fail fast
+    HALF_OPEN = "HALF_OPEN"    # กำลังลอง reconnect หนึ่งครั้ง
+
+class ConnectionHealth:
+    """
+    Connection Health - heartbeat state + circuit breaker (thread-safe)
+    """
+
+    def __init__(self, heartbeat_max_age: float = 15.0, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0, jitter: float = 0.25):
+        self.heartbeat_max_age = heartbeat_max_age
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+
+        # Heartbeat
+        self.heartbeat_ok = False
+        self.last_heartbeat: Optional[float] = None
+        self.last_heartbeat_ms = 0.0
+        self.last_healthy: Optional[float] = None
+
+        # Circuit breaker
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.retry_at = 0.0
+
+        self.stats = {
+            'heartbeats': 0,
+            'heartbeat_failures': 0,
+            'reconnect_attempts': 0,
+            'reconnect_successes': 0,
+            'reconnect_failures': 0,
+            'circuit_opened': 0,
+            'fast_failures': 0
+        }
+
+    # ===== HEARTBEAT =====
+
+    def record_heartbeat(self, ok: bool, latency_ms: float = 0.0):
+        """บันทึกผล heartbeat"""
+        now = time.time()
+        with self._lock:
+            self.heartbeat_ok = ok
+            self.last_heartbeat = now
+            self.last_heartbeat_ms = latency_ms
+            self.stats['heartbeats'] += 1
+            if ok:
+                self.last_healthy = now
+            else:
+                self.stats['heartbeat_failures'] += 1
+
+    def heartbeat_fresh(self) -> bool:
+        """heartbeat ล่าสุดสำเร็จและยังไม่เก่าเกิน heartbeat_max_age"""
+        with self._lock:
+            return (self.heartbeat_ok and self.last_heartbeat is not None and
+                    time.time() - self.last_heartbeat < self.heartbeat_max_age)
+
+    def heartbeat_stale(self) -> bool:
+        """ยังไม่มี heartbeat หรือ heartbeat ล่าสุดเก่าเกิน heartbeat_max_age"""
+        with self._lock:
+            return self.last_heartbeat is None or time.time() - self.last_heartbeat >= self.heartbeat_max_age
+
+    # ===== CIRCUIT BREAKER =====
+
+    def allow_attempt(self) -> bool:
+        """reconnect ได้หรือไม่ (False = circuit เปิดอยู่ - fail fast)"""
+        with self._lock:
+            if self.state == CircuitState.OPEN and time.time() < self.retry_at:
+                self.stats['fast_failures'] += 1
+                return False
+            return True
+
+    def begin_attempt(self):
+        """เริ่ม reconnect หนึ่งครั้ง"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                self.state = CircuitState.HALF_OPEN
+            self.stats['reconnect_attempts'] += 1
+
+    def record_success(self):
+        """เชื่อมต่อสำเร็จ - ปิด circuit และ reset backoff"""
+        with self._lock:
+            if self.consecutive_failures or self.state != CircuitState.CLOSED:
+                self.stats['reconnect_successes'] += 1
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self.retry_at = 0.0
+
+    def record_failure(self) -> float:
+        """reconnect ล้มเหลว - เปิด circuit จนถึงเวลาลองใหม่ (คืน delay เป็นวินาที)"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.stats['reconnect_failures'] += 1
+            delay = self.backoff_delay(self.consecutive_failures)
+            if self.state != CircuitState.OPEN:
+                self.stats['circuit_opened'] += 1
+            self.state = CircuitState.OPEN
+            self.retry_at = time.time() + delay
+            return delay
+
+    def backoff_delay(self, failures: int) -> float:
+        """base × 2^(failures-1) จำกัดที่ backoff_max แล้วกระจาย ± jitter"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, failures - 1)))
+        return delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def record_fast_failure(self):
+        """caller ถูกปฏิเสธเพราะมี thread อื่นกำลัง reconnect"""
+        with self._lock:
+            self.stats['fast_failures'] += 1
+
+    def get_health_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                **self.stats,
+                'heartbeat_ok': self.heartbeat_ok,
+                'heartbeat_age': now - self.last_heartbeat if self.last_heartbeat else None,
+                'heartbeat_ms': self.last_heartbeat_ms,
+                'circuit_state': self.state.value,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in': max(0.0, self.retry_at - now) if self.state == CircuitState.OPEN else 0.0
+            }
@@ -16,18 +16,18 @@ MARKET DATA STREAM - ระบบรับข้อมูลตลาดแบ
 import MetaTrader5 as mt5
 import threading
 import time
-import queue
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable, Any , Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
-try:
-    from mt5_integration.mt5_connector import get_mt5_connector, ensure_mt5_connection
-    from utilities.professional_logger import setup_market_logger
-    from utilities.error_handler import handle_trading_errors, MarketDataError, ErrorCategory, ErrorSeverity
-except ImportError as e:
-    print(f"Import Error in market_data_stream.py: {e}")
+from utilities.compact_records import slotted_dataclass, record_to_dict
+
+from utilities.professional_logger import setup_component_logger
+from utilities.error_handler import handle_trading_errors, ErrorCategory, ErrorSeverity
+from mt5_integration.snapshot_bus import get_snapshot_bus
+from mt5_integration.candle_aggregator import get_candle_aggregator
 
 class DataType(Enum):
     """ประเภทข้อมูลตลาด"""
@@ -36,7 +36,7 @@ class DataType(Enum):
     BOOK = "BOOK"           # Market depth
     NEWS = "NEWS"           # ข่าวสาร
 
-@dataclass
+@slotted_dataclass
 class TickData:
     """ข้อมูล Tick"""
     symbol: str
@@ -49,6 +49,10 @@ class TickData:
     
     def __post_init__(self):
         self.spread = self.ask - self.bid
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """แปลงเป็น Dictionary (JSON serializable)"""
+        return record_to_dict(self)
 
 @dataclass
 class CandleData:
@@ -79,19 +83,37 @@ class MarketDataStream:
     """
     
     def __init__(self):
-        self.logger = setup_market_logger()
+        self.logger = setup_component_logger("MarketDataStream")
         
         # การจัดการ subscriptions
         self.subscriptions: Dict[str, MarketDataSubscription] = {}
         self.tick_callbacks: List[Callable] = []
         self.candle_callbacks: List[Callable] = []
         
-        # Threading และ Queue
-        self.data_queue = queue.Queue(maxsize=1000)
+        # Threading และ coalescing buffer (เก็บเฉพาะ tick ล่าสุดต่อ symbol)
+        self._pending_ticks: Dict[str, Tuple[TickData, float]] = {}
+        self._pending_candles: deque = deque()
+        self._pending_lock = threading.Lock()
+        self._pending_event = threading.Event()
+        self.tick_symbols: set = set()
         self.streaming_active = False
         self.stream_thread: Optional[threading.Thread] = None
         self.processor_thread: Optional[threading.Thread] = None
         
+        # Shared terminal snapshot (แทนการเรียก MT5 ตรงทุกรอบ)
+        self.snapshot_bus = get_snapshot_bus()
+        self._snapshot_version = 0
+        
+        # Change detection และ adaptive polling
+        self.change_detection = True
+        self.min_poll_interval = 0.02       # ช่วง session ที่ตลาด active
+        self.max_poll_interval = 1.0        # ช่วงตลาดเงียบ
+        self.current_poll_interval = 0.1
+        self._last_tick_keys: Dict[str, Tuple] = {}
+        
+        # Candle aggregators ต่อ symbol (ดึง M1 ครั้งเดียวแล้ว aggregate)
+        self.candle_aggregators: Dict[str, Any] = {}
+        
         # Cache ข้อมูล
         self.latest_ticks: Dict[str, TickData] = {}
         self.latest_candles: Dict[str, Dict[str, CandleData]] = {}  # symbol -> timeframe -> candle
@@ -101,6 +123,10 @@ class MarketDataStream:
         self.candle_count = 0
         self.last_tick_time: Optional[datetime] = None
         self.data_latency_ms = 0.0
+        self.ticks_polled = 0
+        self.ticks_unchanged = 0
+        self.ticks_coalesced = 0
+        self.callback_latencies_ms: deque = deque(maxlen=1000)
         
         self.logger.info("📊 เริ่มต้น Market Data Stream")
     
@@ -109,7 +135,7 @@ class MarketDataStream:
         if self.streaming_active:
             return
         
-        if not ensure_mt5_connection():
+        if not mt5.initialize():
             self.logger.error("❌ ไม่สามารถเชื่อมต่อ MT5 สำหรับ streaming")
             return
         
@@ -136,6 +162,7 @@ class MarketDataStream:
     def stop_streaming(self):
         """หยุดการ stream ข้อมูล"""
         self.streaming_active = False
+        self._pending_event.set()
         
         if self.stream_thread and self.stream_thread.is_alive():
             self.stream_thread.join(timeout=5.0)
@@ -156,6 +183,7 @@ class MarketDataStream:
         )
         
         self.subscriptions[subscription_id] = subscription
+        self._refresh_tick_symbols()
         
         if callback:
             self.tick_callbacks.append(callback)
@@ -177,6 +205,11 @@ class MarketDataStream:
         
         self.subscriptions[subscription_id] = subscription
         
+        if symbol not in self.candle_aggregators:
+            aggregator = get_candle_aggregator(symbol)
+            aggregator.subscribe(self._on_candle_closed)
+            self.candle_aggregators[symbol] = aggregator
+        
         if callback:
             self.candle_callbacks.append(callback)
         
@@ -199,12 +232,22 @@ class MarketDataStream:
             
             # ลบ subscription
             del self.subscriptions[subscription_id]
+            self._refresh_tick_symbols()
             
             self.logger.info(f"❌ ยกเลิกการสมัครรับข้อมูล: {subscription_id}")
             return True
         
         return False
     
+    def _refresh_tick_symbols(self):
+        """สร้างชุด symbols ที่ stream tick ใหม่ (เฉพาะเมื่อ subscriptions เปลี่ยน)"""
+        self.tick_symbols = {
+            subscription.symbol for subscription in self.subscriptions.values()
+            if subscription.active and subscription.data_type == DataType.TICK
+        }
+        for symbol in self.tick_symbols:
+            self.snapshot_bus.register_symbol(symbol)
+    
     def get_latest_tick(self, symbol: str) -> Optional[TickData]:
         """ดึงข้อมูล tick ล่าสุด"""
         return self.latest_ticks.get(symbol)
@@ -222,116 +265,149 @@ class MarketDataStream:
     
     @handle_trading_errors(ErrorCategory.MARKET_DATA, ErrorSeverity.MEDIUM)
     def _streaming_loop(self):
-        """ลูปหลักสำหรับ streaming ข้อมูล"""
+        """ลูปหลักสำหรับ streaming ข้อมูล - รอ snapshot ใหม่หรือ poll แบบ adaptive"""
         while self.streaming_active:
             try:
-                # ดึงข้อมูล tick สำหรับ symbols ที่สมัคร
-                symbols_to_stream = set()
-                for subscription in self.subscriptions.values():
-                    if subscription.active and subscription.data_type == DataType.TICK:
-                        symbols_to_stream.add(subscription.symbol)
-                
-                # ดึงข้อมูล tick
-                for symbol in symbols_to_stream:
-                    tick_info = mt5.symbol_info_tick(symbol)
-                    if tick_info:
-                        tick_data = TickData(
-                            symbol=symbol,
-                            time=datetime.fromtimestamp(tick_info.time),
-                            bid=tick_info.bid,
-                            ask=tick_info.ask,
-                            last=tick_info.last,
-                            volume=tick_info.volume,
-                            spread=tick_info.ask - tick_info.bid
-                        )
-                        
-                        # เพิ่มเข้า queue
-                        try:
-                            self.data_queue.put_nowait(('TICK', tick_data))
-                        except queue.Full:
-                            self.logger.warning("⚠️ Data queue เต็ม - ข้าม tick")
+                # ดึงข้อมูล tick (ส่งต่อเฉพาะที่เปลี่ยน)
+                changed = self._poll_ticks()
                 
                 # ดึงข้อมูล candle
                 self._fetch_candle_data()
                 
-                # รอก่อนรอบถัดไป (100ms for tick data)
-                time.sleep(0.1)
+                # ปรับช่วงเวลา poll ตามความเคลื่อนไหวของตลาด
+                self._adapt_poll_interval(changed)
+                
+                if self.snapshot_bus.is_running:
+                    # Event-driven: ตื่นเมื่อ bus publish snapshot ใหม่
+                    snapshot = self.snapshot_bus.wait_for_update(
+                        self._snapshot_version, timeout=self.current_poll_interval
+                    )
+                    self._snapshot_version = snapshot.version
+                else:
+                    time.sleep(self.current_poll_interval)
                 
             except Exception as e:
                 self.logger.error(f"❌ ข้อผิดพลาดใน streaming loop: {e}")
                 time.sleep(1.0)
     
+    def _poll_ticks(self) -> int:
+        """ดึง tick ของทุก symbol ที่สมัคร - คืนจำนวน ticks ที่เปลี่ยน"""
+        changed = 0
+        
+        for symbol in self.tick_symbols:
+            tick_info = self.snapshot_bus.get_tick(symbol)
+            if not tick_info:
+                continue
+            
+            self.ticks_polled += 1
+            received_at = time.perf_counter()
+            
+            # Change detection - ข้ามถ้า bid/ask/time ไม่เปลี่ยน
+            tick_key = (getattr(tick_info, 'time_msc', tick_info.time), tick_info.bid, tick_info.ask)
+            if self.change_detection and self._last_tick_keys.get(symbol) == tick_key:
+                self.ticks_unchanged += 1
+                continue
+            self._last_tick_keys[symbol] = tick_key
+            
+            tick_data = TickData(
+                symbol=symbol,
+                time=datetime.fromtimestamp(tick_info.time),
+                bid=tick_info.bid,
+                ask=tick_info.ask,
+                last=tick_info.last,
+                volume=tick_info.volume,
+                spread=tick_info.ask - tick_info.bid
+            )
+            
+            # Coalescing buffer - ค่าใหม่ทับค่าที่ยังไม่ถูกประมวลผล
+            with self._pending_lock:
+                if symbol in self._pending_ticks:
+                    self.ticks_coalesced += 1
+                self._pending_ticks[symbol] = (tick_data, received_at)
+            self._pending_event.set()
+            changed += 1
+        
+        return changed
+    
+    def _adapt_poll_interval(self, changed: int):
+        """ปรับช่วงเวลา poll - ถี่เมื่อราคาเคลื่อนไหว ห่างเมื่อตลาดเงียบ"""
+        if self._is_active_session():
+            ceiling = self.max_poll_interval / 4
+        else:
+            ceiling = self.max_poll_interval
+        
+        if changed:
+            self.current_poll_interval = self.min_poll_interval
+        else:
+            self.current_poll_interval = min(self.current_poll_interval * 1.5, ceiling)
+    
+    def _is_active_session(self) -> bool:
+        """ตรวจสอบว่าอยู่ในช่วง London / New York session หรือไม่ (GMT+7)"""
+        hour = datetime.now().hour
+        return hour >= 14 or hour < 5
+    
     def _fetch_candle_data(self):
-        """ดึงข้อมูล candle"""
-        for subscription in self.subscriptions.values():
-            if (subscription.active and 
-                subscription.data_type == DataType.CANDLE and 
-                subscription.timeframe):
-                
-                try:
-                    # แปลง timeframe
-                    mt5_timeframe = self._convert_timeframe_to_mt5(subscription.timeframe)
-                    
-                    # ดึงข้อมูล candle ล่าสุด
-                    rates = mt5.copy_rates_from_pos(subscription.symbol, mt5_timeframe, 0, 1)
-                    
-                    if rates is not None and len(rates) > 0:
-                        rate = rates[0]
-                        
-                        candle_data = CandleData(
-                            symbol=subscription.symbol,
-                            timeframe=subscription.timeframe,
-                            time=datetime.fromtimestamp(rate['time']),
-                            open=rate['open'],
-                            high=rate['high'],
-                            low=rate['low'],
-                            close=rate['close'],
-                            volume=rate['real_volume'],
-                            tick_volume=rate['tick_volume']
-                        )
-                        
-                        # ตรวจสอบว่าเป็น candle ใหม่หรือไม่
-                        current_candle = self.get_latest_candle(
-                            subscription.symbol, 
-                            subscription.timeframe
-                        )
-                        
-                        if (not current_candle or 
-                            candle_data.time > current_candle.time):
-                            
-                            # เพิ่มเข้า queue
-                            try:
-                                self.data_queue.put_nowait(('CANDLE', candle_data))
-                            except queue.Full:
-                                self.logger.warning("⚠️ Data queue เต็ม - ข้าม candle")
-                
-                except Exception as e:
-                    self.logger.warning(f"⚠️ ข้อผิดพลาดในการดึง candle {subscription.symbol}: {e}")
+        """ดึงข้อมูล candle - M1 แบบ incremental หนึ่งครั้งต่อ symbol"""
+        for symbol, aggregator in self.candle_aggregators.items():
+            try:
+                aggregator.update()
+            except Exception as e:
+                self.logger.warning(f"⚠️ ข้อผิดพลาดในการดึง candle {symbol}: {e}")
+    
+    def _on_candle_closed(self, symbol: str, timeframe: str, bar: Dict[str, Any]):
+        """รับ candle ที่ปิดแล้วจาก aggregator - ส่งต่อเฉพาะ timeframe ที่สมัคร"""
+        subscribed = any(
+            subscription.active and
+            subscription.data_type == DataType.CANDLE and
+            subscription.symbol == symbol and
+            subscription.timeframe == timeframe
+            for subscription in self.subscriptions.values()
+        )
+        if not subscribed:
+            return
+        
+        candle_data = CandleData(
+            symbol=symbol,
+            timeframe=timeframe,
+            time=datetime.fromtimestamp(bar['time']),
+            open=bar['open'],
+            high=bar['high'],
+            low=bar['low'],
+            close=bar['close'],
+            volume=bar['real_volume'],
+            tick_volume=bar['tick_volume']
+        )
+        
+        with self._pending_lock:
+            self._pending_candles.append(candle_data)
+        self._pending_event.set()
     
     def _data_processor_loop(self):
-        """ลูปประมวลผลข้อมูล"""
+        """ลูปประมวลผลข้อมูลจาก coalescing buffer"""
         while self.streaming_active:
             try:
-                # ดึงข้อมูลจาก queue
-                try:
-                    data_type, data = self.data_queue.get(timeout=1.0)
-                except queue.Empty:
+                if not self._pending_event.wait(timeout=1.0):
                     continue
                 
-                # ประมวลผลตามประเภทข้อมูล
-                if data_type == 'TICK':
-                    self._process_tick_data(data)
-                elif data_type == 'CANDLE':
-                    self._process_candle_data(data)
+                # สลับ buffer ออกมาประมวลผลทั้งชุด
+                with self._pending_lock:
+                    self._pending_event.clear()
+                    pending_ticks = self._pending_ticks
+                    self._pending_ticks = {}
+                    pending_candles = list(self._pending_candles)
+                    self._pending_candles.clear()
+                
+                for tick_data, received_at in pending_ticks.values():
+                    self._process_tick_data(tick_data, received_at)
                 
-                # Mark task as done
-                self.data_queue.task_done()
+                for candle_data in pending_candles:
+                    self._process_candle_data(candle_data)
                 
             except Exception as e:
                 self.logger.error(f"❌ ข้อผิดพลาดใน data processor: {e}")
                 time.sleep(0.1)
     
-    def _process_tick_data(self, tick_data: TickData):
+    def _process_tick_data(self, tick_data: TickData, received_at: Optional[float] = None):
         """ประมวลผลข้อมูล tick"""
         
         # อัพเดท cache
@@ -346,6 +422,10 @@ class MarketDataStream:
         latency = (now - tick_data.time).total_seconds() * 1000
         self.data_latency_ms = latency
         
+        # Latency จากรับ tick ถึงเรียก callback
+        if received_at is not None:
+            self.callback_latencies_ms.append((time.perf_counter() - received_at) * 1000)
+        
         # เรียก callbacks
         for callback in self.tick_callbacks:
             try:
@@ -398,6 +478,22 @@ class MarketDataStream:
         }
         return timeframe_map.get(timeframe, mt5.TIMEFRAME_M1)
     
+    def _latency_percentiles(self) -> Dict[str, float]:
+        """คำนวณ percentiles ของ tick-to-callback latency"""
+        samples = sorted(self.callback_latencies_ms)
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        
+        def percentile(p: float) -> float:
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 3)
+        
+        return {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(samples[-1], 3)
+        }
+    
     def get_streaming_statistics(self) -> Dict:
         """ดึงสถิติการ streaming"""
         return {
@@ -405,7 +501,12 @@ class MarketDataStream:
             "total_subscriptions": len(self.subscriptions),
             "tick_count": self.tick_count,
             "candle_count": self.candle_count,
-            "queue_size": self.data_queue.qsize(),
+            "queue_size": len(self._pending_ticks) + len(self._pending_candles),
+            "ticks_polled": self.ticks_polled,
+            "ticks_unchanged": self.ticks_unchanged,
+            "ticks_coalesced": self.ticks_coalesced,
+            "poll_interval_ms": round(self.current_poll_interval * 1000, 1),
+            "callback_latency_ms": self._latency_percentiles(),
             "data_latency_ms": round(self.data_latency_ms, 2),
             "last_tick_time": self.last_tick_time.isoformat() if self.last_tick_time else None,
             "symbols_streaming": list(set(s.symbol for s in self.subscriptions.values()))
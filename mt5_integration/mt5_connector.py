@@ -15,6 +15,8 @@ MT5 CONNECTOR - Real MetaTrader 5 Connection Manager
 - Error handling และ recovery
 - Performance monitoring
 - Thread-safe operations
+- Symbol metadata cache (TTL + disk) และ order request templates
+- Heartbeat health state + reconnect circuit breaker (jittered exponential backoff)
 """
 
 import os
@@ -39,6 +41,9 @@ except ImportError:
     mt5 = None
     print("⚠️ MetaTrader5 module ไม่พร้อมใช้งาน")
 
+from mt5_integration.symbol_cache import SymbolMetadata, get_symbol_cache
+from mt5_integration.connection_health import ConnectionHealth
+
 class ConnectionStatus(Enum):
     """สถานะการเชื่อมต่อ"""
     DISCONNECTED = "DISCONNECTED"
@@ -80,10 +85,17 @@ class MT5Config:
     verify_symbols: List[str] = field(default_factory=lambda: ["XAUUSD.v"])
     
     # Connection settings
-    max_reconnect_attempts: int = 5
-    reconnect_delay: float = 5.0
+    max_reconnect_attempts: int = 5          # เตือนเมื่อ reconnect ล้มเหลวติดกันครบจำนวนนี้
+    reconnect_delay: float = 5.0             # backoff เริ่มต้น (วินาที)
+    max_reconnect_delay: float = 120.0       # backoff สูงสุด
+    reconnect_jitter: float = 0.25           # ± สัดส่วนของ backoff
     connection_timeout: float = 30.0
     
+    # Health monitoring
+    heartbeat_interval: float = 5.0          # monitor ส่ง heartbeat ทุกกี่วินาที
+    heartbeat_max_age: float = 15.0          # ensure_connection เชื่อ heartbeat ที่อายุไม่เกินนี้
+    account_refresh_interval: float = 30.0
+    
     # Performance settings
     enable_logging: bool = True
     log_trades: bool = True
@@ -146,7 +158,7 @@ class TradeRequest:
     magic: int = 0
     comment: str = ""
     type_time: int = 0
-    type_filling: int = 0
+    type_filling: Optional[int] = None       # None = filling mode ที่ symbol รองรับ (จาก template)
     expiration: int = 0
 
 @dataclass
@@ -176,6 +188,7 @@ class RealMT5Connector:
         self.status = ConnectionStatus.DISCONNECTED
         self.account_info = AccountInfo()
         self.symbols_cache: Dict[str, SymbolInfo] = {}
+        self.symbol_cache = get_symbol_cache()       # metadata + request templates (ใช้ร่วมทั้งระบบ)
         
         # Connection management
         self.connection_lock = threading.Lock()
@@ -191,6 +204,17 @@ class RealMT5Connector:
         # Monitoring
         self.monitor_thread = None
         self.is_monitoring = False
+        self.monitor_stop_event = threading.Event()
+        self.last_account_refresh = 0.0
+        
+        # Health - heartbeat state + reconnect circuit breaker
+        self.health = ConnectionHealth(
+            heartbeat_max_age=self.config.heartbeat_max_age,
+            backoff_base=self.config.reconnect_delay,
+            backoff_max=self.config.max_reconnect_delay,
+            jitter=self.config.reconnect_jitter
+        )
+        self.reconnect_lock = threading.Lock()
         
         print("🔌 MT5 Connector initialized")
     
@@ -222,6 +246,9 @@ class RealMT5Connector:
                 self.last_connection_time = datetime.now()
                 self.connection_count += 1
                 self.reconnect_attempts = 0
+                self.last_account_refresh = time.time()
+                self.health.record_heartbeat(True)
+                self.health.record_success()
                 
                 print("✅ MT5 connected successfully")
                 return True
@@ -355,8 +382,12 @@ class RealMT5Connector:
                 return
             
             cached_count = 0
+            verify_symbols = set(self.config.verify_symbols)
             for symbol in symbols:
                 try:
+                    if symbol.name in verify_symbols:
+                        self.symbol_cache.put(SymbolMetadata.from_mt5(symbol), persist=False)
+                    
                     symbol_info = SymbolInfo(
                         name=symbol.name,
                         visible=symbol.visible,
@@ -384,6 +415,7 @@ class RealMT5Connector:
                     print(f"⚠️ Error caching symbol {symbol.name}: {e}")
             
             print(f"✅ Cached {cached_count} symbols")
+            self.symbol_cache.save()
             
             # Verify target symbols
             for symbol_name in self.config.verify_symbols:
@@ -411,44 +443,85 @@ class RealMT5Connector:
             print(f"❌ Disconnect error: {e}")
     
     def reconnect(self) -> bool:
-        """เชื่อมต่อใหม่"""
-        if self.reconnect_attempts >= self.config.max_reconnect_attempts:
-            print(f"❌ Max reconnect attempts reached: {self.reconnect_attempts}")
+        """
+        เชื่อมต่อใหม่ - ครั้งละหนึ่ง thread และเฉพาะเมื่อ circuit breaker อนุญาต
+        thread อื่นที่เรียกระหว่างนั้นได้ False ทันที
+        """
+        if not self.health.allow_attempt():
             return False
         
-        self.status = ConnectionStatus.RECONNECTING
-        self.reconnect_attempts += 1
-        
-        print(f"🔄 Reconnecting... (Attempt {self.reconnect_attempts})")
-        
-        # Wait before reconnecting
-        time.sleep(self.config.reconnect_delay)
+        if not self.reconnect_lock.acquire(blocking=False):
+            self.health.record_fast_failure()
+            return False
         
-        # Disconnect first
         try:
-            mt5.shutdown()
-        except:
-            pass
+            # thread อื่นเพิ่ง reconnect สำเร็จ
+            if self.status == ConnectionStatus.CONNECTED and self.health.heartbeat_fresh():
+                return True
+            
+            self.status = ConnectionStatus.RECONNECTING
+            self.reconnect_attempts += 1
+            self.health.begin_attempt()
+            
+            print(f"🔄 Reconnecting... (Attempt {self.reconnect_attempts})")
+            
+            # Disconnect first
+            try:
+                mt5.shutdown()
+            except:
+                pass
+            
+            # ข้อมูล symbol อาจเปลี่ยนหลัง reconnect (server / account ใหม่)
+            self.symbol_cache.invalidate()
+            self.symbols_cache.clear()
+            
+            # Try to connect
+            if self.connect():
+                return True
+            
+            delay = self.health.record_failure()
+            self.status = ConnectionStatus.ERROR
+            print(f"❌ Reconnect failed - next attempt in {delay:.1f}s")
+            if self.reconnect_attempts >= self.config.max_reconnect_attempts:
+                print(f"⚠️ Reconnect failed {self.reconnect_attempts} times in a row")
+            return False
+            
+        finally:
+            self.reconnect_lock.release()
+    
+    def _heartbeat(self) -> bool:
+        """ตรวจการเชื่อมต่อด้วย terminal_info ครั้งเดียว แล้วบันทึกเป็น health state"""
+        started = time.perf_counter()
+        try:
+            terminal_info = mt5.terminal_info()
+            ok = terminal_info is not None and terminal_info.connected
+        except Exception:
+            ok = False
         
-        # Try to connect
-        return self.connect()
+        self.health.record_heartbeat(ok, (time.perf_counter() - started) * 1000)
+        return ok
     
     def is_connected(self) -> bool:
-        """ตรวจสอบสถานะการเชื่อมต่อ"""
+        """ตรวจสอบสถานะการเชื่อมต่อ (heartbeat ทันที)"""
         if self.status != ConnectionStatus.CONNECTED:
             return False
         
-        try:
-            # Quick connection test
-            terminal_info = mt5.terminal_info()
-            return terminal_info is not None and terminal_info.connected
-        except:
-            return False
+        return self._heartbeat()
     
     def ensure_connection(self) -> bool:
-        """ตรวจสอบและรับรองการเชื่อมต่อ"""
-        if self.is_connected():
-            return True
+        """
+        ตรวจสอบและรับรองการเชื่อมต่อ - ตอบจาก heartbeat ล่าสุดถ้ายังใหม่
+        ระหว่าง outage (circuit เปิด) คืน False ทันที
+        """
+        if self.status == ConnectionStatus.CONNECTED:
+            if self.health.heartbeat_fresh():
+                return True
+            # heartbeat เก่า (monitor ไม่ได้รัน) - ตรวจครั้งเดียวแล้วใช้ผลนั้นต่อ
+            if self.health.heartbeat_stale() and self._heartbeat():
+                return True
+        
+        if not self.health.allow_attempt():
+            return False
         
         print("⚠️ Connection lost, attempting to reconnect...")
         return self.reconnect()
@@ -462,21 +535,18 @@ class RealMT5Connector:
                     error_message="No connection to MT5"
                 )
             
-            # Prepare MT5 request
-            mt5_request = {
-                "action": request.action,
-                "symbol": request.symbol,
-                "volume": request.volume,
-                "type": request.type,
-                "price": request.price,
-                "sl": request.sl,
-                "tp": request.tp,
-                "deviation": request.deviation,
-                "magic": request.magic,
-                "comment": request.comment,
-                "type_time": request.type_time,
-                "type_filling": request.type_filling,
-            }
+            # Prepare MT5 request - template ของ symbol / order type เติมแค่ price, volume, SL/TP
+            mt5_request = self.symbol_cache.build_request(
+                request.symbol, request.action, request.type,
+                price=request.price, volume=request.volume, sl=request.sl, tp=request.tp,
+                deviation=request.deviation, magic=request.magic, comment=request.comment,
+                type_time=request.type_time, type_filling=request.type_filling
+            )
+            if mt5_request is None:
+                return TradeResult(
+                    success=False,
+                    error_message=f"Symbol {request.symbol} not available"
+                )
             
             # Add expiration if needed
             if request.expiration > 0:
@@ -598,42 +668,40 @@ class RealMT5Connector:
             return None
     
     def get_symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
-        """ดึงข้อมูล symbol"""
+        """ดึงข้อมูล symbol (จาก symbol metadata cache - เรียก MT5 เมื่อหมดอายุเท่านั้น)"""
         try:
-            # Check cache first
-            if symbol in self.symbols_cache:
-                cached_info = self.symbols_cache[symbol]
-                # Check if cache is recent (less than 1 hour)
-                if (datetime.now() - cached_info.last_update).total_seconds() < 3600:
-                    return cached_info
-            
-            if not self.ensure_connection():
-                return None
+            metadata = self.symbol_cache.get_cached(symbol)
+            if metadata is None:
+                if not self.ensure_connection():
+                    return None
+                
+                # Get fresh data
+                metadata = self.symbol_cache.refresh(symbol)
+                if metadata is None:
+                    return None
             
-            # Get fresh data
-            symbol_info = mt5.symbol_info(symbol)
-            if not symbol_info:
-                return None
+            # SymbolInfo ของ metadata ชุดนี้สร้างไว้แล้ว
+            cached_info = self.symbols_cache.get(symbol)
+            last_update = datetime.fromtimestamp(metadata.fetched_at)
+            if cached_info is not None and cached_info.last_update == last_update:
+                return cached_info
             
             # Create SymbolInfo object
             info = SymbolInfo(
-                name=symbol_info.name,
-                visible=symbol_info.visible,
-                select=symbol_info.select,
-                digits=symbol_info.digits,
-                point=symbol_info.point,
-                spread=symbol_info.spread,
-                trade_mode=symbol_info.trade_mode,
-                volume_min=symbol_info.volume_min,
-                volume_max=symbol_info.volume_max,
-                volume_step=symbol_info.volume_step,
-                swap_long=symbol_info.swap_long,
-                swap_short=symbol_info.swap_short,
-                margin_initial=symbol_info.margin_initial,
-                session_deals=symbol_info.session_deals,
-                session_buy_orders=symbol_info.session_buy_orders,
-                session_sell_orders=symbol_info.session_sell_orders,
-                last_update=datetime.now()
+                name=metadata.name,
+                visible=metadata.visible,
+                select=metadata.select,
+                digits=metadata.digits,
+                point=metadata.point,
+                spread=metadata.spread,
+                trade_mode=metadata.trade_mode,
+                volume_min=metadata.volume_min,
+                volume_max=metadata.volume_max,
+                volume_step=metadata.volume_step,
+                swap_long=metadata.swap_long,
+                swap_short=metadata.swap_short,
+                margin_initial=metadata.margin_initial,
+                last_update=last_update
             )
             
             # Update cache
@@ -692,6 +760,7 @@ class RealMT5Connector:
             return
         
         self.is_monitoring = True
+        self.monitor_stop_event.clear()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         print("✅ Connection monitoring started")
@@ -699,27 +768,30 @@ class RealMT5Connector:
     def stop_monitoring(self):
         """หยุดการตรวจสอบ"""
         self.is_monitoring = False
+        self.monitor_stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         print("⏹️ Connection monitoring stopped")
     
     def _monitor_loop(self):
-        """Loop การตรวจสอบการเชื่อมต่อ"""
+        """Loop การตรวจสอบการเชื่อมต่อ - heartbeat ครั้งเดียวต่อรอบ"""
         while self.is_monitoring:
             try:
-                if not self.is_connected():
+                if self.status == ConnectionStatus.CONNECTED and self._heartbeat():
+                    # Refresh account info ตาม interval (ไม่พึ่งวินาทีที่หาร 30 ลงตัว)
+                    if time.time() - self.last_account_refresh >= self.config.account_refresh_interval:
+                        self.last_account_refresh = time.time()
+                        self._load_account_info()
+                
+                elif self.health.allow_attempt():
                     print("⚠️ Connection lost, attempting reconnect...")
                     self.reconnect()
                 
-                # Refresh account info every 30 seconds
-                if self.is_connected() and int(time.time()) % 30 == 0:
-                    self.refresh_account_info()
-                
-                time.sleep(5)  # Check every 5 seconds
+                self.monitor_stop_event.wait(self.config.heartbeat_interval)
                 
             except Exception as e:
                 print(f"❌ Monitor loop error: {e}")
-                time.sleep(10)
+                self.monitor_stop_event.wait(10)
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """ดึงสถิติการเชื่อมต่อ"""
@@ -733,6 +805,8 @@ class RealMT5Connector:
             'account_login': self.account_info.login,
             'account_server': self.account_info.server,
             'symbols_cached': len(self.symbols_cache),
+            'symbol_metadata_cache': self.symbol_cache.get_cache_stats(),
+            'health': self.health.get_health_stats(),
             'market_status': self.get_market_status().value,
             'is_monitoring': self.is_monitoring
         }
@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MT5 SIMULATOR - Offline MetaTrader5 Backend
+==========================================
+MetaTrader5 module จำลอง (drop-in) สำหรับรันทั้งระบบบน Linux โดยไม่ต้องมี terminal
+ใช้ tick XAUUSD แบบ synthetic หรือจากไฟล์ที่บันทึกไว้ และ matching engine
+ที่ fill orders พร้อม latency / slippage ที่ตั้งค่าได้
+
+🎯 FEATURES:
+- install_simulator(): ใส่ simulator เป็น sys.modules['MetaTrader5'] (ต้องเรียกก่อน import components)
+- Tick feed: random walk (synthetic) หรือ replay CSV (time,bid,ask[,volume]) ตามความเร็วที่กำหนด
+- M1 bars จาก ticks + ประวัติเริ่มต้น - copy_rates_from_pos ทุก timeframe
+- Matching engine: market / pending (limit, stop) / close / SL-TP / remove พร้อม requote ตาม deviation
+- Hedging account: balance, equity, margin, deals history
+- PipelineLoadDriver: ส่ง orders ตามอัตราที่กำหนด และวัด order → fill → position tracker latency
+
+เชื่อมต่อไปยัง:
+- main.py (--simulate)
+- ทุก module ที่ import MetaTrader5
+"""
+
+import csv
+import random
+import sys
+import threading
+import time
+import types
+from collections import deque, namedtuple
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ===== MT5 CONSTANTS (ค่าเดียวกับ MetaTrader5 package) =====
+
+MT5_CONSTANTS = {
+    'TIMEFRAME_M1': 1, 'TIMEFRAME_M2': 2, 'TIMEFRAME_M3': 3, 'TIMEFRAME_M4': 4, 'TIMEFRAME_M5': 5,
+    'TIMEFRAME_M10': 10, 'TIMEFRAME_M15': 15, 'TIMEFRAME_M30': 30,
+    'TIMEFRAME_H1': 16385, 'TIMEFRAME_H2': 16386, 'TIMEFRAME_H4': 16388, 'TIMEFRAME_H8': 16392,
+    'TIMEFRAME_D1': 16408, 'TIMEFRAME_W1': 32769,
+
+    'ORDER_TYPE_BUY': 0, 'ORDER_TYPE_SELL': 1,
+    'ORDER_TYPE_BUY_LIMIT': 2, 'ORDER_TYPE_SELL_LIMIT': 3,
+    'ORDER_TYPE_BUY_STOP': 4, 'ORDER_TYPE_SELL_STOP': 5,
+    'POSITION_TYPE_BUY': 0, 'POSITION_TYPE_SELL': 1,
+    'DEAL_TYPE_BUY': 0, 'DEAL_TYPE_SELL': 1,
+    'DEAL_ENTRY_IN': 0, 'DEAL_ENTRY_OUT': 1,
+
+    'TRADE_ACTION_DEAL': 1, 'TRADE_ACTION_PENDING': 5, 'TRADE_ACTION_SLTP': 6,
+    'TRADE_ACTION_MODIFY': 7, 'TRADE_ACTION_REMOVE': 8, 'TRADE_ACTION_CLOSE_BY': 10,
+
+    'ORDER_FILLING_FOK': 0, 'ORDER_FILLING_IOC': 1, 'ORDER_FILLING_RETURN': 2,
+    'ORDER_TIME_GTC': 0, 'ORDER_TIME_DAY': 1, 'ORDER_TIME_SPECIFIED': 2,
+    'SYMBOL_FILLING_FOK': 1, 'SYMBOL_FILLING_IOC': 2,
+    'SYMBOL_TRADE_MODE_FULL': 4,
+    'ACCOUNT_TRADE_MODE_DEMO': 0,
+
+    'TRADE_RETCODE_REQUOTE': 10004, 'TRADE_RETCODE_REJECT': 10006, 'TRADE_RETCODE_CANCEL': 10007,
+    'TRADE_RETCODE_PLACED': 10008, 'TRADE_RETCODE_DONE': 10009, 'TRADE_RETCODE_DONE_PARTIAL': 10010,
+    'TRADE_RETCODE_ERROR': 10011, 'TRADE_RETCODE_TIMEOUT': 10012, 'TRADE_RETCODE_INVALID': 10013,
+    'TRADE_RETCODE_INVALID_VOLUME': 10014, 'TRADE_RETCODE_INVALID_PRICE': 10015,
+    'TRADE_RETCODE_INVALID_STOPS': 10016, 'TRADE_RETCODE_TRADE_DISABLED': 10017,
+    'TRADE_RETCODE_MARKET_CLOSED': 10018, 'TRADE_RETCODE_NO_MONEY': 10019,
+    'TRADE_RETCODE_PRICE_CHANGED': 10020, 'TRADE_RETCODE_PRICE_OFF': 10021,
+    'TRADE_RETCODE_INVALID_EXPIRATION': 10022, 'TRADE_RETCODE_ORDER_CHANGED': 10023,
+    'TRADE_RETCODE_TOO_MANY_REQUESTS': 10024, 'TRADE_RETCODE_NO_CHANGES': 10025,
+    'TRADE_RETCODE_SERVER_DISABLES_AT': 10026, 'TRADE_RETCODE_CLIENT_DISABLES_AT': 10027,
+    'TRADE_RETCODE_LOCKED': 10028, 'TRADE_RETCODE_FROZEN': 10029, 'TRADE_RETCODE_INVALID_FILL': 10030,
+    'TRADE_RETCODE_CONNECTION': 10031, 'TRADE_RETCODE_ONLY_REAL': 10032,
+    'TRADE_RETCODE_LIMIT_ORDERS': 10033, 'TRADE_RETCODE_LIMIT_VOLUME': 10034,
+}
+C = types.SimpleNamespace(**MT5_CONSTANTS)
+
+TIMEFRAME_SECONDS = {
+    C.TIMEFRAME_M1: 60, C.TIMEFRAME_M2: 120, C.TIMEFRAME_M3: 180, C.TIMEFRAME_M4: 240,
+    C.TIMEFRAME_M5: 300, C.TIMEFRAME_M10: 600, C.TIMEFRAME_M15: 900, C.TIMEFRAME_M30: 1800,
+    C.TIMEFRAME_H1: 3600, C.TIMEFRAME_H2: 7200, C.TIMEFRAME_H4: 14400, C.TIMEFRAME_H8: 28800,
+    C.TIMEFRAME_D1: 86400, C.TIMEFRAME_W1: 604800,
+}
+
+RATES_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                        ('close', '<f8'), ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+
+# ===== RETURN TYPES (namedtuples แบบเดียวกับ MetaTrader5) =====
+
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+TerminalInfo = namedtuple('TerminalInfo', 'connected trade_allowed name company path build ping_last')
+AccountInfo = namedtuple('AccountInfo', 'login trade_mode leverage limit_orders margin_so_mode trade_allowed '
+                                        'trade_expert balance credit profit equity margin margin_free '
+                                        'margin_level margin_so_call margin_so_so currency name server company')
+SymbolInfo = namedtuple('SymbolInfo', 'name description visible select digits point spread trade_mode '
+                                      'filling_mode trade_contract_size trade_tick_size trade_tick_value '
+                                      'trade_stops_level volume_min volume_max volume_step swap_long swap_short '
+                                      'margin_initial session_deals session_buy_orders session_sell_orders '
+                                      'bid ask currency_base currency_profit')
+TradePosition = namedtuple('TradePosition', 'ticket time time_msc time_update type magic identifier reason '
+                                            'volume price_open sl tp price_current swap commission profit '
+                                            'symbol comment external_id')
+TradeOrder = namedtuple('TradeOrder', 'ticket time_setup type state magic position_id volume_initial '
+                                      'volume_current price_open sl tp price_current symbol comment')
+TradeDeal = namedtuple('TradeDeal', 'ticket order time time_msc type entry magic position_id reason volume '
+                                    'price commission swap profit fee symbol comment')
+OrderSendResult = namedtuple('OrderSendResult', 'retcode deal order volume price bid ask comment '
+                                                'request_id retcode_external request')
+
+@dataclass
+class SimulatorConfig:
+    """การตั้งค่า simulator - override ได้ด้วย --sim-<field>=value หรือ MT5_SIM_<FIELD>"""
+    symbol: str = "XAUUSD.v"
+    symbol_aliases: str = "XAUUSD,GOLD"          # ชื่ออื่นที่ใช้ตลาดเดียวกัน (คั่นด้วย ,)
+    start_price: float = 2000.0
+    spread: float = 0.30                         # $
+    volatility: float = 0.12                     # σ ของราคาต่อ tick ($)
+    tick_interval: float = 0.25                  # วินาทีระหว่าง synthetic ticks
+    tick_file: str = ""                          # CSV: time,bid,ask[,volume] (ว่าง = synthetic)
+    speed: float = 1.0                           # ความเร็ว replay / tick rate
+    latency_ms: float = 20.0                     # round trip ของ order_send
+    latency_jitter_ms: float = 10.0
+    slippage_points: int = 2                     # slippage สูงสุด (ไม่เป็นผลดี) เป็น points
+    balance: float = 10000.0
+    leverage: int = 100
+    contract_size: float = 100.0
+    history_bars: int = 10080                    # M1 bars เริ่มต้น (1 สัปดาห์)
+    seed: int = 0                                # 0 = สุ่ม
+    load_orders_per_second: float = 0.0          # PipelineLoadDriver (0 = ปิด)
+    benchmark_seconds: float = 0.0               # main.py: รัน headless แล้วรายงาน (0 = ปิด)
+
+    @classmethod
+    def from_args(cls, argv: Sequence[str], environ: Optional[Dict[str, str]] = None) -> 'SimulatorConfig':
+        """อ่านจาก environment (MT5_SIM_*) แล้วทับด้วย arguments (--sim-<field>=value)"""
+        import os
+        environ = os.environ if environ is None else environ
+        config = cls()
+        overrides = {}
+        for f in fields(cls):
+            env_value = environ.get(f"MT5_SIM_{f.name.upper()}")
+            if env_value is not None:
+                overrides[f.name] = env_value
+        for arg in argv:
+            if arg.startswith("--sim-") and "=" in arg:
+                key, value = arg[len("--sim-"):].split("=", 1)
+                overrides[key.replace("-", "_")] = value
+
+        known = {f.name: f for f in fields(cls)}
+        for key, value in overrides.items():
+            if key not in known:
+                print(f"⚠️ Unknown simulator option: {key}")
+                continue
+            default = getattr(config, key)
+            setattr(config, key, type(default)(value))
+        return config
+
+# ===== TICK SOURCES =====
+
+class SyntheticTickSource:
+    """Random walk รอบ start_price (mean reversion เล็กน้อย) - spread ผันผวนเล็กน้อย"""
+
+    def __init__(self, config: SimulatorConfig, rng: random.Random):
+        self.config = config
+        self.rng = rng
+        self.mid = config.start_price
+        self.interval = config.tick_interval / max(config.speed, 1e-6)
+
+    def next_tick(self) -> Tuple[float, float, int, float]:
+        """(bid, ask, volume, วินาทีถึง tick ถัดไป)"""
+        drift = (self.config.start_price - self.mid) * 0.0005
+        self.mid += drift + self.rng.gauss(0.0, self.config.volatility)
+        spread = self.config.spread * self.rng.uniform(0.8, 1.3)
+        bid = round(self.mid - spread / 2, 2)
+        ask = round(bid + spread, 2)
+        return bid, ask, self.rng.randint(1, 20), self.rng.expovariate(1.0 / self.interval)
+
+class RecordedTickSource:
+    """Replay ticks จาก CSV ตามระยะห่างเวลาที่บันทึกไว้ (วนกลับเมื่อจบไฟล์)"""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.speed = max(speed, 1e-6)
+        self.rows: List[Tuple[float, float, float, int]] = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].strip().lower() in ('time', 'timestamp'):
+                    continue
+                stamp = row[0].strip()
+                try:
+                    seconds = float(stamp)
+                except ValueError:
+                    seconds = datetime.fromisoformat(stamp).timestamp()
+                if seconds > 1e11:   # time_msc
+                    seconds /= 1000.0
+                volume = int(float(row[3])) if len(row) > 3 and row[3].strip() else 1
+                self.rows.append((seconds, float(row[1]), float(row[2]), volume))
+        if not self.rows:
+            raise ValueError(f"No ticks in {path}")
+        self.index = 0
+
+    @property
+    def start_price(self) -> float:
+        return (self.rows[0][1] + self.rows[0][2]) / 2
+
+    def next_tick(self) -> Tuple[float, float, int, float]:
+        seconds, bid, ask, volume = self.rows[self.index]
+        self.index = (self.index + 1) % len(self.rows)
+        next_seconds = self.rows[self.index][0]
+        gap = next_seconds - seconds if self.index else 1.0
+        return bid, ask, volume, max(gap, 0.0) / self.speed
+
+# ===== SIMULATOR =====
+
+class MT5Simulator:
+    """
+    MT5 Simulator - API เดียวกับ MetaTrader5 package (ส่วนที่ระบบใช้)
+    ตลาดเดินตามนาฬิกาจริง: ทุกครั้งที่มีการเรียก API จะสร้าง ticks จนถึงเวลาปัจจุบัน
+    """
+
+    MAX_CATCHUP_TICKS = 5000
+    POINT = 0.01
+    DIGITS = 2
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed or None)
+        self._lock = threading.RLock()
+
+        if self.config.tick_file:
+            self.source = RecordedTickSource(self.config.tick_file, self.config.speed)
+            start_price = self.source.start_price
+        else:
+            self.source = SyntheticTickSource(self.config, self.rng)
+            start_price = self.config.start_price
+
+        aliases = [name.strip() for name in self.config.symbol_aliases.split(",") if name.strip()]
+        self.symbols = [self.config.symbol] + [name for name in aliases if name != self.config.symbol]
+
+        # Market state
+        now = time.time()
+        self.bid = round(start_price - self.config.spread / 2, 2)
+        self.ask = round(self.bid + self.config.spread, 2)
+        self.tick_time = now
+        self.next_tick_at = now
+        self._m1 = np.zeros(max(1024, self.config.history_bars * 2), dtype=RATES_DTYPE)
+        self._m1_count = 0
+        self._seed_history(start_price, now)
+
+        # Account / trading state
+        self.balance = self.config.balance
+        self.positions: Dict[int, Dict[str, Any]] = {}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.deals: deque = deque(maxlen=100000)
+        self._next_ticket = 100000000
+        self._connected = False
+
+        self.stats = {
+            'ticks': 0,
+            'api_calls': 0,
+            'orders_sent': 0,
+            'deals': 0,
+            'requotes': 0,
+            'rejects': 0,
+            'pending_triggered': 0,
+            'sl_tp_closes': 0,
+            'send_latency_ms_total': 0.0
+        }
+        self.started_at = now
+
+    # ===== MARKET =====
+
+    def _seed_history(self, end_price: float, now: float):
+        """M1 bars ย้อนหลัง history_bars แท่ง (random walk ที่จบที่ end_price)"""
+        count = self.config.history_bars
+        if count <= 0:
+            return
+        steps = np.array([self.rng.gauss(0.0, self.config.volatility * 4) for _ in range(count)])
+        closes = end_price - np.concatenate([np.cumsum(steps[::-1])[::-1][1:], [0.0]])
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        wiggle = np.abs([self.rng.gauss(0.0, self.config.volatility * 2) for _ in range(count)])
+        current_minute = int(now // 60) * 60
+        bars = self._m1[:count]
+        bars['time'] = current_minute - 60 * np.arange(count, 0, -1)
+        bars['open'] = np.round(opens, 2)
+        bars['close'] = np.round(closes, 2)
+        bars['high'] = np.round(np.maximum(opens, closes) + wiggle, 2)
+        bars['low'] = np.round(np.minimum(opens, closes) - wiggle, 2)
+        bars['tick_volume'] = [self.rng.randint(50, 400) for _ in range(count)]
+        bars['spread'] = int(round(self.config.spread / self.POINT))
+        self._m1_count = count
+
+    def _append_tick_to_bars(self, timestamp: float, bid: float, volume: int):
+        minute = int(timestamp // 60) * 60
+        if self._m1_count and self._m1[self._m1_count - 1]['time'] == minute:
+            bar = self._m1[self._m1_count - 1]
+            bar['high'] = max(bar['high'], bid)
+            bar['low'] = min(bar['low'], bid)
+            bar['close'] = bid
+            bar['tick_volume'] += volume
+            return
+
+        if self._m1_count >= len(self._m1):
+            keep = len(self._m1) // 2
+            self._m1[:keep] = self._m1[self._m1_count - keep:self._m1_count]
+            self._m1_count = keep
+        self._m1[self._m1_count] = (minute, bid, bid, bid, bid, volume,
+                                    int(round((self.ask - self.bid) / self.POINT)), 0)
+        self._m1_count += 1
+
+    def _advance(self):
+        """สร้าง ticks จนถึงเวลาปัจจุบัน (จำกัดจำนวนต่อครั้ง - ถ้าค้างนานจะข้ามไป)"""
+        now = time.time()
+        generated = 0
+        while self.next_tick_at <= now and generated < self.MAX_CATCHUP_TICKS:
+            bid, ask, volume, gap = self.source.next_tick()
+            self.bid, self.ask = bid, ask
+            self.tick_time = self.next_tick_at
+            self._append_tick_to_bars(self.tick_time, bid, volume)
+            self._on_tick()
+            self.next_tick_at += gap
+            generated += 1
+        if generated >= self.MAX_CATCHUP_TICKS:
+            self.next_tick_at = now
+        self.stats['ticks'] += generated
+
+    def _on_tick(self):
+        """trigger pending orders และ SL/TP ด้วยราคาล่าสุด"""
+        for ticket, order in list(self.orders.items()):
+            order_type, price = order['type'], order['price']
+            triggered = ((order_type == C.ORDER_TYPE_BUY_LIMIT and self.ask <= price) or
+                         (order_type == C.ORDER_TYPE_SELL_LIMIT and self.bid >= price) or
+                         (order_type == C.ORDER_TYPE_BUY_STOP and self.ask >= price) or
+                         (order_type == C.ORDER_TYPE_SELL_STOP and self.bid <= price))
+            if triggered:
+                del self.orders[ticket]
+                is_buy = order_type in (C.ORDER_TYPE_BUY_LIMIT, C.ORDER_TYPE_BUY_STOP)
+                fill = self.ask if is_buy else self.bid
+                self._open_position(ticket, order['symbol'], is_buy, order['volume'], fill,
+                                    order['magic'], order['comment'], order['sl'], order['tp'])
+                self.stats['pending_triggered'] += 1
+
+        for ticket, position in list(self.positions.items()):
+            sl, tp = position['sl'], position['tp']
+            if not sl and not tp:
+                continue
+            if position['is_buy']:
+                hit = (sl and self.bid <= sl) or (tp and self.bid >= tp)
+                price = self.bid
+            else:
+                hit = (sl and self.ask >= sl) or (tp and self.ask <= tp)
+                price = self.ask
+            if hit:
+                self._close_position(ticket, position['volume'], price, "sl/tp")
+                self.stats['sl_tp_closes'] += 1
+
+    def _tick(self, symbol: str) -> Optional[Tick]:
+        if symbol not in self.symbols:
+            return None
+        return Tick(time=int(self.tick_time), bid=self.bid, ask=self.ask, last=0.0, volume=0,
+                    time_msc=int(self.tick_time * 1000), flags=6, volume_real=0.0)
+
+    # ===== ACCOUNT / POSITIONS =====
+
+    def _new_ticket(self) -> int:
+        self._next_ticket += 1
+        return self._next_ticket
+
+    def _position_profit(self, position: Dict[str, Any]) -> Tuple[float, float]:
+        """(price_current, profit)"""
+        if position['is_buy']:
+            price = self.bid
+            profit = (price - position['price_open']) * position['volume'] * self.config.contract_size
+        else:
+            price = self.ask
+            profit = (position['price_open'] - price) * position['volume'] * self.config.contract_size
+        return price, round(profit, 2)
+
+    def _margin(self, volume: float, price: float) -> float:
+        return volume * self.config.contract_size * price / self.config.leverage
+
+    def _account_totals(self) -> Tuple[float, float, float]:
+        """(floating profit, equity, margin)"""
+        profit = sum(self._position_profit(position)[1] for position in self.positions.values())
+        margin = sum(self._margin(position['volume'], position['price_open'])
+                     for position in self.positions.values())
+        return profit, self.balance + profit, margin
+
+    def _record_deal(self, order_ticket: int, position_id: int, is_buy: bool, entry: int, volume: float,
+                     price: float, profit: float, magic: int, symbol: str, comment: str) -> int:
+        deal_ticket = self._new_ticket()
+        self.deals.append(TradeDeal(
+            ticket=deal_ticket, order=order_ticket, time=int(self.tick_time), time_msc=int(self.tick_time * 1000),
+            type=C.DEAL_TYPE_BUY if is_buy else C.DEAL_TYPE_SELL, entry=entry, magic=magic,
+            position_id=position_id, reason=3, volume=volume, price=price, commission=0.0, swap=0.0,
+            profit=profit, fee=0.0, symbol=symbol, comment=comment))
+        self.stats['deals'] += 1
+        return deal_ticket
+
+    def _open_position(self, ticket: int, symbol: str, is_buy: bool, volume: float, price: float,
+                       magic: int, comment: str, sl: float = 0.0, tp: float = 0.0) -> int:
+        self.positions[ticket] = {
+            'ticket': ticket, 'symbol': symbol, 'is_buy': is_buy, 'volume': volume, 'price_open': price,
+            'sl': sl or 0.0, 'tp': tp or 0.0, 'magic': magic, 'comment': comment,
+            'time': self.tick_time, 'time_update': self.tick_time
+        }
+        return self._record_deal(ticket, ticket, is_buy, C.DEAL_ENTRY_IN, volume, price, 0.0, magic, symbol, comment)
+
+    def _close_position(self, ticket: int, volume: float, price: float, comment: str,
+                        order_ticket: Optional[int] = None) -> int:
+        position = self.positions[ticket]
+        direction = 1.0 if position['is_buy'] else -1.0
+        profit = round((price - position['price_open']) * direction * volume * self.config.contract_size, 2)
+        self.balance += profit
+
+        position['volume'] = round(position['volume'] - volume, 2)
+        position['time_update'] = self.tick_time
+        if position['volume'] <= 0:
+            del self.positions[ticket]
+
+        return self._record_deal(order_ticket or self._new_ticket(), ticket, not position['is_buy'],
+                                 C.DEAL_ENTRY_OUT, volume, price, profit, position['magic'],
+                                 position['symbol'], comment)
+
+    def _position_tuple(self, position: Dict[str, Any]) -> TradePosition:
+        price_current, profit = self._position_profit(position)
+        return TradePosition(
+            ticket=position['ticket'], time=int(position['time']), time_msc=int(position['time'] * 1000),
+            time_update=int(position['time_update']),
+            type=C.POSITION_TYPE_BUY if position['is_buy'] else C.POSITION_TYPE_SELL,
+            magic=position['magic'], identifier=position['ticket'], reason=3, volume=position['volume'],
+            price_open=position['price_open'], sl=position['sl'], tp=position['tp'],
+            price_current=price_current, swap=0.0, commission=0.0, profit=profit,
+            symbol=position['symbol'], comment=position['comment'], external_id="")
+
+    def _order_tuple(self, order: Dict[str, Any]) -> TradeOrder:
+        is_buy = order['type'] in (C.ORDER_TYPE_BUY_LIMIT, C.ORDER_TYPE_BUY_STOP)
+        return TradeOrder(
+            ticket=order['ticket'], time_setup=int(order['time']), type=order['type'], state=1,
+            magic=order['magic'], position_id=0, volume_initial=order['volume'], volume_current=order['volume'],
+            price_open=order['price'], sl=order['sl'], tp=order['tp'],
+            price_current=self.ask if is_buy else self.bid, symbol=order['symbol'], comment=order['comment'])
+
+    # ===== MATCHING ENGINE =====
+
+    def _result(self, retcode: int, request: Dict[str, Any], comment: str, order: int = 0, deal: int = 0,
+                volume: float = 0.0, price: float = 0.0) -> OrderSendResult:
+        if retcode != C.TRADE_RETCODE_DONE:
+            self.stats['requotes' if retcode == C.TRADE_RETCODE_REQUOTE else 'rejects'] += 1
+        return OrderSendResult(retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+                               bid=self.bid, ask=self.ask, comment=comment, request_id=self.stats['orders_sent'],
+                               retcode_external=0, request=types.SimpleNamespace(**request))
+
+    def _valid_volume(self, volume: float) -> bool:
+        if volume < 0.01 or volume > 100.0:
+            return False
+        steps = volume / 0.01
+        return abs(steps - round(steps)) <= 0.001
+
+    def _execute(self, request: Dict[str, Any]) -> OrderSendResult:
+        action = request.get('action')
+        symbol = request.get('symbol', self.config.symbol)
+        volume = float(request.get('volume', 0.0) or 0.0)
+        order_type = request.get('type')
+        magic = request.get('magic', 0)
+        comment = request.get('comment', "")
+
+        if action == C.TRADE_ACTION_REMOVE:
+            if self.orders.pop(request.get('order'), None) is None:
+                return self._result(C.TRADE_RETCODE_INVALID, request, "Order not found")
+            return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=request.get('order'))
+
+        if action == C.TRADE_ACTION_SLTP:
+            position = self.positions.get(request.get('position'))
+            if position is None:
+                return self._result(C.TRADE_RETCODE_INVALID, request, "Position not found")
+            position['sl'] = request.get('sl', 0.0) or 0.0
+            position['tp'] = request.get('tp', 0.0) or 0.0
+            position['time_update'] = self.tick_time
+            return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=position['ticket'])
+
+        if action == C.TRADE_ACTION_MODIFY:
+            order = self.orders.get(request.get('order'))
+            if order is None:
+                return self._result(C.TRADE_RETCODE_INVALID, request, "Order not found")
+            for key in ('price', 'sl', 'tp'):
+                if request.get(key):
+                    order[key] = request[key]
+            return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=order['ticket'])
+
+        if symbol not in self.symbols:
+            return self._result(C.TRADE_RETCODE_INVALID, request, "Unknown symbol")
+        if not self._valid_volume(volume):
+            return self._result(C.TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume")
+
+        if action == C.TRADE_ACTION_PENDING:
+            price = request.get('price')
+            if not price or order_type not in (C.ORDER_TYPE_BUY_LIMIT, C.ORDER_TYPE_SELL_LIMIT,
+                                               C.ORDER_TYPE_BUY_STOP, C.ORDER_TYPE_SELL_STOP):
+                return self._result(C.TRADE_RETCODE_INVALID_PRICE, request, "Invalid price")
+            ticket = self._new_ticket()
+            self.orders[ticket] = {
+                'ticket': ticket, 'symbol': symbol, 'type': order_type, 'volume': volume, 'price': price,
+                'sl': request.get('sl', 0.0) or 0.0, 'tp': request.get('tp', 0.0) or 0.0,
+                'magic': magic, 'comment': comment, 'time': self.tick_time
+            }
+            return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=ticket,
+                                volume=volume, price=price)
+
+        if action != C.TRADE_ACTION_DEAL or order_type not in (C.ORDER_TYPE_BUY, C.ORDER_TYPE_SELL):
+            return self._result(C.TRADE_RETCODE_INVALID, request, "Unsupported request")
+
+        # Market fill - slippage ไม่เป็นผลดีเสมอ, requote ถ้าเกิน deviation
+        is_buy = order_type == C.ORDER_TYPE_BUY
+        slippage = self.rng.randint(0, max(0, self.config.slippage_points)) * self.POINT
+        fill = round(self.ask + slippage if is_buy else self.bid - slippage, self.DIGITS)
+        requested = request.get('price')
+        deviation = request.get('deviation', 0) or 0
+        if requested and abs(fill - requested) > deviation * self.POINT + 1e-9:
+            return self._result(C.TRADE_RETCODE_REQUOTE, request, "Requote")
+
+        position_ticket = request.get('position')
+        if position_ticket:
+            position = self.positions.get(position_ticket)
+            if position is None:
+                return self._result(C.TRADE_RETCODE_INVALID, request, "Position not found")
+            if position['is_buy'] == is_buy or volume > position['volume'] + 1e-9:
+                return self._result(C.TRADE_RETCODE_INVALID, request, "Invalid close request")
+            order_ticket = self._new_ticket()
+            deal = self._close_position(position_ticket, volume, fill, comment, order_ticket)
+            return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=order_ticket,
+                                deal=deal, volume=volume, price=fill)
+
+        _, equity, margin = self._account_totals()
+        if equity - margin < self._margin(volume, fill):
+            return self._result(C.TRADE_RETCODE_NO_MONEY, request, "No money")
+
+        ticket = self._new_ticket()
+        deal = self._open_position(ticket, symbol, is_buy, volume, fill, magic, comment,
+                                   request.get('sl', 0.0), request.get('tp', 0.0))
+        return self._result(C.TRADE_RETCODE_DONE, request, "Request executed", order=ticket,
+                            deal=deal, volume=volume, price=fill)
+
+    # ===== MetaTrader5 API =====
+
+    def initialize(self, *args, **kwargs) -> bool:
+        self._connected = True
+        return True
+
+    def login(self, *args, **kwargs) -> bool:
+        return True
+
+    def shutdown(self):
+        self._connected = False
+
+    def version(self) -> Tuple[int, int, str]:
+        return (500, 4000, "simulator")
+
+    def last_error(self) -> Tuple[int, str]:
+        return (1, "Success")
+
+    def terminal_info(self) -> Optional[TerminalInfo]:
+        if not self._connected:
+            return None
+        return TerminalInfo(connected=True, trade_allowed=True, name="MT5 Simulator", company="Simulator",
+                            path="", build=4000, ping_last=int(self.config.latency_ms * 1000))
+
+    def account_info(self) -> Optional[AccountInfo]:
+        with self._lock:
+            self._advance()
+            profit, equity, margin = self._account_totals()
+            return AccountInfo(
+                login=10000001, trade_mode=C.ACCOUNT_TRADE_MODE_DEMO, leverage=self.config.leverage,
+                limit_orders=500, margin_so_mode=0, trade_allowed=True, trade_expert=True,
+                balance=round(self.balance, 2), credit=0.0, profit=round(profit, 2), equity=round(equity, 2),
+                margin=round(margin, 2), margin_free=round(equity - margin, 2),
+                margin_level=round(equity / margin * 100, 2) if margin else 0.0,
+                margin_so_call=50.0, margin_so_so=30.0, currency="USD", name="Simulator",
+                server="Simulator-Demo", company="Simulator")
+
+    def symbols_get(self, group: Optional[str] = None) -> Tuple[SymbolInfo, ...]:
+        return tuple(self.symbol_info(name) for name in self.symbols)
+
+    def symbols_total(self) -> int:
+        return len(self.symbols)
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        return symbol in self.symbols
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        if symbol not in self.symbols:
+            return None
+        with self._lock:
+            self._advance()
+            return SymbolInfo(
+                name=symbol, description="Gold vs US Dollar (simulated)", visible=True, select=True,
+                digits=self.DIGITS, point=self.POINT, spread=int(round((self.ask - self.bid) / self.POINT)),
+                trade_mode=C.SYMBOL_TRADE_MODE_FULL, filling_mode=C.SYMBOL_FILLING_FOK | C.SYMBOL_FILLING_IOC,
+                trade_contract_size=self.config.contract_size, trade_tick_size=self.POINT,
+                trade_tick_value=self.POINT * self.config.contract_size, trade_stops_level=0,
+                volume_min=0.01, volume_max=100.0, volume_step=0.01, swap_long=0.0, swap_short=0.0,
+                margin_initial=0.0, session_deals=0, session_buy_orders=0, session_sell_orders=0,
+                bid=self.bid, ask=self.ask, currency_base="XAU", currency_profit="USD")
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        with self._lock:
+            self.stats['api_calls'] += 1
+            self._advance()
+            return self._tick(symbol)
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Optional[np.ndarray]:
+        if symbol not in self.symbols or timeframe not in TIMEFRAME_SECONDS:
+            return None
+        with self._lock:
+            self._advance()
+            m1 = self._m1[:self._m1_count].copy()
+
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        if seconds == 60:
+            bars = m1
+        else:
+            buckets = m1['time'] // seconds
+            starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+            ends = np.append(starts[1:], len(m1)) - 1
+            bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+            bars['time'] = buckets[starts] * seconds
+            bars['open'] = m1['open'][starts]
+            bars['close'] = m1['close'][ends]
+            bars['high'] = np.maximum.reduceat(m1['high'], starts)
+            bars['low'] = np.minimum.reduceat(m1['low'], starts)
+            bars['tick_volume'] = np.add.reduceat(m1['tick_volume'], starts)
+            bars['spread'] = m1['spread'][ends]
+
+        end = len(bars) - start_pos
+        if end <= 0:
+            return np.zeros(0, dtype=RATES_DTYPE)
+        return bars[max(0, end - count):end]
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Optional[np.ndarray]:
+        rates = self.copy_rates_from_pos(symbol, timeframe, 0, self._m1_count)
+        if rates is None:
+            return None
+        stamp = date_from.timestamp() if isinstance(date_from, datetime) else float(date_from)
+        rates = rates[rates['time'] <= stamp]
+        return rates[-count:]
+
+    def positions_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None,
+                      group: Optional[str] = None) -> Tuple[TradePosition, ...]:
+        with self._lock:
+            self.stats['api_calls'] += 1
+            self._advance()
+            positions = self.positions.values()
+            if ticket is not None:
+                positions = [p for p in positions if p['ticket'] == ticket]
+            if symbol is not None:
+                positions = [p for p in positions if p['symbol'] == symbol]
+            return tuple(self._position_tuple(p) for p in positions)
+
+    def positions_total(self) -> int:
+        with self._lock:
+            return len(self.positions)
+
+    def orders_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None,
+                   group: Optional[str] = None) -> Tuple[TradeOrder, ...]:
+        with self._lock:
+            self._advance()
+            orders = self.orders.values()
+            if ticket is not None:
+                orders = [o for o in orders if o['ticket'] == ticket]
+            if symbol is not None:
+                orders = [o for o in orders if o['symbol'] == symbol]
+            return tuple(self._order_tuple(o) for o in orders)
+
+    def orders_total(self) -> int:
+        with self._lock:
+            return len(self.orders)
+
+    def history_deals_get(self, date_from: Any = None, date_to: Any = None, group: Optional[str] = None,
+                          ticket: Optional[int] = None, position: Optional[int] = None) -> Tuple[TradeDeal, ...]:
+        with self._lock:
+            deals = list(self.deals)
+        if position is not None:
+            return tuple(d for d in deals if d.position_id == position)
+        if ticket is not None:
+            return tuple(d for d in deals if d.order == ticket)
+        start = date_from.timestamp() if isinstance(date_from, datetime) else float(date_from or 0)
+        end = date_to.timestamp() if isinstance(date_to, datetime) else float(date_to or time.time() + 1)
+        return tuple(d for d in deals if start <= d.time <= end)
+
+    def history_deals_total(self, date_from: Any = None, date_to: Any = None) -> int:
+        return len(self.history_deals_get(date_from, date_to))
+
+    def order_check(self, request: Dict[str, Any]) -> types.SimpleNamespace:
+        with self._lock:
+            _, equity, margin = self._account_totals()
+        return types.SimpleNamespace(retcode=0, balance=self.balance, equity=equity, margin=margin,
+                                     margin_free=equity - margin, comment="Done", request=request)
+
+    def order_send(self, request: Dict[str, Any]) -> OrderSendResult:
+        """ส่ง order - หน่วงตาม latency (นอก lock เพื่อให้ส่งพร้อมกันได้) แล้ว match ที่ราคาปัจจุบัน"""
+        started = time.perf_counter()
+        delay_ms = max(0.0, self.config.latency_ms +
+                       self.rng.uniform(-self.config.latency_jitter_ms, self.config.latency_jitter_ms))
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+
+        with self._lock:
+            self.stats['orders_sent'] += 1
+            self._advance()
+            result = self._execute(dict(request))
+            self.stats['send_latency_ms_total'] += (time.perf_counter() - started) * 1000
+            return result
+
+    # ===== MODULE =====
+
+    def get_simulator_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-6)
+            sent = self.stats['orders_sent']
+            return {
+                **self.stats,
+                'bid': self.bid,
+                'ask': self.ask,
+                'open_positions': len(self.positions),
+                'pending_orders': len(self.orders),
+                'balance': round(self.balance, 2),
+                'orders_per_second': sent / elapsed,
+                'ticks_per_second': self.stats['ticks'] / elapsed,
+                'average_send_ms': self.stats['send_latency_ms_total'] / sent if sent else 0.0
+            }
+
+    def as_module(self) -> types.ModuleType:
+        """MetaTrader5 module ที่ชี้มายัง simulator นี้"""
+        module = types.ModuleType("MetaTrader5")
+        module.__doc__ = "MetaTrader5 simulator backend"
+        for name, value in MT5_CONSTANTS.items():
+            setattr(module, name, value)
+        for name in ('initialize', 'login', 'shutdown', 'version', 'last_error', 'terminal_info',
+                     'account_info', 'symbols_get', 'symbols_total', 'symbol_select', 'symbol_info',
+                     'symbol_info_tick', 'copy_rates_from_pos', 'copy_rates_from', 'positions_get',
+                     'positions_total', 'orders_get', 'orders_total', 'history_deals_get',
+                     'history_deals_total', 'order_check', 'order_send'):
+            setattr(module, name, getattr(self, name))
+        module.simulator = self
+        return module
+
+_active_simulator: Optional[MT5Simulator] = None
+
+def install_simulator(config: Optional[SimulatorConfig] = None) -> MT5Simulator:
+    """
+    ติดตั้ง simulator เป็น MetaTrader5 module - ต้องเรียกก่อน import components
+    (module ที่ import MetaTrader5 ไปแล้วจะยังใช้ตัวเดิม)
+    """
+    global _active_simulator
+    existing = sys.modules.get("MetaTrader5")
+    if existing is not None and not hasattr(existing, 'simulator'):
+        print("⚠️ MetaTrader5 was imported before the simulator - modules already loaded keep the real terminal")
+
+    _active_simulator = MT5Simulator(config)
+    sys.modules["MetaTrader5"] = _active_simulator.as_module()
+    return _active_simulator
+
+def get_active_simulator() -> Optional[MT5Simulator]:
+    return _active_simulator
+
+# ===== LOAD DRIVER =====
+
+class PipelineLoadDriver:
+    """
+    ส่ง market orders เข้า order executor ตามอัตราคงที่ และวัด latency ของแต่ละช่วง:
+    submit → fill (executor) และ fill → position tracker เห็น position (change event)
+    """
+
+    def __init__(self, order_executor: Any, position_tracker: Any = None, orders_per_second: float = 5.0,
+                 volume: float = 0.01, symbol: Optional[str] = None):
+        self.order_executor = order_executor
+        self.position_tracker = position_tracker
+        self.orders_per_second = orders_per_second
+        self.volume = volume
+        self.symbol = symbol or getattr(order_executor, 'symbol', "XAUUSD.v")
+
+        self.is_running = False
+        self.driver_thread = None
+        self._lock = threading.Lock()
+        self._fill_times: Dict[int, float] = {}
+        self._seen_times: Dict[int, float] = {}     # tracker เห็นก่อน callback ของ fill
+        self.submit_to_fill_ms: deque = deque(maxlen=10000)
+        self.fill_to_tracker_ms: deque = deque(maxlen=10000)
+        self.submitted = 0
+        self.filled = 0
+        self.rejected = 0
+        self.started_at = 0.0
+
+    def start(self):
+        if self.is_running:
+            return
+        if self.position_tracker is not None and hasattr(self.position_tracker, 'subscribe_changes'):
+            self.position_tracker.subscribe_changes(self._on_position_change)
+        self.is_running = True
+        self.started_at = time.perf_counter()
+        self.driver_thread = threading.Thread(target=self._driver_loop, name="PipelineLoadDriver", daemon=True)
+        self.driver_thread.start()
+        print(f"🏋️ Load driver started: {self.orders_per_second:.1f} orders/s")
+
+    def stop(self):
+        self.is_running = False
+        if self.driver_thread:
+            self.driver_thread.join(timeout=5)
+        if self.position_tracker is not None and hasattr(self.position_tracker, 'unsubscribe_changes'):
+            self.position_tracker.unsubscribe_changes(self._on_position_change)
+
+    def _driver_loop(self):
+        from mt5_integration.order_executor import OrderRequest, OrderType
+        import uuid
+
+        interval = 1.0 / max(self.orders_per_second, 1e-6)
+        next_send = time.perf_counter()
+        while self.is_running:
+            now = time.perf_counter()
+            if now < next_send:
+                time.sleep(min(next_send - now, 0.05))
+                continue
+            next_send += interval
+
+            order_type = OrderType.MARKET_BUY if self.submitted % 2 == 0 else OrderType.MARKET_SELL
+            order_request = OrderRequest(
+                request_id=str(uuid.uuid4()), timestamp=datetime.now(), symbol=self.symbol,
+                order_type=order_type, volume=self.volume, comment="load", deviation=50
+            )
+            submitted_at = time.perf_counter()
+            future = self.order_executor.submit_order_async(order_request)
+            self.submitted += 1
+            future.add_done_callback(lambda f, started=submitted_at: self._on_filled(f, started))
+
+    def _on_filled(self, future, submitted_at: float):
+        order_request = future.result()
+        now = time.perf_counter()
+        result = order_request.result
+        with self._lock:
+            if result is not None and result.success:
+                self.filled += 1
+                self.submit_to_fill_ms.append((now - submitted_at) * 1000)
+                if result.ticket:
+                    seen_at = self._seen_times.pop(result.ticket, None)
+                    if seen_at is None:
+                        self._fill_times[result.ticket] = now
+                    else:
+                        self.fill_to_tracker_ms.append(0.0)
+            else:
+                self.rejected += 1
+
+    def _on_position_change(self, event):
+        if getattr(event.change_type, 'value', '') != 'OPENED':
+            return
+        now = time.perf_counter()
+        with self._lock:
+            filled_at = self._fill_times.pop(event.ticket, None)
+            if filled_at is not None:
+                self.fill_to_tracker_ms.append((now - filled_at) * 1000)
+            elif len(self._seen_times) < 10000:
+                self._seen_times[event.ticket] = now
+
+    @staticmethod
+    def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        p50, p90, p99 = np.percentile(np.asarray(values, dtype=np.float64), (50, 90, 99))
+        return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(max(values))}
+
+    def get_report(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.perf_counter() - self.started_at, 1e-6) if self.started_at else 0.0
+            return {
+                'elapsed_seconds': elapsed,
+                'submitted': self.submitted,
+                'filled': self.filled,
+                'rejected': self.rejected,
+                'fills_per_second': self.filled / elapsed if elapsed else 0.0,
+                'submit_to_fill_ms': self._percentiles(list(self.submit_to_fill_ms)),
+                'fill_to_tracker_ms': self._percentiles(list(self.fill_to_tracker_ms))
+            }
@@ -11,6 +11,8 @@ REAL ORDER EXECUTOR - Live MT5 Order Execution System
 - Position Management แบบ Real-time
 - Error Handling สำหรับ Live Trading
 - Order Validation และ Risk Checks
+- Pipelined Execution: validate / สร้าง request ล่วงหน้าระหว่างที่ order ก่อนหน้ากำลังส่ง
+  แล้วส่งผ่าน submission workers หลายตัว (order ของ ticket เดียวกันเรียงลำดับเสมอ)
 """
 
 import MetaTrader5 as mt5
@@ -18,18 +20,29 @@ import threading
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import queue
+import numpy as np
 from collections import deque
+from concurrent.futures import Future
 
 # Internal imports
 from config.settings import get_system_settings
 from config.trading_params import get_trading_parameters
 from utilities.professional_logger import setup_component_logger
 from utilities.error_handler import handle_trading_errors, ErrorCategory, ErrorSeverity
+from mt5_integration.basket_executor import (
+    BasketLeg, BasketLegResult, BasketResult, execute_basket, position_ordering_key
+)
+from mt5_integration.symbol_cache import SymbolMetadata, get_symbol_cache
+
+DEFAULT_SUBMISSION_WORKERS = 4
+DEFAULT_ORDER_TIMEOUT = 10.0                 # วินาทีที่ execute_signal รอผล
+LATENCY_SAMPLES = 1000                       # samples ล่าสุดต่อ order type
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
 
 class OrderStatus(Enum):
     """สถานะ Order"""
@@ -80,13 +93,82 @@ class OrderRequest:
     type_filling: int = mt5.ORDER_FILLING_IOC
     type_time: int = mt5.ORDER_TIME_GTC
     expiration: Optional[datetime] = None
+    position_ticket: Optional[int] = None    # order ที่อ้างถึง position เดิม (ปิด / แก้ไข)
     status: OrderStatus = OrderStatus.PENDING
     result: Optional[ExecutionResult] = None
+    submitted_at: Optional[float] = None     # perf_counter ตอนเข้า pipeline
+    
+    @property
+    def ordering_key(self) -> str:
+        """orders ที่ key เดียวกันถูกส่งตามลำดับบน worker เดียวกัน"""
+        return position_ordering_key(self.position_ticket) if self.position_ticket else self.request_id
+
+class ExecutionLatencyTracker:
+    """Latency (submit → fill, order_send round trip) และ slippage ล่าสุดต่อ order type"""
+    
+    def __init__(self, max_samples: int = LATENCY_SAMPLES):
+        self.max_samples = max_samples
+        self._samples: Dict[str, Dict[str, deque]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, order_type: str, submit_to_fill_ms: float, send_ms: float, slippage: float):
+        with self._lock:
+            samples = self._samples.get(order_type)
+            if samples is None:
+                samples = {name: deque(maxlen=self.max_samples)
+                           for name in ('submit_to_fill_ms', 'send_ms', 'slippage')}
+                self._samples[order_type] = samples
+            samples['submit_to_fill_ms'].append(submit_to_fill_ms)
+            samples['send_ms'].append(send_ms)
+            samples['slippage'].append(slippage)
+    
+    @staticmethod
+    def _percentiles(values: np.ndarray) -> Dict[str, float]:
+        p50, p90, p99 = np.percentile(values, (50, 90, 99))
+        return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99),
+                'max': float(values.max()), 'mean': float(values.mean())}
+    
+    def summary(self) -> Dict[str, Any]:
+        """percentiles ต่อ order type + histogram ของ submit → fill latency รวม"""
+        with self._lock:
+            snapshot = {order_type: {name: np.array(values, dtype=np.float64)
+                                     for name, values in samples.items()}
+                        for order_type, samples in self._samples.items()}
+        
+        by_type = {}
+        all_latency = []
+        for order_type, samples in snapshot.items():
+            if not len(samples['submit_to_fill_ms']):
+                continue
+            all_latency.append(samples['submit_to_fill_ms'])
+            by_type[order_type] = {
+                'count': int(len(samples['submit_to_fill_ms'])),
+                'submit_to_fill_ms': self._percentiles(samples['submit_to_fill_ms']),
+                'send_ms': self._percentiles(samples['send_ms']),
+                'slippage': self._percentiles(samples['slippage'])
+            }
+        
+        histogram = {}
+        if all_latency:
+            latency = np.concatenate(all_latency)
+            edges = (0,) + LATENCY_BUCKETS_MS + (float('inf'),)
+            counts, _ = np.histogram(latency, bins=edges)
+            histogram = {
+                (f"<{int(upper)}ms" if upper != float('inf') else f">={int(lower)}ms"): int(count)
+                for lower, upper, count in zip(edges[:-1], edges[1:], counts)
+            }
+        
+        return {'by_order_type': by_type, 'latency_histogram': histogram}
+    
+    def average_slippage(self) -> float:
+        with self._lock:
+            values = [value for samples in self._samples.values() for value in samples['slippage']]
+        return sum(values) / len(values) if values else 0.0
 
 class RealOrderExecutor:
     """Real Order Executor - ส่ง Orders จริง"""
     
-    def __init__(self):
+    def __init__(self, submission_workers: int = DEFAULT_SUBMISSION_WORKERS):
         self.logger = setup_component_logger("RealOrderExecutor")
         self.settings = get_system_settings()
         self.trading_params = get_trading_parameters()
@@ -116,6 +198,14 @@ class RealOrderExecutor:
         self.executed_orders: deque = deque(maxlen=1000)
         self.execution_lock = threading.Lock()
         
+        # Submission pipeline - หนึ่ง queue ต่อ worker (ordering key เดียวกันไป worker เดียวกัน)
+        self.submission_workers = max(1, submission_workers)
+        self.order_timeout = DEFAULT_ORDER_TIMEOUT
+        self.submission_lanes: List[queue.Queue] = []
+        self.submission_threads: List[threading.Thread] = []
+        self._pending_results: Dict[str, Future] = {}
+        self.latency_tracker = ExecutionLatencyTracker()
+        
         # Statistics
         self.stats = {
             'total_orders': 0,
@@ -125,6 +215,7 @@ class RealOrderExecutor:
             'total_volume': 0.0,
             'total_commission': 0.0,
             'average_slippage': 0.0,
+            'baskets_executed': 0,
             'last_execution_time': None
         }
         
@@ -139,6 +230,10 @@ class RealOrderExecutor:
                 raise RuntimeError(f"❌ ไม่สามารถเลือก Symbol {self.symbol}")
         
         self.symbol_info = symbol_info
+        
+        # Symbol metadata + request templates (ไม่เรียก symbol_info ทุก order)
+        self.symbol_cache = get_symbol_cache()
+        self.symbol_cache.put(SymbolMetadata.from_mt5(symbol_info))
         self.logger.info(f"✅ Symbol {self.symbol} พร้อมใช้งาน")
     
     @handle_trading_errors(ErrorCategory.TRADING_LOGIC, ErrorSeverity.HIGH)
@@ -152,7 +247,20 @@ class RealOrderExecutor:
             self.is_running = True
             self.stop_event.clear()
             
-            # เริ่ม execution thread
+            # เริ่ม submission workers
+            self.submission_lanes = [queue.Queue() for _ in range(self.submission_workers)]
+            self.submission_threads = []
+            for index, lane in enumerate(self.submission_lanes):
+                worker = threading.Thread(
+                    target=self._submission_loop,
+                    args=(lane,),
+                    name=f"OrderSubmissionThread-{index}",
+                    daemon=True
+                )
+                worker.start()
+                self.submission_threads.append(worker)
+            
+            # เริ่ม execution thread (validate + สร้าง request แล้วส่งต่อให้ workers)
             self.execution_thread = threading.Thread(
                 target=self._execution_loop,
                 name="OrderExecutionThread",
@@ -160,7 +268,7 @@ class RealOrderExecutor:
             )
             self.execution_thread.start()
             
-            self.logger.info("🚀 เริ่ม Real Order Execution Engine")
+            self.logger.info(f"🚀 เริ่ม Real Order Execution Engine ({self.submission_workers} submission workers)")
             return True
             
         except Exception as e:
@@ -172,11 +280,22 @@ class RealOrderExecutor:
         """หยุด Execution Engine"""
         try:
             self.stop_event.set()
-            self.is_running = False
+            with self.execution_lock:
+                # หลังจากนี้ submit_to_lane จะไม่เพิ่มงานหลัง sentinel
+                self.is_running = False
             
             if self.execution_thread and self.execution_thread.is_alive():
                 self.execution_thread.join(timeout=5.0)
             
+            # ส่ง orders ที่ค้างใน lanes ให้จบก่อนหยุด workers
+            for lane in self.submission_lanes:
+                lane.put(None)
+            for worker in self.submission_threads:
+                if worker.is_alive():
+                    worker.join(timeout=5.0)
+            
+            self._fail_pending_orders()
+            
             self.logger.info("⏹️ หยุด Order Execution Engine")
             return True
             
@@ -184,8 +303,30 @@ class RealOrderExecutor:
             self.logger.error(f"❌ ไม่สามารถหยุด Execution Engine: {e}")
             return False
     
+    def _fail_pending_orders(self):
+        """แจ้งผลให้ Futures ที่ยังรออยู่หลังหยุด engine (ไม่ให้ผู้เรียกรอจน timeout)"""
+        # orders ที่ยังไม่ได้เตรียม - ยังไม่ถูกส่งแน่นอน
+        while True:
+            try:
+                order_request = self.order_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._reject_order(order_request, "Execution engine stopped")
+            self.order_queue.task_done()
+        
+        # orders ที่อาจกำลังส่งอยู่ - ไม่รู้ผล
+        with self.execution_lock:
+            pending = list(self._pending_results.values())
+            self._pending_results.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Execution engine stopped before the order completed"))
+    
     def _execution_loop(self):
-        """Loop หลักสำหรับ Execute Orders"""
+        """
+        Loop หลักสำหรับ Execute Orders - validate และสร้าง MT5 request
+        แล้วส่งต่อให้ submission worker (ไม่รอ order_send)
+        """
         self.logger.info("🔄 เริ่ม Order Execution Loop")
         
         while not self.stop_event.is_set():
@@ -196,8 +337,10 @@ class RealOrderExecutor:
                 except queue.Empty:
                     continue
                 
-                # Execute Order
-                self._execute_order_request(order_request)
+                # Validate + สร้าง request ระหว่างที่ orders ก่อนหน้ากำลังส่ง
+                mt5_request = self._prepare_order_request(order_request)
+                if mt5_request is not None:
+                    self._lane_for(order_request).put((order_request, mt5_request))
                 
                 # Mark task as done
                 self.order_queue.task_done()
@@ -206,14 +349,77 @@ class RealOrderExecutor:
                 self.logger.error(f"❌ ข้อผิดพลาดใน Execution Loop: {e}")
                 time.sleep(1)
     
-    def execute_signal(self, trading_signal) -> Dict[str, Any]:
-        """Execute Signal (เชื่อมต่อกับ Signal Generator)"""
+    def _lane_for(self, order_request: OrderRequest) -> queue.Queue:
+        """เลือก submission lane ตาม ordering key"""
+        return self._lane_for_key(order_request.ordering_key)
+    
+    def _lane_for_key(self, ordering_key: str) -> queue.Queue:
+        return self.submission_lanes[hash(ordering_key) % len(self.submission_lanes)]
+    
+    def submit_to_lane(self, ordering_key: str, task: Callable[[], Any]) -> Future:
+        """
+        รัน task บน submission lane ของ ordering key (ต่อคิวหลัง orders ของ key เดียวกัน)
+        Engine ไม่ทำงาน หรือเรียกจาก worker ของ lane นั้นเอง - รันทันทีบน thread ที่เรียก
+        (ต่อคิวแล้วรอผลบน worker เดียวกันจะค้างตลอดไป)
+        """
+        future: Future = Future()
+        
+        def run():
+            try:
+                future.set_result(task())
+            except Exception as e:
+                future.set_exception(e)
+        
+        with self.execution_lock:
+            if self.is_running and self.submission_lanes:
+                index = hash(ordering_key) % len(self.submission_lanes)
+                if self.submission_threads[index] is not threading.current_thread():
+                    self.submission_lanes[index].put(run)
+                    return future
+        
+        run()
+        return future
+    
+    def _submission_loop(self, lane: queue.Queue):
+        """Submission worker - ส่ง orders ที่เตรียมแล้ว (หรือ lane task) ตามลำดับของ lane"""
+        while True:
+            item = lane.get()
+            try:
+                if item is None:
+                    break
+                if callable(item):
+                    item()
+                    continue
+                order_request, mt5_request = item
+                self._send_prepared_order(order_request, mt5_request)
+            except Exception as e:
+                self.logger.error(f"❌ ข้อผิดพลาดใน Submission Worker: {e}")
+            finally:
+                lane.task_done()
+    
+    def execute_signal(self, trading_signal, wait: bool = True) -> Dict[str, Any]:
+        """
+        Execute Signal (เชื่อมต่อกับ Signal Generator)
+        
+        ถ้า Execution Engine ทำงานอยู่ order จะถูกส่งผ่าน pipeline
+        wait=False คืนทันทีหลังเข้า queue
+        """
         try:
             # แปลง Trading Signal เป็น Order Request
             order_request = self._create_order_from_signal(trading_signal)
             
-            # Execute Order แบบ synchronous
-            self._execute_order_request(order_request)
+            if self.is_running:
+                future = self.submit_order_async(order_request)
+                if not wait:
+                    return {'success': True, 'queued': True, 'request_id': order_request.request_id}
+                if not self._wait_for_order(order_request, future):
+                    # ยังไม่รู้ผล - order อาจยัง fill ได้ ผู้เรียกต้องตรวจสอบด้วย request_id
+                    return {'success': False, 'pending': True, 'status': "UNKNOWN",
+                            'error': "Execution timeout - order may still fill",
+                            'request_id': order_request.request_id}
+            else:
+                # Engine ไม่ทำงาน - Execute Order แบบ synchronous
+                self._execute_order_request(order_request)
             
             # Return result
             if order_request.result and order_request.result.success:
@@ -237,6 +443,7 @@ class RealOrderExecutor:
     def submit_order(self, order_request: OrderRequest) -> bool:
         """ส่ง Order เข้า Queue"""
         try:
+            order_request.submitted_at = time.perf_counter()
             self.order_queue.put(order_request)
             self.logger.info(f"📤 ส่ง Order เข้า Queue: {order_request.request_id}")
             return True
@@ -244,45 +451,101 @@ class RealOrderExecutor:
             self.logger.error(f"❌ ไม่สามารถส่ง Order เข้า Queue: {e}")
             return False
     
+    def submit_order_async(self, order_request: OrderRequest) -> Future:
+        """ส่ง Order เข้า Queue - คืน Future ที่ได้ OrderRequest (พร้อม result) เมื่อ execute เสร็จ"""
+        future: Future = Future()
+        with self.execution_lock:
+            self._pending_results[order_request.request_id] = future
+        
+        if not self.submit_order(order_request):
+            with self.execution_lock:
+                self._pending_results.pop(order_request.request_id, None)
+            order_request.status = OrderStatus.REJECTED
+            order_request.result = ExecutionResult(success=False, error_message="Failed to queue order")
+            future.set_result(order_request)
+        return future
+    
+    def _wait_for_order(self, order_request: OrderRequest, future: Future) -> bool:
+        """รอผลของ order ใน pipeline - หมดเวลาจะเลิกรอและถอด Future ออกจาก _pending_results"""
+        try:
+            future.result(timeout=self.order_timeout)
+            return True
+        except Exception:
+            with self.execution_lock:
+                self._pending_results.pop(order_request.request_id, None)
+            self.logger.warning(
+                f"⏳ Order {order_request.request_id} ยังไม่มีผลหลัง {self.order_timeout}s "
+                f"(status: {order_request.status.value})"
+            )
+            return False
+    
     @handle_trading_errors(ErrorCategory.TRADING_LOGIC, ErrorSeverity.HIGH)
     def _execute_order_request(self, order_request: OrderRequest):
-        """Execute Order Request"""
+        """Execute Order Request (synchronous บน thread ที่เรียก)"""
+        if order_request.submitted_at is None:
+            order_request.submitted_at = time.perf_counter()
+        
+        mt5_request = self._prepare_order_request(order_request)
+        if mt5_request is not None:
+            self._send_prepared_order(order_request, mt5_request)
+    
+    def _prepare_order_request(self, order_request: OrderRequest) -> Optional[Dict[str, Any]]:
+        """Validate และสร้าง MT5 request - คืน None ถ้า order ถูก reject"""
         try:
             order_request.status = OrderStatus.VALIDATING
             
-            # Validate Order
-            if not self._validate_order_request(order_request):
-                order_request.status = OrderStatus.REJECTED
-                order_request.result = ExecutionResult(
-                    success=False,
-                    error_message="Order validation failed"
-                )
-                return
-            
-            order_request.status = OrderStatus.SENDING
+            # Validate Order (ปิด / แก้ไข position เดิม ไม่ต้องผ่านเงื่อนไขของ order เปิดใหม่)
+            if order_request.position_ticket is None and not self._validate_order_request(order_request):
+                self._reject_order(order_request, "Order validation failed")
+                return None
             
             # สร้าง MT5 Request
             mt5_request = self._create_mt5_request(order_request)
             if not mt5_request:
-                order_request.status = OrderStatus.REJECTED
-                order_request.result = ExecutionResult(
-                    success=False,
-                    error_message="Failed to create MT5 request"
-                )
-                return
+                self._reject_order(order_request, "Failed to create MT5 request")
+                return None
+            
+            return mt5_request
+            
+        except Exception as e:
+            self._reject_order(order_request, f"Execution error: {e}")
+            self.logger.error(f"❌ ไม่สามารถ execute order: {e}")
+            return None
+    
+    def _send_prepared_order(self, order_request: OrderRequest, mt5_request: Dict[str, Any]):
+        """ส่ง MT5 request ที่เตรียมแล้ว และบันทึกผล / latency / slippage"""
+        try:
+            order_request.status = OrderStatus.SENDING
+            self._refresh_market_price(order_request, mt5_request)
             
             # ส่ง Order ไปยัง MT5
             execution_start = datetime.now()
+            send_started = time.perf_counter()
             result = mt5.order_send(mt5_request)
+            send_finished = time.perf_counter()
             execution_end = datetime.now()
             
             # ประมวลผล Result
-            order_request.result = self._process_mt5_result(result, execution_start, execution_end)
+            order_request.result = self._process_mt5_result(result, execution_start, execution_end,
+                                                            mt5_request.get("price"))
+            
+            with self.execution_lock:
+                if order_request.result.success:
+                    order_request.status = OrderStatus.EXECUTED
+                    self.stats['successful_orders'] += 1
+                    self.stats['total_volume'] += order_request.result.volume
+                else:
+                    order_request.status = OrderStatus.REJECTED
+                    self.stats['failed_orders'] += 1
             
             if order_request.result.success:
-                order_request.status = OrderStatus.EXECUTED
-                self.stats['successful_orders'] += 1
-                self.stats['total_volume'] += order_request.result.volume
+                submitted_at = order_request.submitted_at or send_started
+                self.latency_tracker.record(
+                    order_request.order_type.value,
+                    submit_to_fill_ms=(send_finished - submitted_at) * 1000,
+                    send_ms=(send_finished - send_started) * 1000,
+                    slippage=order_request.result.slippage
+                )
                 
                 self.logger.info(
                     f"✅ Order executed: Ticket #{order_request.result.ticket} "
@@ -290,9 +553,6 @@ class RealOrderExecutor:
                     f"@ {order_request.result.price:.2f}"
                 )
             else:
-                order_request.status = OrderStatus.REJECTED
-                self.stats['failed_orders'] += 1
-                
                 self.logger.error(
                     f"❌ Order rejected: {order_request.result.error_message} "
                     f"Code: {order_request.result.error_code}"
@@ -313,6 +573,35 @@ class RealOrderExecutor:
                 error_message=f"Execution error: {e}"
             )
             self.logger.error(f"❌ ไม่สามารถ execute order: {e}")
+        
+        finally:
+            self._resolve_pending(order_request)
+    
+    def _refresh_market_price(self, order_request: OrderRequest, mt5_request: Dict[str, Any]):
+        """ใช้ราคา tick ล่าสุดตอนส่ง (order อาจรอใน lane หลังเตรียม request)"""
+        if order_request.order_type not in (OrderType.MARKET_BUY, OrderType.MARKET_SELL):
+            return
+        
+        tick = mt5.symbol_info_tick(order_request.symbol)
+        if not tick:
+            return
+        
+        price = tick.ask if order_request.order_type == OrderType.MARKET_BUY else tick.bid
+        symbol_meta = self.symbol_cache.get(order_request.symbol)
+        mt5_request["price"] = symbol_meta.normalize_price(price) if symbol_meta else price
+    
+    def _reject_order(self, order_request: OrderRequest, message: str):
+        """Reject order ก่อนส่ง"""
+        order_request.status = OrderStatus.REJECTED
+        order_request.result = ExecutionResult(success=False, error_message=message)
+        self._resolve_pending(order_request)
+    
+    def _resolve_pending(self, order_request: OrderRequest):
+        """แจ้งผลให้ Future ที่รอ order นี้ (ถ้ามี)"""
+        with self.execution_lock:
+            future = self._pending_results.pop(order_request.request_id, None)
+        if future is not None and not future.done():
+            future.set_result(order_request)
     
     def _create_order_from_signal(self, trading_signal) -> OrderRequest:
         """สร้าง Order Request จาก Trading Signal"""
@@ -342,15 +631,9 @@ class RealOrderExecutor:
             if order_request.symbol != self.symbol:
                 return False
             
-            # ตรวจสอบ Volume
-            if order_request.volume < self.symbol_info.volume_min:
-                return False
-            if order_request.volume > self.symbol_info.volume_max:
-                return False
-            
-            # ตรวจสอบ Volume Step
-            volume_steps = order_request.volume / self.symbol_info.volume_step
-            if abs(volume_steps - round(volume_steps)) > 0.001:
+            # ตรวจสอบ Volume / Volume Step
+            symbol_meta = self.symbol_cache.get(order_request.symbol)
+            if not symbol_meta or not symbol_meta.is_valid_volume(order_request.volume):
                 return False
             
             # ตรวจสอบ Market Status
@@ -394,38 +677,34 @@ class RealOrderExecutor:
                 mt5_type = mt5.ORDER_TYPE_BUY_LIMIT if order_request.order_type == OrderType.PENDING_BUY else mt5.ORDER_TYPE_SELL_LIMIT
                 price = order_request.price or tick.ask
             
-            # สร้าง request
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": order_request.symbol,
-                "volume": order_request.volume,
-                "type": mt5_type,
-                "price": price,
-                "deviation": order_request.deviation,
-                "magic": order_request.magic_number,
-                "comment": order_request.comment,
-                "type_time": order_request.type_time,
-                "type_filling": order_request.type_filling,
-            }
-            
-            # เพิ่ม SL/TP ถ้ามี (แต่ตาม requirement ไม่ใช้)
-            if order_request.stop_loss:
-                request["sl"] = order_request.stop_loss
-            
-            if order_request.take_profit:
-                request["tp"] = order_request.take_profit
+            # สร้าง request จาก template (SL/TP ใส่เฉพาะถ้ามี - ตาม requirement ไม่ใช้)
+            request = self.symbol_cache.build_request(
+                order_request.symbol, mt5.TRADE_ACTION_DEAL, mt5_type,
+                price=price, volume=order_request.volume,
+                sl=order_request.stop_loss or 0.0, tp=order_request.take_profit or 0.0,
+                deviation=order_request.deviation, magic=order_request.magic_number,
+                comment=order_request.comment, type_time=order_request.type_time,
+                type_filling=order_request.type_filling
+            )
+            if request is None:
+                return None
             
             # เพิ่ม expiration ถ้ามี
             if order_request.expiration:
                 request["expiration"] = int(order_request.expiration.timestamp())
             
+            # order ที่อ้างถึง position เดิม (ปิด / แก้ไข)
+            if order_request.position_ticket:
+                request["position"] = order_request.position_ticket
+            
             return request
             
         except Exception as e:
             self.logger.error(f"❌ ไม่สามารถสร้าง MT5 request: {e}")
             return None
     
-    def _process_mt5_result(self, mt5_result, start_time: datetime, end_time: datetime) -> ExecutionResult:
+    def _process_mt5_result(self, mt5_result, start_time: datetime, end_time: datetime,
+                            requested_price: Optional[float] = None) -> ExecutionResult:
         """ประมวลผล MT5 Result"""
         try:
             if not mt5_result:
@@ -444,7 +723,8 @@ class RealOrderExecutor:
                     price=mt5_result.price,
                     volume=mt5_result.volume,
                     execution_time=end_time,
-                    slippage=abs(mt5_result.price - mt5_result.request.price) if hasattr(mt5_result, 'request') else 0.0
+                    slippage=abs(mt5_result.price - requested_price) if requested_price else
+                             abs(mt5_result.price - mt5_result.request.price) if hasattr(mt5_result, 'request') else 0.0
                 )
             else:
                 # Error codes mapping
@@ -511,7 +791,11 @@ class RealOrderExecutor:
         )
     
     def close_position(self, ticket: int, volume: Optional[float] = None) -> bool:
-        """ปิด Position"""
+        """
+        ปิด Position
+        
+        ส่งผ่าน pipeline (lane เดียวกับ orders อื่นของ ticket นี้) ถ้า Execution Engine ทำงานอยู่
+        """
         try:
             # ดึงข้อมูล position
             positions = mt5.positions_get(ticket=ticket)
@@ -520,45 +804,83 @@ class RealOrderExecutor:
                 return False
             
             position = positions[0]
-            close_volume = volume or position.volume
             
-            # สร้าง close request
-            if position.type == mt5.POSITION_TYPE_BUY:
-                order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(position.symbol).bid
-            else:
-                order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(position.symbol).ask
-            
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": position.symbol,
-                "volume": close_volume,
-                "type": order_type,
-                "position": ticket,
-                "price": price,
-                "magic": position.magic,
-                "comment": f"Close_{ticket}",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
+            # สร้าง close request (ฝั่งตรงข้ามของ position)
+            order_request = OrderRequest(
+                request_id=str(uuid.uuid4()),
+                timestamp=datetime.now(),
+                symbol=position.symbol,
+                order_type=OrderType.MARKET_SELL if position.type == mt5.POSITION_TYPE_BUY else OrderType.MARKET_BUY,
+                volume=volume or position.volume,
+                magic_number=position.magic,
+                comment=f"Close_{ticket}",
+                position_ticket=ticket
+            )
             
             # ส่ง close order
-            result = mt5.order_send(request)
+            if self.is_running:
+                future = self.submit_order_async(order_request)
+                if not self._wait_for_order(order_request, future):
+                    return False
+            else:
+                self._execute_order_request(order_request)
             
-            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+            result = order_request.result
+            if result and result.success:
                 self.logger.info(f"✅ ปิด Position #{ticket} สำเร็จ")
                 return True
             else:
-                self.logger.error(f"❌ ไม่สามารถปิด Position #{ticket}: {result.retcode if result else 'No result'}")
+                self.logger.error(f"❌ ไม่สามารถปิด Position #{ticket}: "
+                                  f"{result.error_message if result else 'No result'}")
                 return False
                 
         except Exception as e:
             self.logger.error(f"❌ ไม่สามารถปิด Position #{ticket}: {e}")
             return False
     
+    def execute_basket(self, legs: List[BasketLeg]) -> BasketResult:
+        """
+        Execute หลายขาพร้อมกัน (grid / martingale / ปิดหลาย positions)
+        ดึง symbol และราคาครั้งเดียว แล้วส่งทุกขาแบบขนาน
+        """
+        basket = execute_basket(legs, on_leg_result=self._record_basket_leg, lane_submit=self.submit_to_lane)
+        
+        with self.execution_lock:
+            self.stats['baskets_executed'] += 1
+            if basket.legs:
+                self.stats['last_execution_time'] = datetime.now()
+        
+        self.logger.info(
+            f"🧺 Basket {basket.basket_id}: {basket.successful_count}/{len(basket.legs)} legs "
+            f"in {basket.elapsed_ms:.0f}ms"
+        )
+        return basket
+    
+    def _record_basket_leg(self, leg_result: BasketLegResult):
+        """บันทึกสถิติของหนึ่งขาใน basket"""
+        with self.execution_lock:
+            self.stats['total_orders'] += 1
+            if leg_result.success:
+                self.stats['successful_orders'] += 1
+                self.stats['total_volume'] += leg_result.volume
+            else:
+                self.stats['failed_orders'] += 1
+            self.stats['success_rate'] = self.stats['successful_orders'] / self.stats['total_orders']
+        
+        if leg_result.success:
+            direction = "BUY" if leg_result.leg.is_buy else "SELL"
+            self.latency_tracker.record(
+                f"BASKET_{leg_result.leg.kind.value}_{direction}",
+                submit_to_fill_ms=leg_result.elapsed_ms,
+                send_ms=leg_result.elapsed_ms,
+                slippage=leg_result.slippage
+            )
+    
     def get_execution_statistics(self) -> Dict[str, Any]:
-        """ดึงสถิติการ Execute"""
+        """ดึงสถิติการ Execute (รวม latency percentiles / slippage ต่อ order type)"""
+        self.stats['average_slippage'] = self.latency_tracker.average_slippage()
+        latency = self.latency_tracker.summary()
+        
         return {
             'total_orders': self.stats['total_orders'],
             'successful_orders': self.stats['successful_orders'],
@@ -566,8 +888,13 @@ class RealOrderExecutor:
             'success_rate': self.stats['success_rate'],
             'total_volume': self.stats['total_volume'],
             'average_slippage': self.stats['average_slippage'],
+            'baskets_executed': self.stats['baskets_executed'],
             'last_execution_time': self.stats['last_execution_time'],
             'queue_size': self.order_queue.qsize(),
+            'in_flight': sum(lane.qsize() for lane in self.submission_lanes),
+            'submission_workers': self.submission_workers,
+            'latency_by_order_type': latency['by_order_type'],
+            'latency_histogram': latency['latency_histogram'],
             'is_running': self.is_running
         }
     
@@ -611,9 +938,9 @@ class RealOrderExecutor:
 
 # ===== FACTORY FUNCTION =====
 
-def get_smart_order_executor() -> RealOrderExecutor:
+def get_smart_order_executor(submission_workers: int = DEFAULT_SUBMISSION_WORKERS) -> RealOrderExecutor:
     """Factory function สำหรับสร้าง Real Order Executor"""
-    return RealOrderExecutor()
+    return RealOrderExecutor(submission_workers=submission_workers)
 
 # ===== MAIN TESTING =====
 
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MT5 SNAPSHOT BUS - Shared Terminal Snapshot Service
+==================================================
+ดึงข้อมูลจาก MT5 terminal เพียงครั้งเดียวต่อรอบ แล้วแจกจ่ายให้ทุก component
+แทนที่การเรียก mt5.positions_get / mt5.symbol_info_tick แยกกันในแต่ละ thread
+
+🎯 FEATURES:
+- Poll ticks ครั้งเดียวต่อรอบ - positions เฉพาะเมื่อมี subscriber ต้องการ
+- Positions / account ที่ไม่มีใคร subscribe ดึงเมื่อถูกอ่าน (cache ตาม TTL)
+- Snapshot แบบ immutable พร้อม version number
+- Fallback ไปเรียก MT5 โดยตรงเมื่อ bus ยังไม่ทำงานหรือข้อมูลเก่าเกินไป
+- Subscriber callbacks เมื่อมี snapshot ใหม่
+- นับจำนวน terminal calls ที่ประหยัดได้ต่อวินาที
+
+เชื่อมต่อไปยัง:
+- position_management/position_tracker.py
+- intelligent_recovery/recovery_engine.py
+- market_intelligence/market_analyzer.py
+- adaptive_entries/signal_generator.py
+- mt5_integration/market_data_stream.py
+"""
+
+import MetaTrader5 as mt5
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Optional, Callable, Any, Tuple, Mapping
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class MT5Snapshot:
+    """Snapshot ข้อมูล terminal ณ รอบใดรอบหนึ่ง (immutable)"""
+    version: int
+    timestamp: float
+    ticks: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    positions: Optional[Tuple[Any, ...]] = ()
+    account: Optional[Any] = None
+    positions_polled: bool = False      # positions ถูกดึงในรอบนี้หรือไม่
+
+    @property
+    def age_seconds(self) -> float:
+        """อายุของ snapshot (วินาที)"""
+        return time.time() - self.timestamp
+
+    def get_tick(self, symbol: str) -> Optional[Any]:
+        """ดึง tick ของ symbol จาก snapshot"""
+        return self.ticks.get(symbol)
+
+    def get_positions(self, symbol: Optional[str] = None) -> Optional[Tuple[Any, ...]]:
+        """
+        ดึง positions จาก snapshot (กรองตาม symbol ได้)
+        None ถ้า positions_get ล้มเหลวหรือรอบนี้ไม่ได้ดึง positions
+        """
+        return _filter_positions(self.positions if self.positions_polled else None, symbol)
+
+def _filter_positions(positions: Optional[Tuple[Any, ...]], symbol: Optional[str]) -> Optional[Tuple[Any, ...]]:
+    """กรอง positions ตาม symbol (None ผ่านไปตามเดิม)"""
+    if positions is None or symbol is None:
+        return positions
+    return tuple(pos for pos in positions if pos.symbol == symbol)
+
+class MT5SnapshotBus:
+    """
+    Snapshot Bus - poll MT5 ครั้งเดียวต่อรอบและ publish ให้ทุก component อ่าน
+    """
+
+    def __init__(self, poll_interval: float = 1.0, max_snapshot_age: float = 2.0,
+                 positions_ttl: Optional[float] = None, account_ttl: float = 1.0):
+        # ค่าเริ่มต้นตาม consumer ที่ช้าที่สุด (position tracker / recovery engine รอบละ 1 วินาที)
+        self.poll_interval = poll_interval
+        self.max_snapshot_age = max_snapshot_age
+        self.positions_ttl = poll_interval if positions_ttl is None else positions_ttl
+        self.account_ttl = account_ttl
+
+        # Snapshot ปัจจุบัน (แทนที่ทั้ง object ทุกรอบ - อ่านได้โดยไม่ต้อง lock)
+        self._snapshot = MT5Snapshot(version=0, timestamp=0.0)
+        self._symbols: set = set()
+        self._symbols_lock = threading.Lock()
+        self._update_condition = threading.Condition()
+
+        # Subscribers (callbacks ที่ต้องการ positions ในทุก snapshot)
+        self._subscribers: List[Callable[[MT5Snapshot], None]] = []
+        self._position_subscribers: set = set()
+        
+        # Lazy reads - (เวลาที่ดึง, ค่า) ของ positions / account ล่าสุด
+        self._positions_cache: Tuple[float, Optional[Tuple[Any, ...]]] = (0.0, None)
+        self._account_cache: Tuple[float, Optional[Any]] = (0.0, None)
+        self._read_lock = threading.Lock()
+
+        # Threading
+        self.is_running = False
+        self.bus_thread: Optional[threading.Thread] = None
+
+        # สถิติ terminal calls
+        self.start_time: Optional[float] = None
+        self.poll_cycles = 0
+        self.terminal_calls = 0       # calls ที่ bus เรียก terminal จริง
+        self.snapshot_reads = 0       # reads ที่ตอบจาก snapshot
+        self.fallback_calls = 0       # reads ที่ต้องเรียก terminal โดยตรง
+        self.read_fetches = 0         # reads ที่ cache หมดอายุ - bus ดึงให้ (นับใน terminal_calls)
+        self.poll_errors = 0
+        self._stats_lock = threading.Lock()
+
+        print("📡 MT5 Snapshot Bus initialized")
+
+    def start(self):
+        """เริ่มการ poll terminal"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.start_time = time.time()
+        self.bus_thread = threading.Thread(
+            target=self._bus_loop,
+            daemon=True,
+            name="MT5SnapshotBus"
+        )
+        self.bus_thread.start()
+
+        print("✅ MT5 Snapshot Bus started")
+
+    def stop(self):
+        """หยุดการ poll terminal"""
+        self.is_running = False
+        if self.bus_thread and self.bus_thread.is_alive():
+            self.bus_thread.join(timeout=5)
+
+        print("⏹️ MT5 Snapshot Bus stopped")
+
+    def register_symbol(self, symbol: str):
+        """เพิ่ม symbol ที่ต้องดึง tick ในแต่ละรอบ"""
+        if symbol in self._symbols:
+            return
+        with self._symbols_lock:
+            self._symbols = self._symbols | {symbol}
+
+    def subscribe(self, callback: Callable[[MT5Snapshot], None], positions: bool = False):
+        """
+        สมัครรับ snapshot ใหม่ทุกรอบ
+        
+        positions=True ให้ bus ดึง positions ทุกรอบ (เรียกซ้ำเพื่อเปลี่ยนค่าได้)
+        """
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        if positions:
+            self._position_subscribers.add(callback)
+        else:
+            self._position_subscribers.discard(callback)
+
+    def unsubscribe(self, callback: Callable[[MT5Snapshot], None]):
+        """ยกเลิกการรับ snapshot"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+        self._position_subscribers.discard(callback)
+
+    def _count(self, name: str, amount: int = 1):
+        """เพิ่มตัวนับสถิติ (เรียกจากหลาย threads)"""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _bus_loop(self):
+        """Loop หลักของการ poll terminal"""
+        while self.is_running:
+            cycle_start = time.time()
+
+            try:
+                self.poll_once()
+            except Exception as e:
+                self._count('poll_errors')
+                print(f"❌ Snapshot bus poll error: {e}")
+
+            elapsed = time.time() - cycle_start
+            time.sleep(max(self.poll_interval - elapsed, 0.0))
+
+    def poll_once(self) -> MT5Snapshot:
+        """
+        Poll terminal หนึ่งรอบและ publish snapshot ใหม่
+        
+        ดึง positions เฉพาะเมื่อมี subscriber ต้องการ - account ดึงเมื่อถูกอ่านเท่านั้น
+        """
+        symbols = self._symbols
+
+        ticks = {}
+        for symbol in symbols:
+            tick = mt5.symbol_info_tick(symbol)
+            if tick:
+                ticks[symbol] = tick
+        self._count('terminal_calls', len(symbols))
+
+        positions_polled = bool(self._position_subscribers)
+        positions = self._fetch_positions() if positions_polled else None
+
+        snapshot = MT5Snapshot(
+            version=self._snapshot.version + 1,
+            timestamp=time.time(),
+            ticks=MappingProxyType(ticks),
+            positions=positions,
+            account=self._account_cache[1],
+            positions_polled=positions_polled
+        )
+
+        self._snapshot = snapshot
+        self._count('poll_cycles')
+
+        with self._update_condition:
+            self._update_condition.notify_all()
+
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Snapshot subscriber error: {e}")
+
+        return snapshot
+
+    # ===== LAZY TERMINAL READS =====
+
+    def _fetch_positions(self) -> Optional[Tuple[Any, ...]]:
+        """เรียก positions_get หนึ่งครั้งและเก็บ cache (ไม่ cache ผลที่ล้มเหลว)"""
+        positions = mt5.positions_get()
+        self._count('terminal_calls')
+        if positions is None:
+            return None
+        positions = tuple(positions)
+        self._positions_cache = (time.time(), positions)
+        return positions
+
+    def _cached_positions(self) -> Optional[Tuple[Any, ...]]:
+        """positions จาก cache ถ้ายังไม่หมด TTL - ไม่งั้นดึงใหม่"""
+        with self._read_lock:
+            fetched_at, positions = self._positions_cache
+            if positions is not None and time.time() - fetched_at <= self.positions_ttl:
+                self._count('snapshot_reads')
+                return positions
+            self._count('read_fetches')
+            return self._fetch_positions()
+
+    def _cached_account(self) -> Optional[Any]:
+        """account จาก cache ถ้ายังไม่หมด TTL - ไม่งั้นดึงใหม่"""
+        with self._read_lock:
+            fetched_at, account = self._account_cache
+            if account is not None and time.time() - fetched_at <= self.account_ttl:
+                self._count('snapshot_reads')
+                return account
+            account = mt5.account_info()
+            self._count('terminal_calls')
+            self._count('read_fetches')
+            if account is not None:
+                self._account_cache = (time.time(), account)
+            return account
+
+    # ===== READ API =====
+
+    def _fresh_snapshot(self) -> Optional[MT5Snapshot]:
+        """คืน snapshot ปัจจุบันถ้ายังใหม่พอ"""
+        snapshot = self._snapshot
+        if not self.is_running or snapshot.version == 0:
+            return None
+        if snapshot.age_seconds > self.max_snapshot_age:
+            return None
+        return snapshot
+
+    def get_snapshot(self) -> MT5Snapshot:
+        """ดึง snapshot ล่าสุด (อาจเป็น version 0 ถ้ายังไม่เคย poll)"""
+        return self._snapshot
+
+    def wait_for_update(self, last_version: int, timeout: float = 1.0) -> MT5Snapshot:
+        """รอจนกว่าจะมี snapshot ที่ใหม่กว่า last_version"""
+        with self._update_condition:
+            if self._snapshot.version <= last_version:
+                self._update_condition.wait(timeout)
+        return self._snapshot
+
+    def get_tick(self, symbol: str) -> Optional[Any]:
+        """ดึง tick ล่าสุด - จาก snapshot หรือ MT5 โดยตรง"""
+        self.register_symbol(symbol)
+
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None and symbol in snapshot.ticks:
+            self._count('snapshot_reads')
+            return snapshot.ticks[symbol]
+
+        self._count('fallback_calls')
+        return mt5.symbol_info_tick(symbol)
+
+    def get_positions(self, symbol: Optional[str] = None) -> Optional[Tuple[Any, ...]]:
+        """
+        ดึง positions - จาก snapshot, cache (TTL) หรือ MT5 โดยตรง
+        None ถ้า terminal ตอบล้มเหลว
+        """
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None and snapshot.positions_polled and snapshot.positions is not None:
+            self._count('snapshot_reads')
+            return snapshot.get_positions(symbol)
+
+        return _filter_positions(self._cached_positions(), symbol)
+
+    def get_account_info(self) -> Optional[Any]:
+        """ดึงข้อมูลบัญชี - จาก cache (TTL) หรือ MT5 โดยตรง"""
+        return self._cached_account()
+
+    def get_bus_statistics(self) -> Dict[str, Any]:
+        """ดึงสถิติของ snapshot bus"""
+        uptime = time.time() - self.start_time if self.start_time else 0.0
+        # reads ที่ตอบโดยไม่เรียก terminal ลบด้วย calls ที่ bus เรียกเกินกว่าที่ถูกอ่าน
+        calls_saved = self.snapshot_reads + self.read_fetches - self.terminal_calls
+
+        return {
+            'is_running': self.is_running,
+            'snapshot_version': self._snapshot.version,
+            'snapshot_age_seconds': round(self._snapshot.age_seconds, 3) if self._snapshot.version else None,
+            'poll_cycles': self.poll_cycles,
+            'symbols': sorted(self._symbols),
+            'subscribers': len(self._subscribers),
+            'position_subscribers': len(self._position_subscribers),
+            'terminal_calls': self.terminal_calls,
+            'snapshot_reads': self.snapshot_reads,
+            'fallback_calls': self.fallback_calls,
+            'read_fetches': self.read_fetches,
+            'poll_errors': self.poll_errors,
+            'calls_saved': calls_saved,
+            'calls_saved_per_second': round(calls_saved / uptime, 2) if uptime > 0 else 0.0
+        }
+
+# === GLOBAL INSTANCE ===
+_global_snapshot_bus: Optional[MT5SnapshotBus] = None
+
+def get_snapshot_bus() -> MT5SnapshotBus:
+    """ดึง Snapshot Bus แบบ Singleton"""
+    global _global_snapshot_bus
+    if _global_snapshot_bus is None:
+        _global_snapshot_bus = MT5SnapshotBus()
+    return _global_snapshot_bus
+
+def start_snapshot_bus(symbols: Optional[List[str]] = None) -> MT5SnapshotBus:
+    """เริ่ม Snapshot Bus พร้อม symbols ที่ต้องการ"""
+    bus = get_snapshot_bus()
+    for symbol in symbols or []:
+        bus.register_symbol(symbol)
+    bus.start()
+    return bus
+
+def stop_snapshot_bus():
+    """หยุด Snapshot Bus"""
+    if _global_snapshot_bus is not None:
+        _global_snapshot_bus.stop()
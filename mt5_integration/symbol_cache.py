@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SYMBOL CACHE - Symbol Metadata Cache and Order Request Templates
+===============================================================
+เก็บข้อมูล symbol ที่ไม่ค่อยเปลี่ยน (point, digits, volume step, filling modes,
+contract size) ไว้ในหน่วยความจำพร้อม TTL และบันทึกลงไฟล์สำหรับ warm start
+แทนการเรียก mt5.symbol_info ซ้ำในทุก order / ทุก tick
+
+🎯 FEATURES:
+- SymbolMetadata: ข้อมูล static ของ symbol (serialize เป็น JSON ได้)
+- TTL ต่อ symbol + invalidate ทั้งหมดเมื่อ reconnect
+- Persist ลง symbol_metadata_cache.json (ข้าง order_config_cache.json)
+- Order request templates ต่อ (symbol, action, order type) - ตอนส่งเติมแค่ price / volume / SL / TP
+- normalize_volume / normalize_price ตาม volume step และ digits
+
+เชื่อมต่อไปยัง:
+- mt5_integration/mt5_connector.py (get_symbol_info, send_order)
+- mt5_integration/order_executor.py (validation / สร้าง request)
+- mt5_integration/basket_executor.py (price context)
+- adaptive_entries/signal_generator.py (_get_current_market_data)
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Safe MT5 import
+try:
+    import MetaTrader5 as mt5
+    MT5_AVAILABLE = True
+except ImportError:
+    MT5_AVAILABLE = False
+    mt5 = None
+
+DEFAULT_CACHE_FILE = "symbol_metadata_cache.json"
+DEFAULT_TTL_SECONDS = 3600.0
+
+# SYMBOL_FILLING_* flags ใน symbol_info.filling_mode
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+@dataclass
+class SymbolMetadata:
+    """ข้อมูล symbol ที่ใช้สร้าง / ตรวจสอบ orders"""
+    name: str
+    digits: int = 5
+    point: float = 0.00001
+    volume_min: float = 0.01
+    volume_max: float = 1000.0
+    volume_step: float = 0.01
+    filling_mode: int = 0
+    trade_mode: int = 0
+    trade_contract_size: float = 100.0
+    trade_tick_size: float = 0.0
+    trade_tick_value: float = 0.0
+    trade_stops_level: int = 0
+    swap_long: float = 0.0
+    swap_short: float = 0.0
+    margin_initial: float = 0.0
+    spread: int = 0
+    visible: bool = False
+    select: bool = False
+    fetched_at: float = 0.0          # epoch seconds
+
+    @classmethod
+    def from_mt5(cls, symbol_info: Any) -> 'SymbolMetadata':
+        """สร้างจากผลของ mt5.symbol_info (field ที่ไม่มีใช้ค่า default)"""
+        values = {f.name: getattr(symbol_info, f.name) for f in fields(cls)
+                  if f.name != 'fetched_at' and hasattr(symbol_info, f.name)}
+        return cls(fetched_at=time.time(), **values)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SymbolMetadata':
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def is_fresh(self, ttl_seconds: float, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.fetched_at) < ttl_seconds
+
+    def preferred_filling(self) -> int:
+        """filling mode ที่ symbol รองรับ (IOC → FOK → RETURN)"""
+        if self.filling_mode & SYMBOL_FILLING_IOC:
+            return mt5.ORDER_FILLING_IOC
+        if self.filling_mode & SYMBOL_FILLING_FOK:
+            return mt5.ORDER_FILLING_FOK
+        return mt5.ORDER_FILLING_RETURN
+
+    def normalize_volume(self, volume: float) -> float:
+        """ปัด volume ตาม volume_step และจำกัดใน [volume_min, volume_max]"""
+        step = self.volume_step or 0.01
+        steps = round(volume / step)
+        decimals = max(0, len(f"{step:.10f}".rstrip('0').split('.')[1]))
+        return round(min(max(steps * step, self.volume_min), self.volume_max), decimals)
+
+    def normalize_price(self, price: float) -> float:
+        return round(price, self.digits)
+
+    def is_valid_volume(self, volume: float) -> bool:
+        if volume < self.volume_min or volume > self.volume_max:
+            return False
+        steps = volume / (self.volume_step or 0.01)
+        return abs(steps - round(steps)) <= 0.001
+
+class SymbolMetadataCache:
+    """
+    Symbol Metadata Cache - TTL + disk persistence + request templates
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 cache_file: Optional[str] = DEFAULT_CACHE_FILE):
+        self.ttl_seconds = ttl_seconds
+        self.cache_file = Path(cache_file) if cache_file else None
+
+        self._metadata: Dict[str, SymbolMetadata] = {}
+        self._templates: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'invalidations': 0,
+            'disk_loaded': 0,
+            'disk_writes': 0
+        }
+
+        self._load_from_disk()
+
+    # ===== METADATA =====
+
+    def get(self, symbol: str, force_refresh: bool = False) -> Optional[SymbolMetadata]:
+        """metadata ของ symbol - ดึงจาก MT5 เมื่อไม่มีใน cache หรือหมดอายุ"""
+        if not force_refresh:
+            metadata = self.get_cached(symbol)
+            if metadata is not None:
+                return metadata
+        return self.refresh(symbol)
+
+    def get_cached(self, symbol: str) -> Optional[SymbolMetadata]:
+        """metadata ใน cache ที่ยังไม่หมดอายุ (ไม่เรียก MT5)"""
+        with self._lock:
+            metadata = self._metadata.get(symbol)
+            if metadata is not None and metadata.is_fresh(self.ttl_seconds):
+                self.stats['hits'] += 1
+                return metadata
+            self.stats['misses'] += 1
+            return None
+
+    def refresh(self, symbol: str) -> Optional[SymbolMetadata]:
+        """ดึง metadata ใหม่จาก MT5 แล้วบันทึกลง cache / disk"""
+        if mt5 is None:
+            return None
+
+        try:
+            symbol_info = mt5.symbol_info(symbol)
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            print(f"❌ Symbol metadata refresh error ({symbol}): {e}")
+            return None
+
+        if not symbol_info:
+            self.stats['refresh_errors'] += 1
+            return None
+
+        metadata = SymbolMetadata.from_mt5(symbol_info)
+        self.put(metadata)
+        return metadata
+
+    def put(self, metadata: SymbolMetadata, persist: bool = True):
+        """บันทึก metadata (templates ของ symbol นี้สร้างใหม่ตอนใช้ครั้งถัดไป)"""
+        with self._lock:
+            self._metadata[metadata.name] = metadata
+            self._drop_templates(metadata.name)
+            self.stats['refreshes'] += 1
+        if persist:
+            self.save()
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """ล้าง cache (ทั้งหมด หรือเฉพาะ symbol) - เรียกเมื่อ reconnect"""
+        with self._lock:
+            if symbol is None:
+                self._metadata.clear()
+                self._templates.clear()
+            else:
+                self._metadata.pop(symbol, None)
+                self._drop_templates(symbol)
+            self.stats['invalidations'] += 1
+
+    def _drop_templates(self, symbol: str):
+        for key in [key for key in self._templates if key[0] == symbol]:
+            del self._templates[key]
+
+    # ===== REQUEST TEMPLATES =====
+
+    def get_request_template(self, symbol: str, action: int, order_type: int) -> Optional[Dict[str, Any]]:
+        """template ของ (symbol, action, order type) - ห้ามแก้ dict ที่คืน (ใช้ build_request)"""
+        key = (symbol, action, order_type)
+        with self._lock:
+            template = self._templates.get(key)
+            metadata = self._metadata.get(symbol)
+            if template is not None and metadata is not None and metadata.is_fresh(self.ttl_seconds):
+                return template
+
+        metadata = self.get(symbol)
+        if metadata is None:
+            return None
+
+        template = {
+            "action": action,
+            "symbol": symbol,
+            "type": order_type,
+            "deviation": 3,
+            "magic": 0,
+            "comment": "",
+            "type_time": mt5.ORDER_TIME_GTC,
+        }
+        if action != mt5.TRADE_ACTION_PENDING:
+            template["type_filling"] = metadata.preferred_filling()
+
+        with self._lock:
+            self._templates[key] = template
+        return template
+
+    def build_request(self, symbol: str, action: int, order_type: int, price: float, volume: float,
+                      sl: float = 0.0, tp: float = 0.0, **overrides) -> Optional[Dict[str, Any]]:
+        """
+        MT5 request จาก template - เติม price / volume / SL / TP (ปัดตาม digits / volume step)
+        overrides ที่เป็น None จะถูกข้าม (ใช้ค่าใน template)
+        """
+        template = self.get_request_template(symbol, action, order_type)
+        if template is None:
+            return None
+
+        metadata = self._metadata.get(symbol)
+        request = dict(template)
+        request["price"] = metadata.normalize_price(price) if metadata else price
+        request["volume"] = metadata.normalize_volume(volume) if metadata else volume
+        if sl:
+            request["sl"] = metadata.normalize_price(sl) if metadata else sl
+        if tp:
+            request["tp"] = metadata.normalize_price(tp) if metadata else tp
+        for key, value in overrides.items():
+            if value is not None:
+                request[key] = value
+        return request
+
+    # ===== PERSISTENCE =====
+
+    def _load_from_disk(self):
+        """warm start - โหลด metadata ที่ยังไม่หมดอายุจากไฟล์"""
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            now = time.time()
+            for item in data.get('symbols', {}).values():
+                metadata = SymbolMetadata.from_dict(item)
+                if metadata.is_fresh(self.ttl_seconds, now):
+                    self._metadata[metadata.name] = metadata
+                    self.stats['disk_loaded'] += 1
+
+        except Exception as e:
+            print(f"⚠️ Cannot load symbol metadata cache: {e}")
+
+    def save(self):
+        """เขียน cache ลงไฟล์ (เขียนไฟล์ชั่วคราวแล้ว replace)"""
+        if self.cache_file is None:
+            return
+
+        with self._lock:
+            data = {
+                'saved_at': time.time(),
+                'symbols': {name: asdict(metadata) for name, metadata in self._metadata.items()}
+            }
+
+        try:
+            if self.cache_file.parent and not self.cache_file.parent.exists():
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cache_file.with_suffix(self.cache_file.suffix + ".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+            self.stats['disk_writes'] += 1
+        except Exception as e:
+            print(f"⚠️ Cannot save symbol metadata cache: {e}")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'symbols': len(self._metadata),
+                'templates': len(self._templates),
+                'ttl_seconds': self.ttl_seconds,
+                'cache_file': str(self.cache_file) if self.cache_file else None
+            }
+
+# ===== SINGLETON =====
+
+_symbol_cache: Optional[SymbolMetadataCache] = None
+_symbol_cache_lock = threading.Lock()
+
+def get_symbol_cache() -> SymbolMetadataCache:
+    """Symbol Metadata Cache ที่ใช้ร่วมกันทั้งระบบ"""
+    global _symbol_cache
+    with _symbol_cache_lock:
+        if _symbol_cache is None:
+            _symbol_cache = SymbolMetadataCache()
+        return _symbol_cache
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+POSITION BOOK - Indexed Position Storage with Profit Ladder
+==========================================================
+เก็บ positions พร้อม secondary indexes และ ladder ที่เรียงตาม profit
+อัพเดท index เฉพาะเมื่อค่าที่ index เปลี่ยน - query ใช้เวลา O(k) ตามขนาดผลลัพธ์
+แทนการ scan ทุก position ทุกครั้งที่เรียก
+
+🎯 FEATURES:
+- Secondary indexes: position_type / risk_level / magic_number / entry_reason
+- Profit ladder (sorted list) ทั้งพอร์ตและแยกตาม position_type
+- Range query ตาม profit ด้วย bisect (losing / profitable / hedge candidates)
+- Top / worst performers โดยไม่ต้อง sort ใหม่
+
+เชื่อมต่อไปยัง:
+- position_management/position_tracker.py (RealPositionTracker)
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple, Any
+
+DEFAULT_INDEX_FIELDS = ('position_type', 'risk_level', 'magic_number', 'entry_reason')
+LADDER_PARTITION_FIELD = 'position_type'
+ALL_POSITIONS = None    # key ของ ladder รวมทั้งพอร์ต
+
+class PositionBook:
+    """
+    Position Book - positions ตาม ticket + secondary indexes + profit ladders
+
+    positions ถูกแก้ไขในที่ (in-place) โดย tracker แล้วเรียก update() เพื่อย้าย index
+    """
+
+    def __init__(self, index_fields: Tuple[str, ...] = DEFAULT_INDEX_FIELDS,
+                 partition_field: str = LADDER_PARTITION_FIELD):
+        self.index_fields = tuple(index_fields)
+        self.partition_field = partition_field
+
+        self.positions: Dict[int, Any] = {}
+        self.indexes: Dict[str, Dict[Any, Dict[int, Any]]] = {name: {} for name in self.index_fields}
+
+        # Ladder: [(profit, ticket), ...] เรียงจากน้อยไปมาก
+        self._ladders: Dict[Any, List[Tuple[float, int]]] = {ALL_POSITIONS: []}
+
+        # ค่าที่ใช้ index อยู่ของแต่ละ ticket: (profit, partition, (index values))
+        self._indexed: Dict[int, Tuple[float, Any, Tuple[Any, ...]]] = {}
+        self._lock = threading.RLock()
+
+        # สถิติ
+        self.index_moves = 0
+        self.ladder_moves = 0
+
+    # ===== MUTATION =====
+
+    def add(self, position: Any):
+        """เพิ่ม position ใหม่ (ถ้ามี ticket อยู่แล้วจะ update แทน)"""
+        with self._lock:
+            ticket = position.ticket
+            if ticket in self.positions:
+                self.positions[ticket] = position
+                self.update(position)
+                return
+
+            self.positions[ticket] = position
+            values = self._index_values(position)
+            for name, value in zip(self.index_fields, values):
+                self.indexes[name].setdefault(value, {})[ticket] = position
+
+            profit = position.profit
+            partition = getattr(position, self.partition_field)
+            insort(self._ladders[ALL_POSITIONS], (profit, ticket))
+            insort(self._ladders.setdefault(partition, []), (profit, ticket))
+            self._indexed[ticket] = (profit, partition, values)
+
+    def update(self, position: Any):
+        """ย้าย index ของ position ที่ค่าเปลี่ยน (profit / risk level / ...)"""
+        with self._lock:
+            ticket = position.ticket
+            indexed = self._indexed.get(ticket)
+            if indexed is None:
+                self.add(position)
+                return
+
+            old_profit, old_partition, old_values = indexed
+            values = self._index_values(position)
+
+            if values != old_values:
+                for name, old_value, value in zip(self.index_fields, old_values, values):
+                    if old_value != value:
+                        self._discard_from_index(name, old_value, ticket)
+                        self.indexes[name].setdefault(value, {})[ticket] = position
+                        self.index_moves += 1
+
+            profit = position.profit
+            partition = getattr(position, self.partition_field)
+            if profit != old_profit or partition != old_partition:
+                self._ladder_remove(ALL_POSITIONS, old_profit, ticket)
+                self._ladder_remove(old_partition, old_profit, ticket)
+                insort(self._ladders[ALL_POSITIONS], (profit, ticket))
+                insort(self._ladders.setdefault(partition, []), (profit, ticket))
+                self.ladder_moves += 1
+
+            self._indexed[ticket] = (profit, partition, values)
+
+    def remove(self, ticket: int) -> Optional[Any]:
+        """ลบ position ออกจาก book - คืน position ที่ถูกลบ"""
+        with self._lock:
+            position = self.positions.pop(ticket, None)
+            indexed = self._indexed.pop(ticket, None)
+            if indexed is None:
+                return position
+
+            profit, partition, values = indexed
+            for name, value in zip(self.index_fields, values):
+                self._discard_from_index(name, value, ticket)
+            self._ladder_remove(ALL_POSITIONS, profit, ticket)
+            self._ladder_remove(partition, profit, ticket)
+            return position
+
+    def clear(self):
+        """ล้างข้อมูลทั้งหมด"""
+        with self._lock:
+            self.positions.clear()
+            for index in self.indexes.values():
+                index.clear()
+            self._ladders = {ALL_POSITIONS: []}
+            self._indexed.clear()
+
+    def _index_values(self, position: Any) -> Tuple[Any, ...]:
+        return tuple(getattr(position, name) for name in self.index_fields)
+
+    def _discard_from_index(self, name: str, value: Any, ticket: int):
+        bucket = self.indexes[name].get(value)
+        if bucket is not None:
+            bucket.pop(ticket, None)
+            if not bucket:
+                del self.indexes[name][value]
+
+    def _ladder_remove(self, partition: Any, profit: float, ticket: int):
+        ladder = self._ladders.get(partition)
+        if not ladder:
+            return
+        position = bisect_left(ladder, (profit, ticket))
+        if position < len(ladder) and ladder[position] == (profit, ticket):
+            del ladder[position]
+
+    # ===== QUERIES =====
+
+    def get(self, ticket: int) -> Optional[Any]:
+        return self.positions.get(ticket)
+
+    def by_index(self, name: str, value: Any) -> List[Any]:
+        """positions ที่ field == value (เรียงตามลำดับที่เข้า index)"""
+        with self._lock:
+            return list(self.indexes[name].get(value, {}).values())
+
+    def count_by_index(self, name: str, value: Any) -> int:
+        with self._lock:
+            return len(self.indexes[name].get(value, ()))
+
+    def profit_range(self, lower: Optional[float] = None, upper: Optional[float] = None,
+                     lower_inclusive: bool = True, upper_inclusive: bool = True,
+                     partition: Any = ALL_POSITIONS) -> List[Any]:
+        """
+        positions ที่ profit อยู่ในช่วง [lower, upper] (เรียง profit จากน้อยไปมาก)
+
+        Args:
+            lower / upper: ขอบเขต (None = ไม่จำกัด)
+            lower_inclusive / upper_inclusive: รวมค่าขอบหรือไม่
+            partition: ค่า position_type (None = ทั้งพอร์ต)
+        """
+        with self._lock:
+            ladder = self._ladders.get(partition, [])
+            start, end = self._ladder_bounds(ladder, lower, upper, lower_inclusive, upper_inclusive)
+            return [self.positions[ticket] for _, ticket in ladder[start:end]]
+
+    def count_profit_range(self, lower: Optional[float] = None, upper: Optional[float] = None,
+                           lower_inclusive: bool = True, upper_inclusive: bool = True,
+                           partition: Any = ALL_POSITIONS) -> int:
+        """จำนวน positions ในช่วง profit - O(log n)"""
+        with self._lock:
+            ladder = self._ladders.get(partition, [])
+            start, end = self._ladder_bounds(ladder, lower, upper, lower_inclusive, upper_inclusive)
+            return max(0, end - start)
+
+    @staticmethod
+    def _ladder_bounds(ladder: List[Tuple[float, int]], lower: Optional[float], upper: Optional[float],
+                       lower_inclusive: bool, upper_inclusive: bool) -> Tuple[int, int]:
+        """ตำแหน่ง [start, end) ของช่วง profit ใน ladder"""
+        infinity = float('inf')
+        if lower is None:
+            start = 0
+        elif lower_inclusive:
+            start = bisect_left(ladder, (lower, -infinity))
+        else:
+            start = bisect_right(ladder, (lower, infinity))
+
+        if upper is None:
+            end = len(ladder)
+        elif upper_inclusive:
+            end = bisect_right(ladder, (upper, infinity))
+        else:
+            end = bisect_left(ladder, (upper, -infinity))
+        return start, end
+
+    def top(self, n: int, partition: Any = ALL_POSITIONS) -> List[Any]:
+        """n positions ที่กำไรมากที่สุด (มาก→น้อย)"""
+        with self._lock:
+            ladder = self._ladders.get(partition, [])
+            return [self.positions[ticket] for _, ticket in reversed(ladder[-n:])] if n > 0 else []
+
+    def bottom(self, n: int, partition: Any = ALL_POSITIONS) -> List[Any]:
+        """n positions ที่กำไรน้อยที่สุด (มาก→น้อย เหมือนท้าย list ที่ sort แบบ reverse)"""
+        with self._lock:
+            ladder = self._ladders.get(partition, [])
+            return [self.positions[ticket] for _, ticket in reversed(ladder[:n])] if n > 0 else []
+
+    def get_book_stats(self) -> Dict[str, Any]:
+        """สถิติของ Position Book"""
+        with self._lock:
+            return {
+                'positions': len(self.positions),
+                'index_sizes': {name: len(index) for name, index in self.indexes.items()},
+                'ladders': {
+                    'ALL' if key is ALL_POSITIONS else str(getattr(key, 'value', key)): len(ladder)
+                    for key, ladder in self._ladders.items()
+                },
+                'index_moves': self.index_moves,
+                'ladder_moves': self.ladder_moves
+            }
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, ticket: int) -> bool:
+        return ticket in self.positions
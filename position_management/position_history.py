@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+POSITION HISTORY - Bounded Closed-Position History with Disk Spill
+=================================================================
+เก็บ closed positions ล่าสุดไว้ในหน่วยความจำแบบจำกัดขนาด
+positions ที่เก่ากว่า window จะถูก spill ลงไฟล์ JSONL แบบ append-only
+รายงานใช้ running aggregates และอ่านจาก disk เฉพาะเมื่อต้องการรายการเต็ม
+
+🎯 FEATURES:
+- In-memory window (deque) ขนาดคงที่
+- Spill เป็น batch ลง segment files (แบ่งไฟล์ตามขนาด)
+- Running aggregates: win/loss, gross profit/loss, best/worst, ต่อ entry reason, ต่อวัน
+- Lazy iteration - อ่าน segments ทีละบรรทัดแล้วต่อด้วย window ในหน่วยความจำ
+
+เชื่อมต่อไปยัง:
+- position_management/position_tracker.py (RealPositionTracker.closed_positions)
+"""
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+DEFAULT_HISTORY_DIR = "data/position_history"
+DEFAULT_MEMORY_WINDOW = 1000
+DEFAULT_SPILL_BATCH = 200
+DEFAULT_SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+
+@dataclass
+class ClosedPositionAggregates:
+    """Running aggregates ของ closed positions ทั้งหมด (รวมที่ spill แล้ว)"""
+    count: int = 0
+    wins: int = 0
+    losses: int = 0
+    total_profit: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    total_volume: float = 0.0
+    best_profit: Optional[float] = None
+    worst_profit: Optional[float] = None
+    by_entry_reason: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    daily_profit: Dict[date, float] = field(default_factory=dict)     # ตามวันที่เปิด position
+
+    def add(self, profit: float, volume: float, entry_reason: str, open_day: Optional[date]):
+        self.count += 1
+        self.total_profit += profit
+        self.total_volume += volume
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        else:
+            self.losses += 1
+            self.gross_loss += abs(profit)
+
+        self.best_profit = profit if self.best_profit is None else max(self.best_profit, profit)
+        self.worst_profit = profit if self.worst_profit is None else min(self.worst_profit, profit)
+
+        reason = self.by_entry_reason.setdefault(entry_reason, {'count': 0, 'wins': 0, 'profit': 0.0})
+        reason['count'] += 1
+        reason['wins'] += 1 if profit > 0 else 0
+        reason['profit'] += profit
+
+        if open_day is not None:
+            self.daily_profit[open_day] = self.daily_profit.get(open_day, 0.0) + profit
+
+    def profit_since(self, day: date) -> float:
+        """กำไรรวมของ positions ที่เปิดตั้งแต่วันที่กำหนด"""
+        return sum(profit for open_day, profit in self.daily_profit.items() if open_day >= day)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': (self.wins / self.count) * 100 if self.count else 0.0,
+            'total_profit': self.total_profit,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'avg_win': self.gross_profit / self.wins if self.wins else 0.0,
+            'avg_loss': self.gross_loss / self.losses if self.losses else 0.0,
+            'profit_factor': self.gross_profit / self.gross_loss if self.gross_loss > 0 else 0.0,
+            'total_volume': self.total_volume,
+            'best_profit': self.best_profit or 0.0,
+            'worst_profit': self.worst_profit or 0.0,
+            'by_entry_reason': {reason: dict(values) for reason, values in self.by_entry_reason.items()}
+        }
+
+class ClosedPositionHistory:
+    """
+    Closed Position History - window ในหน่วยความจำ + segments บน disk
+
+    ใช้แทน list เดิม: append() / len() / iteration ทำงานเหมือนเดิม
+    แต่หน่วยความจำคงที่ตาม memory_window
+    """
+
+    def __init__(self, name: str, to_record: Callable[[Any], Dict[str, Any]],
+                 from_record: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 history_dir: str = DEFAULT_HISTORY_DIR,
+                 memory_window: int = DEFAULT_MEMORY_WINDOW,
+                 spill_batch: int = DEFAULT_SPILL_BATCH,
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        self.name = name
+        self.to_record = to_record
+        self.from_record = from_record
+        self.history_dir = Path(history_dir)
+        self.memory_window = memory_window
+        self.spill_batch = max(1, spill_batch)
+        self.segment_max_bytes = segment_max_bytes
+
+        self.recent: Deque[Any] = deque()
+        self.aggregates = ClosedPositionAggregates()
+        self.segments: List[Path] = []
+        self.spilled_count = 0
+        self.spill_errors = 0
+
+        self._session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lock = threading.RLock()
+
+    # ===== WRITE =====
+
+    def append(self, position: Any):
+        """เพิ่ม closed position - spill ส่วนเก่าเมื่อเกิน window"""
+        with self._lock:
+            self.recent.append(position)
+            open_time = getattr(position, 'open_time', None)
+            self.aggregates.add(
+                profit=position.profit,
+                volume=getattr(position, 'volume', 0.0),
+                entry_reason=getattr(position, 'entry_reason', '') or 'Unknown',
+                open_day=open_time.date() if isinstance(open_time, datetime) else None
+            )
+
+            # Spill เป็น batch - ไม่เขียน disk ทุกครั้งที่ปิด position
+            if len(self.recent) >= self.memory_window + self.spill_batch:
+                self._spill(len(self.recent) - self.memory_window)
+
+    def _spill(self, count: int):
+        """เขียน closed positions ที่เก่าที่สุด count ตัวต่อท้าย segment ปัจจุบัน"""
+        batch = [self.recent[index] for index in range(count)]
+        try:
+            lines = "".join(json.dumps(self.to_record(position), ensure_ascii=False) + "\n"
+                            for position in batch)
+            segment = self._current_segment()
+            with open(segment, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except Exception as e:
+            # เขียนไม่ได้ - เก็บไว้ในหน่วยความจำต่อ (ไม่ทิ้งข้อมูล)
+            self.spill_errors += 1
+            print(f"❌ Closed history spill error: {e}")
+            return
+
+        for _ in range(count):
+            self.recent.popleft()
+        self.spilled_count += count
+
+    def _current_segment(self) -> Path:
+        """segment ที่กำลังเขียน (ขึ้นไฟล์ใหม่เมื่อเกิน segment_max_bytes)"""
+        if self.segments:
+            segment = self.segments[-1]
+            if not segment.exists() or segment.stat().st_size < self.segment_max_bytes:
+                return segment
+
+        self.history_dir.mkdir(parents=True, exist_ok=True)
+        segment = self.history_dir / f"closed_{self.name}_{self._session}_{len(self.segments):04d}.jsonl"
+        self.segments.append(segment)
+        return segment
+
+    def flush(self):
+        """spill ทุกอย่างที่เกิน window ทันที"""
+        with self._lock:
+            if len(self.recent) > self.memory_window:
+                self._spill(len(self.recent) - self.memory_window)
+
+    # ===== READ =====
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """ทุก closed position เป็น dict (เก่า→ใหม่) - อ่าน segments แบบ lazy"""
+        with self._lock:
+            segments = list(self.segments)
+            recent = list(self.recent)
+
+        for segment in segments:
+            try:
+                with open(segment, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+            except FileNotFoundError:
+                continue
+
+        for position in recent:
+            yield self.to_record(position)
+
+    def __iter__(self) -> Iterator[Any]:
+        """ทุก closed position (segments แปลงกลับด้วย from_record ถ้ามี)"""
+        with self._lock:
+            recent = list(self.recent)
+            spilled = self.spilled_count
+
+        if spilled and self.from_record is not None:
+            for index, record in enumerate(self.iter_records()):
+                if index >= spilled:
+                    break
+                yield self.from_record(record)
+
+        yield from recent
+
+    def get_recent(self, n: Optional[int] = None) -> List[Any]:
+        """closed positions ล่าสุดในหน่วยความจำ"""
+        with self._lock:
+            recent = list(self.recent)
+        return recent if n is None else recent[-n:]
+
+    def __len__(self) -> int:
+        return self.aggregates.count
+
+    def __bool__(self) -> bool:
+        return self.aggregates.count > 0
+
+    def get_history_stats(self) -> Dict[str, Any]:
+        """สถิติของ history"""
+        with self._lock:
+            return {
+                'total_closed': self.aggregates.count,
+                'in_memory': len(self.recent),
+                'spilled': self.spilled_count,
+                'segments': [str(segment) for segment in self.segments],
+                'disk_bytes': sum(segment.stat().st_size for segment in self.segments if segment.exists()),
+                'spill_errors': self.spill_errors
+            }
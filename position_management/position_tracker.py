@@ -22,12 +22,18 @@ import time
 import statistics
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Set
+from typing import Dict, List, Optional, Tuple, Any, Set, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
 import json
 
+from mt5_integration.snapshot_bus import get_snapshot_bus
+from mt5_integration.basket_executor import BasketLeg, BasketLegKind, BasketResult, execute_basket
+from position_management.position_book import PositionBook
+from position_management.position_history import ClosedPositionHistory
+from utilities.compact_records import slotted_dataclass
+
 class PositionType(Enum):
     """ประเภท Position"""
     BUY = "BUY"
@@ -59,7 +65,16 @@ class RiskLevel(Enum):
     HIGH = "HIGH"
     CRITICAL = "CRITICAL"
 
-@dataclass
+class PositionChangeType(Enum):
+    """ประเภทการเปลี่ยนแปลงของ position จากการ sync"""
+    OPENED = "OPENED"
+    MODIFIED = "MODIFIED"
+    CLOSED = "CLOSED"
+
+# ค่าที่ใช้ตรวจว่า position จาก MT5 เปลี่ยนหรือไม่
+FINGERPRINT_FIELDS = ('price_current', 'profit', 'swap', 'volume')
+
+@slotted_dataclass
 class Position:
     """ข้อมูล Position แบบละเอียด"""
     ticket: int
@@ -113,6 +128,66 @@ class PositionGroup:
     target_profit: float = 0.0
     risk_level: RiskLevel = RiskLevel.MEDIUM
 
+def position_to_record(position: Position) -> Dict[str, Any]:
+    """แปลง Position เป็น dict ที่ JSON serialize ได้ (ใช้กับ closed history)"""
+    return {
+        'ticket': position.ticket,
+        'symbol': position.symbol,
+        'type': position.position_type.value,
+        'volume': position.volume,
+        'open_price': position.open_price,
+        'current_price': position.current_price,
+        'profit': position.profit,
+        'swap': position.swap,
+        'commission': position.commission,
+        'open_time': position.open_time.isoformat(),
+        'magic_number': position.magic_number,
+        'comment': position.comment,
+        'status': position.status.value,
+        'risk_level': position.risk_level.value,
+        'max_profit': position.max_profit,
+        'max_loss': position.max_loss,
+        'duration_seconds': position.duration.total_seconds(),
+        'roi_percent': position.roi_percent,
+        'entry_reason': position.entry_reason,
+        'last_update': position.last_update.isoformat()
+    }
+
+def position_from_record(record: Dict[str, Any]) -> Position:
+    """แปลง dict จาก position_to_record กลับเป็น Position"""
+    return Position(
+        ticket=record['ticket'],
+        symbol=record['symbol'],
+        position_type=PositionType(record['type']),
+        volume=record['volume'],
+        open_price=record['open_price'],
+        current_price=record['current_price'],
+        profit=record['profit'],
+        swap=record.get('swap', 0.0),
+        commission=record.get('commission', 0.0),
+        open_time=datetime.fromisoformat(record['open_time']),
+        magic_number=record.get('magic_number', 0),
+        comment=record.get('comment', ''),
+        status=PositionStatus(record.get('status', PositionStatus.CLOSED.value)),
+        risk_level=RiskLevel(record.get('risk_level', RiskLevel.MEDIUM.value)),
+        max_profit=record.get('max_profit', 0.0),
+        max_loss=record.get('max_loss', 0.0),
+        duration=timedelta(seconds=record.get('duration_seconds', 0.0)),
+        roi_percent=record.get('roi_percent', 0.0),
+        entry_reason=record.get('entry_reason', ''),
+        last_update=datetime.fromisoformat(record['last_update']) if record.get('last_update') else datetime.now()
+    )
+
+@dataclass
+class PositionChangeEvent:
+    """การเปลี่ยนแปลงของ position หนึ่งตัว"""
+    change_type: PositionChangeType
+    ticket: int
+    position: Position
+    previous_profit: Optional[float] = None
+    changed_fields: Tuple[str, ...] = ()
+    timestamp: datetime = field(default_factory=datetime.now)
+
 @dataclass
 class PortfolioMetrics:
     """ตัวชี้วัดพอร์ตโฟลิโอ"""
@@ -152,10 +227,23 @@ class RealPositionTracker:
         self.is_tracking = False
         self.tracking_thread = None
         
-        # Position storage
-        self.positions: Dict[int, Position] = {}
+        # Shared terminal snapshot (แทนการเรียก MT5 ตรงทุกรอบ)
+        self.snapshot_bus = get_snapshot_bus()
+        self.snapshot_bus.register_symbol(symbol)
+        
+        # Order executor (ถ้าเชื่อมต่อ) - ใช้ส่ง basket close orders พร้อมบันทึกสถิติ
+        self.order_executor = None
+        
+        # Position storage (positions อยู่ใน PositionBook พร้อม indexes)
+        self.position_book = PositionBook()
+        self.positions: Dict[int, Position] = self.position_book.positions
         self.position_groups: Dict[str, PositionGroup] = {}
-        self.closed_positions: List[Position] = []
+        # Closed positions - window ในหน่วยความจำ + spill ลง disk (ไม่โตไม่จำกัด)
+        self.closed_positions = ClosedPositionHistory(
+            name=symbol.replace('.', '_'),
+            to_record=position_to_record,
+            from_record=position_from_record
+        )
         
         # Portfolio tracking
         self.portfolio_metrics = PortfolioMetrics()
@@ -175,6 +263,21 @@ class RealPositionTracker:
         # Update intervals
         self.update_interval = 1  # seconds
         self.metrics_update_interval = 10  # seconds
+        self.full_sync_interval = 60  # seconds - คำนวณใหม่ทุกตัวเพื่อให้ duration / risk เดินต่อ
+        
+        # Diff-based sync
+        self._fingerprints: Dict[int, Tuple[float, ...]] = {}
+        self._last_full_sync = 0.0
+        self._change_callbacks: List[Callable[[PositionChangeEvent], None]] = []
+        self.sync_stats = {
+            'syncs': 0,
+            'full_syncs': 0,
+            'skipped': 0,
+            'recomputed': 0,
+            'opened': 0,
+            'modified': 0,
+            'closed': 0
+        }
         
         print(f"📊 Position Tracker initialized for {symbol}")
     
@@ -227,24 +330,36 @@ class RealPositionTracker:
                 time.sleep(5)
     
     def _update_positions(self):
-        """อัพเดท positions จาก MT5"""
+        """
+        อัพเดท positions จาก MT5 (diff-based)
+        
+        เทียบ fingerprint (price_current, profit, swap, volume) ของแต่ละ ticket
+        คำนวณ metrics / risk ใหม่เฉพาะ ticket ที่เปลี่ยน แล้วส่ง change events
+        """
         try:
             # ดึง positions ปัจจุบันจาก MT5
-            mt5_positions = mt5.positions_get(symbol=self.symbol)
+            mt5_positions = self.snapshot_bus.get_positions(self.symbol)
             if mt5_positions is None:
-                mt5_positions = []
+                # positions_get ล้มเหลว - ข้ามรอบนี้ ไม่ถือว่าทุก position ปิดแล้ว
+                return
             
+            now = datetime.now()
+            full_sync = time.time() - self._last_full_sync >= self.full_sync_interval
             current_tickets = set()
+            events: List[PositionChangeEvent] = []
             
             for mt5_pos in mt5_positions:
                 ticket = mt5_pos.ticket
                 current_tickets.add(ticket)
-                
-                # แปลง position type
-                pos_type = PositionType.BUY if mt5_pos.type == mt5.POSITION_TYPE_BUY else PositionType.SELL
+                fingerprint = (mt5_pos.price_current, mt5_pos.profit, mt5_pos.swap, mt5_pos.volume)
+                previous_fingerprint = self._fingerprints.get(ticket)
                 
                 # สร้างหรืออัพเดท position
                 if ticket in self.positions:
+                    if fingerprint == previous_fingerprint and not full_sync:
+                        self.sync_stats['skipped'] += 1
+                        continue
+                    
                     # อัพเดท position ที่มีอยู่
                     position = self.positions[ticket]
                     old_profit = position.profit
@@ -252,14 +367,36 @@ class RealPositionTracker:
                     position.current_price = mt5_pos.price_current
                     position.profit = mt5_pos.profit
                     position.swap = mt5_pos.swap
+                    position.volume = mt5_pos.volume
                     position.commission = mt5_pos.commission
-                    position.last_update = datetime.now()
-                    position.duration = datetime.now() - position.open_time
+                    position.last_update = now
+                    position.duration = now - position.open_time
                     
                     # อัพเดท performance metrics
                     self._update_position_metrics(position, old_profit)
+                    self.position_book.update(position)
+                    self._fingerprints[ticket] = fingerprint
+                    self.sync_stats['recomputed'] += 1
+                    
+                    changed_fields = tuple(
+                        name for name, old, new in zip(FINGERPRINT_FIELDS, previous_fingerprint or (), fingerprint)
+                        if old != new
+                    ) if previous_fingerprint else FINGERPRINT_FIELDS
+                    
+                    if changed_fields:
+                        events.append(PositionChangeEvent(
+                            change_type=PositionChangeType.MODIFIED,
+                            ticket=ticket,
+                            position=position,
+                            previous_profit=old_profit,
+                            changed_fields=changed_fields,
+                            timestamp=now
+                        ))
                     
                 else:
+                    # แปลง position type
+                    pos_type = PositionType.BUY if mt5_pos.type == mt5.POSITION_TYPE_BUY else PositionType.SELL
+                    
                     # สร้าง position ใหม่
                     position = Position(
                         ticket=ticket,
@@ -275,11 +412,16 @@ class RealPositionTracker:
                         magic_number=mt5_pos.magic,
                         comment=mt5_pos.comment,
                         entry_reason=self._determine_entry_reason(mt5_pos.comment),
-                        last_update=datetime.now()
+                        last_update=now
                     )
+                    position.duration = now - position.open_time
                     
-                    self.positions[ticket] = position
+                    # metrics / risk ก่อนเก็บ fingerprint - ไม่งั้นค้างค่า default จนราคาขยับหรือ full sync
+                    self._update_position_metrics(position, position.profit)
+                    self.position_book.add(position)
+                    self._fingerprints[ticket] = fingerprint
                     self.total_trades += 1
+                    events.append(PositionChangeEvent(PositionChangeType.OPENED, ticket, position, timestamp=now))
                     
                     print(f"📈 New position tracked: {ticket} - {pos_type.value} {mt5_pos.volume} {mt5_pos.symbol}")
             
@@ -297,13 +439,45 @@ class RealPositionTracker:
                 
                 # ย้ายไปที่ closed positions
                 self.closed_positions.append(closed_position)
-                del self.positions[ticket]
+                self.position_book.remove(ticket)
+                self._fingerprints.pop(ticket, None)
+                events.append(PositionChangeEvent(
+                    PositionChangeType.CLOSED, ticket, closed_position,
+                    previous_profit=closed_position.profit, timestamp=now
+                ))
                 
                 print(f"🔒 Position closed: {ticket} - P&L: ${closed_position.profit:.2f}")
+            
+            self.sync_stats['syncs'] += 1
+            if full_sync:
+                self.sync_stats['full_syncs'] += 1
+                self._last_full_sync = time.time()
+            
+            self._publish_changes(events)
                 
         except Exception as e:
             print(f"❌ Error updating positions: {e}")
     
+    def subscribe_changes(self, callback: Callable[[PositionChangeEvent], None]):
+        """สมัครรับ position change events (OPENED / MODIFIED / CLOSED)"""
+        if callback not in self._change_callbacks:
+            self._change_callbacks.append(callback)
+    
+    def unsubscribe_changes(self, callback: Callable[[PositionChangeEvent], None]):
+        """ยกเลิกการรับ position change events"""
+        if callback in self._change_callbacks:
+            self._change_callbacks.remove(callback)
+    
+    def _publish_changes(self, events: List[PositionChangeEvent]):
+        """ส่ง change events ให้ subscribers"""
+        for event in events:
+            self.sync_stats[event.change_type.value.lower()] += 1
+            for callback in list(self._change_callbacks):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️ Position change callback error: {e}")
+    
     def _update_position_metrics(self, position: Position, old_profit: float):
         """อัพเดทตัวชี้วัดของ position"""
         try:
@@ -475,7 +649,7 @@ class RealPositionTracker:
         """อัพเดทตัวชี้วัดพอร์ตโฟลิโอ"""
         try:
             # ดึงข้อมูลบัญชี
-            account_info = mt5.account_info()
+            account_info = self.snapshot_bus.get_account_info()
             if not account_info:
                 return
             
@@ -509,14 +683,18 @@ class RealPositionTracker:
             if total_trades > 0:
                 self.portfolio_metrics.win_rate = (self.winning_trades / total_trades) * 100
             
-            # คำนวณ P&L วันนี้
+            closed_summary = self.closed_positions.aggregates.to_dict()
+            self.portfolio_metrics.avg_win = closed_summary['avg_win']
+            self.portfolio_metrics.avg_loss = closed_summary['avg_loss']
+            self.portfolio_metrics.profit_factor = closed_summary['profit_factor']
+            
+            # คำนวณ P&L วันนี้ (closed positions จาก running aggregates)
             today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             today_positions = [pos for pos in self.positions.values() if pos.open_time >= today_start]
-            today_closed = [pos for pos in self.closed_positions if pos.open_time >= today_start]
             
             self.portfolio_metrics.total_pnl_today = (
                 sum(pos.profit for pos in today_positions) +
-                sum(pos.profit for pos in today_closed)
+                self.closed_positions.aggregates.profit_since(today_start.date())
             )
             
             # คำนวณ drawdown
@@ -605,7 +783,7 @@ class RealPositionTracker:
                 risk_score += 15
             
             # Losing positions risk
-            losing_positions = sum(1 for pos in self.positions.values() if pos.profit < 0)
+            losing_positions = self.position_book.count_profit_range(upper=0, upper_inclusive=False)
             if losing_positions > 10:
                 risk_score += 20
             elif losing_positions > 5:
@@ -621,10 +799,7 @@ class RealPositionTracker:
         """ตรวจสอบระดับความเสี่ยง"""
         try:
             # ตรวจสอบ positions ที่มีความเสี่ยงสูง
-            critical_positions = [
-                pos for pos in self.positions.values() 
-                if pos.risk_level == RiskLevel.CRITICAL
-            ]
+            critical_positions = self.get_positions_by_risk(RiskLevel.CRITICAL)
             
             if critical_positions:
                 print(f"🚨 CRITICAL RISK: {len(critical_positions)} positions need attention")
@@ -690,25 +865,33 @@ class RealPositionTracker:
     
     def get_positions_by_type(self, position_type: PositionType) -> List[Position]:
         """ดึง positions ตามประเภท"""
-        return [pos for pos in self.positions.values() if pos.position_type == position_type]
+        if isinstance(position_type, str):
+            position_type = PositionType(position_type)
+        return self.position_book.by_index('position_type', position_type)
     
     def get_losing_positions(self, min_loss: float = 0) -> List[Position]:
-        """ดึง positions ที่ขาดทุน"""
-        return [
-            pos for pos in self.positions.values() 
-            if pos.profit < -min_loss
-        ]
+        """ดึง positions ที่ขาดทุน (เรียงจากขาดทุนมากสุด)"""
+        return self.position_book.profit_range(upper=-min_loss, upper_inclusive=False)
     
     def get_profitable_positions(self, min_profit: float = 0) -> List[Position]:
-        """ดึง positions ที่กำไร"""
-        return [
-            pos for pos in self.positions.values() 
-            if pos.profit > min_profit
-        ]
+        """ดึง positions ที่กำไร (เรียงจากกำไรมากสุด)"""
+        positions = self.position_book.profit_range(lower=min_profit, lower_inclusive=False)
+        positions.reverse()
+        return positions
     
     def get_positions_by_risk(self, risk_level: RiskLevel) -> List[Position]:
         """ดึง positions ตามระดับความเสี่ยง"""
-        return [pos for pos in self.positions.values() if pos.risk_level == risk_level]
+        if isinstance(risk_level, str):
+            risk_level = RiskLevel(risk_level)
+        return self.position_book.by_index('risk_level', risk_level)
+    
+    def get_positions_by_magic(self, magic_number: int) -> List[Position]:
+        """ดึง positions ตาม magic number"""
+        return self.position_book.by_index('magic_number', magic_number)
+    
+    def get_positions_by_entry_reason(self, entry_reason: str) -> List[Position]:
+        """ดึง positions ตามเหตุผลการเข้า"""
+        return self.position_book.by_index('entry_reason', entry_reason)
     
     def get_position_groups(self) -> Dict[str, PositionGroup]:
         """ดึงข้อมูลกลุม positions"""
@@ -730,7 +913,10 @@ class RealPositionTracker:
             'win_rate': (self.winning_trades / max(self.total_trades, 1)) * 100,
             'active_positions': len(self.positions),
             'closed_positions': len(self.closed_positions),
+            'closed_history': self.closed_positions.get_history_stats(),
             'position_groups': len(self.position_groups),
+            'position_book': self.position_book.get_book_stats(),
+            'sync_stats': dict(self.sync_stats),
             'current_profit': self.portfolio_metrics.total_profit,
             'max_drawdown': self.portfolio_metrics.max_drawdown,
             'current_drawdown': self.portfolio_metrics.current_drawdown,
@@ -766,16 +952,25 @@ class RealPositionTracker:
         try:
             opportunities = []
             losing_positions = self.get_losing_positions(50)  # Loss > $50
+            hedge_types = [position_type for position_type in PositionType]
             
             for pos in losing_positions:
-                # หา position ที่สามารถ hedge ได้
-                for other_ticket, other_pos in self.positions.items():
-                    if (other_pos.ticket != pos.ticket and 
-                        other_pos.position_type != pos.position_type and
-                        other_pos.profit > 0):  # Profitable position
+                loss = abs(pos.profit)
+                
+                # หา position ที่สามารถ hedge ได้ - hedge ratio 0.5-2.0 คือกำไรในช่วง loss/2 .. loss*2
+                for hedge_type in hedge_types:
+                    if hedge_type == pos.position_type:
+                        continue
+                    
+                    candidates = self.position_book.profit_range(
+                        lower=loss / 2.0 * (1 - 1e-9), upper=loss * 2.0 * (1 + 1e-9), partition=hedge_type
+                    )
+                    for other_pos in candidates:
+                        if other_pos.profit <= 0:  # Profitable position
+                            continue
                         
                         # คำนวณ hedge ratio
-                        hedge_ratio = abs(pos.profit) / other_pos.profit
+                        hedge_ratio = loss / other_pos.profit
                         
                         if 0.5 <= hedge_ratio <= 2.0:  # Reasonable hedge ratio
                             opportunities.append((pos.ticket, other_pos.ticket, hedge_ratio))
@@ -824,16 +1019,16 @@ class RealPositionTracker:
             report = {
                 'summary': {
                     'total_positions': len(self.positions),
-                    'profitable_positions': len(self.get_profitable_positions()),
-                    'losing_positions': len(self.get_losing_positions()),
+                    'profitable_positions': self.position_book.count_profit_range(lower=0, lower_inclusive=False),
+                    'losing_positions': self.position_book.count_profit_range(upper=0, upper_inclusive=False),
                     'total_profit': self.portfolio_metrics.total_profit,
                     'win_rate': self.portfolio_metrics.win_rate
                 },
                 'risk_analysis': {
-                    'low_risk': len(self.get_positions_by_risk(RiskLevel.LOW)),
-                    'medium_risk': len(self.get_positions_by_risk(RiskLevel.MEDIUM)),
-                    'high_risk': len(self.get_positions_by_risk(RiskLevel.HIGH)),
-                    'critical_risk': len(self.get_positions_by_risk(RiskLevel.CRITICAL)),
+                    'low_risk': self.position_book.count_by_index('risk_level', RiskLevel.LOW),
+                    'medium_risk': self.position_book.count_by_index('risk_level', RiskLevel.MEDIUM),
+                    'high_risk': self.position_book.count_by_index('risk_level', RiskLevel.HIGH),
+                    'critical_risk': self.position_book.count_by_index('risk_level', RiskLevel.CRITICAL),
                     'portfolio_risk_score': self.portfolio_metrics.risk_score
                 },
                 'exposure_analysis': {
@@ -848,6 +1043,7 @@ class RealPositionTracker:
                     'margin_level': self.portfolio_metrics.margin_level,
                     'free_margin': self.portfolio_metrics.free_margin
                 },
+                'closed_history': self.closed_positions.aggregates.to_dict(),
                 'top_performers': [],
                 'worst_performers': [],
                 'recommendations': {
@@ -857,13 +1053,7 @@ class RealPositionTracker:
                 }
             }
             
-            # Top และ Worst performers
-            sorted_positions = sorted(
-                self.positions.values(), 
-                key=lambda x: x.profit, 
-                reverse=True
-            )
-            
+            # Top และ Worst performers (จาก profit ladder - ไม่ต้อง sort ใหม่)
             report['top_performers'] = [
                 {
                     'ticket': pos.ticket,
@@ -871,7 +1061,7 @@ class RealPositionTracker:
                     'roi_percent': pos.roi_percent,
                     'duration_hours': pos.duration.total_seconds() / 3600
                 }
-                for pos in sorted_positions[:5]
+                for pos in self.position_book.top(5)
             ]
             
             report['worst_performers'] = [
@@ -881,7 +1071,7 @@ class RealPositionTracker:
                     'roi_percent': pos.roi_percent,
                     'duration_hours': pos.duration.total_seconds() / 3600
                 }
-                for pos in sorted_positions[-5:]
+                for pos in self.position_book.bottom(5)
             ]
             
             # Risk warnings
@@ -891,9 +1081,9 @@ class RealPositionTracker:
             if self.portfolio_metrics.margin_level < 200:
                 report['recommendations']['risk_warnings'].append("Low margin level warning")
             
-            critical_positions = self.get_positions_by_risk(RiskLevel.CRITICAL)
-            if critical_positions:
-                report['recommendations']['risk_warnings'].append(f"{len(critical_positions)} positions in critical risk")
+            critical_count = self.position_book.count_by_index('risk_level', RiskLevel.CRITICAL)
+            if critical_count:
+                report['recommendations']['risk_warnings'].append(f"{critical_count} positions in critical risk")
             
             return report
             
@@ -901,8 +1091,12 @@ class RealPositionTracker:
             print(f"❌ Error generating performance report: {e}")
             return {}
     
-    def export_positions_to_json(self, filename: Optional[str] = None) -> str:
-        """Export ข้อมูล positions เป็น JSON"""
+    def export_positions_to_json(self, filename: Optional[str] = None, include_closed: bool = False) -> str:
+        """
+        Export ข้อมูล positions เป็น JSON
+        
+        include_closed=True จะรวม closed positions ทั้งหมด (อ่านจาก disk segments)
+        """
         try:
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -919,9 +1113,13 @@ class RealPositionTracker:
                     'win_rate': self.portfolio_metrics.win_rate
                 },
                 'positions': [],
-                'position_groups': []
+                'position_groups': [],
+                'closed_summary': self.closed_positions.aggregates.to_dict()
             }
             
+            if include_closed:
+                export_data['closed_positions'] = list(self.closed_positions.iter_records())
+            
             # Export positions
             for ticket, pos in self.positions.items():
                 export_data['positions'].append({
@@ -1047,20 +1245,46 @@ class RealPositionTracker:
             print(f"❌ Error closing position {ticket}: {e}")
             return False
     
+    def _execute_basket(self, legs: List[BasketLeg]) -> BasketResult:
+        """ส่งหลายขาพร้อมกันผ่าน order executor (หรือส่งตรงถ้าไม่ได้เชื่อมต่อ)"""
+        if self.order_executor is not None and hasattr(self.order_executor, 'execute_basket'):
+            return self.order_executor.execute_basket(legs)
+        return execute_basket(legs)
+    
     def emergency_close_all(self) -> bool:
         """ปิด positions ทั้งหมด (ฉุกเฉิน)"""
         try:
             print("🚨 EMERGENCY: Closing all positions")
             
-            closed_count = 0
             total_positions = len(self.positions)
             
-            for ticket in list(self.positions.keys()):
-                if self._close_position(ticket):
-                    closed_count += 1
-                time.sleep(0.1)  # Small delay between closes
+            # ปิดทุก position พร้อมกันเป็น basket เดียว
+            legs = [
+                BasketLeg(
+                    kind=BasketLegKind.CLOSE,
+                    symbol=position.symbol,
+                    volume=position.volume,
+                    is_buy=position.position_type != PositionType.BUY,
+                    position_ticket=ticket,
+                    magic_number=888888,
+                    comment=f"Auto Close - {position.comment}"
+                )
+                for ticket, position in list(self.positions.items())
+            ]
+            basket = self._execute_basket(legs)
+            
+            for result in basket.legs:
+                ticket = result.leg.position_ticket
+                if result.success:
+                    position = self.positions.get(ticket)
+                    final_profit = position.profit if position else 0.0
+                    print(f"✅ Position closed: {ticket} - Final P&L: ${final_profit:.2f}")
+                else:
+                    print(f"❌ Failed to close position {ticket}: {result.retcode or result.error_message}")
             
-            print(f"🚨 Emergency close completed: {closed_count}/{total_positions} positions closed")
+            closed_count = basket.successful_count
+            print(f"🚨 Emergency close completed: {closed_count}/{total_positions} positions closed "
+                  f"({basket.elapsed_ms:.0f}ms)")
             return closed_count == total_positions
             
         except Exception as e:
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pytest configuration - ใช้ MT5 Simulator แทน MetaTrader5 เมื่อไม่มี terminal
+(ต้องติดตั้งก่อน test modules import components)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mt5_integration.mt5_simulator import SimulatorConfig, get_active_simulator, install_simulator
+
+try:
+    import MetaTrader5  # noqa: F401
+except ImportError:
+    install_simulator(SimulatorConfig(seed=7, history_bars=2000, latency_ms=1.0, latency_jitter_ms=0.0))
+
+from mt5_integration import symbol_cache
+
+# Symbol cache ที่ใช้ร่วมกัน - ไม่เขียน symbol_metadata_cache.json ลง working directory
+symbol_cache._symbol_cache = symbol_cache.SymbolMetadataCache(cache_file=None)
+
+@pytest.fixture
+def simulator():
+    """Simulator ที่ไม่มี positions / pending orders ค้างจาก test ก่อนหน้า"""
+    active = get_active_simulator()
+    if active is None:
+        pytest.skip("ต้องใช้ MT5 Simulator (พบ MetaTrader5 จริง)")
+
+    active.positions.clear()
+    active.orders.clear()
+    yield active
+    active.positions.clear()
+    active.orders.clear()
+
+def open_position(simulator, is_buy: bool = True, volume: float = 0.01, magic: int = 0) -> int:
+    """เปิด position ใน simulator ด้วย market order - คืน ticket"""
+    import MetaTrader5 as mt5
+    result = mt5.order_send({
+        'action': mt5.TRADE_ACTION_DEAL,
+        'symbol': simulator.config.symbol,
+        'volume': volume,
+        'type': mt5.ORDER_TYPE_BUY if is_buy else mt5.ORDER_TYPE_SELL,
+        'magic': magic
+    })
+    assert result.retcode == mt5.TRADE_RETCODE_DONE
+    return result.order
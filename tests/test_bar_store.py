@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ market_intelligence/bar_store.py
+"""
+
+import numpy as np
+import pytest
+
+from market_intelligence.bar_store import BarRingBuffer, BarStore
+
+RATES_DTYPE = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+               ('close', '<f8'), ('tick_volume', '<i8')]
+
+def _rates(start, count, seed=1):
+    rng = np.random.default_rng(seed + start)
+    close = 2000.0 + np.cumsum(rng.normal(0, 0.5, count))
+    rates = np.zeros(count, dtype=RATES_DTYPE)
+    rates['time'] = (np.arange(count) + start) * 60
+    rates['open'] = close - 0.1
+    rates['high'] = close + 0.3
+    rates['low'] = close - 0.3
+    rates['close'] = close
+    rates['tick_volume'] = rng.integers(1, 100, count)
+    return rates
+
+def test_overlapping_fetches_append_only_new_bars():
+    buffer = BarRingBuffer(capacity=50)
+    assert buffer.append_rates(_rates(0, 20)) == 20
+
+    # fetch ถัดไปซ้อน bar ล่าสุด (กำลังก่อตัว) + bars ใหม่ 5 ตัว
+    update = _rates(19, 6, seed=9)
+    assert buffer.append_rates(update) == 5
+    assert buffer.bars_updated == 1
+    assert len(buffer) == 25
+    assert buffer.view('close', 6).tolist() == update['close'].tolist()
+
+    # bars เก่ากว่า bar ล่าสุดถูกข้าม
+    assert buffer.append_rates(_rates(3, 10)) == 0
+    assert buffer.latest()['time'] == 24 * 60
+
+def test_views_after_wraparound_match_latest_window():
+    store = BarStore(default_capacity=50)
+    history = []
+    for start in range(0, 130, 13):
+        chunk = _rates(start, 13)
+        history.append(chunk)
+        store.append_rates("XAUUSD", "M1", chunk)
+
+    expected = np.concatenate(history)[-50:]
+    closes = store.closes("XAUUSD", "M1")
+    assert store.count("XAUUSD", "M1") == 50
+    assert closes.tolist() == expected['close'].tolist()
+    assert store.volumes("XAUUSD", "M1", 10).tolist() == expected['tick_volume'][-10:].tolist()
+
+    # zero-copy และอ่านอย่างเดียว
+    assert np.shares_memory(closes, store.get_buffer("XAUUSD", "M1").columns['close'])
+    with pytest.raises(ValueError):
+        closes[0] = 0.0
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/basket_executor.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from conftest import open_position
+from mt5_integration.basket_executor import BasketLeg, BasketLegKind, execute_basket, position_ordering_key
+from mt5_integration.order_executor import RealOrderExecutor
+
+@pytest.fixture
+def executor(simulator):
+    # ราคาของขาถูกดึงตอนสร้าง basket - หยุด tick feed ไม่ให้ requote ระหว่างรอ lane
+    simulator.next_tick_at = float('inf')
+    order_executor = RealOrderExecutor(submission_workers=4)
+    order_executor.start_execution_engine()
+    yield order_executor
+    order_executor.stop_execution_engine()
+    simulator.next_tick_at = time.time()
+
+def _close_leg(simulator, ticket):
+    position = simulator.positions[ticket]
+    return BasketLeg(BasketLegKind.CLOSE, simulator.config.symbol, position['volume'],
+                     is_buy=not position['is_buy'], position_ticket=ticket)
+
+def test_results_follow_leg_order_and_invalid_legs_fail_alone(simulator):
+    symbol = simulator.config.symbol
+    legs = [
+        BasketLeg(BasketLegKind.MARKET, symbol, 0.01, is_buy=True),
+        BasketLeg(BasketLegKind.PENDING, symbol, 0.01, is_buy=True),               # ไม่มีราคา
+        BasketLeg(BasketLegKind.MARKET, symbol, 0.02, is_buy=False),
+        BasketLeg(BasketLegKind.CLOSE, symbol, 0.01, is_buy=False),                # ไม่มี ticket
+    ]
+
+    basket = execute_basket(legs)
+
+    assert [result.leg for result in basket.legs] == legs
+    assert [result.success for result in basket.legs] == [True, False, True, False]
+    assert basket.legs[1].error_message == "Pending leg without price"
+    assert basket.legs[3].error_message == "Close leg without position ticket"
+    assert {basket.legs[0].ticket, basket.legs[2].ticket} <= set(simulator.positions)
+
+def test_close_legs_run_in_ticket_lanes(executor, simulator):
+    tickets = [open_position(simulator) for _ in range(3)]
+    seen_open = []
+
+    def slow_modify():
+        time.sleep(0.05)
+        seen_open.append(tickets[0] in simulator.positions)
+
+    executor.submit_to_lane(position_ordering_key(tickets[0]), slow_modify)
+    basket = executor.execute_basket([_close_leg(simulator, ticket) for ticket in tickets])
+
+    assert basket.success
+    assert seen_open == [True]
+    assert not set(tickets) & set(simulator.positions)
+    assert executor.stats['baskets_executed'] == 1
+
+def test_basket_close_and_close_position_on_same_ticket_do_not_race(executor, simulator):
+    ticket = open_position(simulator)
+    key = position_ordering_key(ticket)
+    release = threading.Event()
+    baskets = []
+
+    # lane ถูกบล็อก - basket ต่อคิวก่อน แล้ว close_position ต่อท้าย
+    executor.submit_to_lane(key, release.wait)
+    basket_thread = threading.Thread(target=lambda: baskets.append(
+        executor.execute_basket([_close_leg(simulator, ticket)])))
+    basket_thread.start()
+    deadline = time.time() + 2.0
+    while executor._lane_for_key(key).qsize() < 1 and time.time() < deadline:
+        time.sleep(0.001)
+
+    threading.Timer(0.05, release.set).start()
+    closed_again = executor.close_position(ticket)
+    basket_thread.join(timeout=5)
+
+    assert baskets[0].success
+    assert not closed_again
+    assert ticket not in simulator.positions
+
+def test_basket_from_inside_a_lane_task_does_not_deadlock(executor, simulator):
+    ticket = open_position(simulator)
+
+    # basket ที่ส่งจาก lane task ของ ticket เดียวกันรันบน worker นั้นเลย
+    future = executor.submit_to_lane(position_ordering_key(ticket),
+                                     lambda: executor.execute_basket([_close_leg(simulator, ticket)]))
+
+    assert future.result(timeout=5).success
+    assert ticket not in simulator.positions
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/candle_aggregator.py
+"""
+
+import numpy as np
+
+from mt5_integration.candle_aggregator import CandleAggregator
+
+RATES_DTYPE = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+               ('close', '<f8'), ('tick_volume', '<i8'), ('spread', '<i4'), ('real_volume', '<i8')]
+
+START = 1_767_225_600      # ต้นชั่วโมง (UTC)
+
+def _m1_bars(count, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 2000.0 + np.cumsum(rng.normal(0, 0.4, count))
+    rates = np.zeros(count, dtype=RATES_DTYPE)
+    rates['time'] = START + np.arange(count) * 60
+    rates['open'] = np.concatenate([[2000.0], close[:-1]])
+    rates['high'] = np.maximum(rates['open'], close) + rng.uniform(0, 0.3, count)
+    rates['low'] = np.minimum(rates['open'], close) - rng.uniform(0, 0.3, count)
+    rates['close'] = close
+    rates['tick_volume'] = rng.integers(1, 50, count)
+    rates['spread'] = 20
+    return rates
+
+def _reference(rates, seconds):
+    """candles ที่ปิดแล้วจากการ resample ตรง ๆ (bucket สุดท้ายยังไม่ปิด)"""
+    buckets = rates['time'] - rates['time'] % seconds
+    candles = []
+    for bucket in np.unique(buckets)[:-1]:
+        rows = rates[buckets == bucket]
+        candles.append((int(bucket), rows['open'][0], rows['high'].max(), rows['low'].min(),
+                        rows['close'][-1], int(rows['tick_volume'].sum())))
+    return candles
+
+def _aggregator():
+    aggregator = CandleAggregator("XAUUSD", capacities={'M1': 500, 'M5': 100, 'M15': 50})
+    published = {'M1': [], 'M5': [], 'M15': []}
+    aggregator.subscribe(lambda symbol, tf, candle: published[tf].append(
+        (candle['time'], candle['open'], candle['high'], candle['low'], candle['close'], candle['tick_volume'])))
+    return aggregator, published
+
+def test_published_candles_match_resampled_m1():
+    rates = _m1_bars(181)
+    aggregator, published = _aggregator()
+
+    aggregator.process_m1_bars(rates)
+
+    # M1 ล่าสุดยังก่อตัว - M5 / M15 ปิดเมื่อมี M1 ของ bucket ถัดไป
+    assert len(published['M1']) == 180
+    assert published['M5'] == _reference(rates, 300)
+    assert published['M15'] == _reference(rates, 900)
+
+def test_incremental_fetches_with_forming_bar_give_same_candles():
+    rates = _m1_bars(181, seed=8)
+    aggregator, published = _aggregator()
+
+    # แต่ละรอบซ้อน bar ล่าสุดของรอบก่อน (เหมือน copy_rates_from_pos ที่ start_pos=0)
+    for end in [*range(7, 181, 7), 181]:
+        chunk = rates[max(0, end - 8):end].copy()
+        forming = chunk[-1:].copy()
+        forming['close'] = forming['open']            # bar ที่ยังไม่ครบนาที
+        aggregator.process_m1_bars(np.concatenate([chunk[:-1], forming]))
+        aggregator.process_m1_bars(chunk[-1:])
+
+    assert published['M5'] == _reference(rates, 300)
+    assert published['M15'] == _reference(rates, 900)
+
+def test_forming_candle_is_visible_in_bar_store():
+    rates = _m1_bars(13)
+    aggregator, published = _aggregator()
+    aggregator.process_m1_bars(rates)
+
+    store = aggregator.bar_store
+    assert len(published['M5']) == 2
+    assert store.count("XAUUSD", "M5") == 3
+    # M5 ที่กำลังก่อตัว = M1 ของ bucket ที่สามทั้งหมด (รวม M1 ที่ยังไม่ปิด)
+    assert store.closes("XAUUSD", "M5")[-1] == rates['close'][-1]
+    assert store.highs("XAUUSD", "M5")[-1] == rates['high'][10:].max()
+    assert store.closes("XAUUSD", "M1").tolist() == rates['close'].tolist()
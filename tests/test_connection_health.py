@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/connection_health.py (reconnect circuit breaker)
+"""
+
+import MetaTrader5 as mt5
+
+from mt5_integration.connection_health import CircuitState, ConnectionHealth
+from mt5_integration.mt5_connector import MT5Config, RealMT5Connector
+
+def test_circuit_transitions_closed_open_half_open_closed():
+    health = ConnectionHealth(backoff_base=10.0, backoff_max=60.0, jitter=0.0)
+    assert health.state == CircuitState.CLOSED and health.allow_attempt()
+
+    health.begin_attempt()
+    assert health.record_failure() == 10.0
+    assert health.state == CircuitState.OPEN
+    assert not health.allow_attempt()
+    assert health.stats['fast_failures'] == 1
+
+    # ครบ backoff - ลองได้หนึ่งครั้งในสถานะ HALF_OPEN
+    health.retry_at = 0.0
+    assert health.allow_attempt()
+    health.begin_attempt()
+    assert health.state == CircuitState.HALF_OPEN
+
+    # ล้มเหลวซ้ำ - กลับเป็น OPEN ด้วย backoff สองเท่า (นับ circuit_opened ใหม่)
+    assert health.record_failure() == 20.0
+    assert health.state == CircuitState.OPEN
+    assert health.stats['circuit_opened'] == 2
+
+    health.retry_at = 0.0
+    health.begin_attempt()
+    health.record_success()
+    assert health.state == CircuitState.CLOSED
+    assert health.consecutive_failures == 0
+    assert health.stats['reconnect_successes'] == 1
+
+def test_backoff_is_capped_and_jittered():
+    exact = ConnectionHealth(backoff_base=1.0, backoff_max=8.0, jitter=0.0)
+    jittered = ConnectionHealth(backoff_base=1.0, backoff_max=8.0, jitter=0.25)
+
+    assert [exact.backoff_delay(failures) for failures in range(1, 7)] == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+    assert all(6.0 <= jittered.backoff_delay(10) <= 10.0 for _ in range(200))
+
+def test_connector_fails_fast_while_circuit_is_open(simulator, monkeypatch):
+    connector = RealMT5Connector(MT5Config(reconnect_delay=30.0, reconnect_jitter=0.0))
+    assert connector.connect()
+
+    initialize_calls = []
+
+    def failing_initialize(*args, **kwargs):
+        initialize_calls.append(args)
+        return False
+
+    monkeypatch.setattr(mt5, 'initialize', failing_initialize)
+    connector.health.last_heartbeat = None          # heartbeat เก่า - บังคับตรวจใหม่
+
+    mt5.shutdown()
+    assert not connector.ensure_connection()
+    assert connector.health.state == CircuitState.OPEN
+    calls_after_outage = len(initialize_calls)
+
+    # ระหว่าง backoff ไม่แตะ terminal อีก
+    assert not connector.ensure_connection()
+    assert not connector.reconnect()
+    assert len(initialize_calls) == calls_after_outage
+
+    # terminal กลับมา + ครบ backoff - HALF_OPEN attempt สำเร็จแล้วปิด circuit
+    monkeypatch.undo()
+    connector.health.retry_at = 0.0
+    assert connector.ensure_connection()
+    assert connector.health.state == CircuitState.CLOSED
+    assert connector.health.stats['reconnect_successes'] == 1
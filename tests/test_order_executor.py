@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/order_executor.py (submission lanes)
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from conftest import open_position
+from mt5_integration.basket_executor import position_ordering_key
+from mt5_integration.order_executor import OrderStatus, RealOrderExecutor
+
+@pytest.fixture
+def executor(simulator):
+    order_executor = RealOrderExecutor(submission_workers=4)
+    yield order_executor
+    order_executor.stop_execution_engine()
+
+def test_tasks_with_same_ticket_run_in_submission_order(executor):
+    executor.start_execution_engine()
+    rng = random.Random(3)
+    completed = {ticket: [] for ticket in (101, 102, 103)}
+    lock = threading.Lock()
+
+    def task(ticket, sequence, delay):
+        def run():
+            time.sleep(delay)
+            with lock:
+                completed[ticket].append(sequence)
+        return run
+
+    futures = [executor.submit_to_lane(position_ordering_key(ticket), task(ticket, sequence, rng.uniform(0, 0.003)))
+               for sequence in range(15) for ticket in completed]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert all(sequence == list(range(15)) for sequence in completed.values())
+
+def test_close_waits_behind_earlier_work_on_same_ticket(executor, simulator):
+    ticket = open_position(simulator)
+    executor.start_execution_engine()
+    seen_open = []
+
+    def slow_modify():
+        time.sleep(0.05)
+        seen_open.append(ticket in simulator.positions)
+
+    executor.submit_to_lane(position_ordering_key(ticket), slow_modify)
+    assert executor.close_position(ticket)
+
+    assert seen_open == [True]
+    assert ticket not in simulator.positions
+
+def test_stop_rejects_queued_orders_and_fails_in_flight_futures(executor, simulator):
+    order = executor.create_market_order(simulator.config.symbol, "BUY", 0.01)
+    queued = executor.submit_order_async(order)
+    in_flight: Future = Future()
+    executor._pending_results["in-flight"] = in_flight
+
+    executor.stop_execution_engine()
+
+    assert queued.result(timeout=1).status == OrderStatus.REJECTED
+    assert order.result.error_message == "Execution engine stopped"
+    with pytest.raises(RuntimeError):
+        in_flight.result(timeout=1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ intelligent_recovery/strategies/position_management/pair_matcher.py (incremental status)
+"""
+
+import random
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from intelligent_recovery.strategies.position_management.pair_matcher import (
+    PairDecision, PairStatus, Position, PositionPairMatcher
+)
+
+def _position(ticket, position_type, pnl, price=2000.0, volume=0.02):
+    return Position(ticket=ticket, symbol="XAUUSD", position_type=position_type, volume=volume,
+                    open_price=2000.0, current_price=price, unrealized_pnl=pnl, open_time=datetime.now())
+
+def _matcher_with_pairs(count):
+    matcher = PositionPairMatcher({})
+    positions = {}
+    pairs = []
+    for index in range(count):
+        buy = _position(2 * index + 1, "BUY", -0.2)
+        sell = _position(2 * index + 2, "SELL", 0.1)
+        positions.update({buy.ticket: buy, sell.ticket: sell})
+        pairs.append(matcher._create_hedge_pair(buy, sell))
+    matcher.execute_pair_creation(PairDecision(True, pairs, [], [], "", 1.0))
+
+    events = []
+    matcher.subscribe_transitions(events.append)
+    return matcher, positions, events
+
+def test_incremental_status_matches_full_recomputation():
+    rng = random.Random(4)
+    matcher, positions, events = _matcher_with_pairs(6)
+    max_profit = {pair_id: pair.max_profit for pair_id, pair in matcher.active_pairs.items()}
+
+    for _ in range(200):
+        before = matcher.status_stats['pair_updates']
+        moved = rng.sample(sorted(positions), 2)
+        for ticket in moved:
+            position = positions[ticket]
+            positions[ticket] = replace(position, unrealized_pnl=round(position.unrealized_pnl + rng.uniform(-0.4, 0.4), 2),
+                                        current_price=position.current_price + 0.01)
+
+        matcher.update_pairs_status(list(positions.values()))
+
+        touched = {pair_id for ticket in moved for pair_id in matcher.ticket_pairs[ticket]}
+        assert matcher.status_stats['pair_updates'] - before == len(touched)
+        for pair_id, pair in matcher.active_pairs.items():
+            combined = sum(positions[pos.ticket].unrealized_pnl for pos in pair.positions)
+            max_profit[pair_id] = max(max_profit[pair_id], combined)
+            assert pair.combined_pnl == pytest.approx(combined)
+            assert pair.max_profit == pytest.approx(max_profit[pair_id])
+            assert pair.status == matcher._evaluate_pair_status(pair)
+
+    assert events and all(event.previous_status != event.new_status for event in events)
+
+def test_transitions_published_for_targets_and_closed_legs():
+    matcher, positions, events = _matcher_with_pairs(2)
+    pair = matcher.active_pairs["HEDGE_0001"]
+    assert pair.status == PairStatus.ACTIVE
+
+    positions[1] = replace(positions[1], unrealized_pnl=pair.profit_target + 1.0)
+    matcher.update_position(positions[1])
+    assert [(e.pair_id, e.previous_status, e.new_status) for e in events] == \
+        [("HEDGE_0001", PairStatus.ACTIVE, PairStatus.PROFITABLE)]
+
+    # ขา SELL ของคู่ที่สองหายจาก snapshot - คู่ถูกลบออกจาก index
+    events.clear()
+    matcher.update_pairs_status([positions[1], positions[2], positions[3]])
+    assert [(e.pair_id, e.new_status) for e in events] == [("HEDGE_0002", PairStatus.CLOSED)]
+    assert set(matcher.active_pairs) == {"HEDGE_0001"}
+    assert set(matcher.ticket_pairs) == {1, 2}
+
+def test_auto_closure_closes_pair_on_max_loss():
+    matcher, positions, _ = _matcher_with_pairs(1)
+    closed = []
+
+    class Interface:
+        def close_position(self, request):
+            closed.append(request['position'])
+            return {'retcode': 10009}
+
+    matcher.enable_auto_closure(Interface())
+    pair = matcher.active_pairs["HEDGE_0001"]
+    matcher.update_position(replace(positions[2], unrealized_pnl=-pair.max_loss_limit - 1.0))
+
+    assert sorted(closed) == [1, 2]
+    assert matcher.active_pairs == {} and matcher.ticket_pairs == {}
+    assert matcher.status_stats['auto_closures'] == 1
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ analytics_engine/pattern_detector.py
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics_engine.pattern_detector import (
+    PatternDetector, PatternTimeframe, PriceActionAnalyzer
+)
+
+def _bars(count=400, seed=5):
+    """Random walk bars ที่มีทั้งช่วง trend / sideway"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2026, 1, 5)
+    regime = np.repeat(rng.integers(0, 3, size=count // 40 + 1), 40)[:count]
+    drift = np.array([-1.5, 0.0, 1.5])[regime]
+    noise = np.where(regime == 1, 0.2, 0.8)
+    jumps = np.where(rng.random(count) < 0.03, rng.choice([-12.0, 12.0], size=count), 0.0)
+    closes = 2000 + np.cumsum(drift + jumps + rng.normal(0, 1.0, count) * noise)
+    bars = []
+    for i, close in enumerate(closes):
+        open_price = closes[i - 1] if i else close
+        wick = abs(rng.normal(0, 0.3, 2))
+        bars.append({
+            'timestamp': start + timedelta(minutes=15 * i),
+            'open': float(open_price),
+            'high': float(max(open_price, close) + wick[0]),
+            'low': float(min(open_price, close) - wick[1]),
+            'close': float(close),
+            'volume': float(rng.integers(100, 1000))
+        })
+    return bars
+
+def _signature(pattern):
+    return (pattern.pattern_type, pattern.start_time, pattern.end_time,
+            round(pattern.pattern_strength, 9), round(pattern.success_probability, 9),
+            tuple(sorted((k, round(v, 9) if isinstance(v, float) else v)
+                         for k, v in pattern.pattern_parameters.items())))
+
+def test_vectorized_detection_matches_loop_detection():
+    bars = _bars()
+    vectorized = PriceActionAnalyzer()
+    loop = PriceActionAnalyzer()
+    loop.vectorized_detection = False
+
+    fast = vectorized.detect_price_patterns(bars, PatternTimeframe.M15)
+    slow = loop.detect_price_patterns(bars, PatternTimeframe.M15)
+
+    assert len({p.pattern_type for p in slow}) == 5
+    assert Counter(map(_signature, fast)) == Counter(map(_signature, slow))
+
+def test_incremental_detection_matches_full_scan_on_new_bars():
+    bars = _bars()
+    analyzer = PriceActionAnalyzer()
+    analyzer.detect_new_price_patterns(bars[:300], PatternTimeframe.M15)
+
+    new_patterns = analyzer.detect_new_price_patterns(bars[:340], PatternTimeframe.M15)
+
+    first_new = bars[300]['timestamp']
+    full_patterns = PriceActionAnalyzer().detect_price_patterns(bars[:340], PatternTimeframe.M15)
+    expected = [p for p in full_patterns if p.end_time >= first_new]
+    assert new_patterns
+    assert Counter(map(_signature, new_patterns)) == Counter(map(_signature, expected))
+
+def test_second_incremental_call_emits_only_patterns_of_appended_bars():
+    bars = _bars()
+    detector = PatternDetector()
+
+    first = asyncio.run(detector.detect_patterns(bars[:300], incremental=True))
+    second = asyncio.run(detector.detect_patterns(bars[:340], incremental=True))
+    repeat = asyncio.run(detector.detect_patterns(bars[:340], incremental=True))
+
+    appended = {bar['timestamp'] for bar in bars[300:340]}
+    assert first and second
+    assert all(pattern.end_time in appended for pattern in second)
+    assert repeat == []
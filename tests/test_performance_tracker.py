@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ analytics_engine/performance_tracker.py
+"""
+
+import gc
+import os
+import sqlite3
+import sys
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics_engine import performance_tracker
+from analytics_engine.performance_tracker import (
+    PerformanceTracker, TradeStatus, create_sample_trade_record
+)
+
+def _closed_trade(trade_id: str, pnl: float):
+    trade = create_sample_trade_record(trade_id=trade_id)
+    trade.status = TradeStatus.CLOSED
+    trade.realized_pnl = pnl
+    return trade
+
+def _bucket_trades(tracker: PerformanceTracker) -> int:
+    return sum(bucket.total_trades
+               for day_buckets in tracker.daily_buckets.values()
+               for bucket in day_buckets.values())
+
+def test_re_adding_completed_trade_does_not_double_count(tmp_path):
+    tracker = PerformanceTracker(db_path=str(tmp_path / "performance.db"))
+    try:
+        tracker.add_trade(_closed_trade("T1", 10.0))
+        tracker.add_trade(_closed_trade("T2", -5.0))
+        tracker.add_trade(_closed_trade("T1", 10.0))
+
+        assert _bucket_trades(tracker) == 2
+        assert tracker.daily_trades == 2
+        assert tracker.running_pnl == 5.0
+        assert len(tracker.trade_history) == 2
+    finally:
+        tracker.close()
+
+def test_trackers_are_not_pinned_by_exit_hook(tmp_path):
+    tracker = PerformanceTracker(db_path=str(tmp_path / "performance.db"))
+    tracker_ref = weakref.ref(tracker)
+    assert tracker in performance_tracker._open_trackers
+
+    tracker.close()
+    assert tracker not in performance_tracker._open_trackers
+
+    del tracker
+    gc.collect()
+    assert tracker_ref() is None
+
+def test_exit_hook_flushes_open_trackers(tmp_path):
+    tracker = PerformanceTracker(db_path=str(tmp_path / "performance.db"))
+    tracker.add_trade(_closed_trade("T1", 10.0))
+
+    performance_tracker._close_open_trackers()
+
+    assert not tracker.db_writer.is_running
+    assert len(performance_tracker._open_trackers) == 0
+    with sqlite3.connect(str(tmp_path / "performance.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trade_records").fetchone()[0] == 1
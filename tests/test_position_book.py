@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ position_management/position_book.py
+"""
+
+import random
+from types import SimpleNamespace
+
+from position_management.position_book import PositionBook
+
+TYPES = ('BUY', 'SELL')
+RISKS = ('LOW', 'MEDIUM', 'HIGH')
+
+def _position(ticket, rng):
+    return SimpleNamespace(
+        ticket=ticket,
+        position_type=rng.choice(TYPES),
+        risk_level=rng.choice(RISKS),
+        magic_number=rng.choice((0, 1001, 2002)),
+        entry_reason=rng.choice(('grid', 'scalp')),
+        profit=round(rng.uniform(-50, 50), 1)
+    )
+
+def _assert_consistent(book, live):
+    assert set(book.positions) == set(live)
+    for name in book.index_fields:
+        expected = {}
+        for position in live.values():
+            expected.setdefault(getattr(position, name), set()).add(position.ticket)
+        assert {value: set(bucket) for value, bucket in book.indexes[name].items()} == expected
+
+    by_profit = sorted(live.values(), key=lambda p: (p.profit, p.ticket))
+    assert [p.ticket for p in book.profit_range()] == [p.ticket for p in by_profit]
+    for position_type in TYPES:
+        expected = [p.ticket for p in by_profit if p.position_type == position_type]
+        assert [p.ticket for p in book.profit_range(partition=position_type)] == expected
+
+def test_indexes_and_ladders_follow_in_place_updates():
+    rng = random.Random(5)
+    book = PositionBook()
+    live = {}
+    next_ticket = 1
+
+    for _ in range(600):
+        action = rng.random()
+        if action < 0.35 or not live:
+            position = _position(next_ticket, rng)
+            next_ticket += 1
+            live[position.ticket] = position
+            book.add(position)
+        elif action < 0.85:
+            position = live[rng.choice(list(live))]
+            position.profit = round(position.profit + rng.uniform(-5, 5), 1)
+            if rng.random() < 0.3:
+                position.risk_level = rng.choice(RISKS)
+            book.update(position)
+        else:
+            ticket = rng.choice(list(live))
+            assert book.remove(ticket) is live.pop(ticket)
+
+        _assert_consistent(book, live)
+
+def test_profit_queries_match_scans():
+    rng = random.Random(9)
+    book = PositionBook()
+    positions = [_position(ticket, rng) for ticket in range(1, 80)]
+    for position in positions:
+        book.add(position)
+
+    losing = sorted((p for p in positions if p.profit < 0), key=lambda p: (p.profit, p.ticket))
+    assert book.profit_range(upper=0, upper_inclusive=False) == losing
+    assert book.count_profit_range(lower=-10, upper=10) == sum(-10 <= p.profit <= 10 for p in positions)
+
+    ranked = sorted(positions, key=lambda p: (p.profit, p.ticket), reverse=True)
+    assert book.top(5) == ranked[:5]
+    assert book.bottom(5) == ranked[-5:]
+    assert book.by_index('magic_number', 1001) == [p for p in positions if p.magic_number == 1001]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ position_management/position_history.py
+"""
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from position_management.position_history import ClosedPositionHistory
+
+START = datetime(2026, 1, 5, 9, 0)
+
+def _position(ticket, rng):
+    return SimpleNamespace(
+        ticket=ticket,
+        profit=round(rng.uniform(-20, 20), 2),
+        volume=0.01,
+        entry_reason=rng.choice(('grid', 'scalp')),
+        open_time=START + timedelta(hours=6 * ticket)
+    )
+
+def _to_record(position):
+    return {'ticket': position.ticket, 'profit': position.profit, 'volume': position.volume,
+            'entry_reason': position.entry_reason, 'open_time': position.open_time.isoformat()}
+
+def _from_record(record):
+    return SimpleNamespace(**{**record, 'open_time': datetime.fromisoformat(record['open_time'])})
+
+def _history(tmp_path, **kwargs):
+    return ClosedPositionHistory("test", _to_record, _from_record, history_dir=str(tmp_path), **kwargs)
+
+def test_spills_in_batches_and_iterates_oldest_first(tmp_path):
+    rng = random.Random(2)
+    history = _history(tmp_path, memory_window=5, spill_batch=3)
+    positions = [_position(ticket, rng) for ticket in range(1, 8)]
+    for position in positions:
+        history.append(position)
+
+    # ยังไม่ถึง window + batch - ไม่เขียน disk
+    assert history.spilled_count == 0 and not history.segments
+
+    positions.append(_position(8, rng))
+    history.append(positions[-1])
+    assert history.spilled_count == 3
+    assert len(history.recent) == 5
+    assert len(history) == 8
+
+    assert [p.ticket for p in history] == list(range(1, 9))
+    assert [record['ticket'] for record in history.iter_records()] == list(range(1, 9))
+    assert history.get_recent(2) == positions[-2:]
+
+def test_segments_rotate_by_size(tmp_path):
+    rng = random.Random(4)
+    history = _history(tmp_path, memory_window=2, spill_batch=1, segment_max_bytes=300)
+    for ticket in range(1, 30):
+        history.append(_position(ticket, rng))
+    history.flush()
+
+    assert len(history.segments) > 1
+    assert all(segment.exists() for segment in history.segments)
+    assert [p.ticket for p in history] == list(range(1, 30))
+
+def test_aggregates_match_full_scan(tmp_path):
+    rng = random.Random(6)
+    history = _history(tmp_path, memory_window=10, spill_batch=5)
+    positions = [_position(ticket, rng) for ticket in range(1, 61)]
+    for position in positions:
+        history.append(position)
+
+    stats = history.aggregates.to_dict()
+    wins = [p.profit for p in positions if p.profit > 0]
+    assert stats['count'] == 60
+    assert stats['wins'] == len(wins)
+    assert stats['total_profit'] == pytest.approx(sum(p.profit for p in positions))
+    assert stats['gross_profit'] == pytest.approx(sum(wins))
+    assert stats['best_profit'] == max(p.profit for p in positions)
+    assert stats['worst_profit'] == min(p.profit for p in positions)
+    for reason in ('grid', 'scalp'):
+        assert stats['by_entry_reason'][reason]['count'] == sum(p.entry_reason == reason for p in positions)
+
+    since = (START + timedelta(days=5)).date()
+    expected = sum(p.profit for p in positions if p.open_time.date() >= since)
+    assert history.aggregates.profit_since(since) == pytest.approx(expected)
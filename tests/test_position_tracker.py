@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ position_management/position_tracker.py (diff-based sync)
+"""
+
+import time
+
+import pytest
+
+from conftest import open_position
+from mt5_integration.snapshot_bus import MT5SnapshotBus
+from position_management.position_tracker import PositionChangeType, RealPositionTracker
+
+@pytest.fixture
+def frozen_simulator(simulator):
+    """หยุด tick feed - ราคาเปลี่ยนเฉพาะเมื่อ test แก้เอง"""
+    simulator.next_tick_at = float('inf')
+    yield simulator
+    simulator.next_tick_at = time.time()
+
+@pytest.fixture
+def tracker(frozen_simulator):
+    position_tracker = RealPositionTracker(frozen_simulator.config.symbol)
+    # bus ของ test เอง - ไม่ cache positions ระหว่างรอบ
+    position_tracker.snapshot_bus = MT5SnapshotBus(positions_ttl=0.0)
+    events = []
+    position_tracker.subscribe_changes(events.append)
+    position_tracker.events = events
+    return position_tracker
+
+def _sync(tracker):
+    tracker.events.clear()
+    tracker._update_positions()
+    return [(event.change_type, event.ticket) for event in tracker.events]
+
+def test_opened_positions_get_metrics_before_first_event(tracker, frozen_simulator):
+    ticket = open_position(frozen_simulator, volume=0.1)
+    frozen_simulator.positions[ticket]['price_open'] += 5.0
+
+    assert _sync(tracker) == [(PositionChangeType.OPENED, ticket)]
+
+    position = tracker.events[0].position
+    assert position.profit < 0
+    assert position.max_loss == position.profit
+    assert position.pip_movement == pytest.approx((position.current_price - position.open_price) / 0.01)
+    assert tracker.get_position(ticket) is position
+
+def test_unchanged_positions_are_skipped(tracker, frozen_simulator):
+    ticket = open_position(frozen_simulator)
+    _sync(tracker)
+
+    assert _sync(tracker) == []
+    assert tracker.sync_stats['skipped'] == 1
+    assert tracker.sync_stats['opened'] == 1
+
+def test_modified_and_closed_events(tracker, frozen_simulator):
+    ticket = open_position(frozen_simulator)
+    other = open_position(frozen_simulator, is_buy=False)
+    _sync(tracker)
+    old_profit = tracker.get_position(ticket).profit
+
+    frozen_simulator.positions[ticket]['price_open'] -= 2.0
+    assert _sync(tracker) == [(PositionChangeType.MODIFIED, ticket)]
+    event = tracker.events[0]
+    assert event.changed_fields == ('profit',)
+    assert event.previous_profit == old_profit
+    assert event.position.profit == pytest.approx(old_profit + 2.0)
+
+    del frozen_simulator.positions[other]
+    assert _sync(tracker) == [(PositionChangeType.CLOSED, other)]
+    assert other not in tracker.position_book
+    assert len(tracker.closed_positions) == 1
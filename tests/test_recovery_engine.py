@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ intelligent_recovery/recovery_engine.py (event-driven evaluation)
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import MetaTrader5 as mt5
+import pytest
+
+from intelligent_recovery.recovery_engine import LosingPosition, RealRecoveryEngine
+
+OPEN_PRICE = 2000.0
+
+@pytest.fixture
+def engine(simulator):
+    recovery_engine = RealRecoveryEngine(simulator.config.symbol)
+    recovery_engine._get_current_market_condition = lambda: 'RANGING_TIGHT'
+    return recovery_engine
+
+def _position(ticket, price, volume=0.1):
+    """BUY position ในรูป TradePosition ของ MT5 - profit ตามราคา"""
+    return SimpleNamespace(ticket=ticket, symbol="XAUUSD", type=mt5.POSITION_TYPE_BUY, volume=volume,
+                           price_open=OPEN_PRICE, price_current=price,
+                           profit=round((price - OPEN_PRICE) * volume * 100, 2),
+                           time=int(time.time()) - 600, magic=0, comment="")
+
+def _update(engine, ticket, price):
+    position = _position(ticket, price)
+    engine._on_position_update(ticket=ticket, symbol=position.symbol, position_type=position.type,
+                               volume=position.volume, open_price=position.price_open, current_price=price,
+                               profit=position.profit, open_time=datetime.now(), magic_number=0, comment="")
+
+def test_snapshot_scan_forwards_only_changed_positions(engine):
+    engine._scan_losing_positions([_position(1, 1999.0), _position(2, 2001.0)])
+    assert set(engine.losing_positions) == {1}
+    assert engine._dirty_tickets == {1}
+
+    engine._scan_losing_positions([_position(1, 1999.0), _position(2, 2001.0)])
+    assert engine.event_stats['unchanged_positions'] == 2
+    assert engine.event_stats['position_events'] == 2
+
+    # 1 กลับมากำไร, 2 ถูกปิด
+    engine._scan_losing_positions([_position(1, 2000.5)])
+    assert engine.losing_positions == {}
+    assert engine._dirty_tickets == set()
+    assert set(engine._open_positions) == {1}
+
+def test_only_upward_threshold_crossings_mark_ticket_dirty(engine):
+    _update(engine, 7, 1999.9)                    # 10 pips
+    engine._dirty_tickets.clear()
+    engine._evaluated_thresholds[7] = 25.0
+
+    def dirty_after(price):
+        _update(engine, 7, price)
+        dirty = 7 in engine._dirty_tickets
+        engine._dirty_tickets.clear()
+        return dirty
+
+    assert [dirty_after(price) for price in (1999.85, 1999.70, 1999.60, 1999.80, 1999.74)] == \
+        [False, True, False, False, True]
+    assert engine.event_stats['threshold_crossings'] == 2
+
+def test_candidates_cover_market_change_and_due_rechecks(engine):
+    for ticket in (1, 2, 3):
+        _update(engine, ticket, 1999.0)
+
+    candidates, condition = engine._take_candidates()
+    assert sorted(candidates) == [1, 2, 3] and condition == 'RANGING_TIGHT'
+
+    # ไม่มี event ใหม่ - ไม่มี candidates
+    assert engine._take_candidates()[0] == []
+
+    engine._schedule_recheck(2, 0.0)
+    engine._schedule_recheck(3, 60.0)
+    assert engine._take_candidates()[0] == [2]
+
+    engine._get_current_market_condition = lambda: 'VOLATILE_HIGH'
+    candidates, condition = engine._take_candidates()
+    assert sorted(candidates) == [1, 2, 3] and condition == 'VOLATILE_HIGH'
+
+def _losing_positions(count, seed):
+    rng = random.Random(seed)
+    now = datetime.now()
+    positions = []
+    for ticket in range(1, count + 1):
+        is_buy = rng.random() < 0.5
+        open_price = OPEN_PRICE + rng.uniform(-3, 3)
+        positions.append(LosingPosition(
+            ticket=ticket,
+            symbol="XAUUSD",
+            position_type=mt5.POSITION_TYPE_BUY if is_buy else mt5.POSITION_TYPE_SELL,
+            volume=rng.choice((0.01, 0.03, 0.05, 0.1, 0.2)),
+            open_price=open_price,
+            current_price=OPEN_PRICE,
+            profit=-round(rng.uniform(5, 800), 2),
+            # ห่างจากขอบ min_wait / 30 นาที - ไม่ขึ้นกับเวลาที่ผ่านไประหว่าง test
+            open_time=now - timedelta(seconds=rng.choice((10, 40, 600, 2400, 5000))),
+            recovery_attempts=rng.choice((0, 0, 1, 5))
+        ))
+    return positions
+
+@pytest.mark.parametrize("condition", ['RANGING_TIGHT', 'VOLATILE_HIGH', 'TRENDING_STRONG'])
+def test_batch_evaluation_matches_per_position_checks(engine, condition):
+    tick = SimpleNamespace(bid=OPEN_PRICE - 0.05, ask=OPEN_PRICE + 0.05)
+    positions = _losing_positions(60, seed=11)
+
+    ranked = engine.evaluate_recovery_candidates(positions, current_tick=tick, market_condition=condition)
+    batch_thresholds = dict(engine._evaluated_thresholds)
+
+    expected = [p.ticket for p in positions if engine._should_start_recovery(p, tick, condition)]
+    assert sorted(c.losing_position.ticket for c in ranked) == expected
+    assert 0 < len(expected) < len(positions)
+
+    for position in positions:
+        assert batch_thresholds[position.ticket] == pytest.approx(
+            engine._calculate_smart_threshold(position, condition))
+
+    for candidate in ranked:
+        position = candidate.losing_position
+        plan = engine._design_recovery_strategy(position)
+        assert candidate.strategy == plan.strategy
+        assert candidate.success_probability == pytest.approx(plan.success_probability)
+
+    scores = [candidate.score for candidate in ranked]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ money_management/risk_calculator.py และ risk_kernels.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from money_management.risk_calculator import (
+    CorrelationAnalyzer, DrawdownCalculator, ValueAtRiskCalculator
+)
+from money_management.risk_kernels import compute_var_surface
+
+def _returns(count=500, seed=7):
+    return np.random.default_rng(seed).normal(0.0, 1.0, count).tolist()
+
+def test_var_surface_matches_sorted_reference():
+    returns = _returns()
+    surface = compute_var_surface(returns, (0.95, 0.99), (30, 60, 120))
+
+    assert set(surface) == {'all', 30, 60, 120}
+    for key, window in (('all', returns), (60, returns[-60:])):
+        ordered = sorted(window)
+        for level in (0.95, 0.99):
+            index = max(0, int((1 - level) * len(window)) - 1)
+            var_value = abs(ordered[index])
+            tail = [r for r in window if r <= -var_value]
+
+            assert surface[key][level]['historical'] == var_value
+            assert surface[key][level]['cvar'] == pytest.approx(abs(sum(tail) / len(tail)))
+            assert surface[key][level]['tail_observations'] == len(tail)
+
+def test_conditional_var_is_at_least_var():
+    calculator = ValueAtRiskCalculator()
+    returns = _returns()
+
+    var_value, _ = calculator.calculate_var(returns, 0.95)
+    cvar_value, metadata = calculator.calculate_conditional_var(returns, 0.95)
+
+    assert cvar_value >= var_value
+    assert metadata['var_value'] == var_value
+
+def test_drawdown_metrics_match_loop_reference():
+    equity = [100, 110, 105, 99, 112, 108, 108, 115, 90]
+    metrics = DrawdownCalculator().calculate_drawdown_metrics(equity)
+
+    peak, drawdowns = equity[0], []
+    for value in equity:
+        peak = max(peak, value)
+        drawdowns.append((value - peak) / peak * 100)
+
+    assert metrics['maximum_drawdown'] == abs(min(drawdowns))
+    assert metrics['current_drawdown'] == abs(drawdowns[-1])
+    assert [(p['start'], p['end']) for p in metrics['underwater_periods']] == [(2, 3), (5, 6), (8, 8)]
+    assert metrics['current_drawdown_duration'] == 1
+    assert metrics['average_recovery_time'] == 2.0
+
+def _correlation_positions(count, start=0):
+    opened = datetime(2026, 1, 5, 9, 0)
+    return [{
+        'position_id': ticket,
+        'symbol': 'XAUUSD' if ticket % 3 else 'XAGUSD',
+        'direction': 'BUY' if ticket % 2 else 'SELL',
+        'entry_strategy': ('GRID', 'MARTINGALE', 'HEDGE')[ticket % 3],
+        'timeframe': 'M5' if ticket % 4 else 'H1',
+        'open_time': opened + timedelta(minutes=37 * ticket),
+        'volume': 0.1
+    } for ticket in range(start, start + count)]
+
+def _pairwise_matrix(analyzer, positions):
+    n = len(positions)
+    expected = np.eye(n)
+    for i in range(n):
+        for j in range(i + 1, n):
+            expected[i, j] = expected[j, i] = analyzer._estimate_position_correlation(positions[i], positions[j])
+    return expected
+
+def test_correlation_matrix_matches_pairwise_estimate():
+    analyzer = CorrelationAnalyzer()
+    positions = _correlation_positions(25)
+
+    matrix = analyzer._build_correlation_matrix(positions, incremental=False)
+
+    np.testing.assert_allclose(matrix, _pairwise_matrix(analyzer, positions))
+
+def test_incremental_matrix_recomputes_only_new_positions():
+    analyzer = CorrelationAnalyzer()
+    analyzer._build_correlation_matrix(_correlation_positions(20))
+
+    # ปิด 5 positions แรก และเปิดใหม่ 3 positions
+    positions = _correlation_positions(18, start=5)
+    matrix = analyzer._build_correlation_matrix(positions)
+
+    assert analyzer.matrix_stats['full_builds'] == 1
+    assert analyzer.matrix_stats['incremental_updates'] == 1
+    assert analyzer.matrix_stats['rows_recomputed'] == 20 + 3
+    np.testing.assert_allclose(matrix, _pairwise_matrix(analyzer, positions))
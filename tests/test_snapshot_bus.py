@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/snapshot_bus.py
+"""
+
+import dataclasses
+
+import pytest
+
+from conftest import open_position
+from mt5_integration.snapshot_bus import MT5SnapshotBus
+
+def test_poll_publishes_new_immutable_snapshot_versions(simulator):
+    bus = MT5SnapshotBus()
+    bus.register_symbol(simulator.config.symbol)
+    assert bus.get_snapshot().version == 0
+
+    first = bus.poll_once()
+    second = bus.poll_once()
+
+    assert (first.version, second.version) == (1, 2)
+    assert bus.get_snapshot() is second
+    assert first.get_tick(simulator.config.symbol) is not None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.version = 5
+    assert bus.wait_for_update(1, timeout=0.01) is second
+
+def test_subscribers_receive_each_snapshot_in_order(simulator):
+    bus = MT5SnapshotBus()
+    versions = []
+    bus.subscribe(lambda snapshot: versions.append(snapshot.version))
+
+    for _ in range(3):
+        bus.poll_once()
+
+    assert versions == [1, 2, 3]
+
+def test_positions_polled_only_for_position_subscribers(simulator):
+    ticket = open_position(simulator)
+    bus = MT5SnapshotBus()
+    callback = lambda snapshot: None
+
+    bus.subscribe(callback)
+    snapshot = bus.poll_once()
+    assert not snapshot.positions_polled
+    assert snapshot.get_positions() is None
+    assert bus.terminal_calls == 0
+
+    bus.subscribe(callback, positions=True)
+    snapshot = bus.poll_once()
+    assert snapshot.positions_polled
+    assert [pos.ticket for pos in snapshot.get_positions()] == [ticket]
+
+def test_lazy_position_reads_are_cached_for_ttl(simulator):
+    ticket = open_position(simulator)
+    bus = MT5SnapshotBus(positions_ttl=60.0)
+
+    first = bus.get_positions()
+    second = bus.get_positions(simulator.config.symbol)
+
+    assert [pos.ticket for pos in first] == [ticket]
+    assert second == first
+    assert bus.terminal_calls == 1
+    assert (bus.read_fetches, bus.snapshot_reads) == (1, 1)
+
+    bus.positions_ttl = 0.0
+    bus.get_positions()
+    assert bus.terminal_calls == 2
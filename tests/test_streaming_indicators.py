@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ adaptive_entries/streaming_indicators.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_entries.streaming_indicators import StreamingIndicatorEngine
+
+def _engine_with_bars(count=120, seed=11):
+    rng = np.random.default_rng(seed)
+    engine = StreamingIndicatorEngine(capacity=200)
+    closes = 2000 + np.cumsum(rng.normal(0, 1.5, count))
+    bars = []
+    for close in closes.tolist():
+        high = close + abs(rng.normal(0, 0.8))
+        low = close - abs(rng.normal(0, 0.8))
+        engine.update(high, low, close, 100)
+        bars.append((high, low, close))
+    return engine, bars
+
+def _wilder_reference(values, period):
+    average = sum(values[:period]) / period
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+    return average
+
+def test_period_paths_match_streaming_wilder_values():
+    engine, _ = _engine_with_bars()
+
+    assert engine.rsi_for_period(engine.rsi_period) == pytest.approx(engine.rsi())
+    assert engine.atr_for_period(engine.atr_period) == pytest.approx(engine.atr())
+
+def test_non_default_periods_use_wilder_smoothing():
+    engine, bars = _engine_with_bars()
+    closes = [close for _, _, close in bars]
+    changes = [b - a for a, b in zip(closes, closes[1:])]
+    true_ranges = [max(high - low, abs(high - previous), abs(low - previous))
+                   for (high, low, _), previous in zip(bars[1:], closes)]
+
+    avg_gain = _wilder_reference([max(change, 0.0) for change in changes], 9)
+    avg_loss = _wilder_reference([max(-change, 0.0) for change in changes], 9)
+
+    assert engine.rsi_for_period(9) == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss))
+    assert engine.atr_for_period(21) == pytest.approx(_wilder_reference(true_ranges, 21))
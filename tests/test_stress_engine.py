@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ money_management/stress_engine.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from money_management.stress_engine import (
+    StressScenario, build_portfolio_exposure, direction_sign, run_stress_scenarios
+)
+
+ACCOUNT = {'equity': 10000.0, 'used_margin': 0.0}
+
+def _position(ticket, direction, volume=0.1, price=2000.0):
+    return {'position_id': ticket, 'symbol': 'XAUUSD', 'type': direction,
+            'volume': volume, 'current_price': price}
+
+def test_direction_sign_maps_strings_and_mt5_constants():
+    assert direction_sign({'direction': 'BUY'}) == 1.0
+    assert direction_sign({'direction': 'sell'}) == -1.0
+    assert direction_sign({'type': 0}) == 1.0
+    assert direction_sign({'type': 1}) == -1.0
+    assert direction_sign({'type': 2}) is None
+    assert direction_sign({'type': 'BUY_LIMIT'}) is None
+    assert direction_sign({}) is None
+
+def test_exposure_skips_unknown_types_and_signs_mt5_sell():
+    exposure = build_portfolio_exposure(
+        [_position(1, 0), _position(2, 1), _position(3, 4)], ACCOUNT
+    )
+
+    assert exposure.position_ids == ['1', '2']
+    assert exposure.notional[0] > 0
+    assert exposure.notional[1] < 0
+
+def test_stress_loss_is_non_zero_for_open_positions():
+    exposure = build_portfolio_exposure(
+        [_position(1, 'BUY', volume=1.0), _position(2, 0, volume=0.5)], ACCOUNT
+    )
+    scenario = StressScenario(name="Gold crash", price_shock_percent=-5.0, volatility_multiplier=2.0)
+
+    result, = run_stress_scenarios(exposure, [scenario], paths=2000, parallel=False)
+
+    assert result.var_95 > 0
+    assert result.expected_loss > 0
+    assert result.worst_loss > 0
+
+def test_stress_loss_for_short_book_under_price_drop_is_gain():
+    exposure = build_portfolio_exposure([_position(1, 1, volume=1.0)], ACCOUNT)
+    scenario = StressScenario(name="Gold crash", price_shock_percent=-5.0)
+
+    result, = run_stress_scenarios(exposure, [scenario], paths=2000, parallel=False)
+
+    assert result.expected_pnl > 0
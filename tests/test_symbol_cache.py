@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests สำหรับ mt5_integration/symbol_cache.py
+"""
+
+import time
+
+import MetaTrader5 as mt5
+
+from mt5_integration.symbol_cache import SymbolMetadata, SymbolMetadataCache
+
+def test_metadata_is_served_from_cache_until_ttl_expires(simulator):
+    cache = SymbolMetadataCache(ttl_seconds=60.0, cache_file=None)
+    symbol = simulator.config.symbol
+
+    first = cache.get(symbol)
+    second = cache.get(symbol)
+    assert second is first
+    assert (cache.stats['refreshes'], cache.stats['hits']) == (1, 1)
+
+    first.fetched_at -= 61.0
+    assert cache.get_cached(symbol) is None
+    refreshed = cache.get(symbol)
+    assert refreshed is not first
+    assert cache.stats['refreshes'] == 2
+
+def test_invalidate_drops_metadata_and_templates(simulator):
+    cache = SymbolMetadataCache(cache_file=None)
+    symbol = simulator.config.symbol
+    template = cache.get_request_template(symbol, mt5.TRADE_ACTION_DEAL, mt5.ORDER_TYPE_BUY)
+    assert cache.get_request_template(symbol, mt5.TRADE_ACTION_DEAL, mt5.ORDER_TYPE_BUY) is template
+
+    cache.invalidate()
+
+    assert cache.get_cached(symbol) is None
+    assert cache.get_request_template(symbol, mt5.TRADE_ACTION_DEAL, mt5.ORDER_TYPE_BUY) is not template
+
+def test_disk_warm_start_skips_expired_entries(tmp_path):
+    cache_file = tmp_path / "symbols.json"
+    writer = SymbolMetadataCache(ttl_seconds=60.0, cache_file=str(cache_file))
+    writer.put(SymbolMetadata(name="FRESH", digits=2, fetched_at=time.time()))
+    writer.put(SymbolMetadata(name="STALE", digits=2, fetched_at=time.time() - 120.0))
+
+    reader = SymbolMetadataCache(ttl_seconds=60.0, cache_file=str(cache_file))
+
+    assert reader.get_cached("FRESH").digits == 2
+    assert reader.get_cached("STALE") is None
+    assert reader.stats['disk_loaded'] == 1
+
+def test_build_request_normalizes_price_and_volume(simulator):
+    cache = SymbolMetadataCache(cache_file=None)
+    symbol = simulator.config.symbol
+
+    request = cache.build_request(symbol, mt5.TRADE_ACTION_DEAL, mt5.ORDER_TYPE_BUY,
+                                  price=2001.23456, volume=0.0149, sl=1990.111, magic=7, comment=None)
+
+    assert request['price'] == 2001.23
+    assert request['volume'] == 0.01
+    assert request['sl'] == 1990.11
+    assert request['magic'] == 7
+    assert request['comment'] == ""
+    assert 'tp' not in request
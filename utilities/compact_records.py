@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMPACT RECORDS - Slotted Dataclasses for Hot Records
+====================================================
+records ที่สร้างหลายพันตัวต่อชั่วโมงและถูกเก็บไว้นาน (Position, TradeRecord, TickData)
+ใช้ dataclass แบบ __slots__ - ไม่มี __dict__ ต่อ instance
+
+🎯 FEATURES:
+- slotted_dataclass: @dataclass(slots=True) (Python < 3.10 ใช้ dataclass ปกติ)
+- record_to_dict: แปลง record เป็น dict สำหรับ exporters (Enum → value, datetime → ISO)
+- benchmark_record_memory: วัด bytes ต่อ record ก่อน / หลังใช้ slots
+
+เชื่อมต่อไปยัง:
+- position_management/position_tracker.py (Position)
+- analytics_engine/performance_tracker.py (TradeRecord)
+- analytics_engine/trade_analyzer.py (TradeRecord)
+- mt5_integration/market_data_stream.py (TickData)
+"""
+
+import sys
+import tracemalloc
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass, make_dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+SLOTS_SUPPORTED = sys.version_info >= (3, 10)
+
+def slotted_dataclass(cls=None, **kwargs):
+    """@dataclass ที่สร้าง __slots__ (ถ้า Python รองรับ)"""
+    if SLOTS_SUPPORTED:
+        kwargs.setdefault('slots', True)
+
+    def wrap(target):
+        return dataclass(target, **kwargs)
+
+    return wrap if cls is None else wrap(cls)
+
+def _plain_value(value: Any) -> Any:
+    """แปลงค่าให้ JSON serialize ได้"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if is_dataclass(value):
+        return record_to_dict(value)
+    if isinstance(value, (list, tuple)):
+        return [_plain_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain_value(item) for key, item in value.items()}
+    return value
+
+def record_to_dict(record: Any) -> Dict[str, Any]:
+    """แปลง dataclass record (slotted หรือไม่ก็ได้) เป็น dict ที่ JSON serialize ได้"""
+    return {f.name: _plain_value(getattr(record, f.name)) for f in fields(record)}
+
+def _unslotted_copy(cls) -> type:
+    """สร้าง dataclass แบบเดิม (มี __dict__) ที่มี fields เดียวกัน - ใช้เปรียบเทียบ"""
+    definitions = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            definitions.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            definitions.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            definitions.append((f.name, f.type))
+    return make_dataclass(f"{cls.__name__}WithDict", definitions)
+
+def measure_bytes_per_record(factory: Callable[[int], Any], count: int = 10000) -> float:
+    """bytes ที่จองเพิ่มต่อ record (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        records = [factory(index) for index in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del records
+    return allocated / count
+
+def benchmark_record_memory(count: int = 10000) -> Dict[str, Dict[str, Any]]:
+    """
+    วัดหน่วยความจำต่อ record ของ hot records ก่อน (dataclass + __dict__) / หลัง (slots)
+
+    module ที่ import ไม่ได้จะถูกข้ามและรายงานเป็น skipped
+    """
+    print("⚡ ทดสอบหน่วยความจำของ Records...")
+
+    now = datetime.now()
+    samples: List[Tuple[str, str, str, Callable[[Any, type, int], Any]]] = [
+        ("position_tracker.Position", "position_management.position_tracker", "Position",
+         lambda module, cls, i: cls(
+             ticket=i, symbol="XAUUSD.v", position_type=module.PositionType.BUY, volume=0.01,
+             open_price=2000.0 + i, current_price=2001.0, profit=1.0, swap=0.0, commission=0.0,
+             open_time=now, magic_number=123, comment="grid")),
+        ("performance_tracker.TradeRecord", "analytics_engine.performance_tracker", "TradeRecord",
+         lambda module, cls, i: cls(
+             trade_id=f"T{i}", position_id=f"P{i}", symbol="XAUUSD.v", entry_time=now,
+             direction=module.TradeDirection.BUY, volume=0.01, entry_price=2000.0 + i)),
+        ("trade_analyzer.TradeRecord", "analytics_engine.trade_analyzer", "TradeRecord",
+         lambda module, cls, i: cls(
+             trade_id=f"T{i}", position_id=f"P{i}", entry_price=2000.0 + i)),
+        ("market_data_stream.TickData", "mt5_integration.market_data_stream", "TickData",
+         lambda module, cls, i: cls(
+             symbol="XAUUSD.v", time=now, bid=2000.0 + i, ask=2000.3 + i, last=0.0, volume=1, spread=0.0)),
+    ]
+
+    results = {}
+    for name, module_name, class_name, build in samples:
+        try:
+            module = import_module(module_name)
+            cls = getattr(module, class_name)
+        except Exception as e:
+            results[name] = {'skipped': f"{type(e).__name__}: {e}"}
+            print(f"⏭️ {name}: skipped ({results[name]['skipped']})")
+            continue
+
+        legacy_cls = _unslotted_copy(cls)
+        before = measure_bytes_per_record(lambda i: build(module, legacy_cls, i), count)
+        after = measure_bytes_per_record(lambda i: build(module, cls, i), count)
+        results[name] = {
+            'bytes_before': before,
+            'bytes_after': after,
+            'saved_percent': (1 - after / before) * 100 if before else 0.0,
+            'slotted': hasattr(cls, '__slots__')
+        }
+        print(f"📊 {name}: {before:.0f} → {after:.0f} bytes/record "
+              f"({results[name]['saved_percent']:.0f}% less)")
+
+    return results
+
+if __name__ == "__main__":
+    benchmark_record_memory()
@@ -33,6 +33,8 @@ class ErrorCategory(Enum):
     CONFIGURATION = "CONFIGURATION"
     NETWORK = "NETWORK"
     DATABASE = "DATABASE"
+    RISK_CALCULATION = "RISK_CALCULATION"
+    PATTERN_DETECTION = "PATTERN_DETECTION"
 
 class ErrorSeverity(Enum):
     """ระดับความร้ายแรง"""